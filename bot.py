@@ -211,6 +211,10 @@ class HawkBot(commands.Bot):
             await self.keep_alive.stop()
             logger.info("🔄 Sistema keep alive parado")
         
+        # Gravar eventos de check-in pendentes antes de fechar o storage
+        if hasattr(self, 'checkin_system'):
+            self.checkin_system.close()
+        
         # Fechar conexão do storage
         if hasattr(self.storage, 'close'):
             await self.storage.close()
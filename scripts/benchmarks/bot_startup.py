@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de inicialização do HawkBot
+Mede, em processos novos, o tempo do início do interpretador até o bot
+estar pronto para conectar (import de `bot` + construção do HawkBot), com e
+sem o registro de serviços sob demanda, e o custo do primeiro acesso a um
+sistema no modo lazy. Cada processo roda num diretório temporário para que
+os arquivos de dados criados pelos sistemas não sujem o repositório.
+
+Uso: python scripts/benchmarks/bot_startup.py [--runs 5] [--first-use music_system]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[2] / 'src'
+
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {src!r})
+import bot
+ready = time.perf_counter() - started
+first_use = None
+if {service!r} and bot.bot.lazy_services:
+    began = time.perf_counter()
+    getattr(bot.bot, {service!r})
+    first_use = time.perf_counter() - began
+stats = bot.bot.services.get_stats()
+print(json.dumps({{"ready": ready, "first_use": first_use, "loaded": stats["loaded"],
+                  "registered": stats["registered"], "modules": len(sys.modules)}}))
+'''
+
+
+def run_probe(lazy, service):
+    """Executa um processo novo e devolve as medições (ou o erro)"""
+    env = dict(os.environ, HAWKBOT_LAZY_SERVICES='1' if lazy else '0', DISCORD_TOKEN='')
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE.format(src=str(SRC_DIR), service=service)],
+            cwd=workdir, env=env, capture_output=True, text=True
+        )
+    if result.returncode != 0:
+        last_line = (result.stderr.strip().splitlines() or ['?'])[-1]
+        return {'error': last_line}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--first-use', default='music_system',
+                        help='serviço acessado depois do ready no modo lazy')
+    args = parser.parse_args()
+
+    print(f"📊 Inicialização do HawkBot ({args.runs} processos por modo)")
+    print(f"   {'modo':>6}  {'ready ms':>9}  {'mín ms':>8}  {'serviços':>9}  {'módulos':>8}")
+    for lazy in (True, False):
+        mode = 'lazy' if lazy else 'eager'
+        samples = [run_probe(lazy, args.first_use) for _ in range(args.runs)]
+        errors = [sample['error'] for sample in samples if 'error' in sample]
+        if errors:
+            print(f"   {mode:>6}  falhou: {errors[0]}")
+            continue
+        ready = [sample['ready'] * 1000 for sample in samples]
+        last = samples[-1]
+        print(f"   {mode:>6}  {statistics.median(ready):>9.1f}  {min(ready):>8.1f}  "
+              f"{last['loaded']:>4}/{last['registered']:<4}  {last['modules']:>8}")
+        if lazy and last['first_use'] is not None:
+            first_use = statistics.median(sample['first_use'] * 1000 for sample in samples)
+            print(f"   {'':>6}  primeiro acesso a {args.first_use}: {first_use:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do livro de ofertas do mercado P2P
+Coloca ordens aleatórias de compra e venda (com cancelamentos) em poucos
+itens, casando cada uma como `ModernEconomySystem._try_execute_order`, e
+mede a latência por faixa de ordens enquanto o livro cresce. Compara com a
+varredura + ordenação de todas as ordens usada antes.
+
+Uso: python scripts/benchmarks/market_order_book.py [--orders 100000] [--buckets 10]
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.features.economy.modern_system import (
+    CurrencyType, MarketOrderModel, MarketOrderStatus, MarketOrderType
+)
+from src.features.economy.order_book import MarketOrderBooks
+
+ITEMS = ['daily_boost_2x', 'vip_badge', 'lucky_charm', 'xp_boost', 'custom_color']
+
+
+def build_orders(count, seed=11):
+    """Ordens com preços em torno de 100 e leve viés vendedor para o livro crescer"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    orders = []
+    for i in range(count):
+        buy = rng.random() < 0.45
+        price = rng.gauss(96 if buy else 104, 6)
+        orders.append(MarketOrderModel(
+            order_id=f"order_{i}",
+            user_id=rng.randrange(5000),
+            order_type=MarketOrderType.BUY if buy else MarketOrderType.SELL,
+            item_id=rng.choice(ITEMS),
+            quantity=rng.randint(1, 20),
+            price_per_unit=Decimal(max(1, round(price, 2))).quantize(Decimal('0.01')),
+            currency=CurrencyType.COINS,
+            created_at=now + timedelta(microseconds=i),
+            expires_at=now + timedelta(days=7)
+        ))
+    return orders
+
+
+def fill(order, other):
+    quantity = min(order.remaining_quantity, other.remaining_quantity)
+    order.filled_quantity += quantity
+    other.filled_quantity += quantity
+    for o in (order, other):
+        if o.remaining_quantity == 0:
+            o.status = MarketOrderStatus.FILLED
+
+
+def place_with_book(books, order):
+    book = books.book(order.item_id, order.currency)
+    fills = 0
+    for other in book.crossing(order):
+        fill(order, other)
+        fills += 1
+        if other.status == MarketOrderStatus.FILLED:
+            books.remove(other.order_id)
+    if order.status == MarketOrderStatus.ACTIVE:
+        books.add(order)
+    return fills
+
+
+def place_with_scan(market_orders, order):
+    """Algoritmo anterior: varre todas as ordens e ordena as compatíveis"""
+    market_orders[order.order_id] = order
+    compatible = []
+    for other_id, other in market_orders.items():
+        if (other_id != order.order_id and other.status == MarketOrderStatus.ACTIVE and
+                other.item_id == order.item_id and other.currency == order.currency and
+                other.order_type != order.order_type):
+            if order.order_type == MarketOrderType.BUY:
+                if order.price_per_unit >= other.price_per_unit:
+                    compatible.append(other)
+            elif order.price_per_unit <= other.price_per_unit:
+                compatible.append(other)
+    compatible.sort(key=lambda x: x.price_per_unit, reverse=order.order_type == MarketOrderType.SELL)
+    for other in compatible:
+        if order.remaining_quantity == 0:
+            break
+        fill(order, other)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, default=100000)
+    parser.add_argument('--buckets', type=int, default=10)
+    parser.add_argument('--cancel-rate', type=float, default=0.1)
+    parser.add_argument('--scan-sample', type=int, default=5000)
+    args = parser.parse_args()
+
+    orders = build_orders(args.orders)
+    rng = random.Random(3)
+    books = MarketOrderBooks()
+    bucket = max(1, args.orders // args.buckets)
+    total_fills = 0
+    resting = []
+
+    print(f"📊 {args.orders} ordens em {len(ITEMS)} itens, {args.cancel_rate:.0%} de cancelamentos")
+    print(f"   {'ordens':>12}  {'abertas':>8}  {'µs/ordem':>9}  {'p99 µs':>8}")
+    for start in range(0, args.orders, bucket):
+        latencies = []
+        for order in orders[start:start + bucket]:
+            began = time.perf_counter()
+            total_fills += place_with_book(books, order)
+            if resting and rng.random() < args.cancel_rate:
+                books.remove(resting.pop(rng.randrange(len(resting))))
+            latencies.append(time.perf_counter() - began)
+            if order.status == MarketOrderStatus.ACTIVE:
+                resting.append(order.order_id)
+        latencies.sort()
+        mean = sum(latencies) / len(latencies) * 1e6
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+        print(f"   {start + len(latencies):>12,}  {len(books):>8,}  {mean:>9.1f}  {p99:>8.1f}")
+
+    scan_orders = build_orders(args.scan_sample)
+    market_orders = {}
+    began = time.perf_counter()
+    for order in scan_orders:
+        place_with_scan(market_orders, order)
+    scan_us = (time.perf_counter() - began) / len(scan_orders) * 1e6
+
+    print(f"   Fills executados: {total_fills:,}")
+    print(f"   Varredura antiga: {scan_us:,.1f} µs/ordem em média nas primeiras "
+          f"{args.scan_sample:,} ordens (cresce com o número de ordens)")
+
+
+if __name__ == '__main__':
+    main()
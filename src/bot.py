@@ -16,7 +16,7 @@ import logging
 import os
 from dotenv import load_dotenv
 from datetime import datetime
-from typing import Literal
+from typing import Literal, Optional
 
 # Configuração de sincronização de comandos slash
 # Sincronização automática habilitada para funcionamento normal
@@ -34,36 +34,13 @@ import sys
 from pathlib import Path
 
 from core.storage import DataStorage
-from core.postgres_storage import PostgreSQLStorage as PostgresStorage
-from core.rank import RankSystem
-from features.pubg.api import PUBGIntegration
-from features.pubg.dual_ranking import DualRankingSystem
-from features.pubg.roles import PubgRankRoles
-from features.music.player import MusicSystem
-from features.music.dynamic_channels import DynamicChannelsSystem
-from features.music.channels import MusicChannelsSystem
-from features.tournaments.manager import TournamentSystem
-from features.tournaments.seasons import SeasonSystem
-from features.achievements.system import AchievementSystem
-from features.badges.system import BadgeSystem
-from features.notifications.system import NotificationsSystem
-from features.moderation.system import ModerationSystem
-from features.minigames.system import MinigamesSystem
-from features.checkin.system import CheckInSystem
-from features.checkin.notifications import CheckInNotifications
-from features.checkin.reminders import CheckInReminders
-from features.checkin.reports import CheckInReports
-from integrations.medal import MedalIntegration
-from utils import scheduler, embed_templates, keep_alive
-from utils.keep_alive import KeepAlive
-from utils.charts_system import ChartsSystem
-from utils.scheduler import TaskScheduler
-from web.app import WebDashboard
-from core.registration import Registration
+from core.service_registry import LazyServiceRegistry, ServiceError
+from utils import embed_templates
 
-# Importar ServerSetup dos scripts
+# Os sistemas de features são importados dentro das fábricas de
+# HawkBot._register_services, só quando o serviço é usado pela primeira vez.
+# ServerSetup fica em scripts/setup
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts', 'setup'))
-from server_setup import ServerSetup
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -82,7 +59,7 @@ logger = logging.getLogger('HawkBot')
 class HawkBot(commands.Bot):
     """Bot principal do clã Hawk Esports"""
     
-    def __init__(self):
+    def __init__(self, lazy_services: Optional[bool] = None):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.members = True
@@ -94,36 +71,169 @@ class HawkBot(commands.Bot):
             description='Bot oficial do clã Hawk Esports - PUBG'
         )
         
-        # Inicializar sistema de armazenamento (PostgreSQL ou JSON)
-        self.storage = self._initialize_storage()
+        # Sistemas construídos sob demanda (HAWKBOT_LAZY_SERVICES=0 constrói tudo na partida)
+        if lazy_services is None:
+            lazy_services = os.getenv('HAWKBOT_LAZY_SERVICES', '1').lower() not in ('0', 'false', 'no')
+        self.lazy_services = lazy_services
+        self.services = LazyServiceRegistry()
         self.embed_templates = embed_templates
-        self.server_setup = ServerSetup(self)
-        self.registration = Registration(self)
-        self.pubg_api = PUBGIntegration()
-        self.rank_system = RankSystem(self, self.storage, self.pubg_api)
-        self.dual_ranking_system = DualRankingSystem(self, self.storage, self.pubg_api, self.rank_system)
-        self.medal_integration = MedalIntegration(self, self.storage)
-        self.tournament_system = TournamentSystem(self, self.storage)
-        self.web_dashboard = WebDashboard(self)
-        self.achievement_system = AchievementSystem(self, self.storage)
-        self.music_system = MusicSystem(self)
-        self.moderation_system = ModerationSystem(self, self.storage)
-        self.minigames_system = MinigamesSystem(self, self.storage)
-        self.charts_system = ChartsSystem(self, self.storage)
-        self.notifications_system = NotificationsSystem(self, self.storage)
-        self.pubg_rank_roles = PubgRankRoles(self, self.storage, self.pubg_api)
-        self.badge_system = BadgeSystem(self, self.storage, self.pubg_api, self.dual_ranking_system)
-        self.season_system = SeasonSystem(self, self.storage, self.dual_ranking_system, self.badge_system)
-        self.dynamic_channels = DynamicChannelsSystem(self, self.storage)
-        self.music_channels = MusicChannelsSystem(self, self.storage, self.music_system)
-        self.checkin_system = CheckInSystem(self, self.storage)
-        self.checkin_notifications = CheckInNotifications(self, self.checkin_system)
-        self.checkin_reminders = CheckInReminders(self, self.checkin_system, self.storage)
-        self.checkin_reports = CheckInReports(self, self.checkin_system, self.storage)
-        self.scheduler = TaskScheduler(self, self.storage, self.rank_system, self.medal_integration)
+        self._register_services()
+        
+        if not lazy_services:
+            self.services.load_all()
         
         logger.info("Bot Hawk Esports inicializado com sucesso!")
     
+    def __getattr__(self, name):
+        """Resolve `self.<sistema>` pelo registro de serviços no primeiro acesso"""
+        services = self.__dict__.get('services')
+        if services is None or name not in services:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        known_failure = services.failure(name)
+        try:
+            instance = services.get(name)
+        except ServiceError as e:
+            # hasattr(bot, ...) e getattr(bot, ..., None) tratam o sistema como ausente;
+            # a falha fica registrada até services.retry(name)
+            if known_failure is None:
+                logger.error(f"Sistema '{name}' indisponível: {e}")
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'") from e
+        # Os próximos acessos não passam mais por __getattr__
+        setattr(self, name, instance)
+        return instance
+    
+    def _register_services(self):
+        """Declara os sistemas do bot com suas dependências.
+        
+        Cada fábrica importa o módulo do sistema, então bibliotecas pesadas
+        (yt-dlp, matplotlib, Flask...) só são carregadas quando o sistema é
+        usado por um comando, listener ou tarefa.
+        """
+        register = self.services.register
+        
+        def server_setup():
+            from server_setup import ServerSetup
+            return ServerSetup(self)
+        
+        def registration():
+            from core.registration import Registration
+            return Registration(self)
+        
+        def pubg_api():
+            from features.pubg.api import PUBGIntegration
+            return PUBGIntegration()
+        
+        def rank_system(storage, api):
+            from core.rank import RankSystem
+            return RankSystem(self, storage, api)
+        
+        def dual_ranking_system(storage, api, ranks):
+            from features.pubg.dual_ranking import DualRankingSystem
+            return DualRankingSystem(self, storage, api, ranks)
+        
+        def medal_integration(storage):
+            from integrations.medal import MedalIntegration
+            return MedalIntegration(self, storage)
+        
+        def tournament_system(storage):
+            from features.tournaments.manager import TournamentSystem
+            return TournamentSystem(self, storage)
+        
+        def web_dashboard():
+            from web.app import WebDashboard
+            return WebDashboard(self)
+        
+        def achievement_system(storage):
+            from features.achievements.system import AchievementSystem
+            return AchievementSystem(self, storage)
+        
+        def music_system():
+            from features.music.player import MusicSystem
+            return MusicSystem(self)
+        
+        def moderation_system(storage):
+            from features.moderation.system import ModerationSystem
+            return ModerationSystem(self, storage)
+        
+        def minigames_system(storage):
+            from features.minigames.system import MinigamesSystem
+            return MinigamesSystem(self, storage)
+        
+        def charts_system(storage):
+            from utils.charts_system import ChartsSystem
+            return ChartsSystem(self, storage)
+        
+        def notifications_system(storage):
+            from features.notifications.system import NotificationsSystem
+            return NotificationsSystem(self, storage)
+        
+        def pubg_rank_roles(storage, api):
+            from features.pubg.roles import PubgRankRoles
+            return PubgRankRoles(self, storage, api)
+        
+        def badge_system(storage, api, dual_ranking):
+            from features.badges.system import BadgeSystem
+            return BadgeSystem(self, storage, api, dual_ranking)
+        
+        def season_system(storage, dual_ranking, badges):
+            from features.tournaments.seasons import SeasonSystem
+            return SeasonSystem(self, storage, dual_ranking, badges)
+        
+        def dynamic_channels(storage):
+            from features.music.dynamic_channels import DynamicChannelsSystem
+            return DynamicChannelsSystem(self, storage)
+        
+        def music_channels(storage, music):
+            from features.music.channels import MusicChannelsSystem
+            return MusicChannelsSystem(self, storage, music)
+        
+        def checkin_system(storage):
+            from features.checkin.system import CheckInSystem
+            return CheckInSystem(self, storage)
+        
+        def checkin_notifications(checkin):
+            from features.checkin.notifications import CheckInNotifications
+            return CheckInNotifications(self, checkin)
+        
+        def checkin_reminders(checkin, storage):
+            from features.checkin.reminders import CheckInReminders
+            return CheckInReminders(self, checkin, storage)
+        
+        def checkin_reports(checkin, storage):
+            from features.checkin.reports import CheckInReports
+            return CheckInReports(self, checkin, storage)
+        
+        def scheduler(storage, ranks, medal):
+            from utils.scheduler import TaskScheduler
+            return TaskScheduler(self, storage, ranks, medal)
+        
+        # Mesma ordem da construção antiga, usada por load_all no modo eager
+        register('storage', self._initialize_storage)
+        register('server_setup', server_setup)
+        register('registration', registration)
+        register('pubg_api', pubg_api)
+        register('rank_system', rank_system, ('storage', 'pubg_api'))
+        register('dual_ranking_system', dual_ranking_system, ('storage', 'pubg_api', 'rank_system'))
+        register('medal_integration', medal_integration, ('storage',))
+        register('tournament_system', tournament_system, ('storage',))
+        register('web_dashboard', web_dashboard)
+        register('achievement_system', achievement_system, ('storage',))
+        register('music_system', music_system)
+        register('moderation_system', moderation_system, ('storage',))
+        register('minigames_system', minigames_system, ('storage',))
+        register('charts_system', charts_system, ('storage',))
+        register('notifications_system', notifications_system, ('storage',))
+        register('pubg_rank_roles', pubg_rank_roles, ('storage', 'pubg_api'))
+        register('badge_system', badge_system, ('storage', 'pubg_api', 'dual_ranking_system'))
+        register('season_system', season_system, ('storage', 'dual_ranking_system', 'badge_system'))
+        register('dynamic_channels', dynamic_channels, ('storage',))
+        register('music_channels', music_channels, ('storage', 'music_system'))
+        register('checkin_system', checkin_system, ('storage',))
+        register('checkin_notifications', checkin_notifications, ('checkin_system',))
+        register('checkin_reminders', checkin_reminders, ('checkin_system', 'storage'))
+        register('checkin_reports', checkin_reports, ('checkin_system', 'storage'))
+        register('scheduler', scheduler, ('storage', 'rank_system', 'medal_integration'))
+    
     def _initialize_storage(self):
         """Inicializa o sistema de armazenamento baseado nas variáveis de ambiente"""
         # Verifica se há configuração de PostgreSQL
@@ -133,6 +243,7 @@ class HawkBot(commands.Bot):
         db_password = os.getenv('DB_PASSWORD')
         
         if db_host and db_name and db_user and db_password:
+            from core.postgres_storage import PostgreSQLStorage
             logger.info("🐘 Usando PostgreSQL como sistema de armazenamento")
             return PostgreSQLStorage()
         else:
@@ -148,6 +259,7 @@ class HawkBot(commands.Bot):
             
             # Inicializar sistema keep alive para Render
             if os.getenv('RENDER'):
+                from utils.keep_alive import KeepAlive
                 self.keep_alive = KeepAlive(self)
                 await self.keep_alive.start()
                 logger.info("🔄 Sistema keep alive iniciado para Render")
@@ -155,27 +267,16 @@ class HawkBot(commands.Bot):
             # Sincronizar comandos slash com proteção inteligente
             await self._sync_commands_with_protection()
             
-            # Configurar sistema de música
-            await self.music_system.setup_hook()
-            
             # Iniciar tarefas automáticas
             if not self.auto_update_ranks.is_running():
                 self.auto_update_ranks.start()
             
-            # Iniciar sistema de notificações
-            self.notifications_system.start_tasks()
-            
-            # Iniciar sistema de canais dinâmicos
-            await self.dynamic_channels.start_cleanup_task()
-            
-            # Iniciar sistema de canais de música
-            await self.music_channels.start_cleanup_task()
-            
-            # Iniciar sistema de notificações de check-in
-            asyncio.create_task(self.checkin_notifications.start_cleanup_task())
-            
-            # Iniciar sistema de lembretes de check-in
-            self.checkin_reminders.start_reminder_task()
+            # No modo lazy os sistemas com tarefas de fundo são construídos
+            # depois que o bot fica pronto, sem atrasar a conexão
+            if self.lazy_services:
+                asyncio.create_task(self._start_background_services())
+            else:
+                await self._start_background_services()
             
             # Carregar comandos de check-in
             try:
@@ -208,6 +309,33 @@ class HawkBot(commands.Bot):
         except Exception as e:
             logger.error(f"Erro no setup_hook: {e}")
     
+    async def _start_background_services(self):
+        """Constrói os sistemas que mantêm tarefas de fundo e inicia essas tarefas"""
+        if self.lazy_services:
+            await self.wait_until_ready()
+        try:
+            # Configurar sistema de música
+            await self.music_system.setup_hook()
+            
+            # Iniciar sistema de notificações
+            self.notifications_system.start_tasks()
+            
+            # Iniciar sistema de canais dinâmicos
+            await self.dynamic_channels.start_cleanup_task()
+            
+            # Iniciar sistema de canais de música
+            await self.music_channels.start_cleanup_task()
+            
+            # Iniciar sistema de notificações de check-in
+            asyncio.create_task(self.checkin_notifications.start_cleanup_task())
+            
+            # Iniciar sistema de lembretes de check-in
+            self.checkin_reminders.start_reminder_task()
+            
+            logger.info(f"⚙️ Serviços carregados: {self.services.get_stats()['loaded']}/{len(self.services)}")
+        except Exception as e:
+            logger.error(f"Erro ao iniciar tarefas dos sistemas: {e}")
+    
     async def close(self):
         """Método chamado quando o bot é desligado"""
         # Parar sistema keep alive se estiver rodando
@@ -215,8 +343,12 @@ class HawkBot(commands.Bot):
             await self.keep_alive.stop()
             logger.info("🔄 Sistema keep alive parado")
         
+        # Gravar eventos de check-in pendentes antes de fechar o storage
+        if self.services.is_loaded('checkin_system'):
+            self.checkin_system.close()
+        
         # Fechar conexão do storage
-        if hasattr(self.storage, 'close'):
+        if self.services.is_loaded('storage') and hasattr(self.storage, 'close'):
             await self.storage.close()
             logger.info("💾 Conexão do armazenamento fechada")
         
@@ -65,6 +65,8 @@ except ImportError:
         async def export_user_data(self, user_id, guild_id): return {}
         async def delete_user_data(self, user_id, guild_id): return True
         async def health_check(self): return {'status': 'healthy'}
+        def submit_message(self, message): return False
+        async def shutdown(self): pass
     
     class ModerationConfig:
         def __init__(self, **kwargs): pass
@@ -765,14 +767,15 @@ class ModernModerationCommands(commands.Cog):
                 ephemeral=True
             )
     
+    async def cog_unload(self):
+        """Encerra o pipeline de moderação ao descarregar o cog"""
+        await self.moderation_system.shutdown()
+    
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        """Processa mensagens para moderação automática"""
+        """Enfileira mensagens para moderação automática em lote"""
         if message.guild and not message.author.bot:
-            try:
-                await self.moderation_system.process_message(message)
-            except Exception as e:
-                self.logger.error(f"Erro no processamento de mensagem: {e}")
+            self.moderation_system.submit_message(message)
     
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazenamento de Backups Endereçado por Conteúdo - Hawk Bot
+Arquivos são divididos em chunks de tamanho fixo; cada chunk é gravado uma
+única vez sob o hash do seu conteúdo e compartilhado entre backups. Cada
+backup é um manifesto que lista, por arquivo, tamanho, mtime e os IDs
+dos chunks — restaurar um backup só precisa do seu manifesto.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import hashlib
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.fernet import Fernet
+except ImportError:
+    AESGCM = None
+    Fernet = None
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+MANIFEST_VERSION = 1
+
+_RAW = b'R'
+_ZLIB = b'Z'
+_SEALED = b'E'
+_NONCE_SIZE = 12
+
+
+class ChunkStore:
+    """Repositório de chunks deduplicados.
+
+    O ID de um chunk é o BLAKE2b do conteúdo original, chaveado quando há
+    `encryption_key` para que os IDs não revelem o conteúdo. Cada arquivo
+    de chunk guarda um byte de formato (bruto ou zlib) seguido dos dados.
+    Com criptografia, esse corpo vira um quadro AES-GCM
+    (`E` + nonce + texto cifrado + tag) autenticado contra o próprio ID,
+    então um chunk trocado ou adulterado falha na leitura.
+    """
+
+    def __init__(self, root: Path, compression_level: int = 6,
+                 encryption_key: Optional[bytes] = None):
+        self.root = Path(root)
+        self.chunks_dir = self.root / 'chunks'
+        self.manifests_dir = self.root / 'manifests'
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        self.compression_level = compression_level
+        self.encryption_key = encryption_key
+        self.id_key = (encryption_key or b'')[:64]
+        self._aead = None
+        if encryption_key:
+            if AESGCM is None:
+                raise ImportError("cryptography é necessário para backups criptografados")
+            self._aead = AESGCM(hashlib.sha256(b'hawkbot-backup-chunks' + encryption_key).digest())
+        self._known: Optional[Set[str]] = None
+
+    # ------------------------------------------------------------------
+    # Chunks
+    # ------------------------------------------------------------------
+
+    def chunk_id(self, data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=32, key=self.id_key).hexdigest()
+
+    def _chunk_path(self, chunk_id: str) -> Path:
+        return self.chunks_dir / chunk_id[:2] / chunk_id
+
+    def _known_ids(self) -> Set[str]:
+        if self._known is None:
+            self._known = {path.name for path in self.chunks_dir.glob('*/*')
+                           if path.is_file() and not path.suffix}
+        return self._known
+
+    def has(self, chunk_id: str) -> bool:
+        return chunk_id in self._known_ids()
+
+    def chunk_count(self) -> int:
+        return len(self._known_ids())
+
+    def put(self, data: bytes) -> Dict[str, Any]:
+        """Grava um chunk se ele ainda não existir.
+
+        Retorna o ID, se o chunk era novo e quantos bytes foram gravados.
+        """
+        chunk_id = self.chunk_id(data)
+        if self.has(chunk_id):
+            return {'id': chunk_id, 'new': False, 'stored': 0}
+
+        if self.compression_level > 0:
+            compressed = zlib.compress(data, self.compression_level)
+            payload = _ZLIB + compressed if len(compressed) < len(data) else _RAW + data
+        else:
+            payload = _RAW + data
+        if self._aead is not None:
+            nonce = os.urandom(_NONCE_SIZE)
+            payload = _SEALED + nonce + self._aead.encrypt(nonce, payload, chunk_id.encode())
+
+        path = self._chunk_path(chunk_id)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        self._known_ids().add(chunk_id)
+        return {'id': chunk_id, 'new': True, 'stored': len(payload)}
+
+    def get(self, chunk_id: str) -> bytes:
+        """Lê um chunk e confere que o conteúdo corresponde ao ID"""
+        with open(self._chunk_path(chunk_id), 'rb') as f:
+            payload = f.read()
+        if payload[:1] == _SEALED:
+            if self._aead is None:
+                raise ValueError(f"Chunk {chunk_id} é criptografado e não há chave configurada")
+            nonce = payload[1:1 + _NONCE_SIZE]
+            payload = self._aead.decrypt(nonce, payload[1 + _NONCE_SIZE:], chunk_id.encode())
+        elif payload[:1] not in (_RAW, _ZLIB) and self.encryption_key:
+            payload = Fernet(self.encryption_key).decrypt(payload)  # formato anterior
+
+        kind, body = payload[:1], payload[1:]
+        data = zlib.decompress(body) if kind == _ZLIB else body
+        if self.chunk_id(data) != chunk_id:
+            raise ValueError(f"Chunk corrompido: {chunk_id}")
+        return data
+
+    def sweep(self, live: Set[str]) -> int:
+        """Remove chunks não referenciados por nenhum manifesto; retorna a quantidade"""
+        removed = 0
+        for chunk_id in list(self._known_ids()):
+            if chunk_id not in live:
+                self._chunk_path(chunk_id).unlink(missing_ok=True)
+                self._known.discard(chunk_id)
+                removed += 1
+        return removed
+
+    # ------------------------------------------------------------------
+    # Arquivos
+    # ------------------------------------------------------------------
+
+    def store_file(self, file_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """Divide um arquivo em chunks e grava os que ainda não existem.
+        
+        Passagem única com memória limitada a um chunk: cada bloco lido é
+        hasheado, comprimido, cifrado e gravado antes do próximo.
+        `progress` recebe o número de bytes de cada bloco processado.
+        """
+        chunks: List[str] = []
+        new_chunks = 0
+        stored = 0
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(chunk_size), b''):
+                result = self.put(block)
+                chunks.append(result['id'])
+                if result['new']:
+                    new_chunks += 1
+                    stored += result['stored']
+                if progress is not None:
+                    progress(len(block))
+        return {'chunks': chunks, 'new_chunks': new_chunks, 'stored': stored}
+
+    def iter_file(self, chunk_ids: Iterable[str]) -> Iterator[bytes]:
+        for chunk_id in chunk_ids:
+            yield self.get(chunk_id)
+
+    # ------------------------------------------------------------------
+    # Manifestos
+    # ------------------------------------------------------------------
+
+    def manifest_path(self, backup_id: str) -> Path:
+        return self.manifests_dir / f"{backup_id}.json"
+
+    def write_manifest(self, backup_id: str, manifest: Dict[str, Any]) -> Tuple[Path, str]:
+        """Grava o manifesto; retorna o caminho e o SHA-256 do conteúdo gravado"""
+        data = json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8')
+        path = self.manifest_path(backup_id)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path, hashlib.sha256(data).hexdigest()
+
+    def load_manifest(self, backup_id: str) -> Optional[Dict[str, Any]]:
+        path = self.manifest_path(backup_id)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def delete_manifest(self, backup_id: str):
+        self.manifest_path(backup_id).unlink(missing_ok=True)
+
+    def live_chunks(self) -> Set[str]:
+        """IDs referenciados pelos manifestos existentes"""
+        live: Set[str] = set()
+        for path in self.manifests_dir.glob('*.json'):
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            for entry in manifest.get('files', {}).values():
+                live.update(entry['chunks'])
+        return live
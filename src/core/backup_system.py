@@ -4,6 +4,7 @@ Este módulo fornece:
 - Backup automático de dados do bot
 - Backup de configurações
 - Backup de logs
+- Armazenamento deduplicado por conteúdo (backups incrementais e diferenciais)
 - Compressão e criptografia
 - Rotação de backups
 - Restauração de backups
@@ -18,11 +19,13 @@ import json
 import hashlib
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union, Callable
+from typing import Dict, List, Optional, Any, Union, Callable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
 import tempfile
+import threading
+import time
 
 try:
     import aiofiles
@@ -37,6 +40,9 @@ except ImportError:
     CRYPTO_AVAILABLE = False
     Fernet = None
 
+from .backup_store import ChunkStore, DEFAULT_CHUNK_SIZE, MANIFEST_VERSION
+from .metrics import increment_counter, observe_histogram, record_gauge
+
 class BackupType(Enum):
     """Tipos de backup disponíveis"""
     FULL = "full"          # Backup completo
@@ -76,6 +82,7 @@ class BackupConfig:
         "*.tmp", "*.log", "__pycache__", "*.pyc", ".git", "node_modules"
     ])
     auto_backup_interval: int = 24  # horas
+    chunk_size: int = DEFAULT_CHUNK_SIZE
     remote_sync_enabled: bool = False
     remote_sync_config: Dict[str, Any] = field(default_factory=dict)
 
@@ -128,8 +135,64 @@ class BackupInfo:
             metadata=data['metadata']
         )
 
+class BackupProgress:
+    """Progresso de um backup em andamento, publicado como métricas.
+    
+    Atualizado pela thread de trabalho a cada chunk; os gauges só são
+    regravados quando o percentual avança ou a cada `interval` segundos.
+    """
+    
+    def __init__(self, backup_info: 'BackupInfo', total_bytes: int, interval: float = 0.5):
+        self.backup_info = backup_info
+        self.total_bytes = total_bytes
+        self.done_bytes = 0
+        self.interval = interval
+        self.labels = {'backup_type': backup_info.type.value}
+        self._last_percent = -1
+        self._last_publish = 0.0
+        self._lock = threading.Lock()
+    
+    @property
+    def percent(self) -> int:
+        if not self.total_bytes:
+            return 100
+        return min(100, self.done_bytes * 100 // self.total_bytes)
+    
+    def advance(self, read_bytes: int):
+        """Bytes de um chunk lido do disco"""
+        increment_counter('backup.bytes_read', read_bytes, labels=self.labels)
+        with self._lock:
+            self.done_bytes += read_bytes
+            percent = self.percent
+            now = time.monotonic()
+            if percent == self._last_percent and now - self._last_publish < self.interval:
+                return
+            self._last_percent = percent
+            self._last_publish = now
+        self.backup_info.metadata['progress_percent'] = percent
+        record_gauge('backup.progress_percent', percent, labels=self.labels)
+    
+    def skip(self, size: int):
+        """Arquivo reaproveitado do manifesto base (não lido)"""
+        with self._lock:
+            self.done_bytes += size
+    
+    def finish(self, stats: Dict[str, Any], duration: float):
+        self.done_bytes = self.total_bytes
+        self.backup_info.metadata['progress_percent'] = 100
+        record_gauge('backup.progress_percent', 100, labels=self.labels)
+        increment_counter('backup.files_read', stats['files_read'], labels=self.labels)
+        increment_counter('backup.files_reused', stats['files_reused'], labels=self.labels)
+        increment_counter('backup.bytes_stored', stats['stored_bytes'], labels=self.labels)
+        observe_histogram('backup.duration_seconds', duration, labels=self.labels)
+
 class BackupSystem:
-    """Sistema principal de backup"""
+    """Sistema principal de backup.
+    
+    A coleta de arquivos, o chunking, a compressão, a criptografia e a
+    restauração rodam numa thread do executor padrão; o event loop só
+    agenda o trabalho e registra o resultado.
+    """
     
     def __init__(self, config: Optional[BackupConfig] = None):
         self.config = config or BackupConfig()
@@ -138,6 +201,7 @@ class BackupSystem:
         self._running = False
         self._backup_task: Optional[asyncio.Task] = None
         self._encryption_key: Optional[bytes] = None
+        self._backup_lock = asyncio.Lock()
         
         # Criar diretório de backup
         self.config.backup_dir.mkdir(parents=True, exist_ok=True)
@@ -146,6 +210,13 @@ class BackupSystem:
         if self.config.encrypt_backups and CRYPTO_AVAILABLE:
             self._setup_encryption()
         
+        # Repositório de chunks compartilhado por todos os backups
+        self.store = ChunkStore(
+            self.config.backup_dir,
+            compression_level=self.config.compression_level.value,
+            encryption_key=self._encryption_key
+        )
+        
         # Carregar histórico de backups
         self._load_backup_history()
     
@@ -159,11 +230,16 @@ class BackupSystem:
             import base64
             self._encryption_key = base64.urlsafe_b64encode(key_hash[:32])
         else:
+            # Reaproveitar a chave salva; uma chave nova tornaria os chunks existentes ilegíveis
+            key_file = self.config.backup_dir / ".backup_key"
+            if key_file.exists():
+                self._encryption_key = key_file.read_bytes().strip()
+                return
+            
             # Gerar nova chave
             self._encryption_key = Fernet.generate_key()
             
             # Salvar chave em arquivo seguro
-            key_file = self.config.backup_dir / ".backup_key"
             with open(key_file, 'wb') as f:
                 f.write(self._encryption_key)
             
@@ -202,14 +278,6 @@ class BackupSystem:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         return f"backup_{timestamp}_{os.urandom(4).hex()}"
     
-    def _calculate_checksum(self, file_path: Path) -> str:
-        """Calcula o checksum MD5 de um arquivo"""
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    
     def _should_include_file(self, file_path: Path, base_path: Path) -> bool:
         """Verifica se um arquivo deve ser incluído no backup"""
         relative_path = file_path.relative_to(base_path)
@@ -220,21 +288,6 @@ class BackupSystem:
         
         return True
     
-    def _encrypt_file(self, file_path: Path) -> Path:
-        """Criptografa um arquivo"""
-        if not self._encryption_key or not CRYPTO_AVAILABLE:
-            return file_path
-        
-        fernet = Fernet(self._encryption_key)
-        encrypted_path = file_path.with_suffix(file_path.suffix + '.encrypted')
-        
-        with open(file_path, 'rb') as infile, open(encrypted_path, 'wb') as outfile:
-            data = infile.read()
-            encrypted_data = fernet.encrypt(data)
-            outfile.write(encrypted_data)
-        
-        return encrypted_path
-    
     def _decrypt_file(self, encrypted_path: Path, output_path: Path):
         """Descriptografa um arquivo"""
         if not self._encryption_key or not CRYPTO_AVAILABLE:
@@ -265,35 +318,33 @@ class BackupSystem:
         self.logger.info(f"Iniciando backup {backup_id} (tipo: {backup_type.value})")
         
         try:
-            backup_info.status = BackupStatus.RUNNING
-            
-            # Determinar quais arquivos incluir
-            files_to_backup = await self._collect_files_for_backup(backup_type, custom_paths)
-            
-            # Criar arquivo de backup
-            backup_filename = f"{backup_id}.zip"
-            backup_path = self.config.backup_dir / backup_filename
-            
-            # Criar backup comprimido
-            await self._create_compressed_backup(files_to_backup, backup_path, backup_info)
-            
-            # Criptografar se necessário
-            if backup_info.encrypted:
-                encrypted_path = self._encrypt_file(backup_path)
-                backup_path.unlink()  # Remover arquivo não criptografado
-                backup_path = encrypted_path
-            
-            # Atualizar informações do backup
-            backup_info.file_path = backup_path
-            backup_info.file_size = backup_path.stat().st_size
-            backup_info.checksum = self._calculate_checksum(backup_path)
-            backup_info.completed_at = datetime.now()
-            backup_info.status = BackupStatus.COMPLETED
-            
-            self.logger.info(f"Backup {backup_id} concluído com sucesso")
-            
-            # Limpar backups antigos
-            await self._cleanup_old_backups()
+            # Um backup por vez: o manifesto base precisa refletir o anterior
+            async with self._backup_lock:
+                backup_info.status = BackupStatus.RUNNING
+                
+                # Determinar quais arquivos incluir
+                files_to_backup = await self._collect_files_for_backup(backup_type, custom_paths)
+                
+                # Gravar chunks novos e o manifesto do backup fora do event loop
+                # (os candidatos a base são lidos aqui, no loop que altera self.backups)
+                loop = asyncio.get_running_loop()
+                manifest_path, checksum = await loop.run_in_executor(
+                    None, self._create_chunked_backup, files_to_backup, backup_info,
+                    self._base_candidates(backup_type)
+                )
+                
+                # Atualizar informações do backup
+                backup_info.file_path = manifest_path
+                backup_info.file_size = backup_info.metadata['stored_bytes']
+                backup_info.checksum = checksum
+                backup_info.completed_at = datetime.now()
+                backup_info.status = BackupStatus.COMPLETED
+                
+                self.logger.info(f"Backup {backup_id} concluído com sucesso")
+                
+                # Limpar backups antigos ainda sob o lock: a varredura de chunks
+                # não pode correr junto com um backup que ainda grava o manifesto
+                await self._cleanup_old_backups()
             
             # Salvar histórico
             self._save_backup_history()
@@ -308,9 +359,15 @@ class BackupSystem:
     
     async def _collect_files_for_backup(self, backup_type: BackupType,
                                       custom_paths: Optional[List[Path]] = None) -> List[Path]:
-        """Coleta arquivos para backup baseado no tipo"""
+        """Coleta arquivos para backup baseado no tipo (varredura fora do event loop)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._collect_files, backup_type, custom_paths)
+    
+    def _collect_files(self, backup_type: BackupType,
+                       custom_paths: Optional[List[Path]] = None) -> List[Path]:
         files = []
         base_dir = Path.cwd()
+        full_scope = [BackupType.FULL, BackupType.INCREMENTAL, BackupType.DIFFERENTIAL]
         
         if custom_paths:
             # Usar caminhos personalizados
@@ -323,7 +380,7 @@ class BackupSystem:
                             files.append(file_path)
         else:
             # Coletar baseado no tipo de backup
-            if backup_type in [BackupType.FULL, BackupType.CONFIG_ONLY]:
+            if backup_type in full_scope + [BackupType.CONFIG_ONLY]:
                 # Incluir arquivos de configuração
                 config_patterns = ['*.json', '*.yaml', '*.yml', '*.toml', '*.ini', '.env*']
                 for pattern in config_patterns:
@@ -336,7 +393,7 @@ class BackupSystem:
                         if file_path.is_file():
                             files.append(file_path)
             
-            if backup_type in [BackupType.FULL, BackupType.DATA_ONLY]:
+            if backup_type in full_scope + [BackupType.DATA_ONLY]:
                 # Incluir dados do bot
                 data_dirs = ['data', 'database', 'storage']
                 for dir_name in data_dirs:
@@ -353,7 +410,7 @@ class BackupSystem:
                         if self._should_include_file(file_path, base_dir):
                             files.append(file_path)
             
-            if backup_type in [BackupType.FULL, BackupType.LOGS_ONLY] and self.config.include_logs:
+            if backup_type in full_scope + [BackupType.LOGS_ONLY] and self.config.include_logs:
                 # Incluir logs
                 logs_dir = base_dir / 'logs'
                 if logs_dir.exists():
@@ -365,43 +422,116 @@ class BackupSystem:
         unique_files = list(set(f for f in files if f.exists()))
         return unique_files
     
-    async def _create_compressed_backup(self, files: List[Path], backup_path: Path,
-                                      backup_info: BackupInfo):
-        """Cria um backup comprimido"""
-        compression = zipfile.ZIP_DEFLATED if self.config.compression_level != CompressionLevel.NONE else zipfile.ZIP_STORED
-        compresslevel = self.config.compression_level.value if self.config.compression_level != CompressionLevel.NONE else None
+    def _base_candidates(self, backup_type: BackupType) -> List[str]:
+        """IDs que podem servir de base, do mais recente ao mais antigo.
+        
+        O último backup (incremental) ou o último FULL (diferencial).
+        """
+        if backup_type not in (BackupType.INCREMENTAL, BackupType.DIFFERENTIAL):
+            return []
+        
+        candidates = sorted(
+            (b for b in self.backups.values()
+             if b.status == BackupStatus.COMPLETED and b.metadata.get('format') == 'chunked'
+             and (backup_type == BackupType.INCREMENTAL or b.type == BackupType.FULL)),
+            key=lambda b: b.created_at,
+            reverse=True
+        )
+        return [candidate.id for candidate in candidates]
+    
+    def _select_base_manifest(self, candidates: List[str]) -> Optional[Dict[str, Any]]:
+        """Primeiro manifesto existente entre os candidatos"""
+        for candidate_id in candidates:
+            manifest = self.store.load_manifest(candidate_id)
+            if manifest is not None:
+                return manifest
+        return None
+    
+    def _unchanged_entry(self, base_files: Dict[str, Any], relative: str,
+                         stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Entrada do manifesto base se o arquivo não mudou (mesmo tamanho e mtime)"""
+        entry = base_files.get(relative)
+        if (entry is None or entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns
+                or not all(self.store.has(chunk_id) for chunk_id in entry['chunks'])):
+            return None
+        return entry
+    
+    def _create_chunked_backup(self, files: List[Path], backup_info: BackupInfo,
+                               base_candidates: Optional[List[str]] = None) -> Tuple[Path, str]:
+        """Grava os arquivos no repositório de chunks e escreve o manifesto.
         
+        Executado numa thread de trabalho. Todo manifesto lista o conjunto
+        completo de arquivos; backups incrementais e diferenciais só leem os
+        arquivos cujo tamanho ou mtime mudou desde o manifesto base e
+        reaproveitam os demais. Retorna o caminho e o SHA-256 do manifesto.
+        """
+        started = time.perf_counter()
         base_dir = Path.cwd()
+        base = self._select_base_manifest(base_candidates or [])
+        base_files = base['files'] if base else {}
         
-        with zipfile.ZipFile(backup_path, 'w', compression=compression, compresslevel=compresslevel) as zipf:
-            # Adicionar metadados do backup
-            metadata = {
-                'backup_id': backup_info.id,
-                'backup_type': backup_info.type.value,
-                'created_at': backup_info.created_at.isoformat(),
-                'file_count': len(files),
-                'bot_version': '2.0.0',  # Versão do bot
-                'backup_system_version': '1.0.0'
-            }
-            
-            zipf.writestr('backup_metadata.json', json.dumps(metadata, indent=2))
-            
-            # Adicionar arquivos
-            for file_path in files:
-                try:
-                    # Calcular caminho relativo
-                    if file_path.is_relative_to(base_dir):
-                        arcname = file_path.relative_to(base_dir)
-                    else:
-                        arcname = file_path.name
-                    
-                    zipf.write(file_path, arcname)
-                    
-                except Exception as e:
-                    self.logger.warning(f"Erro ao adicionar arquivo {file_path} ao backup: {e}")
+        entries: Dict[str, Dict[str, Any]] = {}
+        stats = {'files_read': 0, 'files_reused': 0, 'new_chunks': 0,
+                 'stored_bytes': 0, 'logical_size': 0}
+        
+        scanned = []
+        for file_path in sorted(files):
+            try:
+                scanned.append((file_path, file_path.stat()))
+            except OSError as e:
+                self.logger.warning(f"Erro ao adicionar arquivo {file_path} ao backup: {e}")
+        progress = BackupProgress(backup_info, sum(stat.st_size for _, stat in scanned))
+        
+        for file_path, stat in scanned:
+            try:
+                # Calcular caminho relativo
+                if file_path.is_relative_to(base_dir):
+                    relative = file_path.relative_to(base_dir).as_posix()
+                else:
+                    relative = file_path.name
+                
+                entry = self._unchanged_entry(base_files, relative, stat)
+                if entry is not None:
+                    stats['files_reused'] += 1
+                    progress.skip(stat.st_size)
+                else:
+                    stored = self.store.store_file(file_path, self.config.chunk_size, progress.advance)
+                    entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                             'chunks': stored['chunks']}
+                    stats['files_read'] += 1
+                    stats['new_chunks'] += stored['new_chunks']
+                    stats['stored_bytes'] += stored['stored']
+                
+                entries[relative] = entry
+                stats['logical_size'] += entry['size']
+                
+            except Exception as e:
+                self.logger.warning(f"Erro ao adicionar arquivo {file_path} ao backup: {e}")
+        
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'backup_id': backup_info.id,
+            'backup_type': backup_info.type.value,
+            'created_at': backup_info.created_at.isoformat(),
+            'base_backup': base['backup_id'] if base else None,
+            'chunk_size': self.config.chunk_size,
+            'encrypted': backup_info.encrypted,
+            'files': entries
+        }
+        manifest_path, checksum = self.store.write_manifest(backup_info.id, manifest)
+        
+        backup_info.metadata.update(stats, format='chunked', file_count=len(entries),
+                                    base_backup=manifest['base_backup'])
+        progress.finish(stats, time.perf_counter() - started)
+        return manifest_path, checksum
     
     async def _cleanup_old_backups(self):
-        """Remove backups antigos baseado na configuração"""
+        """Remove backups antigos baseado na configuração.
+        
+        Chamado com `_backup_lock` adquirido. A remoção dos manifestos e a
+        varredura de chunks (glob + leitura de todos os manifestos) rodam
+        fora do event loop.
+        """
         if self.config.max_backups <= 0:
             return
         
@@ -414,17 +544,35 @@ class BackupSystem:
         
         # Remover backups excedentes
         backups_to_remove = sorted_backups[self.config.max_backups:]
+        if not backups_to_remove:
+            return
         
-        for backup in backups_to_remove:
+        loop = asyncio.get_running_loop()
+        removed_ids, removed_chunks = await loop.run_in_executor(
+            None, self._remove_backup_files, backups_to_remove
+        )
+        for backup_id in removed_ids:
+            del self.backups[backup_id]
+        if removed_chunks:
+            self.logger.info(f"{removed_chunks} chunks sem referência removidos")
+    
+    def _remove_backup_files(self, backups: List[BackupInfo]) -> Tuple[List[str], int]:
+        """Apaga os manifestos e varre os chunks órfãos (thread de trabalho)"""
+        removed_ids = []
+        for backup in backups:
             try:
                 if backup.file_path and backup.file_path.exists():
                     backup.file_path.unlink()
                     self.logger.info(f"Backup antigo removido: {backup.id}")
-                
-                del self.backups[backup.id]
-                
+                removed_ids.append(backup.id)
             except Exception as e:
                 self.logger.error(f"Erro ao remover backup {backup.id}: {e}")
+        
+        # Chunks que nenhum manifesto restante referencia
+        removed_chunks = 0
+        if any(b.metadata.get('format') == 'chunked' for b in backups):
+            removed_chunks = self.store.sweep(self.store.live_chunks())
+        return removed_ids, removed_chunks
     
     async def restore_backup(self, backup_id: str, restore_path: Optional[Path] = None) -> bool:
         """Restaura um backup"""
@@ -441,22 +589,14 @@ class BackupSystem:
         
         self.logger.info(f"Iniciando restauração do backup {backup_id}")
         
+        if backup_info.metadata.get('format') == 'chunked':
+            restore = self._restore_chunked
+        else:
+            restore = self._restore_zip
+        
         try:
-            # Descriptografar se necessário
-            backup_file = backup_info.file_path
-            if backup_info.encrypted:
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp_file:
-                    tmp_path = Path(tmp_file.name)
-                    self._decrypt_file(backup_file, tmp_path)
-                    backup_file = tmp_path
-            
-            # Extrair backup
-            with zipfile.ZipFile(backup_file, 'r') as zipf:
-                zipf.extractall(restore_path)
-            
-            # Limpar arquivo temporário se foi criado
-            if backup_info.encrypted and backup_file != backup_info.file_path:
-                backup_file.unlink()
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, restore, backup_info, restore_path)
             
             self.logger.info(f"Backup {backup_id} restaurado com sucesso em {restore_path}")
             return True
@@ -465,6 +605,43 @@ class BackupSystem:
             self.logger.error(f"Erro ao restaurar backup {backup_id}: {e}")
             return False
     
+    def _restore_zip(self, backup_info: BackupInfo, restore_path: Path):
+        """Restaura backups antigos em zip (formato anterior ao repositório de chunks)"""
+        # Descriptografar se necessário
+        backup_file = backup_info.file_path
+        if backup_info.encrypted:
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp_file:
+                tmp_path = Path(tmp_file.name)
+                self._decrypt_file(backup_file, tmp_path)
+                backup_file = tmp_path
+        
+        try:
+            # Extrair backup
+            with zipfile.ZipFile(backup_file, 'r') as zipf:
+                zipf.extractall(restore_path)
+        finally:
+            # Limpar arquivo temporário se foi criado
+            if backup_file != backup_info.file_path:
+                backup_file.unlink()
+    
+    def _restore_chunked(self, backup_info: BackupInfo, restore_path: Path):
+        """Remonta os arquivos de um manifesto a partir dos chunks, um chunk por vez"""
+        manifest = self.store.load_manifest(backup_info.id)
+        if manifest is None:
+            raise FileNotFoundError(f"Manifesto do backup {backup_info.id} não encontrado")
+        
+        root = restore_path.resolve()
+        for relative, entry in manifest['files'].items():
+            target = (root / relative).resolve()
+            if not target.is_relative_to(root):
+                raise ValueError(f"Caminho inválido no manifesto: {relative}")
+            
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, 'wb') as f:
+                for data in self.store.iter_file(entry['chunks']):
+                    f.write(data)
+            os.utime(target, ns=(entry['mtime_ns'], entry['mtime_ns']))
+    
     async def _auto_backup_loop(self):
         """Loop para backups automáticos"""
         while self._running:
@@ -536,6 +713,8 @@ class BackupSystem:
             'failed_backups': len([b for b in backups if b.status == BackupStatus.FAILED]),
             'total_size_bytes': total_size,
             'total_size_mb': total_size / (1024 * 1024),
+            'logical_size_bytes': sum(b.metadata.get('logical_size', b.file_size) for b in completed_backups),
+            'stored_chunks': self.store.chunk_count(),
             'oldest_backup': min((b.created_at for b in completed_backups), default=None),
             'newest_backup': max((b.created_at for b in completed_backups), default=None),
             'auto_backup_enabled': self._running
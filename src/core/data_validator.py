@@ -314,6 +314,11 @@ class DataValidator:
         """Adiciona um schema customizado"""
         self.schemas[name] = schema_class
         self.logger.info(f"Schema '{name}' adicionado")
+        
+        # Schemas de evento mudam quais eventos passam pelo middleware de validação
+        if name.startswith('event_'):
+            from .event_system import get_event_system
+            get_event_system().invalidate_dispatch()
     
     def validate_data(self, data: Dict[str, Any], schema_name: str, 
                      strict: Optional[bool] = None) -> Tuple[bool, Optional[Any], List[str]]:
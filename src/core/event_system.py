@@ -13,7 +13,9 @@ Este módulo fornece:
 import asyncio
 import inspect
 import logging
-from typing import Any, Dict, List, Optional, Callable, Union, Type, Tuple
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Callable, Union, Type, Tuple, Iterable, FrozenSet
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -51,6 +53,61 @@ class HookType(Enum):
     REPLACE = "replace"  # Substitui a função
     ERROR = "error"      # Executado em caso de erro
 
+class ListenerMode(Enum):
+    """Modo de execução de um listener"""
+    SERIAL = "serial"          # Aguardado em ordem (padrão)
+    CONCURRENT = "concurrent"  # Executado junto com os concorrentes de mesma prioridade
+    BACKGROUND = "background"  # Fire-and-forget pela fila limitada de workers
+
+class OverflowPolicy(Enum):
+    """O que fazer quando a fila de background está cheia"""
+    DROP_OLDEST = "drop_oldest"  # Descarta o item mais antigo
+    BLOCK = "block"              # Emissor aguarda espaço na fila
+
+class LatencyHistogram:
+    """Histograma de latência com buckets fixos (segundos)"""
+    
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    __slots__ = ('counts', 'count', 'total', 'max')
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds: float):
+        """Registra uma observação"""
+        self.counts[bisect_left(self.BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+    
+    def percentile(self, p: float) -> float:
+        """Limite superior do bucket que contém o percentil `p` (0-100)"""
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.BUCKETS[index] if index < len(self.BUCKETS) else self.max
+        return self.max
+    
+    def summary(self) -> Dict[str, float]:
+        """Resumo do histograma"""
+        return {
+            'count': self.count,
+            'avg': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+
 @dataclass
 class EventData:
     """Dados de um evento"""
@@ -95,6 +152,8 @@ class EventListener:
     enabled: bool = True
     call_count: int = 0
     last_called: Optional[datetime] = None
+    mode: ListenerMode = ListenerMode.SERIAL
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
     
     async def execute(self, event: EventData) -> Any:
         """Executa o listener"""
@@ -161,16 +220,67 @@ class Hook:
             logging.error(f"Erro ao executar hook {self.name}: {e}")
             raise
 
+# Filtro de middleware: None (eventos com listeners), nomes de eventos ou predicado
+MiddlewareFilter = Union[None, FrozenSet[str], Callable[[str], bool]]
+
+@dataclass(frozen=True)
+class _MiddlewareEntry:
+    """Middleware registrado com o filtro de eventos em que atua"""
+    callback: Callable
+    events: MiddlewareFilter
+    is_async: bool
+    
+    def opted_in(self, event_name: str) -> bool:
+        """True se o middleware pediu explicitamente este evento"""
+        if self.events is None:
+            return False
+        if callable(self.events):
+            try:
+                return bool(self.events(event_name))
+            except Exception:
+                return False
+        return event_name in self.events
+
+@dataclass(frozen=True)
+class _Dispatch:
+    """Tabela de despacho pré-compilada de um (evento, fase).
+    
+    `stages` são executados em ordem: um estágio é um listener serial ou um
+    grupo de listeners concorrentes consecutivos de mesma prioridade.
+    """
+    stages: Tuple[Tuple[EventListener, ...], ...]
+    background: Tuple[EventListener, ...]
+    middleware: Tuple[_MiddlewareEntry, ...]
+
+_EMPTY_DISPATCH = _Dispatch((), (), ())
+
 class EventSystem:
-    """Sistema principal de eventos"""
+    """Sistema principal de eventos.
+    
+    Listeners e middleware de cada (evento, fase) são resolvidos uma vez
+    numa tabela de despacho, invalidada só quando listeners ou middleware
+    mudam. Eventos sem listeners e sem middleware inscrito pelo nome não
+    criam EventData nem entram no histórico.
+    """
     
     def __init__(self):
         self.listeners: Dict[str, List[EventListener]] = defaultdict(list)
         self.hooks: Dict[str, Dict[HookType, List[Hook]]] = defaultdict(lambda: defaultdict(list))
         self.middleware: List[Callable] = []
+        self._middleware_entries: List[_MiddlewareEntry] = []
+        self._dispatch: Dict[Tuple[str, EventPhase], _Dispatch] = {}
         self.event_history: deque = deque(maxlen=1000)
         self.logger = logging.getLogger(__name__)
         
+        # Fila limitada para listeners em background
+        self.background_queue_size = 1000
+        self.background_workers = 4
+        self.overflow_policy = OverflowPolicy.DROP_OLDEST
+        self._background_queue: Optional[asyncio.Queue] = None
+        self._background_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self.background_stats = {'queued': 0, 'processed': 0, 'dropped': 0}
+        
         # Métricas
         self.event_count = defaultdict(int)
         self.listener_count = defaultdict(int)
@@ -215,10 +325,11 @@ class EventSystem:
     
     def on(self, event_name: str, priority: EventPriority = EventPriority.NORMAL,
            phase: EventPhase = EventPhase.MAIN, once: bool = False,
-           condition: Optional[Callable] = None, name: Optional[str] = None):
+           condition: Optional[Callable] = None, name: Optional[str] = None,
+           mode: ListenerMode = ListenerMode.SERIAL):
         """Decorador para registrar event listener"""
         def decorator(callback: Callable):
-            self.add_listener(event_name, callback, priority, phase, once, condition, name)
+            self.add_listener(event_name, callback, priority, phase, once, condition, name, mode)
             return callback
         return decorator
     
@@ -227,15 +338,23 @@ class EventSystem:
                     phase: EventPhase = EventPhase.MAIN,
                     once: bool = False,
                     condition: Optional[Callable] = None,
-                    name: Optional[str] = None) -> EventListener:
-        """Adiciona um event listener"""
+                    name: Optional[str] = None,
+                    mode: ListenerMode = ListenerMode.SERIAL) -> EventListener:
+        """Adiciona um event listener.
+        
+        `mode` controla a execução: SERIAL (em ordem, padrão), CONCURRENT
+        (agrupado com concorrentes vizinhos de mesma prioridade) ou
+        BACKGROUND (enfileirado; não atrasa o emissor e não pode cancelar
+        nem parar a propagação do evento).
+        """
         listener = EventListener(
             callback=callback,
             priority=priority,
             phase=phase,
             once=once,
             condition=condition,
-            name=name or f"{callback.__name__}_{len(self.listeners[event_name])}"
+            name=name or f"{callback.__name__}_{len(self.listeners[event_name])}",
+            mode=mode
         )
         
         self.listeners[event_name].append(listener)
@@ -244,6 +363,7 @@ class EventSystem:
         self.listeners[event_name].sort(key=lambda x: x.priority.value, reverse=True)
         
         self.listener_count[event_name] += 1
+        self._invalidate(event_name)
         self.logger.debug(f"Listener '{listener.name}' adicionado para evento '{event_name}'")
         
         return listener
@@ -261,12 +381,14 @@ class EventSystem:
                 if l.name == listener:
                     del listeners[i]
                     self.listener_count[event_name] -= 1
+                    self._invalidate(event_name)
                     return True
         else:
             # Remover por referência
             if listener in listeners:
                 listeners.remove(listener)
                 self.listener_count[event_name] -= 1
+                self._invalidate(event_name)
                 return True
         
         return False
@@ -294,15 +416,88 @@ class EventSystem:
         
         return hook
     
-    def add_middleware(self, middleware: Callable):
-        """Adiciona middleware para processar todos os eventos"""
+    def add_middleware(self, middleware: Callable,
+                       events: Union[None, Iterable[str], Callable[[str], bool]] = None):
+        """Adiciona middleware.
+        
+        Sem `events`, o middleware processa todo evento que tenha listeners.
+        Com uma lista de nomes ou um predicado `(nome) -> bool`, processa só
+        os eventos escolhidos, mesmo que não tenham listeners. Predicados são
+        avaliados ao montar a tabela de despacho; chame `invalidate_dispatch`
+        se a resposta deles mudar.
+        """
+        if events is not None and not callable(events):
+            events = frozenset(events)
+        
         self.middleware.append(middleware)
+        self._middleware_entries.append(
+            _MiddlewareEntry(middleware, events, inspect.iscoroutinefunction(middleware))
+        )
+        self.invalidate_dispatch()
         self.logger.debug(f"Middleware '{middleware.__name__}' adicionado")
     
+    def remove_middleware(self, middleware: Callable) -> bool:
+        """Remove um middleware"""
+        if middleware not in self.middleware:
+            return False
+        
+        self.middleware.remove(middleware)
+        self._middleware_entries = [m for m in self._middleware_entries if m.callback is not middleware]
+        self.invalidate_dispatch()
+        return True
+    
+    def _invalidate(self, event_name: str):
+        """Descarta as tabelas de despacho de um evento"""
+        for phase in EventPhase:
+            self._dispatch.pop((event_name, phase), None)
+    
+    def invalidate_dispatch(self):
+        """Descarta todas as tabelas de despacho (recompiladas sob demanda)"""
+        self._dispatch.clear()
+    
+    def _build_dispatch(self, event_name: str, phase: EventPhase) -> _Dispatch:
+        """Compila listeners (já ordenados por prioridade) e middleware de um (evento, fase)"""
+        listeners = [l for l in self.listeners.get(event_name, ()) if l.phase == phase]
+        middleware = tuple(
+            m for m in self._middleware_entries
+            if m.opted_in(event_name) or (m.events is None and listeners)
+        )
+        
+        stages: List[List[EventListener]] = []
+        for listener in listeners:
+            if listener.mode is ListenerMode.BACKGROUND:
+                continue
+            previous = stages[-1] if stages else None
+            if (listener.mode is ListenerMode.CONCURRENT and previous
+                    and previous[0].mode is ListenerMode.CONCURRENT
+                    and previous[0].priority == listener.priority):
+                previous.append(listener)
+            else:
+                stages.append([listener])
+        background = tuple(l for l in listeners if l.mode is ListenerMode.BACKGROUND)
+        
+        if listeners or middleware:
+            dispatch = _Dispatch(tuple(tuple(stage) for stage in stages), background, middleware)
+        else:
+            dispatch = _EMPTY_DISPATCH
+        self._dispatch[(event_name, phase)] = dispatch
+        return dispatch
+    
     async def emit(self, event_name: str, data: Optional[Dict[str, Any]] = None,
                   source: Optional[str] = None, phase: EventPhase = EventPhase.MAIN,
-                  priority: EventPriority = EventPriority.NORMAL) -> EventData:
-        """Emite um evento"""
+                  priority: EventPriority = EventPriority.NORMAL) -> Optional[EventData]:
+        """Emite um evento.
+        
+        Retorna None quando nenhum listener ou middleware atua no evento.
+        """
+        self.event_count[event_name] += 1
+        
+        dispatch = self._dispatch.get((event_name, phase))
+        if dispatch is None:
+            dispatch = self._build_dispatch(event_name, phase)
+        if dispatch is _EMPTY_DISPATCH:
+            return None
+        
         event = EventData(
             name=event_name,
             data=data or {},
@@ -310,18 +505,16 @@ class EventSystem:
             phase=phase,
             priority=priority
         )
-        
-        self.event_count[event_name] += 1
         self.event_history.append(event)
         
         try:
             # Processar middleware
-            for middleware in self.middleware:
+            for middleware in dispatch.middleware:
                 try:
-                    if inspect.iscoroutinefunction(middleware):
-                        await middleware(event)
+                    if middleware.is_async:
+                        await middleware.callback(event)
                     else:
-                        middleware(event)
+                        middleware.callback(event)
                     
                     if event.cancelled or event.propagation_stopped:
                         break
@@ -330,8 +523,8 @@ class EventSystem:
                     self.error_count[event_name] += 1
             
             # Executar listeners se o evento não foi cancelado
-            if not event.cancelled:
-                await self._execute_listeners(event_name, event)
+            if not event.cancelled and (dispatch.stages or dispatch.background):
+                await self._execute_listeners(event_name, event, dispatch)
             
             return event
             
@@ -340,46 +533,132 @@ class EventSystem:
             self.error_count[event_name] += 1
             raise
     
-    async def _execute_listeners(self, event_name: str, event: EventData):
-        """Executa listeners para um evento"""
-        if event_name not in self.listeners:
-            return
-        
-        # Filtrar listeners por fase
-        phase_listeners = [l for l in self.listeners[event_name] 
-                          if l.phase == event.phase and l.enabled]
-        
-        # Executar listeners em ordem de prioridade
-        for listener in phase_listeners:
+    async def _execute_listeners(self, event_name: str, event: EventData, dispatch: _Dispatch):
+        """Executa os estágios da tabela de despacho e enfileira os de background"""
+        for stage in dispatch.stages:
             if event.propagation_stopped:
                 break
             
+            if len(stage) == 1:
+                await self._run_listener(event_name, event, stage[0])
+            else:
+                await asyncio.gather(*(self._run_listener(event_name, event, l) for l in stage))
+        
+        if dispatch.background and not event.propagation_stopped:
+            for listener in dispatch.background:
+                await self._enqueue_background(event_name, event, listener)
+    
+    async def _run_listener(self, event_name: str, event: EventData, listener: EventListener):
+        """Executa um listener medindo a latência e tratando erros"""
+        if not listener.enabled:
+            return
+        
+        started = time.perf_counter()
+        try:
+            await listener.execute(event)
+            
+            # Remover listeners "once" após a execução
+            if listener.once and not listener.enabled:
+                self.remove_listener(event_name, listener)
+        except Exception as e:
+            self.logger.error(f"Erro ao executar listener '{listener.name}': {e}")
+            self.error_count[event_name] += 1
+            
+            # Evitar recursão infinita
+            if event_name != 'listener_error':
+                await self.emit('listener_error', {
+                    'original_event': event_name,
+                    'listener_name': listener.name,
+                    'error': str(e),
+                    'traceback': traceback.format_exc()
+                })
+        finally:
+            listener.latency.observe(time.perf_counter() - started)
+    
+    def configure_background(self, max_queue_size: Optional[int] = None,
+                             workers: Optional[int] = None,
+                             overflow_policy: Optional[OverflowPolicy] = None):
+        """Configura a fila de background (vale para a próxima fila criada)"""
+        if max_queue_size is not None:
+            self.background_queue_size = max_queue_size
+        if workers is not None:
+            self.background_workers = workers
+        if overflow_policy is not None:
+            self.overflow_policy = overflow_policy
+    
+    def _ensure_background_workers(self) -> asyncio.Queue:
+        """Cria a fila e os workers no loop atual (sob demanda)"""
+        loop = asyncio.get_running_loop()
+        if self._background_queue is None or self._background_loop is not loop:
+            self._background_queue = asyncio.Queue(maxsize=self.background_queue_size)
+            self._background_loop = loop
+            self._worker_tasks = []
+        
+        self._worker_tasks = [t for t in self._worker_tasks if not t.done()]
+        while len(self._worker_tasks) < self.background_workers:
+            self._worker_tasks.append(loop.create_task(self._background_worker(self._background_queue)))
+        return self._background_queue
+    
+    async def _enqueue_background(self, event_name: str, event: EventData, listener: EventListener):
+        """Enfileira um listener de background aplicando a política de overflow"""
+        queue = self._ensure_background_workers()
+        item = (event_name, event, listener)
+        
+        if self.overflow_policy is OverflowPolicy.BLOCK:
+            await queue.put(item)
+        else:
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                    queue.task_done()
+                    self.background_stats['dropped'] += 1
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(item)
+        
+        self.background_stats['queued'] += 1
+    
+    async def _background_worker(self, queue: asyncio.Queue):
+        """Worker que consome a fila de listeners de background"""
+        while True:
+            event_name, event, listener = await queue.get()
             try:
-                await listener.execute(event)
+                await self._run_listener(event_name, event, listener)
+                self.background_stats['processed'] += 1
             except Exception as e:
-                self.logger.error(f"Erro ao executar listener '{listener.name}': {e}")
-                self.error_count[event_name] += 1
-                
-                # Emitir evento de erro
-                error_event = EventData(
-                    name='listener_error',
-                    data={
-                        'original_event': event_name,
-                        'listener_name': listener.name,
-                        'error': str(e),
-                        'traceback': traceback.format_exc()
-                    }
-                )
-                
-                # Evitar recursão infinita
-                if event_name != 'listener_error':
-                    await self.emit('listener_error', error_event.data)
-        
-        # Remover listeners "once" que foram desabilitados
-        self.listeners[event_name] = [l for l in self.listeners[event_name] if l.enabled]
+                self.logger.error(f"Erro no worker de eventos: {e}")
+            finally:
+                queue.task_done()
+    
+    async def drain_background(self):
+        """Aguarda a fila de background esvaziar"""
+        if self._background_queue is not None and self._background_loop is asyncio.get_running_loop():
+            await self._background_queue.join()
+    
+    async def stop_background(self, drain: bool = True):
+        """Encerra os workers de background (opcionalmente drenando a fila)"""
+        if drain:
+            await self.drain_background()
+        
+        for task in self._worker_tasks:
+            task.cancel()
+        if self._worker_tasks:
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._background_queue = None
+        self._background_loop = None
+    
+    def get_listener_latency(self, event_name: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Resumo de latência por listener (p50/p95/p99 em segundos)"""
+        names = [event_name] if event_name else list(self.listeners)
+        return {
+            name: {l.name: l.latency.summary() for l in self.listeners.get(name, []) if l.latency.count}
+            for name in names
+            if any(l.latency.count for l in self.listeners.get(name, []))
+        }
     
     async def emit_phases(self, event_name: str, data: Optional[Dict[str, Any]] = None,
-                         source: Optional[str] = None) -> List[EventData]:
+                         source: Optional[str] = None) -> List[Optional[EventData]]:
         """Emite evento em todas as fases"""
         events = []
         
@@ -388,7 +667,7 @@ class EventSystem:
             events.append(event)
             
             # Parar se o evento foi cancelado
-            if event.cancelled:
+            if event is not None and event.cancelled:
                 break
         
         return events
@@ -424,7 +703,7 @@ class EventSystem:
             
             async def emit(self, event_name: str, data: Optional[Dict[str, Any]] = None,
                           phase: EventPhase = EventPhase.MAIN,
-                          priority: EventPriority = EventPriority.NORMAL) -> EventData:
+                          priority: EventPriority = EventPriority.NORMAL) -> Optional[EventData]:
                 return await self.event_system.emit(event_name, data, self.source, phase, priority)
             
             async def emit_phases(self, event_name: str, data: Optional[Dict[str, Any]] = None) -> List[EventData]:
@@ -455,6 +734,12 @@ class EventSystem:
             'hooks_by_function': dict(self.hook_count),
             'registered_events': list(self.listeners.keys()),
             'middleware_count': len(self.middleware),
+            'background': {
+                **self.background_stats,
+                'queue_depth': self._background_queue.qsize() if self._background_queue else 0,
+                'workers': len(self._worker_tasks),
+                'overflow_policy': self.overflow_policy.value
+            },
             'recent_events': [{
                 'name': e.name,
                 'timestamp': e.timestamp.isoformat(),
@@ -469,9 +754,11 @@ class EventSystem:
             if event_name in self.listeners:
                 self.listeners[event_name].clear()
                 self.listener_count[event_name] = 0
+                self._invalidate(event_name)
         else:
             self.listeners.clear()
             self.listener_count.clear()
+            self.invalidate_dispatch()
     
     def clear_hooks(self, function_name: Optional[str] = None):
         """Remove hooks"""
@@ -502,18 +789,20 @@ def get_event_system() -> EventSystem:
 # Funções de conveniência
 def on(event_name: str, priority: EventPriority = EventPriority.NORMAL,
        phase: EventPhase = EventPhase.MAIN, once: bool = False,
-       condition: Optional[Callable] = None, name: Optional[str] = None):
+       condition: Optional[Callable] = None, name: Optional[str] = None,
+       mode: ListenerMode = ListenerMode.SERIAL):
     """Decorador para registrar event listener"""
-    return get_event_system().on(event_name, priority, phase, once, condition, name)
+    return get_event_system().on(event_name, priority, phase, once, condition, name, mode)
 
 def add_listener(event_name: str, callback: Callable,
                 priority: EventPriority = EventPriority.NORMAL,
                 phase: EventPhase = EventPhase.MAIN,
                 once: bool = False,
                 condition: Optional[Callable] = None,
-                name: Optional[str] = None) -> EventListener:
+                name: Optional[str] = None,
+                mode: ListenerMode = ListenerMode.SERIAL) -> EventListener:
     """Adiciona event listener"""
-    return get_event_system().add_listener(event_name, callback, priority, phase, once, condition, name)
+    return get_event_system().add_listener(event_name, callback, priority, phase, once, condition, name, mode)
 
 def add_hook(function_name: str, hook_type: HookType, callback: Callable,
             priority: EventPriority = EventPriority.NORMAL,
@@ -524,7 +813,7 @@ def add_hook(function_name: str, hook_type: HookType, callback: Callable,
 
 async def emit(event_name: str, data: Optional[Dict[str, Any]] = None,
               source: Optional[str] = None, phase: EventPhase = EventPhase.MAIN,
-              priority: EventPriority = EventPriority.NORMAL) -> EventData:
+              priority: EventPriority = EventPriority.NORMAL) -> Optional[EventData]:
     """Emite evento"""
     return await get_event_system().emit(event_name, data, source, phase, priority)
 
@@ -533,9 +822,10 @@ async def emit_phases(event_name: str, data: Optional[Dict[str, Any]] = None,
     """Emite evento em todas as fases"""
     return await get_event_system().emit_phases(event_name, data, source)
 
-def add_middleware(middleware: Callable):
+def add_middleware(middleware: Callable,
+                   events: Union[None, Iterable[str], Callable[[str], bool]] = None):
     """Adiciona middleware"""
-    get_event_system().add_middleware(middleware)
+    get_event_system().add_middleware(middleware, events)
 
 def get_event_stats() -> Dict[str, Any]:
     """Obtém estatísticas de eventos"""
@@ -587,7 +877,8 @@ def event_emitter(source: str):
 async def logging_middleware(event: EventData):
     """Middleware para logging de eventos"""
     logger = logging.getLogger('events')
-    logger.debug(f"Evento '{event.name}' emitido por '{event.source}' com dados: {event.data}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Evento '{event.name}' emitido por '{event.source}' com dados: {event.data}")
 
 async def metrics_middleware(event: EventData):
     """Middleware para métricas de eventos"""
@@ -599,13 +890,20 @@ async def metrics_middleware(event: EventData):
     except ImportError:
         pass
 
+def has_event_schema(event_name: str) -> bool:
+    """True se existe schema `event_<nome>` registrado no validador"""
+    try:
+        from .data_validator import get_data_validator
+    except ImportError:
+        return False
+    return f'event_{event_name}' in get_data_validator().schemas
+
 async def validation_middleware(event: EventData):
-    """Middleware para validação de eventos"""
+    """Middleware para validação de eventos (só eventos com schema)"""
     try:
         from .data_validator import get_data_validator
         validator = get_data_validator()
         
-        # Validar dados do evento se houver schema
         schema_name = f'event_{event.name}'
         valid, validated_data, errors = validator.validate_data(event.data, schema_name)
         
@@ -621,7 +919,7 @@ def _register_default_middleware():
     event_system = get_event_system()
     event_system.add_middleware(logging_middleware)
     event_system.add_middleware(metrics_middleware)
-    event_system.add_middleware(validation_middleware)
+    event_system.add_middleware(validation_middleware, events=has_event_schema)
 
 # Inicializar middleware padrão
 _register_default_middleware()
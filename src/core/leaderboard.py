@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de Leaderboards Incremental - Hawk Bot
+Rankings mantidos ordenados a cada atualização de pontuação, com um
+quadro por categoria. Consultar o top-N custa O(limit) e atualizar a
+pontuação de um membro custa O(log n) de busca mais o deslocamento da lista.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+Score = Union[int, float, Tuple[Union[int, float], ...]]
+
+
+def _descending(score: Score) -> Any:
+    """Chave que ordena pontuações (números ou tuplas) da maior para a menor"""
+    if isinstance(score, tuple):
+        return tuple(-value for value in score)
+    return -score
+
+
+class _Board:
+    """Quadro ordenado de um ranking"""
+
+    __slots__ = ('keys', 'scores')
+
+    def __init__(self):
+        self.keys: List[Tuple[Any, Hashable]] = []
+        self.scores: Dict[Hashable, Score] = {}
+
+    def _key(self, member: Hashable) -> Tuple[Any, Hashable]:
+        return (_descending(self.scores[member]), member)
+
+    def discard(self, member: Hashable):
+        if member not in self.scores:
+            return
+        key = self._key(member)
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+        del self.scores[member]
+
+    def set(self, member: Hashable, score: Score):
+        if member in self.scores and self.scores[member] == score:
+            return
+        self.discard(member)
+        self.scores[member] = score
+        insort(self.keys, self._key(member))
+
+
+class LeaderboardIndex:
+    """Conjunto de rankings nomeados (ex.: "total", "category:combate").
+
+    Cada quadro guarda as chaves (pontuação decrescente, membro) numa lista
+    ordenada; o desempate é pelo identificador do membro, então todos os
+    membros de um quadro devem ter identificadores do mesmo tipo.
+    """
+
+    DEFAULT_BOARD = 'total'
+
+    def __init__(self):
+        self._boards: Dict[str, _Board] = {}
+
+    def _board(self, board: str) -> _Board:
+        existing = self._boards.get(board)
+        if existing is None:
+            existing = self._boards[board] = _Board()
+        return existing
+
+    def set_score(self, member: Hashable, score: Score, board: str = DEFAULT_BOARD):
+        """Define a pontuação de um membro num quadro"""
+        self._board(board).set(member, score)
+
+    def add_score(self, member: Hashable, delta: Union[int, float], board: str = DEFAULT_BOARD) -> Score:
+        """Soma `delta` à pontuação numérica de um membro; retorna o novo valor"""
+        target = self._board(board)
+        score = target.scores.get(member, 0) + delta
+        target.set(member, score)
+        return score
+
+    def score(self, member: Hashable, board: str = DEFAULT_BOARD, default: Optional[Score] = None) -> Optional[Score]:
+        """Pontuação atual de um membro"""
+        target = self._boards.get(board)
+        if target is None:
+            return default
+        return target.scores.get(member, default)
+
+    def top(self, limit: int = 10, board: str = DEFAULT_BOARD) -> List[Tuple[Hashable, Score]]:
+        """Os `limit` primeiros (membro, pontuação) em ordem decrescente"""
+        target = self._boards.get(board)
+        if target is None or limit <= 0:
+            return []
+        return [(member, target.scores[member]) for _, member in target.keys[:limit]]
+
+    def iter_ranked(self, board: str = DEFAULT_BOARD) -> Iterable[Tuple[Hashable, Score]]:
+        """Itera (membro, pontuação) em ordem decrescente, sob demanda.
+
+        O quadro não deve ser alterado enquanto o iterador estiver em uso.
+        """
+        target = self._boards.get(board)
+        if target is None:
+            return
+        for _, member in target.keys:
+            yield member, target.scores[member]
+
+    def rank(self, member: Hashable, board: str = DEFAULT_BOARD) -> Optional[int]:
+        """Posição (1 = primeiro) de um membro, ou None se não estiver no quadro"""
+        target = self._boards.get(board)
+        if target is None or member not in target.scores:
+            return None
+        return bisect_left(target.keys, target._key(member)) + 1
+
+    def remove(self, member: Hashable, board: Optional[str] = None):
+        """Remove um membro de um quadro (ou de todos, se `board` for None)"""
+        boards = [self._boards.get(board)] if board is not None else list(self._boards.values())
+        for target in boards:
+            if target is not None:
+                target.discard(member)
+
+    def size(self, board: str = DEFAULT_BOARD) -> int:
+        """Quantidade de membros num quadro"""
+        target = self._boards.get(board)
+        return len(target.scores) if target else 0
+
+    def boards(self) -> List[str]:
+        """Nomes dos quadros existentes"""
+        return list(self._boards)
+
+    def clear(self):
+        """Remove todos os quadros"""
+        self._boards.clear()
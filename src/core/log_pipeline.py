@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline Assíncrono de Logging - Hawk Bot
+Os loggers entregam registros a uma fila limitada (sem I/O na thread que
+loga, inclusive o event loop); uma única thread de escrita consome a fila
+em lotes e repassa aos handlers reais, gravando cada lote com um único
+write/flush por arquivo quando possível.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import atexit
+import logging
+import logging.handlers
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, List, Optional, Sequence
+
+from .metrics import increment_counter, observe_histogram, record_gauge
+
+
+class LogOverflowPolicy(Enum):
+    """O que fazer quando a fila de logs está cheia"""
+    DROP_NEWEST = "drop_newest"  # Descarta o registro que está chegando
+    DROP_OLDEST = "drop_oldest"  # Descarta o registro mais antigo da fila
+    BLOCK = "block"              # Espera até `block_timeout`; depois descarta o novo
+
+
+class BoundedLogQueue:
+    """Fila limitada de registros com política de descarte.
+
+    Expõe `put_nowait` para ser usada por `logging.handlers.QueueHandler`.
+    """
+
+    def __init__(self, maxsize: int = 10000,
+                 policy: LogOverflowPolicy = LogOverflowPolicy.DROP_NEWEST,
+                 block_timeout: float = 0.05, name: str = "default"):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.labels = {'pipeline': name, 'policy': policy.value}
+        self._items: Deque[logging.LogRecord] = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self.enqueued = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put_nowait(self, record: logging.LogRecord):
+        accepted = True
+        dropped = 0
+        with self._lock:
+            if len(self._items) >= self.maxsize:
+                if self.policy == LogOverflowPolicy.DROP_OLDEST:
+                    self._items.popleft()
+                    dropped = 1
+                elif self.policy == LogOverflowPolicy.BLOCK:
+                    self._not_full.wait_for(lambda: len(self._items) < self.maxsize, self.block_timeout)
+                if len(self._items) >= self.maxsize:
+                    # DROP_NEWEST, ou BLOCK sem espaço após a espera
+                    accepted = False
+                    dropped = 1
+
+            if accepted:
+                self._items.append(record)
+                self.enqueued += 1
+                self._not_empty.notify()
+            self.dropped += dropped
+
+        if dropped:
+            increment_counter('logging.records_dropped', labels=self.labels)
+        if accepted:
+            increment_counter('logging.records_queued', labels=self.labels)
+
+    def get_batch(self, max_items: int, timeout: float) -> List[logging.LogRecord]:
+        """Até `max_items` registros; espera no máximo `timeout` pelo primeiro"""
+        with self._lock:
+            if not self._items:
+                self._not_empty.wait(timeout)
+            batch = []
+            while self._items and len(batch) < max_items:
+                batch.append(self._items.popleft())
+            self._in_flight = len(batch)
+            if batch:
+                self._not_full.notify_all()
+            return batch
+
+    def task_done(self):
+        with self._lock:
+            self._in_flight = 0
+            if not self._items:
+                self._idle.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Espera a fila esvaziar e o lote em andamento terminar"""
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._items and not self._in_flight, timeout)
+
+    def wake(self):
+        with self._lock:
+            self._not_empty.notify_all()
+
+
+class AsyncLogHandler(logging.handlers.QueueHandler):
+    """QueueHandler que só prepara o registro na thread de origem.
+
+    A mensagem é combinada com os argumentos (congelando valores mutáveis),
+    mas a formatação e a sanitização ficam para a thread de escrita. As
+    informações de exceção são preservadas para os formatadores finais.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def emit_batch(handler: logging.Handler, records: Sequence[logging.LogRecord]):
+    """Entrega um lote de registros a um handler respeitando nível e filtros.
+
+    Handlers com `emit_batch` próprio (ex.: SecureLogHandler) recebem o lote
+    inteiro; StreamHandler/FileHandler gravam o lote com um único write e um
+    único flush, a menos que o lote provoque rotação de arquivo.
+    """
+    accepted = [record for record in records
+                if record.levelno >= handler.level and handler.filter(record)]
+    if not accepted:
+        return
+
+    custom = getattr(handler, 'emit_batch', None)
+    if custom is not None:
+        custom(accepted)
+        return
+
+    if not isinstance(handler, logging.StreamHandler):
+        for record in accepted:
+            handler.handle(record)
+        return
+
+    handler.acquire()
+    try:
+        try:
+            text = ''.join(handler.format(record) + handler.terminator for record in accepted)
+        except Exception:
+            text = None
+
+        rotating = isinstance(handler, logging.handlers.RotatingFileHandler) and handler.maxBytes > 0
+        if text is None or (rotating and handler.stream is not None
+                            and handler.stream.tell() + len(text) >= handler.maxBytes):
+            # Erros de formatação ou rotação: caminho normal, registro a registro
+            for record in accepted:
+                handler.handle(record)
+            return
+
+        if isinstance(handler, logging.FileHandler) and handler.stream is None:
+            handler.stream = handler._open()
+        handler.stream.write(text)
+        handler.flush()
+    except Exception:
+        for record in accepted:
+            handler.handleError(record)
+    finally:
+        handler.release()
+
+
+class LogPipeline:
+    """Fila + thread de escrita única para um conjunto de handlers.
+
+    `queue_handler` é o único handler que deve ficar no logger; os handlers
+    reais só são usados pela thread de escrita.
+    """
+
+    def __init__(self, handlers: Sequence[logging.Handler], name: str = "default",
+                 maxsize: int = 10000,
+                 policy: LogOverflowPolicy = LogOverflowPolicy.DROP_NEWEST,
+                 batch_size: int = 256, block_timeout: float = 0.05,
+                 flush_interval: float = 0.2):
+        self.name = name
+        self.handlers = list(handlers)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = BoundedLogQueue(maxsize, policy, block_timeout, name)
+        self.queue_handler = AsyncLogHandler(self.queue)
+        self.queue_handler.setLevel(min((h.level for h in self.handlers), default=logging.NOTSET))
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.batches = 0
+
+    def start(self):
+        """Inicia a thread de escrita (idempotente)"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"log-writer-{self.name}", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while self._running or len(self.queue):
+            batch = self.queue.get_batch(self.batch_size, self.flush_interval)
+            if not batch:
+                self.queue.task_done()
+                continue
+
+            started = time.perf_counter()
+            for handler in self.handlers:
+                try:
+                    emit_batch(handler, batch)
+                except Exception:
+                    for record in batch:
+                        handler.handleError(record)
+
+            self.batches += 1
+            self.queue.task_done()
+            record_gauge('logging.queue_depth', len(self.queue), labels={'pipeline': self.name})
+            observe_histogram('logging.batch_write_seconds', time.perf_counter() - started,
+                              labels={'pipeline': self.name})
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Espera os registros já enfileirados serem gravados"""
+        if not self._running:
+            return not len(self.queue)
+        self.queue.wake()
+        return self.queue.wait_idle(timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """Grava o que resta na fila e encerra a thread de escrita"""
+        if not self._running:
+            return
+        self._running = False
+        self.queue.wake()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        atexit.unregister(self.stop)
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass
+
+    def close(self, timeout: float = 5.0):
+        """Encerra a thread de escrita e fecha os handlers reais"""
+        self.stop(timeout)
+        for handler in self.handlers:
+            try:
+                handler.close()
+            except Exception:
+                pass
+
+    def get_stats(self) -> dict:
+        return {
+            'queued': len(self.queue),
+            'enqueued': self.queue.enqueued,
+            'dropped': self.queue.dropped,
+            'batches': self.batches,
+            'policy': self.queue.policy.value
+        }
+
+
+# Pipeline ativo de cada logger: recriar um logger com o mesmo nome encerra
+# o anterior em vez de deixar a thread e os arquivos dele abertos
+_pipelines: Dict[str, LogPipeline] = {}
+
+
+def attach_pipeline(logger: logging.Logger, pipeline: LogPipeline) -> LogPipeline:
+    """Deixa `pipeline` como único handler do logger e inicia a escrita"""
+    release_pipeline(logger.name)
+    _pipelines[logger.name] = pipeline
+    logger.handlers = [pipeline.queue_handler]
+    pipeline.start()
+    return pipeline
+
+
+def release_pipeline(name: str):
+    """Encerra o pipeline do logger `name`, se houver, e fecha seus arquivos"""
+    pipeline = _pipelines.pop(name, None)
+    if pipeline is not None:
+        pipeline.close()
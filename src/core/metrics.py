@@ -9,11 +9,13 @@ Este módulo fornece funcionalidades para:
 """
 
 import asyncio
+import gc
+import math
 import time
 import psutil
 import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable, Union
+from typing import Dict, List, Optional, Any, Callable, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict, deque
@@ -77,8 +79,148 @@ class Alert:
             'resolved': self.resolved
         }
 
+class _WindowStats:
+    """Agregados (quantidade, soma, mínimo, máximo) por intervalo num anel fixo.
+    
+    Com os padrões, 60 intervalos de 1 minuto: estatísticas da última hora
+    em memória constante, consultadas em O(60) sem copiar amostras.
+    """
+    
+    __slots__ = ('resolution', 'size', 'slots', 'counts', 'sums', 'mins', 'maxs')
+    
+    def __init__(self, size: int = 60, resolution: float = 60.0):
+        self.resolution = resolution
+        self.size = size
+        self.slots = [-1] * size
+        self.counts = [0] * size
+        self.sums = [0.0] * size
+        self.mins = [0.0] * size
+        self.maxs = [0.0] * size
+    
+    def add(self, value: Union[int, float], now: float):
+        slot = int(now // self.resolution)
+        i = slot % self.size
+        if self.slots[i] != slot:
+            self.slots[i] = slot
+            self.counts[i] = 1
+            self.sums[i] = value
+            self.mins[i] = value
+            self.maxs[i] = value
+            return
+        
+        self.counts[i] += 1
+        self.sums[i] += value
+        if value < self.mins[i]:
+            self.mins[i] = value
+        if value > self.maxs[i]:
+            self.maxs[i] = value
+    
+    def summary(self, since: Optional[float], now: float) -> Optional[Tuple[int, float, float, float]]:
+        """(quantidade, soma, mínimo, máximo) desde `since` (limitado à janela retida)"""
+        current = int(now // self.resolution)
+        oldest = current - self.size + 1
+        if since is not None:
+            oldest = max(oldest, int(since // self.resolution))
+        
+        count, total, low, high = 0, 0.0, None, None
+        for i in range(self.size):
+            if oldest <= self.slots[i] <= current and self.counts[i]:
+                count += self.counts[i]
+                total += self.sums[i]
+                low = self.mins[i] if low is None or self.mins[i] < low else low
+                high = self.maxs[i] if high is None or self.maxs[i] > high else high
+        return (count, total, low, high) if count else None
+
+class StreamingHistogram:
+    """Histograma logarítmico de memória fixa (estilo DDSketch/HDR).
+    
+    Cada bucket cobre um fator `gamma` do anterior, então qualquer quantil
+    tem erro relativo de no máximo `relative_accuracy`. Os quantis usuais
+    ficam em cache até a próxima observação.
+    """
+    
+    __slots__ = ('relative_accuracy', 'min_value', 'gamma', '_log_gamma', '_offset',
+                 'counts', 'zero_count', 'count', 'sum', 'min', 'max', '_cache')
+    
+    def __init__(self, relative_accuracy: float = 0.02, min_value: float = 1e-6,
+                 max_value: float = 1e9):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._offset = math.ceil(math.log(min_value) / self._log_gamma)
+        buckets = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        self.counts = [0] * buckets
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._cache: Optional[Dict[str, float]] = None
+    
+    def observe(self, value: Union[int, float]):
+        """Registra um valor"""
+        if value <= self.min_value:
+            self.zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma) - self._offset
+            self.counts[min(index, len(self.counts) - 1)] += 1
+        
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self._cache = None
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Valor estimado do quantil `q` (0-1)"""
+        if not self.count:
+            return None
+        
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0) if self.min < self.min_value else self.min
+        
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen > rank:
+                if index == len(self.counts) - 1:
+                    return self.max  # último bucket também acumula valores acima da faixa
+                value = 2 * self.gamma ** (index + self._offset) / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+    
+    def quantiles(self) -> Dict[str, float]:
+        """p50/p95/p99 (em cache até a próxima observação)"""
+        if self._cache is None:
+            self._cache = {
+                'p50': self.quantile(0.50),
+                'p95': self.quantile(0.95),
+                'p99': self.quantile(0.99)
+            }
+        return self._cache
+    
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+def _label_key(tags: Dict[str, str]) -> str:
+    """Sufixo de exibição de um conjunto de labels: {a="1",b="2"}"""
+    return '{' + ','.join(f'{k}="{v}"' for k, v in sorted(tags.items())) + '}'
+
 class Metric:
-    """Classe base para métricas"""
+    """Classe base para métricas.
+    
+    Memória constante por série: as últimas `SAMPLE_SIZE` amostras ficam num
+    anel de tuplas (timestamp, valor) para gráficos e as estatísticas da
+    última hora vêm de agregados por minuto. Cada combinação de tags é uma
+    série filha obtida com `labels(...)`.
+    """
+    
+    SAMPLE_SIZE = 120
     
     def __init__(self, name: str, metric_type: MetricType, description: str = "",
                  tags: Optional[Dict[str, str]] = None):
@@ -86,63 +228,128 @@ class Metric:
         self.type = metric_type
         self.description = description
         self.tags = tags or {}
-        self.values: deque = deque(maxlen=1000)  # Manter últimos 1000 valores
-        self._lock = threading.Lock()
+        self.samples: deque = deque(maxlen=self.SAMPLE_SIZE)
+        self.window = _WindowStats()
+        self._last: Optional[Union[int, float]] = None
+        self._children: Dict[frozenset, 'Metric'] = {}
+        self.version = 0
+    
+    def _make_child(self, tags: Dict[str, str]) -> 'Metric':
+        return Metric(self.name, self.type, self.description, tags)
+    
+    def labels(self, **tags: str) -> 'Metric':
+        """Série filha para um conjunto de tags (criada uma única vez)"""
+        if not tags:
+            return self
+        key = frozenset(tags.items())
+        child = self._children.get(key)
+        if child is None:
+            child = self._children.setdefault(key, self._make_child({**self.tags, **tags}))
+        return child
+    
+    def children(self) -> List['Metric']:
+        """Séries filhas por labels"""
+        return list(self._children.values())
+    
+    def remove(self, **tags: str) -> bool:
+        """Remove a série filha de um conjunto de tags (deixa de ser exportada)"""
+        if self._children.pop(frozenset(tags.items()), None) is None:
+            return False
+        self.version += 1
+        return True
+    
+    def fingerprint(self) -> Any:
+        """Valor que muda sempre que a série muda (para caches de exportação)"""
+        return self.version
+    
+    def _record(self, value: Union[int, float]):
+        now = time.time()
+        self._last = value
+        self.version += 1
+        self.samples.append((now, value))
+        self.window.add(value, now)
     
     def add_value(self, value: Union[int, float], tags: Optional[Dict[str, str]] = None):
-        """Adiciona um valor à métrica"""
-        with self._lock:
-            metric_tags = {**self.tags, **(tags or {})}
-            self.values.append(MetricValue(value, datetime.now(), metric_tags))
+        """Adiciona um valor à métrica (ou à série filha das tags)"""
+        (self.labels(**tags) if tags else self)._record(value)
     
     def get_current_value(self) -> Optional[Union[int, float]]:
         """Retorna o valor mais recente"""
-        with self._lock:
-            return self.values[-1].value if self.values else None
+        return self._last
     
     def get_values(self, since: Optional[datetime] = None) -> List[MetricValue]:
-        """Retorna valores desde um timestamp específico"""
-        with self._lock:
-            if since is None:
-                return list(self.values)
-            return [v for v in self.values if v.timestamp >= since]
+        """Retorna as amostras recentes desde um timestamp específico"""
+        cutoff = since.timestamp() if since else None
+        return [MetricValue(value, datetime.fromtimestamp(ts), self.tags)
+                for ts, value in list(self.samples) if cutoff is None or ts >= cutoff]
+    
+    def _summary(self, since: Optional[datetime]) -> Optional[Tuple[int, float, float, float]]:
+        return self.window.summary(since.timestamp() if since else None, time.time())
     
     def get_average(self, since: Optional[datetime] = None) -> Optional[float]:
-        """Calcula a média dos valores"""
-        values = self.get_values(since)
-        if not values:
-            return None
-        return sum(v.value for v in values) / len(values)
+        """Calcula a média dos valores (última hora, no máximo)"""
+        summary = self._summary(since)
+        return summary[1] / summary[0] if summary else None
     
     def get_max(self, since: Optional[datetime] = None) -> Optional[Union[int, float]]:
         """Retorna o valor máximo"""
-        values = self.get_values(since)
-        if not values:
-            return None
-        return max(v.value for v in values)
+        summary = self._summary(since)
+        return summary[3] if summary else None
     
     def get_min(self, since: Optional[datetime] = None) -> Optional[Union[int, float]]:
         """Retorna o valor mínimo"""
-        values = self.get_values(since)
-        if not values:
-            return None
-        return min(v.value for v in values)
+        summary = self._summary(since)
+        return summary[2] if summary else None
+    
+    def snapshot(self):
+        """Grava uma amostra periódica (usado por métricas que não amostram a cada escrita)"""
 
 class Counter(Metric):
-    """Métrica de contador (só aumenta)"""
+    """Métrica de contador (só aumenta).
+    
+    Sem lock: cada thread incrementa a própria célula e a leitura soma as
+    células. Amostras para gráficos são gravadas por `snapshot()` no loop
+    de coleta, não a cada incremento.
+    """
     
     def __init__(self, name: str, description: str = "", tags: Optional[Dict[str, str]] = None):
         super().__init__(name, MetricType.COUNTER, description, tags)
-        self._count = 0
+        self._cells: List[List[Union[int, float]]] = []
+        self._local = threading.local()
+    
+    def _make_child(self, tags: Dict[str, str]) -> 'Counter':
+        return Counter(self.name, self.description, tags)
     
     def increment(self, amount: Union[int, float] = 1, tags: Optional[Dict[str, str]] = None):
         """Incrementa o contador"""
-        self._count += amount
-        self.add_value(self._count, tags)
+        if tags:
+            self.labels(**tags).increment(amount)
+            return
+        
+        cell = getattr(self._local, 'cell', None)
+        if cell is None:
+            cell = self._local.cell = [0]
+            self._cells.append(cell)  # append é atômico sob o GIL
+        cell[0] += amount
+    
+    def add_value(self, value: Union[int, float], tags: Optional[Dict[str, str]] = None):
+        """Compatibilidade: somar ao contador"""
+        self.increment(value, tags)
     
     def get_count(self) -> Union[int, float]:
         """Retorna o valor atual do contador"""
-        return self._count
+        return sum(cell[0] for cell in self._cells)
+    
+    def get_current_value(self) -> Optional[Union[int, float]]:
+        return self.get_count()
+    
+    def fingerprint(self) -> Any:
+        return self.get_count()
+    
+    def snapshot(self):
+        self._record(self.get_count())
+        for child in self._children.values():
+            child.snapshot()
 
 class Gauge(Metric):
     """Métrica de gauge (pode aumentar/diminuir)"""
@@ -150,19 +357,48 @@ class Gauge(Metric):
     def __init__(self, name: str, description: str = "", tags: Optional[Dict[str, str]] = None):
         super().__init__(name, MetricType.GAUGE, description, tags)
     
+    def _make_child(self, tags: Dict[str, str]) -> 'Gauge':
+        return Gauge(self.name, self.description, tags)
+    
     def set(self, value: Union[int, float], tags: Optional[Dict[str, str]] = None):
         """Define o valor do gauge"""
         self.add_value(value, tags)
     
     def increment(self, amount: Union[int, float] = 1, tags: Optional[Dict[str, str]] = None):
         """Incrementa o gauge"""
-        current = self.get_current_value() or 0
-        self.set(current + amount, tags)
+        target = self.labels(**tags) if tags else self
+        target._record((target.get_current_value() or 0) + amount)
     
     def decrement(self, amount: Union[int, float] = 1, tags: Optional[Dict[str, str]] = None):
         """Decrementa o gauge"""
-        current = self.get_current_value() or 0
-        self.set(current - amount, tags)
+        self.increment(-amount, tags)
+
+class Histogram(Metric):
+    """Distribuição de valores com quantis em memória fixa"""
+    
+    def __init__(self, name: str, description: str = "", tags: Optional[Dict[str, str]] = None,
+                 metric_type: MetricType = MetricType.HISTOGRAM):
+        super().__init__(name, metric_type, description, tags)
+        self.histogram = StreamingHistogram()
+    
+    def _make_child(self, tags: Dict[str, str]) -> 'Histogram':
+        return Histogram(self.name, self.description, tags, self.type)
+    
+    def _record(self, value: Union[int, float]):
+        super()._record(value)
+        self.histogram.observe(value)
+    
+    def observe(self, value: Union[int, float], tags: Optional[Dict[str, str]] = None):
+        """Registra uma observação"""
+        self.add_value(value, tags)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Quantil `q` (0-1) desde a criação da série"""
+        return self.histogram.quantile(q)
+    
+    def quantiles(self) -> Dict[str, Optional[float]]:
+        """p50/p95/p99 em O(1) amortizado"""
+        return self.histogram.quantiles()
 
 class Timer:
     """Context manager para medir tempo de execução"""
@@ -173,26 +409,92 @@ class Timer:
         self.start_time = None
     
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.start_time is not None:
-            duration = time.time() - self.start_time
+            duration = time.perf_counter() - self.start_time
             self.metric.add_value(duration, self.tags)
 
-class MetricsCollector:
-    """Coletor principal de métricas"""
+class GCPauseTracker:
+    """Mede pausas do coletor de lixo via `gc.callbacks`.
+    
+    O callback roda na thread que disparou a coleta; os acumuladores são
+    lidos e zerados pelo coletor de métricas a cada janela.
+    """
     
     def __init__(self):
+        self._started: Optional[float] = None
+        self.collections = [0, 0, 0]
+        self.total_pause = 0.0
+        self.window_max_pause = 0.0
+        self.window_pause = 0.0
+        self.installed = False
+    
+    def _callback(self, phase: str, info: Dict[str, Any]):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif phase == 'stop' and self._started is not None:
+            pause = time.perf_counter() - self._started
+            self._started = None
+            generation = info.get('generation', 0)
+            if 0 <= generation < len(self.collections):
+                self.collections[generation] += 1
+            self.total_pause += pause
+            self.window_pause += pause
+            if pause > self.window_max_pause:
+                self.window_max_pause = pause
+    
+    def install(self):
+        if not self.installed:
+            gc.callbacks.append(self._callback)
+            self.installed = True
+    
+    def uninstall(self):
+        if self.installed:
+            try:
+                gc.callbacks.remove(self._callback)
+            except ValueError:
+                pass
+            self.installed = False
+    
+    def take_window(self) -> Dict[str, float]:
+        """Retorna e zera as pausas acumuladas desde a última leitura"""
+        window = {'pause': self.window_pause, 'max_pause': self.window_max_pause}
+        self.window_pause = 0.0
+        self.window_max_pause = 0.0
+        return window
+
+class MetricsCollector:
+    """Coletor principal de métricas.
+    
+    Nada aqui bloqueia o event loop: CPU é medida por delta desde a última
+    amostra (`cpu_percent(interval=None)`) e as chamadas ao psutil rodam no
+    executor padrão. Além do sistema, mede atraso do event loop, pausas do
+    GC e quantidade de tasks asyncio.
+    """
+    
+    def __init__(self, collection_interval: float = 10.0, lag_interval: float = 0.5,
+                 top_task_names: int = 10):
         self.metrics: Dict[str, Metric] = {}
         self.alerts: List[Alert] = []
         self.alert_rules: Dict[str, Dict[str, Any]] = {}
         self.collectors: List[Callable] = []
         self._running = False
         self._collection_task: Optional[asyncio.Task] = None
+        self._lag_task: Optional[asyncio.Task] = None
         self._lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
+        
+        self.collection_interval = collection_interval
+        self.lag_interval = lag_interval
+        self.top_task_names = top_task_names
+        self.gc_tracker = GCPauseTracker()
+        self._process = psutil.Process()
+        self._last_network_sample: Optional[tuple] = None
+        self._lag_window_max = 0.0
+        self._last_lag = 0.0
     
     def register_metric(self, metric: Metric) -> Metric:
         """Registra uma nova métrica"""
@@ -217,11 +519,44 @@ class MetricsCollector:
         return self.register_metric(gauge)
     
     def create_timer(self, name: str, description: str = "",
-                    tags: Optional[Dict[str, str]] = None) -> Metric:
-        """Cria uma métrica de timer"""
-        timer_metric = Metric(name, MetricType.TIMER, description, tags)
+                    tags: Optional[Dict[str, str]] = None) -> Histogram:
+        """Cria uma métrica de timer (histograma de durações em segundos)"""
+        timer_metric = Histogram(name, description, tags, MetricType.TIMER)
         return self.register_metric(timer_metric)
     
+    def create_histogram(self, name: str, description: str = "",
+                         tags: Optional[Dict[str, str]] = None) -> Histogram:
+        """Cria e registra um histograma"""
+        return self.register_metric(Histogram(name, description, tags))
+    
+    def _get_or_create(self, name: str, factory: Callable[[str], Metric]) -> Metric:
+        metric = self.metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self.metrics.get(name)
+                if metric is None:
+                    metric = self.metrics[name] = factory(name)
+        return metric
+    
+    def increment_counter(self, name: str, amount: Union[int, float] = 1,
+                          labels: Optional[Dict[str, str]] = None):
+        """Incrementa um contador, criando-o se necessário"""
+        self._get_or_create(name, Counter).increment(amount, labels)
+    
+    def record_gauge(self, name: str, value: Union[int, float],
+                     labels: Optional[Dict[str, str]] = None):
+        """Define um gauge, criando-o se necessário"""
+        self._get_or_create(name, Gauge).set(value, labels)
+    
+    def observe_histogram(self, name: str, value: Union[int, float],
+                          labels: Optional[Dict[str, str]] = None):
+        """Registra um valor num histograma, criando-o se necessário"""
+        self._get_or_create(name, Histogram).observe(value, labels)
+    
+    def record_timer(self, name: str, labels: Optional[Dict[str, str]] = None) -> Timer:
+        """Context manager que mede a duração do bloco num timer"""
+        return Timer(self._get_or_create(name, lambda n: Histogram(n, metric_type=MetricType.TIMER)), labels)
+    
     def time_function(self, metric_name: str, tags: Optional[Dict[str, str]] = None):
         """Decorador para medir tempo de execução de funções"""
         def decorator(func):
@@ -287,57 +622,116 @@ class MetricsCollector:
         """Adiciona uma função coletora personalizada"""
         self.collectors.append(collector_func)
     
+    def _set_gauge(self, name: str, value: Union[int, float], description: str = ""):
+        """Define um gauge, criando-o na primeira vez"""
+        self._get_or_create(name, lambda n: Gauge(n, description)).set(value)
+    
+    def snapshot_metrics(self):
+        """Grava amostras periódicas das métricas que não amostram a cada escrita"""
+        for metric in list(self.metrics.values()):
+            metric.snapshot()
+    
+    def _sample_system(self) -> Dict[str, Any]:
+        """Amostra o sistema com psutil (executado fora do event loop)"""
+        return {
+            # interval=None: percentual desde a chamada anterior, sem dormir
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'process_cpu_percent': self._process.cpu_percent(interval=None),
+            'process_rss': self._process.memory_info().rss,
+            'memory_percent': psutil.virtual_memory().percent,
+            'disk': psutil.disk_usage('/'),
+            'network': psutil.net_io_counters(),
+            'sampled_at': time.monotonic()
+        }
+    
     async def collect_system_metrics(self):
-        """Coleta métricas do sistema"""
+        """Coleta métricas do sistema sem bloquear o event loop"""
         try:
-            # CPU
-            cpu_percent = psutil.cpu_percent(interval=1)
-            cpu_metric = self.get_metric("system.cpu.percent")
-            if cpu_metric is None:
-                cpu_metric = self.create_gauge("system.cpu.percent", "CPU usage percentage")
-            cpu_metric.set(cpu_percent)
+            loop = asyncio.get_running_loop()
+            sample = await loop.run_in_executor(None, self._sample_system)
             
-            # Memória
-            memory = psutil.virtual_memory()
-            memory_metric = self.get_metric("system.memory.percent")
-            if memory_metric is None:
-                memory_metric = self.create_gauge("system.memory.percent", "Memory usage percentage")
-            memory_metric.set(memory.percent)
+            self._set_gauge("system.cpu.percent", sample['cpu_percent'], "CPU usage percentage")
+            self._set_gauge("process.cpu.percent", sample['process_cpu_percent'], "Bot process CPU percentage")
+            self._set_gauge("process.memory.rss_bytes", sample['process_rss'], "Bot process resident memory")
+            self._set_gauge("system.memory.percent", sample['memory_percent'], "Memory usage percentage")
             
-            # Disco
-            disk = psutil.disk_usage('/')
-            disk_metric = self.get_metric("system.disk.percent")
-            if disk_metric is None:
-                disk_metric = self.create_gauge("system.disk.percent", "Disk usage percentage")
-            disk_metric.set((disk.used / disk.total) * 100)
+            disk = sample['disk']
+            self._set_gauge("system.disk.percent", (disk.used / disk.total) * 100, "Disk usage percentage")
             
-            # Rede
-            network = psutil.net_io_counters()
-            if hasattr(self, '_last_network_stats'):
-                bytes_sent_rate = network.bytes_sent - self._last_network_stats.bytes_sent
-                bytes_recv_rate = network.bytes_recv - self._last_network_stats.bytes_recv
-                
-                sent_metric = self.get_metric("system.network.bytes_sent_rate")
-                if sent_metric is None:
-                    sent_metric = self.create_gauge("system.network.bytes_sent_rate", "Network bytes sent per second")
-                sent_metric.set(bytes_sent_rate)
-                
-                recv_metric = self.get_metric("system.network.bytes_recv_rate")
-                if recv_metric is None:
-                    recv_metric = self.create_gauge("system.network.bytes_recv_rate", "Network bytes received per second")
-                recv_metric.set(bytes_recv_rate)
-            
-            self._last_network_stats = network
+            # Rede: taxa real pelo tempo decorrido entre amostras
+            network, sampled_at = sample['network'], sample['sampled_at']
+            if self._last_network_sample is not None:
+                last_network, last_at = self._last_network_sample
+                elapsed = max(sampled_at - last_at, 1e-6)
+                self._set_gauge("system.network.bytes_sent_rate",
+                                (network.bytes_sent - last_network.bytes_sent) / elapsed,
+                                "Network bytes sent per second")
+                self._set_gauge("system.network.bytes_recv_rate",
+                                (network.bytes_recv - last_network.bytes_recv) / elapsed,
+                                "Network bytes received per second")
+            self._last_network_sample = (network, sampled_at)
             
         except Exception as e:
             self.logger.error(f"Erro ao coletar métricas do sistema: {e}")
     
+    def collect_runtime_metrics(self):
+        """Coleta atraso do event loop, pausas do GC e tasks asyncio"""
+        # Atraso do event loop (último e máximo da janela)
+        self._set_gauge("event_loop.lag_ms", self._last_lag * 1000, "Event loop lag (last sample)")
+        self._set_gauge("event_loop.lag_max_ms", self._lag_window_max * 1000, "Event loop lag (window max)")
+        self._lag_window_max = 0.0
+        
+        # Pausas do GC
+        window = self.gc_tracker.take_window()
+        self._set_gauge("gc.pause_ms", window['pause'] * 1000, "GC pause time in the window")
+        self._set_gauge("gc.pause_max_ms", window['max_pause'] * 1000, "Longest GC pause in the window")
+        self._set_gauge("gc.pause_total_ms", self.gc_tracker.total_pause * 1000, "GC pause time since start")
+        for generation, count in enumerate(self.gc_tracker.collections):
+            self._set_gauge(f"gc.collections.gen{generation}", count, f"GC generation {generation} collections")
+        
+        # Tasks asyncio (total e por coroutine)
+        try:
+            tasks = asyncio.all_tasks()
+        except RuntimeError:
+            return
+        
+        by_name: Dict[str, int] = defaultdict(int)
+        for task in tasks:
+            coro = task.get_coro()
+            name = getattr(coro, '__qualname__', None) or task.get_name()
+            by_name[name.replace('<locals>.', '')] += 1
+        
+        # Um único gauge: o total e uma série por coroutine (label) no top N;
+        # as que saem do top N são removidas em vez de manter o último valor
+        self._set_gauge("event_loop.tasks", len(tasks), "Pending asyncio tasks (total and by coroutine)")
+        gauge = self.metrics["event_loop.tasks"]
+        top = dict(sorted(by_name.items(), key=lambda item: item[1], reverse=True)[:self.top_task_names])
+        for child in gauge.children():
+            name = child.tags.get('coroutine')
+            if name not in top:
+                gauge.remove(coroutine=name)
+        for name, count in top.items():
+            gauge.labels(coroutine=name).set(count)
+    
+    async def _lag_monitor(self):
+        """Mede o atraso do event loop: quanto um sleep curto acorda atrasado"""
+        loop = asyncio.get_running_loop()
+        while self._running:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            lag = max(0.0, loop.time() - expected)
+            self._last_lag = lag
+            if lag > self._lag_window_max:
+                self._lag_window_max = lag
+    
     async def _collection_loop(self):
         """Loop principal de coleta de métricas"""
         while self._running:
             try:
-                # Coletar métricas do sistema
+                # Coletar métricas do sistema e do runtime
                 await self.collect_system_metrics()
+                self.collect_runtime_metrics()
+                self.snapshot_metrics()
                 
                 # Executar coletores personalizados
                 for collector in self.collectors:
@@ -353,7 +747,7 @@ class MetricsCollector:
                 self.check_alerts()
                 
                 # Aguardar próxima coleta
-                await asyncio.sleep(10)  # Coletar a cada 10 segundos
+                await asyncio.sleep(self.collection_interval)
                 
             except Exception as e:
                 self.logger.error(f"Erro no loop de coleta: {e}")
@@ -365,34 +759,52 @@ class MetricsCollector:
             return
         
         self._running = True
+        
+        # Primeira leitura de CPU só estabelece a base do delta
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+        self.gc_tracker.install()
+        
+        self._lag_task = asyncio.create_task(self._lag_monitor())
         self._collection_task = asyncio.create_task(self._collection_loop())
         self.logger.info("Sistema de métricas iniciado")
     
     async def stop(self):
         """Para a coleta de métricas"""
         self._running = False
-        if self._collection_task:
-            self._collection_task.cancel()
-            try:
-                await self._collection_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._collection_task, self._lag_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self.gc_tracker.uninstall()
         self.logger.info("Sistema de métricas parado")
     
     def get_all_metrics(self) -> Dict[str, Dict[str, Any]]:
         """Retorna todas as métricas em formato de dicionário"""
         result = {}
-        for name, metric in self.metrics.items():
-            current_value = metric.get_current_value()
-            result[name] = {
-                'type': metric.type.value,
-                'description': metric.description,
-                'current_value': current_value,
-                'tags': metric.tags,
-                'average_1h': metric.get_average(datetime.now() - timedelta(hours=1)),
-                'max_1h': metric.get_max(datetime.now() - timedelta(hours=1)),
-                'min_1h': metric.get_min(datetime.now() - timedelta(hours=1))
-            }
+        since = datetime.now() - timedelta(hours=1)
+        for name, metric in list(self.metrics.items()):
+            series = [(name, metric)] + [
+                (name + _label_key(child.tags), child) for child in metric.children()
+            ]
+            for key, item in series:
+                summary = item._summary(since)
+                entry = {
+                    'type': item.type.value,
+                    'description': item.description,
+                    'current_value': item.get_current_value(),
+                    'tags': item.tags,
+                    'average_1h': summary[1] / summary[0] if summary else None,
+                    'max_1h': summary[3] if summary else None,
+                    'min_1h': summary[2] if summary else None
+                }
+                if isinstance(item, Histogram):
+                    entry['count'] = item.histogram.count
+                    entry['quantiles'] = item.quantiles()
+                result[key] = entry
         return result
     
     def get_alerts(self, resolved: Optional[bool] = None) -> List[Alert]:
@@ -439,10 +851,30 @@ def create_timer(name: str, description: str = "", tags: Optional[Dict[str, str]
     """Cria um timer"""
     return get_metrics_collector().create_timer(name, description, tags)
 
+def create_histogram(name: str, description: str = "", tags: Optional[Dict[str, str]] = None) -> Histogram:
+    """Cria um histograma"""
+    return get_metrics_collector().create_histogram(name, description, tags)
+
 def time_function(metric_name: str, tags: Optional[Dict[str, str]] = None):
     """Decorador para medir tempo de execução"""
     return get_metrics_collector().time_function(metric_name, tags)
 
+def increment_counter(name: str, amount: Union[int, float] = 1, labels: Optional[Dict[str, str]] = None):
+    """Incrementa um contador"""
+    get_metrics_collector().increment_counter(name, amount, labels)
+
+def record_gauge(name: str, value: Union[int, float], labels: Optional[Dict[str, str]] = None):
+    """Define um gauge"""
+    get_metrics_collector().record_gauge(name, value, labels)
+
+def observe_histogram(name: str, value: Union[int, float], labels: Optional[Dict[str, str]] = None):
+    """Registra um valor num histograma"""
+    get_metrics_collector().observe_histogram(name, value, labels)
+
+def record_timer(name: str, labels: Optional[Dict[str, str]] = None) -> Timer:
+    """Mede a duração de um bloco `with`"""
+    return get_metrics_collector().record_timer(name, labels)
+
 def add_alert_rule(metric_name: str, threshold: Union[int, float], 
                   condition: str = ">", level: AlertLevel = AlertLevel.WARNING,
                   message: Optional[str] = None):
@@ -465,4 +897,5 @@ def setup_default_alerts():
     add_alert_rule("system.memory.percent", 85, ">", AlertLevel.WARNING, "Memory usage above 85%")
     add_alert_rule("system.memory.percent", 95, ">", AlertLevel.CRITICAL, "Memory usage above 95%")
     add_alert_rule("system.disk.percent", 90, ">", AlertLevel.WARNING, "Disk usage above 90%")
-    add_alert_rule("system.disk.percent", 98, ">", AlertLevel.CRITICAL, "Disk usage above 98%")
\ No newline at end of file
+    add_alert_rule("system.disk.percent", 98, ">", AlertLevel.CRITICAL, "Disk usage above 98%")
+    add_alert_rule("event_loop.lag_max_ms", 250, ">", AlertLevel.WARNING, "Event loop lag above 250ms")
\ No newline at end of file
@@ -26,7 +26,8 @@ except ImportError:
     Response = None
     WebSocketResponse = None
 
-from .metrics import get_metrics_collector, MetricsCollector, AlertLevel
+from .metrics import get_metrics_collector, MetricsCollector, AlertLevel, Histogram
+from .metrics_exposition import PrometheusExporter
 
 class MetricsDashboard:
     """Dashboard web para métricas"""
@@ -39,7 +40,13 @@ class MetricsDashboard:
         self.port = port
         self.app: Optional[Application] = None
         self.metrics_collector = get_metrics_collector()
+        self.exporter = PrometheusExporter(self.metrics_collector)
         self.websockets: List[WebSocketResponse] = []
+        # Quadro atual e anterior do broadcast; cada cliente guarda o id do último recebido
+        self._frame_id = 0
+        self._frame: Optional[Dict[str, Any]] = None
+        self._previous_frame: Optional[Dict[str, Any]] = None
+        self._client_frames: Dict[WebSocketResponse, int] = {}
         self._running = False
         self._update_task: Optional[asyncio.Task] = None
     
@@ -54,6 +61,9 @@ class MetricsDashboard:
         app.router.add_post('/api/alerts/{alert_id}/resolve', self.resolve_alert_api)
         app.router.add_get('/api/health', self.health_check_api)
         
+        # Exposição para scrapers Prometheus/OpenMetrics
+        app.router.add_get('/metrics', self.prometheus_metrics)
+        
         # WebSocket para atualizações em tempo real
         app.router.add_get('/ws', self.websocket_handler)
         
@@ -83,6 +93,22 @@ class MetricsDashboard:
                 'message': str(e)
             }, status=500)
     
+    async def prometheus_metrics(self, request: Request) -> Response:
+        """Texto de exposição Prometheus/OpenMetrics (gzip quando aceito)"""
+        try:
+            openmetrics = self.exporter.wants_openmetrics(request.headers.get('Accept'))
+            headers = {'Content-Type': self.exporter.content_type(openmetrics)}
+            
+            if 'gzip' in request.headers.get('Accept-Encoding', ''):
+                body = self.exporter.render_gzip(openmetrics)
+                headers['Content-Encoding'] = 'gzip'
+            else:
+                body = self.exporter.render(openmetrics)
+            
+            return web.Response(body=body, headers=headers)
+        except Exception as e:
+            return web.Response(text=f'# erro: {e}\n', status=500)
+    
     async def get_metric_api(self, request: Request) -> Response:
         """API endpoint para obter uma métrica específica"""
         try:
@@ -106,6 +132,13 @@ class MetricsDashboard:
                     pass
             
             values = metric.get_values(since)
+            stats = {
+                'average': metric.get_average(since),
+                'max': metric.get_max(since),
+                'min': metric.get_min(since)
+            }
+            if isinstance(metric, Histogram):
+                stats.update(metric.quantiles())
             
             return web.json_response({
                 'status': 'success',
@@ -115,11 +148,8 @@ class MetricsDashboard:
                     'description': metric.description,
                     'current_value': metric.get_current_value(),
                     'values': [v.to_dict() for v in values[-100:]],  # Últimos 100 valores
-                    'stats': {
-                        'average': metric.get_average(since),
-                        'max': metric.get_max(since),
-                        'min': metric.get_min(since)
-                    }
+                    'stats': stats,
+                    'labels': [child.tags for child in metric.children()]
                 }
             })
         except Exception as e:
@@ -205,37 +235,76 @@ class MetricsDashboard:
         finally:
             if ws in self.websockets:
                 self.websockets.remove(ws)
+            self._client_frames.pop(ws, None)
         
         return ws
     
+    def _next_frame(self) -> Dict[str, Any]:
+        """Gera o próximo quadro de broadcast (métricas e alertas ativos)"""
+        self._previous_frame = self._frame
+        self._frame_id += 1
+        self._frame = {
+            'id': self._frame_id,
+            'metrics': self.metrics_collector.get_all_metrics(),
+            'alerts': [alert.to_dict() for alert in self.metrics_collector.get_alerts(False)],
+            'timestamp': datetime.now().isoformat()
+        }
+        return self._frame
+    
+    def _full_message(self, frame: Dict[str, Any]) -> str:
+        return json.dumps({
+            'type': 'metrics_update',
+            'data': {
+                'metrics': frame['metrics'],
+                'alerts': frame['alerts'],
+                'timestamp': frame['timestamp']
+            }
+        })
+    
+    def _delta_message(self, previous: Dict[str, Any], frame: Dict[str, Any]) -> str:
+        """Apenas as séries que mudaram (ou sumiram) desde o quadro anterior"""
+        old, new = previous['metrics'], frame['metrics']
+        data = {
+            'changed': {name: entry for name, entry in new.items() if old.get(name) != entry},
+            'removed': [name for name in old if name not in new],
+            'timestamp': frame['timestamp']
+        }
+        if frame['alerts'] != previous['alerts']:
+            data['alerts'] = frame['alerts']
+        return json.dumps({'type': 'metrics_delta', 'data': data})
+    
     async def broadcast_metrics(self):
-        """Envia métricas para todos os clientes WebSocket conectados"""
+        """Envia a cada cliente WebSocket só o que mudou desde o último quadro dele.
+        
+        Clientes que receberam o quadro anterior compartilham a mesma mensagem
+        delta (serializada uma vez); clientes novos recebem o quadro completo.
+        """
         if not self.websockets:
             return
         
         try:
-            metrics = self.metrics_collector.get_all_metrics()
-            alerts = [alert.to_dict() for alert in self.metrics_collector.get_alerts(False)]
-            
-            message = json.dumps({
-                'type': 'metrics_update',
-                'data': {
-                    'metrics': metrics,
-                    'alerts': alerts,
-                    'timestamp': datetime.now().isoformat()
-                }
-            })
+            frame = self._next_frame()
+            previous = self._previous_frame
+            messages: Dict[bool, str] = {}
             
             # Remover conexões fechadas
             active_websockets = []
             for ws in self.websockets:
                 if ws.closed:
+                    self._client_frames.pop(ws, None)
                     continue
+                
+                delta = previous is not None and self._client_frames.get(ws) == previous['id']
+                message = messages.get(delta)
+                if message is None:
+                    message = messages[delta] = (self._delta_message(previous, frame) if delta
+                                                 else self._full_message(frame))
                 try:
                     await ws.send_str(message)
+                    self._client_frames[ws] = frame['id']
                     active_websockets.append(ws)
                 except Exception:
-                    pass
+                    self._client_frames.pop(ws, None)
             
             self.websockets = active_websockets
             
@@ -458,6 +527,8 @@ class MetricsDashboard:
                 this.reconnectAttempts = 0;
                 this.maxReconnectAttempts = 5;
                 this.reconnectDelay = 1000;
+                this.metrics = {};
+                this.alerts = [];
                 
                 this.init();
             }
@@ -484,6 +555,8 @@ class MetricsDashboard:
                         const data = JSON.parse(event.data);
                         if (data.type === 'metrics_update') {
                             this.updateMetrics(data.data);
+                        } else if (data.type === 'metrics_delta') {
+                            this.applyDelta(data.data);
                         }
                     } catch (e) {
                         console.error('Erro ao processar mensagem WebSocket:', e);
@@ -548,8 +621,20 @@ class MetricsDashboard:
                 }
             }
             
+            applyDelta(delta) {
+                const metrics = Object.assign({}, this.metrics, delta.changed);
+                (delta.removed || []).forEach(name => delete metrics[name]);
+                this.updateMetrics({
+                    metrics,
+                    alerts: delta.alerts || this.alerts,
+                    timestamp: delta.timestamp
+                });
+            }
+            
             updateMetrics(data) {
                 const { metrics, alerts, timestamp } = data;
+                this.metrics = metrics;
+                this.alerts = alerts;
                 
                 // Atualizar contadores
                 document.getElementById('metricsCount').textContent = Object.keys(metrics).length;
@@ -669,6 +754,7 @@ class MetricsDashboard:
                 await ws.close()
         
         self.websockets.clear()
+        self._client_frames.clear()
         print("Dashboard de métricas parado")
 
 # Instância global do dashboard
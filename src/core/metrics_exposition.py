@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exposição de Métricas no Formato Prometheus/OpenMetrics - Hawk Bot
+Gera o texto de exposição a partir do MetricsCollector para que scrapers
+padrão consultem o bot. Cada família de métricas é renderizada uma vez e
+reaproveitada enquanto suas séries não mudam; o corpo completo (e sua
+versão gzip) fica em cache até alguma família mudar.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import gzip
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .metrics import Counter, Histogram, Metric, MetricsCollector, MetricType
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+_INVALID_NAME_CHARS = re.compile(r'[^a-zA-Z0-9_:]')
+_INVALID_LABEL_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+_QUANTILES = (('0.5', 'p50'), ('0.95', 'p95'), ('0.99', 'p99'))
+
+
+def sanitize_metric_name(name: str, prefix: str = '') -> str:
+    """Converte um nome interno (ex.: "system.cpu.percent") num nome Prometheus válido"""
+    sanitized = _INVALID_NAME_CHARS.sub('_', f'{prefix}{name}')
+    if sanitized[:1].isdigit():
+        sanitized = '_' + sanitized
+    return sanitized
+
+
+def _escape_label_value(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _format_labels(tags: Dict[str, Any], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [(_INVALID_LABEL_CHARS.sub('_', str(k)), v) for k, v in sorted(tags.items())]
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs) + '}'
+
+
+def _format_value(value: Union[int, float]) -> str:
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class PrometheusExporter:
+    """Renderizador incremental do texto de exposição de um MetricsCollector.
+
+    Counters viram `counter` (sufixo `_total`), gauges viram `gauge` e
+    histogramas/timers viram `summary` com os quantis p50/p95/p99 do
+    histograma em streaming, além de `_sum` e `_count`.
+    """
+
+    def __init__(self, collector: MetricsCollector, prefix: str = 'hawkbot_'):
+        self.collector = collector
+        self.prefix = prefix
+        self._families: Dict[Tuple[str, bool], Tuple[Any, str]] = {}
+        self._bodies: Dict[bool, Tuple[Tuple, bytes, Optional[bytes]]] = {}
+        self._lock = threading.Lock()
+        self.family_renders = 0
+
+    @staticmethod
+    def _series(metric: Metric) -> List[Metric]:
+        return [metric] + metric.children()
+
+    def _family_fingerprint(self, metric: Metric) -> Tuple:
+        return (metric.type, metric.description,
+                tuple(series.fingerprint() for series in self._series(metric)))
+
+    def _render_family(self, metric: Metric, openmetrics: bool) -> str:
+        self.family_renders += 1
+        name = sanitize_metric_name(metric.name, self.prefix)
+        lines: List[str] = []
+
+        if isinstance(metric, Counter):
+            family = name[:-len('_total')] if name.endswith('_total') else name
+            kind = 'counter'
+        elif isinstance(metric, Histogram):
+            family = name
+            kind = 'summary'
+        else:
+            family = name
+            kind = 'gauge' if metric.type != MetricType.COUNTER else 'counter'
+
+        header = family if openmetrics else (family + '_total' if kind == 'counter' else family)
+        if metric.description:
+            lines.append(f'# HELP {header} {_escape_help(metric.description)}')
+        lines.append(f'# TYPE {header} {kind}')
+
+        for series in self._series(metric):
+            if kind == 'summary':
+                stats = series.histogram
+                if not stats.count:
+                    continue
+                quantiles = series.quantiles()
+                for label, key in _QUANTILES:
+                    value = quantiles.get(key)
+                    if value is not None:
+                        lines.append(f'{family}{_format_labels(series.tags, ("quantile", label))} {_format_value(value)}')
+                labels = _format_labels(series.tags)
+                lines.append(f'{family}_sum{labels} {_format_value(stats.sum)}')
+                lines.append(f'{family}_count{labels} {stats.count}')
+                continue
+
+            value = series.get_current_value()
+            if value is None:
+                continue
+            sample = family + '_total' if kind == 'counter' else family
+            lines.append(f'{sample}{_format_labels(series.tags)} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+    def _render(self, openmetrics: bool) -> Tuple[Tuple, bytes, Optional[bytes]]:
+        fingerprints = []
+        chunks = []
+        live = set()
+        for name, metric in sorted(self.collector.metrics.items()):
+            key = (name, openmetrics)
+            live.add(key)
+            fingerprint = self._family_fingerprint(metric)
+            cached = self._families.get(key)
+            if cached is None or cached[0] != fingerprint:
+                cached = self._families[key] = (fingerprint, self._render_family(metric, openmetrics))
+            fingerprints.append((name, fingerprint))
+            chunks.append(cached[1])
+
+        for key in [key for key in self._families if key[1] == openmetrics and key not in live]:
+            del self._families[key]
+
+        state = tuple(fingerprints)
+        body = self._bodies.get(openmetrics)
+        if body is None or body[0] != state:
+            if openmetrics:
+                chunks.append('# EOF\n')
+            body = self._bodies[openmetrics] = (state, ''.join(chunks).encode('utf-8'), None)
+        return body
+
+    def render(self, openmetrics: bool = False) -> bytes:
+        """Corpo da exposição (UTF-8), reaproveitando famílias inalteradas"""
+        with self._lock:
+            return self._render(openmetrics)[1]
+
+    def render_gzip(self, openmetrics: bool = False) -> bytes:
+        """Corpo comprimido com gzip (em cache enquanto nada mudar)"""
+        with self._lock:
+            state, body, compressed = self._render(openmetrics)
+            if compressed is None:
+                compressed = gzip.compress(body, compresslevel=6)
+                self._bodies[openmetrics] = (state, body, compressed)
+            return compressed
+
+    @staticmethod
+    def content_type(openmetrics: bool = False) -> str:
+        return OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+
+    @staticmethod
+    def wants_openmetrics(accept: Optional[str]) -> bool:
+        """Negociação pelo cabeçalho Accept enviado pelo scraper"""
+        return bool(accept) and 'application/openmetrics-text' in accept
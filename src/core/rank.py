@@ -15,6 +15,12 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 import os
 
+try:
+    from .event_system import emit as emit_event, get_event_system
+except ImportError:
+    emit_event = None
+    get_event_system = None
+
 logger = logging.getLogger('HawkBot.RankSystem')
 
 class RankSystem:
@@ -117,21 +123,39 @@ class RankSystem:
             # Salvar no storage
             self.storage.update_player(player_id, updated_data)
             
-            # Verificar conquistas baseadas em estatísticas
-            if hasattr(self.bot, 'achievement_system'):
+            # Notificar ouvintes (ex.: stream em tempo real do dashboard)
+            if emit_event:
+                await emit_event('ranking_updated', {
+                    'player_id': player_id,
+                    'guild_id': guild_id,
+                    'ranked_rank': new_ranked_rank,
+                    'mm_rank': new_mm_rank
+                }, 'rank_system')
+            
+            # Preparar estatísticas para verificação de conquistas
+            ranked_stats = stats['season_stats'].get('ranked', {})
+            mm_stats = stats['season_stats'].get('mm', {})
+            
+            combat_stats = {
+                'kd_ratio': max(ranked_stats.get('squad', {}).get('kd', 0), mm_stats.get('squad', {}).get('kd', 0)),
+                'kills': ranked_stats.get('squad', {}).get('kills', 0) + mm_stats.get('squad', {}).get('kills', 0),
+                'wins': ranked_stats.get('squad', {}).get('wins', 0) + mm_stats.get('squad', {}).get('wins', 0),
+                'matches': ranked_stats.get('squad', {}).get('matches', 0) + mm_stats.get('squad', {}).get('matches', 0),
+                'registration_date': player_data.get('registered_at')
+            }
+            
+            # Conquistas orientadas a eventos reavaliam só as regras afetadas
+            event_driven = bool(emit_event and get_event_system().get_listeners('player_stats_updated'))
+            if event_driven:
+                await emit_event('player_stats_updated', {
+                    'user_id': player_id,
+                    'guild_id': guild_id,
+                    'stats': combat_stats
+                }, 'rank_system')
+            
+            # Verificação completa legada só quando ninguém consome o evento
+            if not event_driven and hasattr(self.bot, 'achievement_system'):
                 try:
-                    # Preparar estatísticas para verificação de conquistas
-                    ranked_stats = stats['season_stats'].get('ranked', {})
-                    mm_stats = stats['season_stats'].get('mm', {})
-                    
-                    combat_stats = {
-                        'kd_ratio': max(ranked_stats.get('squad', {}).get('kd', 0), mm_stats.get('squad', {}).get('kd', 0)),
-                        'kills': ranked_stats.get('squad', {}).get('kills', 0) + mm_stats.get('squad', {}).get('kills', 0),
-                        'wins': ranked_stats.get('squad', {}).get('wins', 0) + mm_stats.get('squad', {}).get('wins', 0),
-                        'matches': ranked_stats.get('squad', {}).get('matches', 0) + mm_stats.get('squad', {}).get('matches', 0),
-                        'registration_date': player_data.get('registered_at')
-                    }
-                    
                     unlocked = self.bot.achievement_system.check_achievements(player_id, combat_stats)
                     
                     # Enviar notificações de conquistas
@@ -21,8 +21,11 @@ import sys
 import os
 from contextlib import contextmanager
 from collections import deque, defaultdict
+from functools import lru_cache
 import time
 
+from .log_pipeline import LogOverflowPolicy, LogPipeline, attach_pipeline, emit_batch, release_pipeline
+
 class LogLevel(Enum):
     """Níveis de log personalizados"""
     TRACE = 5
@@ -62,8 +65,8 @@ class SanitizationRule:
         if not self.enabled:
             return text
         
-        flags = 0 if self.case_sensitive else re.IGNORECASE
-        return re.sub(self.pattern, self.replacement, text, flags=flags)
+        # O padrão já vem compilado com as flags da regra
+        return self.pattern.sub(self.replacement, text)
 
 @dataclass
 class LogContext:
@@ -169,13 +172,29 @@ class LogFormatter(logging.Formatter):
         
         return formatted
 
+_GLOBAL_FLAGS = re.compile(r'^\(\?[aiLmsux]+\)')
+_SCOPED_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+
 class DataSanitizer:
-    """Sanitizador de dados sensíveis"""
+    """Sanitizador de dados sensíveis.
+    
+    As regras ativas são combinadas numa única expressão com um grupo
+    nomeado por regra; cada texto é percorrido uma só vez e o callback
+    aplica a substituição da regra que casou (na ordem das regras, em caso
+    de empate na mesma posição). Textos curtos e repetidos (mensagens sem
+    argumentos, valores de contexto) passam por um cache LRU.
+    """
     
-    def __init__(self):
+    CACHEABLE_LENGTH = 512
+    
+    def __init__(self, cache_size: int = 1024):
         self.rules: List[SanitizationRule] = []
+        self.cache_size = cache_size
+        self._combined: Optional[Pattern] = None
+        self._combined_rules: Dict[str, SanitizationRule] = {}
+        self._signature: tuple = ()
+        self._cached_sanitize = lru_cache(maxsize=cache_size)(self._sanitize_uncached)
         self._setup_default_rules()
-        self._compiled_patterns: Dict[str, Pattern] = {}
     
     def _setup_default_rules(self):
         """Configura regras padrão de sanitização"""
@@ -285,10 +304,12 @@ class DataSanitizer:
         # Remover regra existente com o mesmo nome
         self.rules = [r for r in self.rules if r.name != name]
         self.rules.append(rule)
+        self._signature = ()
     
     def remove_rule(self, name: str):
         """Remove uma regra de sanitização"""
         self.rules = [r for r in self.rules if r.name != name]
+        self._signature = ()
     
     def enable_rule(self, name: str, enabled: bool = True):
         """Habilita/desabilita uma regra"""
@@ -297,18 +318,84 @@ class DataSanitizer:
                 rule.enabled = enabled
                 break
     
-    def sanitize(self, text: str) -> str:
-        """Sanitiza um texto aplicando todas as regras ativas"""
-        if not isinstance(text, str):
-            text = str(text)
+    def _compile(self):
+        """Recompila a expressão combinada se as regras ativas mudaram"""
+        signature = tuple((id(rule), rule.pattern, rule.replacement)
+                          for rule in self.rules if rule.enabled)
+        if signature == self._signature:
+            return
+        
+        alternatives = []
+        combined_rules = {}
+        for index, rule in enumerate(r for r in self.rules if r.enabled):
+            # Flags globais como "(?i)" só valem no início da expressão; elas
+            # já estão em pattern.flags e viram flags locais do grupo da regra
+            source = _GLOBAL_FLAGS.sub('', rule.pattern.pattern, count=1)
+            flags = ''.join(letter for flag, letter in _SCOPED_FLAGS if rule.pattern.flags & flag)
+            scope = flags if 'i' in flags else flags + '-i'
+            group = f"_r{index}"
+            alternatives.append(f"(?P<{group}>(?{scope}:{source}))")
+            combined_rules[group] = rule
+        
+        try:
+            # Grupos nomeados ou referências numeradas dentro das regras
+            # personalizadas podem impedir a combinação
+            self._combined = re.compile('|'.join(alternatives)) if alternatives else None
+            self._combined_rules = combined_rules
+        except re.error:
+            self._combined = None
+            self._combined_rules = {}
+        
+        self._signature = signature
+        self._cached_sanitize.cache_clear()
+    
+    def _replace(self, match) -> str:
+        rule = self._combined_rules[match.lastgroup]
+        # Reaplica a regra isolada na mesma posição para que \1, \2... da
+        # substituição usem a numeração de grupos da própria regra
+        own = rule.pattern.match(match.string, match.start())
+        return own.expand(rule.replacement) if own else match.group()
+    
+    def _sanitize_uncached(self, text: str) -> str:
+        if self._combined is not None:
+            return self._combined.sub(self._replace, text)
         
         result = text
         for rule in self.rules:
             if rule.enabled:
                 result = rule.sanitize(result)
-        
         return result
     
+    def sanitize(self, text: str) -> str:
+        """Sanitiza um texto aplicando todas as regras ativas numa única passada"""
+        if not isinstance(text, str):
+            text = str(text)
+        
+        self._compile()
+        if len(text) <= self.CACHEABLE_LENGTH:
+            return self._cached_sanitize(text)
+        return self._sanitize_uncached(text)
+    
+    def sanitize_record(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Sanitiza um registro uma única vez, mesmo com vários handlers.
+        
+        A mensagem é formatada com os argumentos e sanitizada como um texto
+        só; o registro passa a carregar a mensagem pronta, sem argumentos.
+        """
+        if getattr(record, '_sanitized', False):
+            return record
+        
+        record.msg = self.sanitize(record.getMessage())
+        record.args = ()
+        
+        # Sanitizar contexto se presente
+        context = getattr(record, 'context', None)
+        if context:
+            record.context = LogContext(**self.sanitize_dict(context.to_dict()))
+        
+        record._sanitized = True
+        return record
+    
     def sanitize_dict(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Sanitiza um dicionário recursivamente"""
         result = {}
@@ -337,35 +424,36 @@ class SecureLogHandler(logging.Handler):
         self.setLevel(base_handler.level)
         self.setFormatter(base_handler.formatter)
     
+    def setFormatter(self, fmt: Optional[logging.Formatter]):
+        """Define o formatador também no handler base, que é quem formata"""
+        super().setFormatter(fmt)
+        self.base_handler.setFormatter(fmt)
+    
     def emit(self, record: logging.LogRecord):
-        """Emite o log após sanitização"""
+        """Emite o log após sanitização (feita uma vez por registro)"""
         try:
-            # Sanitizar a mensagem
-            if hasattr(record, 'msg') and record.msg:
-                record.msg = self.sanitizer.sanitize(str(record.msg))
-            
-            # Sanitizar argumentos
-            if hasattr(record, 'args') and record.args:
-                sanitized_args = []
-                for arg in record.args:
-                    if isinstance(arg, dict):
-                        sanitized_args.append(self.sanitizer.sanitize_dict(arg))
-                    else:
-                        sanitized_args.append(self.sanitizer.sanitize(str(arg)))
-                record.args = tuple(sanitized_args)
-            
-            # Sanitizar contexto se presente
-            if hasattr(record, 'context') and record.context:
-                context_dict = record.context.to_dict()
-                sanitized_context_dict = self.sanitizer.sanitize_dict(context_dict)
-                # Recriar contexto com dados sanitizados
-                record.context = LogContext(**sanitized_context_dict)
-            
             # Delegar para o handler base
-            self.base_handler.emit(record)
+            self.base_handler.emit(self.sanitizer.sanitize_record(record))
             
         except Exception as e:
             self.handleError(record)
+    
+    def emit_batch(self, records: List[logging.LogRecord]):
+        """Sanitiza e entrega um lote inteiro ao handler base (pipeline assíncrono)"""
+        try:
+            sanitized = [self.sanitizer.sanitize_record(record) for record in records]
+        except Exception:
+            for record in records:
+                self.handle(record)
+            return
+        emit_batch(self.base_handler, sanitized)
+    
+    def flush(self):
+        self.base_handler.flush()
+    
+    def close(self):
+        self.base_handler.close()
+        super().close()
 
 class PerformanceLogger:
     """Logger para métricas de performance"""
@@ -452,7 +540,10 @@ class SecureLogger:
                  json_format: bool = False,
                  enable_console: bool = True,
                  enable_file: bool = True,
-                 sanitizer: Optional[DataSanitizer] = None):
+                 sanitizer: Optional[DataSanitizer] = None,
+                 async_writes: bool = True,
+                 queue_size: int = 10000,
+                 overflow_policy: LogOverflowPolicy = LogOverflowPolicy.DROP_NEWEST):
         
         self.name = name
         self.log_dir = log_dir or Path("logs")
@@ -465,8 +556,10 @@ class SecureLogger:
         self.logger = logging.getLogger(name)
         self.logger.setLevel(LogLevel.TRACE.value)
         
-        # Limpar handlers existentes
+        # Limpar handlers existentes (e encerrar o pipeline de uma instância anterior)
+        release_pipeline(name)
         self.logger.handlers.clear()
+        self._min_handler_level = LogLevel.SECURITY.value
         
         # Configurar formatador
         formatter = LogFormatter(
@@ -482,6 +575,7 @@ class SecureLogger:
             secure_console = SecureLogHandler(console_handler, self.sanitizer)
             secure_console.setFormatter(formatter)
             self.logger.addHandler(secure_console)
+            self._min_handler_level = min(self._min_handler_level, console_handler.level)
         
         # Handler para arquivo
         if enable_file:
@@ -496,6 +590,7 @@ class SecureLogger:
             secure_file = SecureLogHandler(file_handler, self.sanitizer)
             secure_file.setFormatter(formatter)
             self.logger.addHandler(secure_file)
+            self._min_handler_level = min(self._min_handler_level, file_handler.level)
         
         # Handler para logs de segurança (arquivo separado)
         security_file_path = self.log_dir / f"{name}_security.log"
@@ -511,6 +606,15 @@ class SecureLogger:
         secure_security.setFormatter(formatter)
         self.logger.addHandler(secure_security)
         
+        # Nenhum handler aceita registros abaixo do menor nível configurado
+        self.logger.setLevel(self._min_handler_level)
+        
+        # Escrita em thread própria: quem loga (inclusive o event loop) só enfileira
+        self.pipeline: Optional[LogPipeline] = None
+        if async_writes:
+            self.pipeline = attach_pipeline(self.logger, LogPipeline(
+                list(self.logger.handlers), name=name, maxsize=queue_size, policy=overflow_policy))
+        
         # Configurar performance logger
         self.performance_logger = PerformanceLogger(self.logger)
         
@@ -520,6 +624,9 @@ class SecureLogger:
     
     def _log_with_context(self, level: int, message: str, context: Optional[LogContext] = None, **kwargs):
         """Log interno com contexto"""
+        if not self.logger.isEnabledFor(level):
+            return
+        
         extra = kwargs.get('extra', {})
         if context:
             extra['context'] = context
@@ -555,6 +662,9 @@ class SecureLogger:
     
     def security(self, message: str, context: Optional[LogContext] = None, **kwargs):
         """Log de evento de segurança"""
+        if not self.logger.isEnabledFor(LogLevel.SECURITY.value):
+            return
+        
         # Adicionar timestamp de segurança
         security_context = context or LogContext()
         security_context.metadata = security_context.metadata or {}
@@ -563,6 +673,27 @@ class SecureLogger:
         
         self._log_with_context(LogLevel.SECURITY.value, f"[SECURITY] {message}", security_context, **kwargs)
     
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Espera os registros enfileirados serem gravados"""
+        if self.pipeline:
+            return self.pipeline.flush(timeout)
+        for handler in self.logger.handlers:
+            handler.flush()
+        return True
+    
+    def close(self):
+        """Grava o que resta na fila e fecha os arquivos de log"""
+        if self.pipeline:
+            self.pipeline.close()
+        else:
+            for handler in self.logger.handlers:
+                handler.close()
+        self.logger.handlers.clear()
+    
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """Estatísticas da fila de logs (enfileirados, descartados, lotes)"""
+        return self.pipeline.get_stats() if self.pipeline else {}
+    
     def measure_performance(self, operation: str, context: Optional[LogContext] = None):
         """Context manager para medir performance"""
         return self.performance_logger.measure(operation, context)
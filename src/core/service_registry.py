@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registro de Serviços Sob Demanda - Hawk Bot
+Cada sistema do bot é declarado com uma fábrica e a lista de serviços de
+que depende. Nada é construído no registro: o serviço é instanciado no
+primeiro acesso (comando, listener ou tarefa), depois das suas
+dependências, e reaproveitado nos acessos seguintes. Módulos pesados são
+importados dentro das fábricas, então só entram no processo quando usados.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger('HawkBot.Services')
+
+
+class ServiceError(RuntimeError):
+    """Serviço desconhecido, ciclo de dependências ou falha na fábrica"""
+
+
+class LazyServiceRegistry:
+    """Serviços nomeados construídos sob demanda.
+
+    A fábrica recebe as dependências já resolvidas, na ordem declarada:
+
+        registry.register('rank_system', lambda storage, api: RankSystem(bot, storage, api),
+                          dependencies=('storage', 'pubg_api'))
+        registry.get('rank_system')  # constrói storage e pubg_api se preciso
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._load_times: Dict[str, float] = {}
+        # Falhas de fábrica lembradas até retry()/reset(): sem reimportar a cada acesso
+        self._failures: Dict[str, ServiceError] = {}
+        self._resolving: List[str] = []
+        self._lock = threading.RLock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._factories)
+
+    def register(self, name: str, factory: Callable[..., Any], dependencies: Iterable[str] = ()):
+        """Declara um serviço; substitui a declaração anterior se ainda não foi construído"""
+        if name in self._instances:
+            raise ServiceError(f"Serviço '{name}' já foi construído")
+        self._factories[name] = (factory, tuple(dependencies))
+        self._failures.pop(name, None)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def failure(self, name: str) -> Optional[ServiceError]:
+        """Erro da última tentativa de construção, se ela falhou"""
+        return self._failures.get(name)
+
+    def retry(self, name: str) -> Any:
+        """Esquece a falha registrada e tenta construir o serviço de novo"""
+        self._failures.pop(name, None)
+        return self.get(name)
+
+    def reset(self, name: Optional[str] = None):
+        """Esquece as falhas registradas (de um serviço ou de todos)"""
+        if name is None:
+            self._failures.clear()
+        else:
+            self._failures.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """Instância do serviço, construindo-a (e as dependências) no primeiro acesso"""
+        instance = self._instances.get(name)
+        if instance is not None or name in self._instances:
+            return instance
+
+        with self._lock:
+            if name in self._instances:
+                return self._instances[name]
+            if name not in self._factories:
+                raise ServiceError(f"Serviço '{name}' não registrado")
+            if name in self._failures:
+                raise self._failures[name]
+            if name in self._resolving:
+                cycle = ' -> '.join(self._resolving[self._resolving.index(name):] + [name])
+                raise ServiceError(f"Dependência circular: {cycle}")
+
+            factory, dependencies = self._factories[name]
+            self._resolving.append(name)
+            try:
+                args = [self.get(dependency) for dependency in dependencies]
+                started = time.perf_counter()
+                try:
+                    instance = factory(*args)
+                except Exception as e:
+                    error = ServiceError(f"Erro ao construir '{name}': {e}")
+                    error.__cause__ = e
+                    self._failures[name] = error
+                    raise error
+                # Tempo próprio da fábrica, sem contar as dependências
+                self._load_times[name] = time.perf_counter() - started
+            finally:
+                self._resolving.pop()
+
+            self._instances[name] = instance
+            logger.debug(f"Serviço '{name}' construído em {self._load_times[name] * 1000:.1f}ms")
+            return instance
+
+    def load_all(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Constrói todos os serviços (ou os indicados) na ordem de registro"""
+        loaded = []
+        for name in (self.names if names is None else names):
+            if not self.is_loaded(name):
+                self.get(name)
+                loaded.append(name)
+        return loaded
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'registered': len(self._factories),
+            'loaded': len(self._instances),
+            'pending': [name for name in self._factories if name not in self._instances],
+            'failed': sorted(self._failures),
+            'load_times_ms': {name: round(seconds * 1000, 2) for name, seconds in self._load_times.items()},
+            'total_load_ms': round(sum(self._load_times.values()) * 1000, 2)
+        }
@@ -35,6 +35,8 @@ except ImportError as e:
             'LOG_BACKUP_COUNT': 5
         })()
 
+from .log_pipeline import LogPipeline, attach_pipeline, release_pipeline
+
 # Importar o novo sistema de logging seguro
 try:
     from .secure_logger import (
@@ -133,12 +135,14 @@ class StructuredLogger:
         else:
             # Fallback para logging básico
             self.secure_logger = None
+            self.pipeline: Optional[LogPipeline] = None
             self.logger = logging.getLogger(name)
             self._setup_basic_logger()
     
     def _setup_basic_logger(self):
         """Configura o logger básico (fallback)"""
-        # Limpar handlers existentes
+        # Limpar handlers existentes (e encerrar o pipeline de uma instância anterior)
+        release_pipeline(self.name)
         self.logger.handlers.clear()
         
         # Definir nível
@@ -179,6 +183,9 @@ class StructuredLogger:
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(formatter)
         self.logger.addHandler(error_handler)
+        
+        # Arquivos e console são gravados pela thread do pipeline, não por quem loga
+        self.pipeline = attach_pipeline(self.logger, LogPipeline(list(self.logger.handlers), name=self.name))
     
     def _sanitize_data(self, data: Any) -> Any:
         """Sanitiza dados sensíveis antes do log (fallback)"""
@@ -7,6 +7,12 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 
+try:
+    from ...core.leaderboard import LeaderboardIndex
+except ImportError:
+    # Importado como `features.*` com src no sys.path (bot.py)
+    from core.leaderboard import LeaderboardIndex
+
 logger = logging.getLogger('HawkBot.BadgeSystem')
 
 class BadgeType(Enum):
@@ -548,6 +554,11 @@ class BadgeSystem:
         self.config = self._load_config()
         self.user_badges = self._load_user_badges()
         
+        # Rankings incrementais: "total" e um quadro por categoria de emblema
+        self.leaderboards = LeaderboardIndex()
+        for user_id in self.user_badges:
+            self._index_user_badges(user_id)
+        
     def _load_config(self) -> Dict[str, Any]:
         """Carrega configurações do sistema de emblemas"""
         try:
@@ -768,6 +779,28 @@ class BadgeSystem:
             total_score += int(100 * multiplier)
         
         self.user_badges[user_id]["total_score"] = total_score
+        self._index_user_badges(user_id)
+    
+    def _index_user_badges(self, user_id: str):
+        """Atualiza as posições do usuário nos rankings de emblemas"""
+        self.leaderboards.remove(user_id)
+        
+        user_data = self.user_badges.get(user_id, {})
+        badges = user_data.get("badges", [])
+        if not badges:
+            return
+        
+        self.leaderboards.set_score(user_id, (user_data.get("total_score", 0), len(badges)))
+        
+        multipliers = self.config.get("rarity_multipliers", {})
+        categories: Dict[str, List[int]] = {}
+        for badge in badges:
+            totals = categories.setdefault(badge.get("category", "outros"), [0, 0])
+            totals[0] += int(100 * multipliers.get(badge.get("rarity"), 1.0))
+            totals[1] += 1
+        
+        for category, (score, count) in categories.items():
+            self.leaderboards.set_score(user_id, (score, count), f"category:{category}")
     
     def get_user_badges(self, user_id: str) -> Dict[str, Any]:
         """Obtém todos os emblemas de um usuário"""
@@ -884,28 +917,35 @@ class BadgeSystem:
             logger.error(f"Erro na verificação em massa de emblemas: {e}")
             return {"success": False, "message": f"Erro: {str(e)}"}
     
-    def get_leaderboard(self, guild: discord.Guild, limit: int = 10) -> List[Dict[str, Any]]:
-        """Obtém ranking de emblemas"""
+    def get_leaderboard(self, guild: discord.Guild, limit: int = 10,
+                        category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Obtém ranking de emblemas (geral ou de uma categoria)"""
         leaderboard = []
+        board = f"category:{category}" if category else LeaderboardIndex.DEFAULT_BOARD
         
-        for member in guild.members:
-            if member.bot:
+        # Percorre o índice já ordenado por (pontuação, quantidade) até completar o limite
+        for user_id, (score, count) in self.leaderboards.iter_ranked(board):
+            if len(leaderboard) >= limit:
+                break
+            
+            member = guild.get_member(int(user_id))
+            if member is None or member.bot:
                 continue
             
-            user_badges = self.get_user_badges(str(member.id))
-            if user_badges["badges"]:
-                leaderboard.append({
-                    "user_id": str(member.id),
-                    "display_name": member.display_name,
-                    "badge_count": len(user_badges["badges"]),
-                    "total_score": user_badges["total_score"],
-                    "top_badges": self.get_user_display_badges(str(member.id))[:3]
-                })
-        
-        # Ordena por pontuação total e quantidade de emblemas
-        leaderboard.sort(key=lambda x: (x["total_score"], x["badge_count"]), reverse=True)
+            user_badges = self.get_user_badges(user_id)
+            entry = {
+                "user_id": user_id,
+                "display_name": member.display_name,
+                "badge_count": len(user_badges["badges"]),
+                "total_score": user_badges["total_score"],
+                "top_badges": self.get_user_display_badges(user_id)[:3]
+            }
+            if category:
+                entry["category_score"] = score
+                entry["category_badge_count"] = count
+            leaderboard.append(entry)
         
-        return leaderboard[:limit]
+        return leaderboard
     
     async def enable_system(self, guild_id: int) -> bool:
         """Ativa o sistema de emblemas"""
@@ -943,6 +983,7 @@ class BadgeSystem:
     async def reset_all_badges(self, guild_id: int) -> bool:
         """Reset todos os emblemas do servidor"""
         self.user_badges = {}
+        self.leaderboards.clear()
         self._save_user_badges()
         logger.warning(f"Todos os emblemas foram resetados para guild {guild_id}")
         return True
\ No newline at end of file
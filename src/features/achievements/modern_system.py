@@ -42,6 +42,23 @@ except ImportError:
     rate_limit = None
     TypedConfig = None
 
+# Event system para reagir a mudanças de estatísticas
+try:
+    from ...core.event_system import add_listener as add_event_listener
+except ImportError:
+    try:
+        # Mesmo singleton em que o core.rank emite quando importado pelo bot.py
+        from core.event_system import add_listener as add_event_listener
+    except ImportError:
+        add_event_listener = None
+
+from .rule_engine import AchievementRuleEngine
+try:
+    from ...core.leaderboard import LeaderboardIndex
+except ImportError:
+    # Importado como `features.*` com src no sys.path (bot.py)
+    from core.leaderboard import LeaderboardIndex
+
 # Importar Pydantic com fallback
 try:
     from pydantic import BaseModel, Field, validator
@@ -204,6 +221,18 @@ class ModernAchievementSystem:
         self.badges: Dict[str, BadgeModel] = {}
         self.user_progress: Dict[int, UserProgressModel] = {}
         
+        # Regras compiladas e último snapshot de estatísticas por usuário
+        self.rule_engine = AchievementRuleEngine()
+        self._user_stats: Dict[int, Dict[str, Any]] = {}
+        # Estatísticas que chegam por eventos; as demais são relidas na varredura completa
+        self._event_stats: set = set()
+        # Candidatas que excederam max_achievements_per_check, em ordem
+        self._pending_unlocks: Dict[int, List[str]] = {}
+        
+        # Rankings incrementais: "total" e um quadro por categoria
+        self.leaderboards = LeaderboardIndex()
+        self._category_counts: Dict[int, Dict[str, int]] = {}
+        
         # Métricas
         self.metrics = {
             'achievements_unlocked': 0,
@@ -231,7 +260,7 @@ class ModernAchievementSystem:
         return {
             "enabled": True,
             "auto_check": True,
-            "check_interval_minutes": 30,
+            "full_check_interval_minutes": 360,
             "max_achievements_per_check": 5,
             "experience_multiplier": 1.0,
             "level_formula": "sqrt",
@@ -256,9 +285,14 @@ class ModernAchievementSystem:
             await self._load_default_badges()
             await self._load_user_progress()
             
-            # Iniciar tarefas em background
+            # Verificação automática orientada a eventos de estatísticas
+            if self.config.get("auto_check", True) and add_event_listener:
+                add_event_listener('player_stats_updated', self._on_player_stats_updated,
+                                   name='achievements_stats_updated')
+            
+            # Varredura completa de baixa frequência como rede de segurança
             if self.config.get("auto_check", True):
-                asyncio.create_task(self._auto_check_loop())
+                asyncio.create_task(self._full_check_loop())
             
             self.logger.info("Inicialização assíncrona concluída")
         
@@ -409,6 +443,7 @@ class ModernAchievementSystem:
                     achievement = AchievementModel(**ach_data)
                 
                 self.achievements[achievement.id] = achievement
+                self.rule_engine.add_rule(achievement.id, getattr(achievement, 'requirements', []))
             except Exception as e:
                 self.logger.error(f"Erro ao carregar conquista {ach_data.get('id', 'unknown')}: {e}")
         
@@ -495,39 +530,141 @@ class ModernAchievementSystem:
         except Exception as e:
             self.logger.error(f"Erro ao carregar progresso dos usuários: {e}")
     
-    async def _auto_check_loop(self):
-        """Loop automático de verificação de conquistas"""
-        interval = self.config.get("check_interval_minutes", 30) * 60
+    async def _on_player_stats_updated(self, event):
+        """Handler do evento player_stats_updated ({'user_id', 'stats'})"""
+        user_id = event.get('user_id')
+        stats = event.get('stats')
+        if user_id is None or not stats:
+            return
+        
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return
+        
+        await self.update_user_stats(user_id, stats)
+    
+    async def _full_check_loop(self):
+        """Reavalia todas as regras dos usuários conhecidos de tempos em tempos.
+        
+        Cobre estatísticas que não chegam no evento player_stats_updated
+        (relidas de _get_user_stats) e conquistas adiadas pelo limite por check.
+        """
+        interval = self.config.get("full_check_interval_minutes", 360) * 60
         
         while True:
             try:
                 await asyncio.sleep(interval)
                 
-                if not self.config.get("auto_check", True):
-                    continue
-                
-                # Verificar conquistas para usuários ativos
-                active_users = await self._get_active_users()
-                
-                for user_id in active_users:
+                user_ids = list(self._user_stats)
+                for user_id in user_ids:
                     try:
-                        await self.check_user_achievements(user_id)
+                        await self.full_check_user(user_id)
                     except Exception as e:
                         self.logger.error(f"Erro ao verificar conquistas do usuário {user_id}: {e}")
+                    await asyncio.sleep(0)
                 
-                self.logger.debug(f"Verificação automática concluída para {len(active_users)} usuários")
+                self.logger.debug(f"Verificação completa concluída para {len(user_ids)} usuários")
             
+            except asyncio.CancelledError:
+                break
             except Exception as e:
-                self.logger.error(f"Erro no loop de verificação automática: {e}")
+                self.logger.error(f"Erro no loop de verificação completa: {e}")
+    
+    async def full_check_user(self, user_id: int) -> List[AchievementModel]:
+        """Avaliação completa com as estatísticas atuais do usuário.
+        
+        Valores recebidos por eventos são mantidos; os demais vêm da fonte.
+        """
+        fresh = await self._get_user_stats(user_id)
+        stats = dict(self._user_stats.get(user_id, {}))
+        stats.update({stat: value for stat, value in fresh.items() if stat not in self._event_stats})
+        return await self.check_user_achievements(user_id, stats)
+    
+    async def update_user_stats(self, user_id: int, stats: Dict[str, Any]) -> List[AchievementModel]:
+        """Aplicar mudança de estatísticas e avaliar só as conquistas afetadas"""
+        try:
+            self._event_stats.update(stats)
+            if user_id not in self._user_stats:
+                # Sem snapshot anterior: avaliação completa uma única vez
+                return await self.check_user_achievements(user_id, {**await self._get_user_stats(user_id), **stats})
+            
+            if increment_counter:
+                increment_counter('achievement_checks_total')
+            
+            user_progress = await self.get_user_progress(user_id)
+            
+            current = self._user_stats[user_id]
+            changes = {}
+            for stat, value in stats.items():
+                old = current.get(stat)
+                if old != value:
+                    changes[stat] = (old, value)
+                    current[stat] = value
+            
+            if not changes and user_id not in self._pending_unlocks:
+                return []
+            
+            candidates = (self.rule_engine.newly_satisfied(changes, current, exclude=user_progress.achievements)
+                          if changes else [])
+            return await self._unlock_candidates(user_id, user_progress, candidates, current)
+        
+        except Exception as e:
+            self.logger.error(f"Erro ao atualizar estatísticas do usuário {user_id}: {e}")
+            return []
     
-    async def _get_active_users(self) -> List[int]:
-        """Obter lista de usuários ativos"""
-        # Implementar lógica para obter usuários ativos
-        # Por exemplo, usuários que jogaram nas últimas 24h
-        return list(self.user_progress.keys())[:50]  # Limitar a 50 por verificação
+    async def _unlock_candidates(self, user_id: int, user_progress: 'UserProgressModel',
+                                 candidates: List[str], stats: Dict[str, Any]) -> List[AchievementModel]:
+        """Desbloquear as conquistas candidatas (já avaliadas pelo motor de regras).
+        
+        Candidatas além de max_achievements_per_check ficam pendentes e são
+        desbloqueadas nos próximos checks do usuário, se ainda satisfeitas.
+        """
+        unlocked_achievements = []
+        max_per_check = self.config.get("max_achievements_per_check", 5)
+        
+        pending = [achievement_id for achievement_id in self._pending_unlocks.pop(user_id, [])
+                   if achievement_id not in user_progress.achievements
+                   and self.rule_engine.evaluate(achievement_id, stats)]
+        candidates = pending + [achievement_id for achievement_id in candidates if achievement_id not in pending]
+        deferred = []
+        
+        while candidates:
+            for achievement_id in candidates:
+                achievement = self.achievements.get(achievement_id)
+                if achievement is None or achievement_id in user_progress.achievements:
+                    continue
+                if len(unlocked_achievements) >= max_per_check:
+                    deferred.append(achievement_id)
+                    continue
+                await self._unlock_achievement(user_id, achievement)
+                unlocked_achievements.append(achievement)
+            
+            # Conquistas desbloqueadas alteram a própria estatística de conquistas
+            old_count = stats.get('achievements_unlocked', 0)
+            new_count = len(user_progress.achievements)
+            if new_count == old_count:
+                break
+            stats['achievements_unlocked'] = new_count
+            candidates = self.rule_engine.newly_satisfied(
+                {'achievements_unlocked': (old_count, new_count)}, stats, exclude=user_progress.achievements
+            )
+        
+        if deferred:
+            self._pending_unlocks[user_id] = list(dict.fromkeys(deferred))
+        
+        # Atualizar métricas
+        if unlocked_achievements:
+            if increment_counter:
+                increment_counter('achievements_unlocked_total', len(unlocked_achievements))
+            
+            if record_gauge:
+                record_gauge('user_total_achievements', len(user_progress.achievements))
+        
+        return unlocked_achievements
     
     async def check_user_achievements(self, user_id: int, stats: Optional[Dict[str, Any]] = None) -> List[AchievementModel]:
-        """Verificar e desbloquear conquistas para um usuário"""
+        """Verificar e desbloquear conquistas para um usuário (avaliação completa)"""
         try:
             if increment_counter:
                 increment_counter('achievement_checks_total')
@@ -539,30 +676,13 @@ class ModernAchievementSystem:
             if stats is None:
                 stats = await self._get_user_stats(user_id)
             
-            unlocked_achievements = []
-            max_per_check = self.config.get("max_achievements_per_check", 5)
+            # Snapshot usado para calcular as diferenças dos próximos eventos
+            snapshot = dict(stats)
+            snapshot['achievements_unlocked'] = len(user_progress.achievements)
+            self._user_stats[user_id] = snapshot
             
-            for achievement_id, achievement in self.achievements.items():
-                if len(unlocked_achievements) >= max_per_check:
-                    break
-                
-                if achievement_id in user_progress.achievements:
-                    continue  # Já desbloqueada
-                
-                if await self._check_achievement_requirements(achievement, stats, user_progress):
-                    # Desbloquear conquista
-                    await self._unlock_achievement(user_id, achievement)
-                    unlocked_achievements.append(achievement)
-            
-            # Atualizar métricas
-            if unlocked_achievements:
-                if increment_counter:
-                    increment_counter('achievements_unlocked_total', len(unlocked_achievements))
-                
-                if record_gauge:
-                    record_gauge('user_total_achievements', len(user_progress.achievements) + len(unlocked_achievements))
-            
-            return unlocked_achievements
+            candidates = self.rule_engine.satisfied(snapshot, exclude=user_progress.achievements)
+            return await self._unlock_candidates(user_id, user_progress, candidates, snapshot)
         
         except Exception as e:
             self.logger.error(f"Erro ao verificar conquistas do usuário {user_id}: {e}")
@@ -611,35 +731,10 @@ class ModernAchievementSystem:
             if not hasattr(achievement, 'requirements'):
                 return False
             
-            requirements = achievement.requirements if hasattr(achievement, 'requirements') else []
-            
-            for req in requirements:
-                req_type = req.get('type')
-                req_value = req.get('value')
-                req_operator = req.get('operator', '>=')
-                
-                current_value = stats.get(req_type, 0)
-                
-                # Verificar operador
-                if req_operator == '>=':
-                    if not (current_value >= req_value):
-                        return False
-                elif req_operator == '>':
-                    if not (current_value > req_value):
-                        return False
-                elif req_operator == '==':
-                    if not (current_value == req_value):
-                        return False
-                elif req_operator == '<=':
-                    if not (current_value <= req_value):
-                        return False
-                elif req_operator == '<':
-                    if not (current_value < req_value):
-                        return False
-                else:
-                    return False
+            if achievement.id not in self.rule_engine.rules:
+                self.rule_engine.add_rule(achievement.id, achievement.requirements)
             
-            return True
+            return self.rule_engine.evaluate(achievement.id, stats)
         
         except Exception as e:
             self.logger.error(f"Erro ao verificar requisitos da conquista {achievement.id}: {e}")
@@ -669,6 +764,13 @@ class ModernAchievementSystem:
             # Atualizar timestamp
             user_progress.last_updated = datetime.now()
             
+            # Acumular pontos da categoria no ranking
+            if hasattr(achievement, 'category'):
+                category = achievement.category.value
+                self.leaderboards.add_score(user_id, achievement.points, f"category:{category}")
+                counts = self._category_counts.setdefault(user_id, {})
+                counts[category] = counts.get(category, 0) + 1
+            
             # Salvar progresso
             await self._save_user_progress(user_id, user_progress)
             
@@ -724,6 +826,7 @@ class ModernAchievementSystem:
                 )
             
             self.user_progress[user_id] = progress
+            self.leaderboards.set_score(user_id, progress.total_points)
         
         return self.user_progress[user_id]
     
@@ -731,6 +834,7 @@ class ModernAchievementSystem:
         """Salvar progresso do usuário"""
         try:
             self.user_progress[user_id] = progress
+            self.leaderboards.set_score(user_id, progress.total_points)
             
             # Aqui você salvaria no banco de dados
             # Por enquanto, apenas manter em memória
@@ -788,10 +892,27 @@ class ModernAchievementSystem:
     async def get_leaderboard(self, limit: int = 10, category: Optional[str] = None) -> List[Dict[str, Any]]:
         """Obter leaderboard de conquistas"""
         try:
-            # Filtrar usuários por categoria se especificada
-            users_data = []
+            if category:
+                board = f"category:{category}"
+                ranked = self.leaderboards.top(limit, board)
+                
+                # Completar com usuários sem pontos na categoria
+                if len(ranked) < limit:
+                    seen = {user_id for user_id, _ in ranked}
+                    for user_id, _ in self.leaderboards.iter_ranked():
+                        if len(ranked) >= limit:
+                            break
+                        if user_id not in seen:
+                            ranked.append((user_id, 0))
+            else:
+                ranked = self.leaderboards.top(limit)
             
-            for user_id, progress in self.user_progress.items():
+            users_data = []
+            for user_id, score in ranked:
+                progress = self.user_progress.get(user_id)
+                if progress is None:
+                    continue
+                
                 user_data = {
                     'user_id': user_id,
                     'total_points': progress.total_points,
@@ -801,26 +922,12 @@ class ModernAchievementSystem:
                 }
                 
                 if category:
-                    # Filtrar conquistas por categoria
-                    category_achievements = [
-                        ach_id for ach_id in progress.achievements
-                        if ach_id in self.achievements and 
-                        hasattr(self.achievements[ach_id], 'category') and
-                        self.achievements[ach_id].category.value == category
-                    ]
-                    user_data['category_achievements'] = len(category_achievements)
-                    user_data['category_points'] = sum(
-                        self.achievements[ach_id].points for ach_id in category_achievements
-                        if ach_id in self.achievements
-                    )
+                    user_data['category_achievements'] = self._category_counts.get(user_id, {}).get(category, 0)
+                    user_data['category_points'] = score
                 
                 users_data.append(user_data)
             
-            # Ordenar por pontos totais ou pontos da categoria
-            sort_key = 'category_points' if category else 'total_points'
-            users_data.sort(key=lambda x: x.get(sort_key, 0), reverse=True)
-            
-            return users_data[:limit]
+            return users_data
         
         except Exception as e:
             self.logger.error(f"Erro ao gerar leaderboard: {e}")
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de Regras de Conquistas - Hawk Bot
+Requisitos compilados em predicados e indexados pela estatística de que
+dependem. Uma mudança de estatística avalia apenas as regras que a
+referenciam; limiares numéricos simples são encontrados por bisect.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import operator
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '==': operator.eq,
+    '<=': operator.le,
+    '<': operator.lt,
+}
+
+# Mudança de uma estatística: (valor anterior ou None, valor novo)
+StatChange = Tuple[Optional[Any], Any]
+
+
+@dataclass(frozen=True)
+class CompiledRequirement:
+    """Requisito compilado: estatística, operador e valor de referência"""
+    stat: str
+    compare: Callable[[Any, Any], bool]
+    value: Any
+    op: str
+
+    def matches(self, stats: Mapping[str, Any]) -> bool:
+        try:
+            return self.compare(stats.get(self.stat, 0), self.value)
+        except TypeError:
+            return False  # tipos incomparáveis (ex.: str vs int)
+
+
+class CompiledRule:
+    """Regra de uma conquista: todos os requisitos precisam ser atendidos"""
+
+    __slots__ = ('rule_id', 'order', 'requirements', 'stats')
+
+    def __init__(self, rule_id: str, order: int, requirements: List[CompiledRequirement]):
+        self.rule_id = rule_id
+        self.order = order
+        self.requirements = requirements
+        self.stats = frozenset(req.stat for req in requirements)
+
+    def evaluate(self, stats: Mapping[str, Any]) -> bool:
+        return bool(self.requirements) and all(req.matches(stats) for req in self.requirements)
+
+
+def compile_requirements(requirements: Iterable[Mapping[str, Any]]) -> Optional[List[CompiledRequirement]]:
+    """Compila os requisitos; None se algum operador for desconhecido (regra nunca satisfeita)"""
+    compiled = []
+    for req in requirements:
+        op = req.get('operator', '>=')
+        compare = OPERATORS.get(op)
+        if compare is None:
+            return None
+        compiled.append(CompiledRequirement(req.get('type'), compare, req.get('value'), op))
+    return compiled
+
+
+class _ThresholdIndex:
+    """Limiares ordenados de regras `stat >= v` / `stat > v` de uma estatística"""
+
+    __slots__ = ('values', 'rule_ids')
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self.rule_ids: List[str] = []
+
+    def add(self, value: Any, rule_id: str):
+        position = bisect_right(self.values, value)
+        self.values.insert(position, value)
+        self.rule_ids.insert(position, rule_id)
+
+    def remove(self, rule_id: str):
+        position = self.rule_ids.index(rule_id)
+        del self.values[position]
+        del self.rule_ids[position]
+
+    def crossed(self, old: Optional[Any], new: Any, inclusive: bool) -> List[str]:
+        """Regras cujo limiar foi cruzado ao ir de `old` para `new`"""
+        # >=: satisfeita quando v <= new; >: quando v < new
+        end = bisect_right(self.values, new) if inclusive else bisect_left(self.values, new)
+        if old is None:
+            return self.rule_ids[:end]
+        start = bisect_right(self.values, old) if inclusive else bisect_left(self.values, old)
+        return self.rule_ids[start:end]
+
+
+class AchievementRuleEngine:
+    """Índice de regras por estatística.
+
+    Regras com um único requisito `>=`/`>` numérico vão para o índice de
+    limiares: ao subir uma estatística, as recém-satisfeitas são a fatia
+    entre os valores antigo e novo, sem avaliar nenhum predicado. As demais
+    (vários requisitos, `==`, `<`, valores não numéricos) ficam listadas
+    em cada estatística que referenciam e são avaliadas quando ela muda.
+    """
+
+    def __init__(self):
+        self.rules: Dict[str, CompiledRule] = {}
+        self._by_stat: Dict[str, Set[str]] = {}
+        self._thresholds: Dict[Tuple[str, bool], _ThresholdIndex] = {}
+        self._threshold_rules: Dict[str, Tuple[str, bool]] = {}
+        self._counter = 0
+
+        # Estatísticas
+        self.evaluations = 0
+
+    def add_rule(self, rule_id: str, requirements: Iterable[Mapping[str, Any]]) -> bool:
+        """Compila e indexa uma regra (substitui se já existir)"""
+        self.remove_rule(rule_id)
+
+        compiled = compile_requirements(requirements)
+        if not compiled:
+            return False
+
+        rule = CompiledRule(rule_id, self._counter, compiled)
+        self._counter += 1
+        self.rules[rule_id] = rule
+
+        single = compiled[0] if len(compiled) == 1 else None
+        if (single is not None and single.op in ('>=', '>')
+                and isinstance(single.value, (int, float)) and not isinstance(single.value, bool)):
+            key = (single.stat, single.op == '>=')
+            self._thresholds.setdefault(key, _ThresholdIndex()).add(single.value, rule_id)
+            self._threshold_rules[rule_id] = key
+        else:
+            for stat in rule.stats:
+                self._by_stat.setdefault(stat, set()).add(rule_id)
+        return True
+
+    def remove_rule(self, rule_id: str):
+        """Remove uma regra dos índices"""
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return
+
+        key = self._threshold_rules.pop(rule_id, None)
+        if key is not None:
+            self._thresholds[key].remove(rule_id)
+        for stat in rule.stats:
+            self._by_stat.get(stat, set()).discard(rule_id)
+
+    def evaluate(self, rule_id: str, stats: Mapping[str, Any]) -> bool:
+        """Avalia uma regra compilada"""
+        rule = self.rules.get(rule_id)
+        self.evaluations += 1
+        return rule is not None and rule.evaluate(stats)
+
+    def satisfied(self, stats: Mapping[str, Any], exclude: Iterable[str] = ()) -> List[str]:
+        """Avaliação completa: todas as regras satisfeitas, em ordem de definição"""
+        excluded = set(exclude)
+        result = []
+        for rule in sorted(self.rules.values(), key=lambda r: r.order):
+            if rule.rule_id in excluded:
+                continue
+            self.evaluations += 1
+            if rule.evaluate(stats):
+                result.append(rule.rule_id)
+        return result
+
+    def newly_satisfied(self, changes: Mapping[str, StatChange], stats: Mapping[str, Any],
+                        exclude: Iterable[str] = ()) -> List[str]:
+        """Regras satisfeitas por `stats` que dependem das estatísticas alteradas"""
+        excluded = set(exclude)
+        found: Dict[str, CompiledRule] = {}
+
+        for stat, (old, new) in changes.items():
+            numeric = isinstance(new, (int, float)) and not isinstance(new, bool)
+            rising = numeric and (old is None or (isinstance(old, (int, float)) and new > old))
+
+            # Limiar mínimo só pode ser cruzado quando o valor sobe
+            if rising:
+                for inclusive in (True, False):
+                    index = self._thresholds.get((stat, inclusive))
+                    if index is None:
+                        continue
+                    for rule_id in index.crossed(old, new, inclusive):
+                        if rule_id not in excluded:
+                            found[rule_id] = self.rules[rule_id]
+
+            for rule_id in self._by_stat.get(stat, ()):
+                if rule_id in excluded or rule_id in found:
+                    continue
+                self.evaluations += 1
+                rule = self.rules[rule_id]
+                if rule.evaluate(stats):
+                    found[rule_id] = rule
+
+        return [rule.rule_id for rule in sorted(found.values(), key=lambda r: r.order)]
+
+    def stats_for(self, rule_id: str) -> frozenset:
+        """Estatísticas referenciadas por uma regra"""
+        rule = self.rules.get(rule_id)
+        return rule.stats if rule else frozenset()
@@ -135,7 +135,7 @@ class CheckInAdmin(commands.Cog):
             
             embed.add_field(
                 name="Participantes",
-                value=f"{len(session['checked_in_players'])}{f'/{session["max_players"]}' if session['max_players'] else ''}",
+                value=f"{len(session['checked_in_players'])}{'/' + str(session['max_players']) if session['max_players'] else ''}",
                 inline=True
             )
             
@@ -398,7 +398,7 @@ class CheckInAdmin(commands.Cog):
                     value=f"**Tipo:** {session['session_type'].replace('_', ' ').title()}\n" +
                           f"**ID:** `{session['session_id']}`\n" +
                           f"**Início:** <t:{int(start_time.timestamp())}:R>\n" +
-                          f"**Participantes:** {len(session['checked_in_players'])}{f'/{session["max_players"]}' if session['max_players'] else ''}",
+                          f"**Participantes:** {len(session['checked_in_players'])}{'/' + str(session['max_players']) if session['max_players'] else ''}",
                     inline=True
                 )
                 
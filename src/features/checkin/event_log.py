@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Log de Eventos de Check-in
+Log append-only por sessão (JSON Lines). Cada check-in/check-out custa uma
+escrita de uma linha; o documento completo da sessão só é gravado no
+storage compartilhado no próximo flush em lote, e o log é compactado depois.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, IO, List
+
+logger = logging.getLogger('HawkBot.CheckInEventLog')
+
+_UNSAFE_CHARS = re.compile(r'[^\w.-]')
+
+
+class CheckInEventLog:
+    """Logs por sessão em `log_dir/<session_id>.jsonl`.
+
+    Os arquivos ficam abertos em modo append (até `max_open_files`) e cada
+    evento é gravado com flush imediato; com `fsync=True` também é forçado
+    para o disco. Eventos carregam um número de sequência crescente para que
+    o replay seja idempotente mesmo se o processo cair entre o flush do
+    storage e a compactação do log.
+    """
+
+    def __init__(self, log_dir: Path, fsync: bool = False, max_open_files: int = 32):
+        self.log_dir = Path(log_dir)
+        self.fsync = fsync
+        self.max_open_files = max_open_files
+        self._handles: Dict[str, IO[str]] = {}
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, session_id: str) -> Path:
+        return self.log_dir / f"{_UNSAFE_CHARS.sub('_', session_id)}.jsonl"
+
+    def append(self, session_id: str, event: Dict[str, Any]):
+        """Grava um evento no log da sessão"""
+        handle = self._handles.pop(session_id, None)
+        if handle is None:
+            if len(self._handles) >= self.max_open_files:
+                # Fecha o arquivo usado há mais tempo (dict mantém ordem de uso)
+                oldest = next(iter(self._handles))
+                self._handles.pop(oldest).close()
+            handle = open(self._path(session_id), 'a', encoding='utf-8')
+        self._handles[session_id] = handle
+
+        handle.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Lê os eventos de todos os logs em ordem de sequência"""
+        events = []
+        for path in self.log_dir.glob('*.jsonl'):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Linha parcial de uma escrita interrompida
+                        logger.warning(f"Evento corrompido ignorado em {path.name}")
+        events.sort(key=lambda event: event.get('seq', 0))
+        return events
+
+    def compact(self, session_id: str):
+        """Remove o log de uma sessão já materializada no storage"""
+        handle = self._handles.pop(session_id, None)
+        if handle is not None:
+            handle.close()
+        try:
+            self._path(session_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """Fecha os arquivos abertos"""
+        for handle in self._handles.values():
+            handle.close()
+        self._handles.clear()
@@ -284,7 +284,7 @@ class CheckInNotifications:
         
         embed.add_field(
             name="Participantes",
-            value=f"{len(session['checked_in_players'])}{f'/{session["max_players"]}' if session['max_players'] else ''}",
+            value=f"{len(session['checked_in_players'])}{'/' + str(session['max_players']) if session['max_players'] else ''}",
             inline=True
         )
         
@@ -321,7 +321,7 @@ class CheckInNotifications:
         
         embed.add_field(
             name="Participantes",
-            value=f"{len(session['checked_in_players'])}{f'/{session["max_players"]}' if session['max_players'] else ''}",
+            value=f"{len(session['checked_in_players'])}{'/' + str(session['max_players']) if session['max_players'] else ''}",
             inline=True
         )
         
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agendador de Lembretes por Deadline
+Min-heap de horários de disparo concretos com cancelamento por chave e por
+grupo (sessão). O consumidor dorme exatamente até o próximo deadline em vez
+de varrer todas as sessões a cada intervalo.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import heapq
+import itertools
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# (horário de disparo, sequência, chave)
+HeapEntry = Tuple[float, int, str]
+
+
+class ReminderScheduler:
+    """Fila de prioridade de lembretes indexada por chave.
+
+    Reagendar ou cancelar marca a entrada antiga do heap como obsoleta
+    (remoção preguiçosa); ela é descartada quando chega ao topo, e o heap é
+    reconstruído se as obsoletas passarem da metade. Inserção O(log n),
+    cancelamento O(1) amortizado e consulta do próximo deadline O(1).
+    """
+
+    def __init__(self):
+        self._heap: List[HeapEntry] = []
+        self._entries: Dict[str, Tuple[float, int, Any, Optional[str]]] = {}
+        self._groups: Dict[str, Set[str]] = {}
+        self._counter = itertools.count()
+
+    def schedule(self, key: str, fire_at: float, payload: Any = None,
+                 group: Optional[str] = None) -> bool:
+        """Agenda (ou reagenda) um lembrete; True se virou o próximo deadline"""
+        self.cancel(key)
+
+        seq = next(self._counter)
+        self._entries[key] = (fire_at, seq, payload, group)
+        if group is not None:
+            self._groups.setdefault(group, set()).add(key)
+        heapq.heappush(self._heap, (fire_at, seq, key))
+
+        return self.next_deadline() == fire_at
+
+    def cancel(self, key: str) -> bool:
+        """Cancela um lembrete pela chave"""
+        if self._remove(key) is None:
+            return False
+
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._compact()
+        return True
+
+    def _remove(self, key: str):
+        """Remove a chave dos índices (a entrada do heap fica obsoleta)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+
+        group = entry[3]
+        if group is not None:
+            keys = self._groups.get(group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._groups[group]
+        return entry
+
+    def cancel_group(self, group: str) -> int:
+        """Cancela todos os lembretes de um grupo (ex.: de uma sessão)"""
+        keys = list(self._groups.get(group, ()))
+        for key in keys:
+            self.cancel(key)
+        return len(keys)
+
+    def _is_live(self, entry: HeapEntry) -> bool:
+        current = self._entries.get(entry[2])
+        return current is not None and current[1] == entry[1]
+
+    def _compact(self):
+        """Reconstrói o heap apenas com entradas válidas"""
+        self._heap = [entry for entry in self._heap if self._is_live(entry)]
+        heapq.heapify(self._heap)
+
+    def next_deadline(self) -> Optional[float]:
+        """Horário do próximo lembrete, ou None se não houver"""
+        heap = self._heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now: float) -> List[Tuple[str, Any]]:
+        """Remove e retorna (chave, payload) dos lembretes vencidos, em ordem"""
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if not self._is_live(entry):
+                continue
+            key = entry[2]
+            due.append((key, self._remove(key)[2]))
+        return due
+
+    def clear(self):
+        """Remove todos os lembretes"""
+        self._heap.clear()
+        self._entries.clear()
+        self._groups.clear()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
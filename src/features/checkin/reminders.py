@@ -9,12 +9,16 @@ Versão: 1.0.0
 """
 
 import asyncio
+import time
+import uuid
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import logging
 
+from .reminder_scheduler import ReminderScheduler
+
 logger = logging.getLogger('HawkBot.CheckInReminders')
 
 class ReminderType:
@@ -35,6 +39,12 @@ class CheckInReminders:
         self.active_reminders = {}
         self.reminder_settings = self._load_reminder_settings()
         
+        # Horários de disparo concretos; um único sleeper acorda no próximo deadline
+        self.scheduler = ReminderScheduler()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.checkin_system.add_session_listener(self.schedule_session)
+        
         # Task será iniciada no setup_hook do bot
         
         logger.info("Sistema de Lembretes de Check-in inicializado")
@@ -66,128 +76,117 @@ class CheckInReminders:
         self.storage.data["reminder_settings"] = self.reminder_settings
         self.storage.save_data()
     
-    @tasks.loop(minutes=1)
-    async def reminder_task(self):
-        """Task principal de verificação de lembretes"""
-        try:
-            await self._check_session_reminders()
-            await self._check_custom_reminders()
-        except Exception as e:
-            logger.error(f"Erro na task de lembretes: {e}")
-    
-    @reminder_task.before_loop
-    async def before_reminder_task(self):
-        """Aguarda o bot estar pronto"""
-        await self.bot.wait_until_ready()
-    
     def start_reminder_task(self):
         """Inicia a task de lembretes"""
-        if not self.reminder_task.is_running():
-            self.reminder_task.start()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
             logger.info("Task de lembretes iniciada")
     
-    async def _check_session_reminders(self):
-        """Verifica lembretes de sessões"""
-        now = datetime.now()
-        active_sessions = self.checkin_system.get_active_sessions()
+    async def _run(self):
+        """Dorme até o próximo deadline e dispara os lembretes vencidos"""
+        await self.bot.wait_until_ready()
+        self.rebuild_schedule()
         
-        for session in active_sessions:
-            session_id = session['id']
-            start_time = datetime.fromisoformat(session['start_time'])
-            end_time = datetime.fromisoformat(session['end_time'])
-            
-            # Lembretes de início de sessão
-            if self.reminder_settings['enabled_reminders'].get(ReminderType.SESSION_START, True):
-                await self._check_start_reminders(session, start_time, now)
+        while True:
+            deadline = self.scheduler.next_deadline()
+            timeout = None if deadline is None else max(deadline - time.time(), 0)
             
-            # Lembretes de deadline de check-in (15 min após início)
-            checkin_deadline = start_time + timedelta(minutes=15)
-            if self.reminder_settings['enabled_reminders'].get(ReminderType.CHECKIN_DEADLINE, True):
-                await self._check_checkin_deadline_reminders(session, checkin_deadline, now)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
             
-            # Lembretes de fim de sessão
-            if self.reminder_settings['enabled_reminders'].get(ReminderType.SESSION_END, True):
-                await self._check_end_reminders(session, end_time, now)
-            
-            # Lembretes de check-out (após fim da sessão)
-            if self.reminder_settings['enabled_reminders'].get(ReminderType.CHECKOUT_REMINDER, True):
-                await self._check_checkout_reminders(session, end_time, now)
+            for key, payload in self.scheduler.pop_due(time.time()):
+                try:
+                    await self._fire_reminder(key, payload)
+                except Exception as e:
+                    logger.error(f"Erro na task de lembretes: {e}")
     
-    async def _check_start_reminders(self, session: Dict, start_time: datetime, now: datetime):
-        """Verifica lembretes de início de sessão"""
-        session_id = session['id']
-        reminder_times = self.reminder_settings['default_reminders'][ReminderType.SESSION_START]
-        
-        for minutes_before in reminder_times:
-            reminder_time = start_time - timedelta(minutes=minutes_before)
-            reminder_key = f"{session_id}_start_{minutes_before}"
-            
-            if (now >= reminder_time and 
-                reminder_key not in self.active_reminders and
-                now < start_time):
-                
-                await self._send_start_reminder(session, minutes_before)
-                self.active_reminders[reminder_key] = now.isoformat()
+    def _schedule(self, key: str, fire_at: datetime, payload: tuple, group: Optional[str] = None):
+        """Agenda um lembrete e acorda o sleeper se ele virou o próximo deadline"""
+        if key in self.active_reminders:
+            return  # já enviado
+        if self.scheduler.schedule(key, fire_at.timestamp(), payload, group=group):
+            self._wakeup.set()
     
-    async def _check_checkin_deadline_reminders(self, session: Dict, deadline: datetime, now: datetime):
-        """Verifica lembretes de deadline de check-in"""
+    def schedule_session(self, session: Dict):
+        """Compila os lembretes de uma sessão em horários de disparo"""
         session_id = session['id']
-        reminder_times = self.reminder_settings['default_reminders'][ReminderType.CHECKIN_DEADLINE]
+        self.scheduler.cancel_group(session_id)
+        if session.get('status') != 'active':
+            return
         
-        for minutes_before in reminder_times:
-            reminder_time = deadline - timedelta(minutes=minutes_before)
-            reminder_key = f"{session_id}_checkin_deadline_{minutes_before}"
-            
-            if (now >= reminder_time and 
-                reminder_key not in self.active_reminders and
-                now < deadline):
-                
-                await self._send_checkin_deadline_reminder(session, minutes_before)
-                self.active_reminders[reminder_key] = now.isoformat()
-    
-    async def _check_end_reminders(self, session: Dict, end_time: datetime, now: datetime):
-        """Verifica lembretes de fim de sessão"""
-        session_id = session['id']
-        reminder_times = self.reminder_settings['default_reminders'][ReminderType.SESSION_END]
+        now = datetime.now()
+        start_time = datetime.fromisoformat(session['start_time'])
+        end_time = datetime.fromisoformat(session['end_time'])
+        checkin_deadline = start_time + timedelta(minutes=15)  # 15 min após início
         
-        for minutes_before in reminder_times:
-            reminder_time = end_time - timedelta(minutes=minutes_before)
-            reminder_key = f"{session_id}_end_{minutes_before}"
-            
-            if (now >= reminder_time and 
-                reminder_key not in self.active_reminders and
-                now < end_time):
-                
-                await self._send_end_reminder(session, minutes_before)
-                self.active_reminders[reminder_key] = now.isoformat()
-    
-    async def _check_checkout_reminders(self, session: Dict, end_time: datetime, now: datetime):
-        """Verifica lembretes de check-out"""
-        session_id = session['id']
-        reminder_times = self.reminder_settings['default_reminders'][ReminderType.CHECKOUT_REMINDER]
+        # (tipo, rótulo da chave, referência, sentido, fim da janela de envio)
+        specs = [
+            (ReminderType.SESSION_START, 'start', start_time, -1, start_time),
+            (ReminderType.CHECKIN_DEADLINE, 'checkin_deadline', checkin_deadline, -1, checkin_deadline),
+            (ReminderType.SESSION_END, 'end', end_time, -1, end_time),
+            (ReminderType.CHECKOUT_REMINDER, 'checkout', end_time, 1, None),
+        ]
         
-        for minutes_after in reminder_times:
-            reminder_time = end_time + timedelta(minutes=minutes_after)
-            reminder_key = f"{session_id}_checkout_{minutes_after}"
-            
-            if (now >= reminder_time and 
-                reminder_key not in self.active_reminders):
-                
-                await self._send_checkout_reminder(session)
-                self.active_reminders[reminder_key] = now.isoformat()
+        for reminder_type, label, reference, direction, expires_at in specs:
+            if not self.reminder_settings['enabled_reminders'].get(reminder_type, True):
+                continue
+            if expires_at is not None and now >= expires_at:
+                continue
+            
+            for minutes in self.reminder_settings['default_reminders'][reminder_type]:
+                fire_at = reference + direction * timedelta(minutes=minutes)
+                payload = (reminder_type, session_id, minutes,
+                           expires_at.timestamp() if expires_at else None)
+                self._schedule(f"{session_id}_{label}_{minutes}", fire_at, payload, group=session_id)
     
-    async def _check_custom_reminders(self):
-        """Verifica lembretes personalizados"""
-        now = datetime.now()
-        custom_reminders = self.reminder_settings.get('custom_reminders', {})
+    def _schedule_custom(self, reminder_data: Dict):
+        """Agenda um lembrete personalizado ainda não enviado"""
+        if not reminder_data.get('sent', False):
+            self._schedule(f"custom:{reminder_data['id']}", datetime.fromisoformat(reminder_data['time']),
+                           (ReminderType.CUSTOM, reminder_data['id']))
+    
+    def rebuild_schedule(self):
+        """Reconstrói a agenda a partir das sessões e lembretes persistidos"""
+        self.scheduler.clear()
+        for session in self.checkin_system.get_active_sessions():
+            self.schedule_session(session)
+        for reminder_data in self.reminder_settings.get('custom_reminders', {}).values():
+            self._schedule_custom(reminder_data)
+        self._wakeup.set()
+        logger.info(f"Agenda de lembretes reconstruída: {len(self.scheduler)} pendentes")
+    
+    async def _fire_reminder(self, key: str, payload: tuple):
+        """Envia um lembrete vencido se ele ainda for válido"""
+        reminder_type = payload[0]
         
-        for reminder_id, reminder_data in list(custom_reminders.items()):
-            reminder_time = datetime.fromisoformat(reminder_data['time'])
-            
-            if now >= reminder_time and not reminder_data.get('sent', False):
+        if reminder_type == ReminderType.CUSTOM:
+            reminder_data = self.reminder_settings.get('custom_reminders', {}).get(payload[1])
+            if reminder_data and not reminder_data.get('sent', False):
                 await self._send_custom_reminder(reminder_data)
-                custom_reminders[reminder_id]['sent'] = True
+                reminder_data['sent'] = True
                 self._save_reminder_settings()
+            return
+        
+        _, session_id, minutes, expires_at = payload
+        session = self.checkin_system.get_session(session_id)
+        if not session or session.get('status') != 'active':
+            return
+        if expires_at is not None and time.time() >= expires_at:
+            return  # janela de envio já passou (ex.: event loop atrasado)
+        
+        if reminder_type == ReminderType.SESSION_START:
+            await self._send_start_reminder(session, minutes)
+        elif reminder_type == ReminderType.CHECKIN_DEADLINE:
+            await self._send_checkin_deadline_reminder(session, minutes)
+        elif reminder_type == ReminderType.SESSION_END:
+            await self._send_end_reminder(session, minutes)
+        elif reminder_type == ReminderType.CHECKOUT_REMINDER:
+            await self._send_checkout_reminder(session)
+        
+        self.active_reminders[key] = datetime.now().isoformat()
     
     async def _send_start_reminder(self, session: Dict, minutes_before: int):
         """Envia lembrete de início de sessão"""
@@ -342,7 +341,7 @@ class CheckInReminders:
     def create_custom_reminder(self, title: str, message: str, reminder_time: datetime, 
                              channel_id: Optional[int] = None, author: Optional[str] = None) -> str:
         """Cria um lembrete personalizado"""
-        reminder_id = f"custom_{int(datetime.now().timestamp())}"
+        reminder_id = f"custom_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:6]}"
         
         reminder_data = {
             'id': reminder_id,
@@ -360,6 +359,7 @@ class CheckInReminders:
         
         self.reminder_settings['custom_reminders'][reminder_id] = reminder_data
         self._save_reminder_settings()
+        self._schedule_custom(reminder_data)
         
         logger.info(f"Lembrete personalizado criado: {title}")
         return reminder_id
@@ -369,6 +369,7 @@ class CheckInReminders:
         if reminder_id in self.reminder_settings['custom_reminders']:
             del self.reminder_settings['custom_reminders'][reminder_id]
             self._save_reminder_settings()
+            self.scheduler.cancel(f"custom:{reminder_id}")
             logger.info(f"Lembrete personalizado removido: {reminder_id}")
             return True
         return False
@@ -388,6 +389,7 @@ class CheckInReminders:
                 self.reminder_settings['default_reminders'][reminder_type] = times
             
             self._save_reminder_settings()
+            self.rebuild_schedule()
             logger.info(f"Configurações de lembrete atualizadas: {reminder_type}")
             return True
             
@@ -429,6 +431,6 @@ class CheckInReminders:
     
     def stop_reminders(self):
         """Para o sistema de lembretes"""
-        if self.reminder_task.is_running():
-            self.reminder_task.cancel()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
         logger.info("Sistema de lembretes parado")
\ No newline at end of file
@@ -31,31 +31,18 @@ class CheckInReports:
         """Gera relatório de participação dos últimos N dias"""
         try:
             end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
+            start_date = datetime.combine(end_date.date() - timedelta(days=days - 1), datetime.min.time())
             
-            # Obter todas as sessões do período
-            all_sessions = self.checkin_system.get_all_sessions()
-            period_sessions = [
-                session for session in all_sessions
-                if start_date <= datetime.fromisoformat(session['created_at']) <= end_date
-            ]
+            # Somar os rollups diários do período (N dias de calendário até hoje)
+            rollup = self.checkin_system.rollups.aggregate(days, today=end_date.date())
             
             # Estatísticas gerais
-            total_sessions = len(period_sessions)
-            total_checkins = sum(session.get('checkin_count', 0) for session in period_sessions)
-            total_checkouts = sum(session.get('checkout_count', 0) for session in period_sessions)
-            
-            # Estatísticas por tipo de sessão
-            session_types = Counter(session['type'] for session in period_sessions)
+            total_sessions = rollup['sessions']
+            total_checkins = rollup['checkins']
+            total_checkouts = rollup['checkouts']
             
             # Estatísticas por jogador
-            player_stats = self._calculate_player_stats(period_sessions)
-            
-            # Estatísticas por dia da semana
-            weekday_stats = self._calculate_weekday_stats(period_sessions)
-            
-            # Estatísticas por horário
-            hourly_stats = self._calculate_hourly_stats(period_sessions)
+            player_stats = self._build_player_stats(rollup['players'])
             
             # Taxa de participação
             participation_rate = (total_checkouts / total_checkins * 100) if total_checkins > 0 else 0
@@ -73,10 +60,10 @@ class CheckInReports:
                     'participation_rate': round(participation_rate, 2),
                     'avg_players_per_session': round(total_checkins / total_sessions, 2) if total_sessions > 0 else 0
                 },
-                'session_types': dict(session_types),
+                'session_types': rollup['session_types'],
                 'player_stats': player_stats,
-                'weekday_stats': weekday_stats,
-                'hourly_stats': hourly_stats,
+                'weekday_stats': rollup['weekdays'],
+                'hourly_stats': rollup['hours'],
                 'generated_at': datetime.now().isoformat()
             }
             
@@ -87,71 +74,22 @@ class CheckInReports:
             logger.error(f"Erro ao gerar relatório de participação: {e}")
             return {}
     
-    def _calculate_player_stats(self, sessions: List[Dict]) -> Dict[str, Dict]:
-        """Calcula estatísticas por jogador"""
-        player_stats = defaultdict(lambda: {
-            'checkins': 0,
-            'checkouts': 0,
-            'sessions_participated': 0,
-            'session_types': defaultdict(int),
-            'total_time': 0,  # em minutos
-            'avg_session_time': 0
-        })
-        
-        for session in sessions:
-            session_duration = self._calculate_session_duration(session)
-            
-            # Processar check-ins
-            for player_id in session.get('checked_in_players', []):
-                stats = player_stats[player_id]
-                stats['checkins'] += 1
-                stats['sessions_participated'] += 1
-                stats['session_types'][session['type']] += 1
-                
-                # Se o jogador fez check-out, adicionar tempo
-                if player_id in session.get('checked_out_players', []):
-                    stats['checkouts'] += 1
-                    stats['total_time'] += session_duration
-        
-        # Calcular médias
-        for player_id, stats in player_stats.items():
-            if stats['checkouts'] > 0:
-                stats['avg_session_time'] = round(stats['total_time'] / stats['checkouts'], 2)
-            stats['session_types'] = dict(stats['session_types'])
-        
-        return dict(player_stats)
-    
-    def _calculate_weekday_stats(self, sessions: List[Dict]) -> Dict[str, int]:
-        """Calcula estatísticas por dia da semana"""
-        weekday_names = {
-            0: 'Segunda-feira',
-            1: 'Terça-feira', 
-            2: 'Quarta-feira',
-            3: 'Quinta-feira',
-            4: 'Sexta-feira',
-            5: 'Sábado',
-            6: 'Domingo'
-        }
-        
-        weekday_counts = defaultdict(int)
-        
-        for session in sessions:
-            session_date = datetime.fromisoformat(session['start_time'])
-            weekday = session_date.weekday()
-            weekday_counts[weekday_names[weekday]] += 1
-        
-        return dict(weekday_counts)
-    
-    def _calculate_hourly_stats(self, sessions: List[Dict]) -> Dict[str, int]:
-        """Calcula estatísticas por horário"""
-        hourly_counts = defaultdict(int)
+    def _build_player_stats(self, players: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Monta as estatísticas por jogador a partir dos contadores agregados"""
+        player_stats = {}
         
-        for session in sessions:
-            session_time = datetime.fromisoformat(session['start_time'])
-            hour_range = f"{session_time.hour:02d}:00-{(session_time.hour + 1) % 24:02d}:00"
-            hourly_counts[hour_range] += 1
+        for player_id, totals in players.items():
+            checkouts = totals['checkouts']
+            player_stats[player_id] = {
+                'checkins': totals['checkins'],
+                'checkouts': checkouts,
+                'sessions_participated': totals['checkins'],
+                'session_types': dict(totals['session_types']),
+                'total_time': totals['total_time'],  # em minutos
+                'avg_session_time': round(totals['total_time'] / checkouts, 2) if checkouts > 0 else 0
+            }
         
-        return dict(sorted(hourly_counts.items()))
+        return player_stats
     
     def _calculate_session_duration(self, session: Dict) -> int:
         """Calcula duração da sessão em minutos"""
@@ -283,17 +221,9 @@ class CheckInReports:
     def generate_leaderboard(self, metric: str = 'participation', days: int = 30, limit: int = 10) -> List[Dict]:
         """Gera leaderboard baseado em métricas"""
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            # Obter estatísticas de todos os jogadores
-            all_sessions = self.checkin_system.get_all_sessions()
-            period_sessions = [
-                session for session in all_sessions
-                if start_date <= datetime.fromisoformat(session['created_at']) <= end_date
-            ]
-            
-            player_stats = self._calculate_player_stats(period_sessions)
+            # Obter estatísticas de todos os jogadores a partir dos rollups diários
+            rollup = self.checkin_system.rollups.aggregate(days)
+            player_stats = self._build_player_stats(rollup['players'])
             
             # Ordenar baseado na métrica
             if metric == 'participation':
@@ -419,32 +349,24 @@ class CheckInReports:
     def get_summary_stats(self, days: int = 7) -> Dict[str, Any]:
         """Obtém estatísticas resumidas para dashboard"""
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            
-            all_sessions = self.checkin_system.get_all_sessions()
-            recent_sessions = [
-                session for session in all_sessions
-                if start_date <= datetime.fromisoformat(session['created_at']) <= end_date
-            ]
+            rollup = self.checkin_system.rollups.aggregate(days)
             
             # Estatísticas básicas
-            total_sessions = len(recent_sessions)
-            total_checkins = sum(session.get('checkin_count', 0) for session in recent_sessions)
-            total_checkouts = sum(session.get('checkout_count', 0) for session in recent_sessions)
+            total_sessions = rollup['sessions']
+            total_checkins = rollup['checkins']
+            total_checkouts = rollup['checkouts']
             
             # Jogadores únicos
-            unique_players = set()
-            for session in recent_sessions:
-                unique_players.update(session.get('checked_in_players', []))
+            unique_players = rollup['players'].keys()
             
             # Sessão mais popular
             most_popular_session = None
-            if recent_sessions:
-                most_popular_session = max(
-                    recent_sessions, 
-                    key=lambda x: x.get('checkin_count', 0)
+            if rollup['session_checkins']:
+                session_id, (session_type, checkins) = max(
+                    rollup['session_checkins'].items(),
+                    key=lambda item: item[1][1]
                 )
+                most_popular_session = {'id': session_id, 'type': session_type, 'checkins': checkins}
             
             summary = {
                 'period_days': days,
@@ -454,11 +376,7 @@ class CheckInReports:
                 'unique_players': len(unique_players),
                 'avg_players_per_session': round(total_checkins / total_sessions, 2) if total_sessions > 0 else 0,
                 'completion_rate': round(total_checkouts / total_checkins * 100, 2) if total_checkins > 0 else 0,
-                'most_popular_session': {
-                    'id': most_popular_session['id'],
-                    'type': most_popular_session['type'],
-                    'checkins': most_popular_session.get('checkin_count', 0)
-                } if most_popular_session else None,
+                'most_popular_session': most_popular_session,
                 'generated_at': datetime.now().isoformat()
             }
             
@@ -1,10 +1,18 @@
 import discord
 from discord.ext import commands
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
+from pathlib import Path
+import asyncio
 import json
+import logging
 from enum import Enum
 
+from .event_log import CheckInEventLog
+from .rollups import CheckInRollups
+
+logger = logging.getLogger('HawkBot.CheckInSystem')
+
 class SessionType(Enum):
     SCRIM = "scrim"
     RANKED = "ranked"
@@ -17,11 +25,25 @@ class CheckInStatus(Enum):
     NO_SHOW = "no_show"
 
 class CheckInSystem:
-    def __init__(self, bot, storage):
+    def __init__(self, bot, storage, log_dir: Optional[Path] = None,
+                 flush_interval: float = 5.0, max_pending_events: int = 500):
         self.bot = bot
         self.storage = storage
         self.active_sessions = {}
         self.checkin_data = self._load_checkin_data()
+        self.rollups = self._load_rollups()
+        
+        # Eventos vão para o log da sessão; o storage compartilhado é gravado em lote
+        self.flush_interval = flush_interval
+        self.max_pending_events = max_pending_events
+        self._pending_events = 0
+        self._dirty_sessions = set()
+        self._flush_handle = None
+        self.event_log = CheckInEventLog(log_dir or self._default_log_dir())
+        self._replay_event_log()
+        
+        # Callbacks chamados quando uma sessão é criada, fechada ou cancelada
+        self._session_listeners: List[Callable[[Dict[str, Any]], None]] = []
     
     def _load_checkin_data(self) -> Dict[str, Any]:
         """Carrega dados de check-in do armazenamento"""
@@ -38,6 +60,147 @@ class CheckInSystem:
             self.storage.save_data()
         return self.storage.data["checkin_system"]
     
+    def _load_rollups(self) -> CheckInRollups:
+        """Carrega os rollups diários, reconstruindo-os do histórico se necessário"""
+        if "rollups" in self.checkin_data:
+            return CheckInRollups(self.checkin_data["rollups"])
+        
+        rollups = CheckInRollups(self.checkin_data.setdefault("rollups", {}))
+        rollups.rebuild(self.checkin_data["sessions"].values())
+        self.storage.save_data()
+        return rollups
+    
+    def _default_log_dir(self) -> Path:
+        """Diretório dos logs ao lado do arquivo de dados"""
+        data_file = Path(getattr(self.storage, "data_file", "data.json"))
+        return data_file.parent / "checkin_logs"
+    
+    def _replay_event_log(self):
+        """Reaplica eventos registrados após o último flush (recuperação de falhas)"""
+        replayed = 0
+        for event in self.event_log.read_all():
+            if event.get("seq", 0) <= self.checkin_data.get("log_seq", 0):
+                self._dirty_sessions.add(event["session_id"])
+                continue  # já materializado no storage
+            try:
+                self._apply_event(event)
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Evento de check-in ignorado no replay ({event.get('op')}): {e}")
+                self.checkin_data["log_seq"] = event["seq"]
+            self._dirty_sessions.add(event["session_id"])
+            replayed += 1
+        
+        if self._dirty_sessions:
+            logger.info(f"{replayed} eventos de check-in recuperados do log")
+            self.flush()
+    
+    def _record_event(self, op: str, session_id: str, **fields) -> Dict[str, Any]:
+        """Grava o evento no log da sessão, aplica em memória e agenda o flush"""
+        event = {
+            "seq": self.checkin_data.get("log_seq", 0) + 1,
+            "op": op,
+            "session_id": session_id,
+            "time": datetime.now().isoformat(),
+            **fields
+        }
+        self.event_log.append(session_id, event)
+        self._apply_event(event)
+        
+        self._dirty_sessions.add(session_id)
+        self._pending_events += 1
+        self._schedule_flush()
+        return event
+    
+    def _apply_event(self, event: Dict[str, Any]):
+        """Aplica um evento ao documento da sessão, estatísticas e rollups"""
+        op = event["op"]
+        
+        if op == "create":
+            session = event["session"]
+            self.checkin_data["sessions"][session["id"]] = session
+            if session["status"] == "active":
+                self.active_sessions[session["id"]] = session
+            self.rollups.record_session(session)
+        
+        elif op == "checkin":
+            session = self.checkin_data["sessions"][event["session_id"]]
+            user_id = event["user_id"]
+            session["players"][user_id] = {
+                "username": event["username"],
+                "checkin_time": event["time"],
+                "checkout_time": None,
+                "status": CheckInStatus.CHECKED_IN.value
+            }
+            session["checkin_count"] += 1
+            self._update_player_stats(user_id, event["username"], "checkin", session["type"], event["time"])
+            self.rollups.record_checkin(session, user_id)
+        
+        elif op == "checkout":
+            session = self.checkin_data["sessions"][event["session_id"]]
+            user_id = event["user_id"]
+            player_data = session["players"][user_id]
+            player_data["checkout_time"] = event["time"]
+            player_data["status"] = CheckInStatus.CHECKED_OUT.value
+            session["checkout_count"] += 1
+            self._update_player_stats(user_id, player_data["username"], "checkout", session["type"], event["time"])
+            self.rollups.record_checkout(session, user_id)
+        
+        else:
+            raise ValueError(f"Operação desconhecida: {op}")
+        
+        self.checkin_data["log_seq"] = event["seq"]
+    
+    def _schedule_flush(self):
+        """Agenda a gravação em lote do storage compartilhado"""
+        if self._pending_events >= self.max_pending_events:
+            self.flush()
+            return
+        
+        if self._flush_handle is not None:
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Fora do event loop (scripts, testes): grava imediatamente
+            self.flush()
+            return
+        
+        self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+    
+    def flush(self) -> bool:
+        """Grava o storage compartilhado e compacta os logs já materializados"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        if self.storage.save_data() is False:
+            # Os eventos continuam duráveis no log; tenta de novo no próximo flush
+            logger.error("Falha ao gravar dados de check-in; log de eventos preservado")
+            return False
+        
+        for session_id in self._dirty_sessions:
+            self.event_log.compact(session_id)
+        self._dirty_sessions.clear()
+        self._pending_events = 0
+        return True
+    
+    def add_session_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """Registra um callback para mudanças de estado das sessões"""
+        self._session_listeners.append(callback)
+    
+    def _notify_session_listeners(self, session: Dict[str, Any]):
+        for callback in self._session_listeners:
+            try:
+                callback(session)
+            except Exception as e:
+                logger.error(f"Erro no listener de sessão: {e}")
+    
+    def close(self):
+        """Grava eventos pendentes e fecha os logs"""
+        self.flush()
+        self.event_log.close()
+    
     def create_session(self, session_id: str, session_type: SessionType, 
                       start_time: datetime, end_time: datetime, 
                       max_players: int = None, description: str = "") -> Dict[str, Any]:
@@ -56,9 +219,8 @@ class CheckInSystem:
             "checkout_count": 0
         }
         
-        self.checkin_data["sessions"][session_id] = session
-        self.active_sessions[session_id] = session
-        self.storage.save_data()
+        self._record_event("create", session_id, session=session)
+        self._notify_session_listeners(session)
         
         return session
     
@@ -82,25 +244,12 @@ class CheckInSystem:
             if session["players"][user_id]["status"] == CheckInStatus.CHECKED_IN.value:
                 raise ValueError("Jogador já fez check-in")
         
-        # Registra check-in
-        checkin_time = datetime.now()
-        session["players"][user_id] = {
-            "username": username,
-            "checkin_time": checkin_time.isoformat(),
-            "checkout_time": None,
-            "status": CheckInStatus.CHECKED_IN.value
-        }
-        
-        session["checkin_count"] += 1
-        
-        # Atualiza estatísticas do jogador
-        self._update_player_stats(user_id, username, "checkin", session["type"])
-        
-        self.storage.save_data()
+        # Registra check-in (sessão, estatísticas e rollups são atualizados pelo evento)
+        event = self._record_event("checkin", session_id, user_id=user_id, username=username)
         
         return {
             "success": True,
-            "checkin_time": checkin_time,
+            "checkin_time": datetime.fromisoformat(event["time"]),
             "position": session["checkin_count"],
             "session": session
         }
@@ -123,20 +272,11 @@ class CheckInSystem:
             raise ValueError("Jogador já fez check-out")
         
         # Registra check-out
-        checkout_time = datetime.now()
-        player_data["checkout_time"] = checkout_time.isoformat()
-        player_data["status"] = CheckInStatus.CHECKED_OUT.value
-        
-        session["checkout_count"] += 1
-        
-        # Atualiza estatísticas do jogador
-        self._update_player_stats(user_id, player_data["username"], "checkout", session["type"])
-        
-        self.storage.save_data()
+        event = self._record_event("checkout", session_id, user_id=user_id)
         
         return {
             "success": True,
-            "checkout_time": checkout_time,
+            "checkout_time": datetime.fromisoformat(event["time"]),
             "session": session
         }
     
@@ -165,7 +305,8 @@ class CheckInSystem:
         if session_id in self.active_sessions:
             del self.active_sessions[session_id]
         
-        self.storage.save_data()
+        self.flush()
+        self._notify_session_listeners(session)
         
         return session
     
@@ -204,7 +345,8 @@ class CheckInSystem:
             del self.active_sessions[session_id]
         
         # Salvar alterações
-        self.storage.save_data()
+        self.flush()
+        self._notify_session_listeners(session)
         
         return True
         
@@ -235,7 +377,8 @@ class CheckInSystem:
             "last_activity": None
         })
     
-    def _update_player_stats(self, user_id: str, username: str, action: str, session_type: str):
+    def _update_player_stats(self, user_id: str, username: str, action: str, session_type: str,
+                             timestamp: Optional[str] = None):
         """Atualiza estatísticas do jogador"""
         if user_id not in self.checkin_data["player_stats"]:
             self.checkin_data["player_stats"][user_id] = {
@@ -254,7 +397,7 @@ class CheckInSystem:
         
         stats = self.checkin_data["player_stats"][user_id]
         stats["username"] = username  # Atualiza username
-        stats["last_activity"] = datetime.now().isoformat()
+        stats["last_activity"] = timestamp or datetime.now().isoformat()
         
         if action == "checkin":
             stats["total_checkins"] += 1
@@ -277,7 +420,7 @@ class CheckInSystem:
             if user_id in self.checkin_data["player_stats"]:
                 self.checkin_data["player_stats"][user_id]["no_shows"] += 1
         
-        self.storage.save_data()
+        self.flush()
     
     def get_session_summary(self, session_id: str) -> Dict[str, Any]:
         """Retorna resumo de uma sessão"""
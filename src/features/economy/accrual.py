@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de Rendimento de Investimentos
+Investimentos ativos ficam em buckets colunares agrupados por (tipo, taxa,
+hora de criação). Todos os membros de um bucket completam um período (dia,
+ou hora para cripto) ao mesmo tempo, então o fator de crescimento é
+calculado uma vez por bucket e aplicado à coluna de principais numa única
+passada. Os vencimentos ficam num min-heap: o loop dorme exatamente até o
+próximo bucket vencer e cada tick só processa os buckets vencidos.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import heapq
+import itertools
+import math
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+BUCKET_WIDTH = timedelta(hours=1)
+
+# Chave em `investment.metadata` com os períodos já processados, persistida
+# para que um reinício retome a agenda de onde parou
+ACCRUED_KEY = "accrued_periods"
+
+# Período de rendimento por tipo (valor do enum); o padrão é diário
+_PERIODS = {
+    "crypto": timedelta(hours=1),
+}
+_DIVIDEND_DAYS = {"daily": 1, "weekly": 7, "monthly": 30}
+_DIVIDEND_DIVISORS = {"daily": 365, "weekly": 52, "monthly": 12}
+
+BucketKey = Tuple[Any, Decimal, datetime]
+
+
+def _floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class InvestmentBucket:
+    """Colunas (IDs, usuários, principais) de investimentos equivalentes"""
+
+    __slots__ = ('investment_type', 'rate', 'start', 'period', 'accrued', 'ids', 'user_ids',
+                 'principals', '_positions')
+
+    def __init__(self, investment_type: Any, rate: Decimal, start: datetime, period: timedelta):
+        self.investment_type = investment_type
+        self.rate = rate
+        self.start = start
+        self.period = period
+        self.accrued = 0  # Períodos já processados
+        self.ids: List[str] = []
+        self.user_ids: List[int] = []
+        self.principals: List[Decimal] = []
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, investment_id: str, user_id: int, principal: Decimal):
+        if investment_id in self._positions:
+            return
+        self._positions[investment_id] = len(self.ids)
+        self.ids.append(investment_id)
+        self.user_ids.append(user_id)
+        self.principals.append(principal)
+
+    def remove(self, investment_id: str) -> bool:
+        """Remove trocando com o último elemento (O(1))"""
+        position = self._positions.pop(investment_id, None)
+        if position is None:
+            return False
+        last = len(self.ids) - 1
+        if position != last:
+            for column in (self.ids, self.user_ids, self.principals):
+                column[position] = column[last]
+            self._positions[self.ids[position]] = position
+        for column in (self.ids, self.user_ids, self.principals):
+            column.pop()
+        return True
+
+    def due_at(self, periods: int) -> datetime:
+        """Quando todos os membros completam `periods` períodos"""
+        return self.start + BUCKET_WIDTH + self.period * periods
+
+    def periods_at(self, now: datetime) -> int:
+        """Períodos completos por todos os membros em `now`"""
+        return max(0, (now - self.start - BUCKET_WIDTH) // self.period)
+
+
+class InvestmentAccrualEngine:
+    """Buckets de investimentos ativos e agenda de vencimentos.
+
+    `options` é a configuração `investment_options` do sistema de economia.
+    """
+
+    def __init__(self, options: Dict[Any, Dict[str, Any]]):
+        self.options = options
+        self.buckets: Dict[BucketKey, InvestmentBucket] = {}
+        self._bucket_of: Dict[str, BucketKey] = {}
+        self._schedule: List[Tuple[datetime, int, BucketKey]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._bucket_of)
+
+    # ------------------------------------------------------------------
+    # Agenda
+    # ------------------------------------------------------------------
+
+    def add(self, investment, now: Optional[datetime] = None):
+        """Registra um investimento ativo"""
+        if investment.investment_id in self._bucket_of:
+            return
+        investment_type = investment.investment_type
+        key = (investment_type, investment.interest_rate, _floor_hour(investment.created_at))
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            period = _PERIODS.get(investment_type.value, timedelta(days=1))
+            bucket = self.buckets[key] = InvestmentBucket(investment_type, key[1], key[2], period)
+            bucket.accrued = self._persisted_periods(investment, bucket, now or datetime.now())
+            heapq.heappush(self._schedule, (bucket.due_at(bucket.accrued + 1), next(self._seq), key))
+        bucket.add(investment.investment_id, investment.user_id, investment.principal_amount)
+        self._bucket_of[investment.investment_id] = key
+
+    @staticmethod
+    def _persisted_periods(investment, bucket: InvestmentBucket, now: datetime) -> int:
+        """Períodos já processados segundo o registro salvo.
+
+        Registros sem o contador usam o último dividendo pago; sem nenhum dos
+        dois, a agenda começa em `now` (nada é pago duas vezes).
+        """
+        accrued = investment.metadata.get(ACCRUED_KEY)
+        if accrued is None and investment.last_dividend is not None:
+            accrued = bucket.periods_at(investment.last_dividend)
+        if accrued is None:
+            return bucket.periods_at(now)
+        return min(int(accrued), bucket.periods_at(now))
+
+    def remove(self, investment_id: str):
+        """Tira um investimento retirado; buckets vazios saem da agenda depois"""
+        key = self._bucket_of.pop(investment_id, None)
+        if key is None:
+            return
+        bucket = self.buckets[key]
+        bucket.remove(investment_id)
+        if not bucket:
+            del self.buckets[key]
+
+    def next_due(self) -> Optional[datetime]:
+        """Próximo vencimento agendado (descartando buckets que esvaziaram)"""
+        while self._schedule and self._schedule[0][2] not in self.buckets:
+            heapq.heappop(self._schedule)
+        return self._schedule[0][0] if self._schedule else None
+
+    def pop_due(self, now: Optional[datetime] = None) -> List[Tuple[InvestmentBucket, int]]:
+        """Buckets vencidos até `now`, com o número de períodos completos.
+
+        Cada bucket devolvido é reagendado para o período seguinte.
+        """
+        now = now or datetime.now()
+        due = []
+        while self._schedule and self._schedule[0][0] <= now:
+            _, _, key = heapq.heappop(self._schedule)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                continue
+            periods = bucket.periods_at(now)
+            due.append((bucket, periods))
+            heapq.heappush(self._schedule, (bucket.due_at(periods + 1), next(self._seq), key))
+        return due
+
+    # ------------------------------------------------------------------
+    # Valorização
+    # ------------------------------------------------------------------
+
+    def _growth(self, investment_type: Any, rate: Decimal, periods: int) -> Tuple[Decimal, Optional[float]]:
+        """Fator comum do bucket e, para tipos voláteis, a escala do ruído"""
+        config = self.options[investment_type]
+        kind = investment_type.value
+        if kind == "savings":
+            return (1 + rate / 365) ** periods, None
+        if kind == "bonds":
+            return 1 + rate / 365 * periods, None
+        if kind == "real_estate":
+            appreciation = (1 + config["appreciation_rate"] / 365) ** periods
+            net_yield = (config["rental_yield"] - config["maintenance_cost"]) / 365 * periods
+            return appreciation + net_yield, None
+        if kind == "stocks":
+            return Decimal('1'), float(config["volatility"]) * math.sqrt(periods / 365)
+        if kind == "crypto":
+            return Decimal('1'), float(config["volatility"]) * math.sqrt(periods / (24 * 365))
+        return Decimal('1'), None
+
+    def _apply(self, principals: List[Decimal], factor: Decimal, noise: Optional[float]) -> List[Decimal]:
+        if noise is None:
+            return [max(principal * factor, Decimal('0')) for principal in principals]
+        # Movimento aleatório por investimento (uniforme em ±volatilidade × tempo)
+        return [max(principal * (1 + Decimal(str(random.uniform(-noise, noise)))), Decimal('0'))
+                for principal in principals]
+
+    def accrue(self, bucket: InvestmentBucket, periods: int) -> List[Decimal]:
+        """Valores atuais de todos os membros do bucket, na ordem de `bucket.ids`"""
+        factor, noise = self._growth(bucket.investment_type, bucket.rate, periods)
+        return self._apply(bucket.principals, factor, noise)
+
+    def advance(self, bucket: InvestmentBucket, periods: int) -> Tuple[List[Decimal], Optional[Decimal]]:
+        """Processa um bucket vencido: novos valores e dividendo a pagar"""
+        values = self.accrue(bucket, periods)
+        dividend = self.dividend_rate(bucket, periods)
+        bucket.accrued = periods
+        return values, dividend
+
+    def value_of(self, investment, now: Optional[datetime] = None) -> Decimal:
+        """Valor atual de um único investimento (ex.: no momento da retirada)"""
+        period = _PERIODS.get(investment.investment_type.value, timedelta(days=1))
+        periods = max(0, ((now or datetime.now()) - investment.created_at) // period)
+        factor, noise = self._growth(investment.investment_type, investment.interest_rate, periods)
+        return self._apply([investment.principal_amount], factor, noise)[0]
+
+    def dividend_rate(self, bucket: InvestmentBucket, periods: int) -> Optional[Decimal]:
+        """Fração do principal a pagar como dividendos ao avançar até `periods`.
+
+        Conta as datas de pagamento entre o último tick processado e este,
+        então um tick atrasado (ex.: após reiniciar) paga o que ficou para trás.
+        """
+        config = self.options[bucket.investment_type]
+        if "dividend_rate" not in config:
+            return None
+        frequency = config.get("dividend_frequency", "monthly")
+        interval = timedelta(days=_DIVIDEND_DAYS.get(frequency, 30))
+        payments = (periods * bucket.period) // interval - (bucket.accrued * bucket.period) // interval
+        if payments <= 0:
+            return None
+        return config["dividend_rate"] / _DIVIDEND_DIVISORS.get(frequency, 12) * payments
@@ -12,9 +12,19 @@ from decimal import Decimal, ROUND_HALF_UP
 from enum import Enum
 from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
+from pathlib import Path
 from pydantic import BaseModel, Field, validator
 import random
-import math
+
+try:
+    from ...core.leaderboard import LeaderboardIndex
+except ImportError:
+    # Importado como `features.*` com src no sys.path (bot.py)
+    from core.leaderboard import LeaderboardIndex
+from .accrual import ACCRUED_KEY, InvestmentAccrualEngine
+from .order_book import MarketOrderBooks
+from .storage import EconomyStore
+from .transaction_index import TransactionIndex
 
 # Importar sistemas core modernos (com fallbacks)
 try:
@@ -301,7 +311,7 @@ class EconomicIndicators(BaseModel):
 class ModernEconomySystem:
     """Sistema de Economia Virtual Avançado"""
     
-    def __init__(self, bot):
+    def __init__(self, bot, data_dir: Optional[Path] = None):
         self.bot = bot
         self.logger = SecureLogger("ModernEconomySystem")
         self.cache = SmartCache()
@@ -412,17 +422,31 @@ class ModernEconomySystem:
         # Dados em memória
         self.wallets: Dict[int, WalletModel] = {}
         self.transactions: Dict[str, TransactionModel] = {}
+        self.transaction_index = TransactionIndex()  # Histórico e volume diário por usuário
         self.shop_items: Dict[str, ShopItemModel] = {}
         self.user_inventories: Dict[int, List[UserInventoryItem]] = {}
         self.investments: Dict[str, InvestmentModel] = {}
+        self._user_investments: Dict[int, set] = {}  # IDs de investimentos por usuário
         self.market_orders: Dict[str, MarketOrderModel] = {}
+        self.order_books = MarketOrderBooks()  # Ordens ativas por (item, moeda)
         self.economic_indicators = EconomicIndicators()
         
         # Dados de usuário
         self.user_data: Dict[int, Dict[str, Any]] = {}
         
+        # Rendimento de investimentos em lotes, agendado por vencimento
+        self.accrual = InvestmentAccrualEngine(self.config["investment_options"])
+        self._investments_changed = asyncio.Event()
+        
+        # Rankings mantidos a cada alteração: "net_worth", um por moeda e "trade_volume"
+        self.rankings = LeaderboardIndex()
+        
+        # Persistência: snapshot + journal, gravando só o que mudou
+        self.store = EconomyStore(data_dir or Path("data") / "economy")
+        self._save_lock = asyncio.Lock()
+        
         # Inicialização
-        asyncio.create_task(self._initialize_system())
+        self._init_task = asyncio.create_task(self._initialize_system())
     
     async def _initialize_system(self):
         """Inicializar o sistema de economia"""
@@ -437,123 +461,121 @@ class ModernEconomySystem:
             self.logger.error(f"Erro ao inicializar sistema de economia: {e}")
     
     async def _load_data(self):
-        """Carregar dados do sistema"""
+        """Carregar dados do sistema (snapshot + replay do journal)"""
         try:
+            loop = asyncio.get_running_loop()
+            state = await loop.run_in_executor(None, self.store.load)
+            
             # Carregar carteiras
-            wallets_data = await self._load_json_file("economy_wallets.json")
-            for user_id_str, wallet_data in wallets_data.items():
-                user_id = int(user_id_str)
-                # Converter dados para modelo Pydantic
-                wallet_data['user_id'] = user_id
-                self.wallets[user_id] = WalletModel(**wallet_data)
+            for user_id_str, wallet_data in state.get("wallets", {}).items():
+                self.wallets[int(user_id_str)] = WalletModel(**wallet_data)
             
             # Carregar transações
-            transactions_data = await self._load_json_file("economy_transactions.json")
-            for transaction_id, transaction_data in transactions_data.items():
+            for transaction_id, transaction_data in state.get("transactions", {}).items():
                 self.transactions[transaction_id] = TransactionModel(**transaction_data)
+            self.transaction_index.rebuild(self.transactions.values())
             
             # Carregar itens da loja
-            shop_data = await self._load_json_file("economy_shop.json")
-            for item_id, item_data in shop_data.items():
+            for item_id, item_data in state.get("shop", {}).items():
                 self.shop_items[item_id] = ShopItemModel(**item_data)
             
             # Carregar inventários
-            inventories_data = await self._load_json_file("economy_inventories.json")
-            for user_id_str, items_data in inventories_data.items():
-                user_id = int(user_id_str)
-                self.user_inventories[user_id] = [
+            for user_id_str, items_data in state.get("inventories", {}).items():
+                self.user_inventories[int(user_id_str)] = [
                     UserInventoryItem(**item_data) for item_data in items_data
                 ]
             
             # Carregar investimentos
-            investments_data = await self._load_json_file("economy_investments.json")
-            for investment_id, investment_data in investments_data.items():
-                self.investments[investment_id] = InvestmentModel(**investment_data)
+            for investment_id, investment_data in state.get("investments", {}).items():
+                investment = InvestmentModel(**investment_data)
+                self.investments[investment_id] = investment
+                self._user_investments.setdefault(investment.user_id, set()).add(investment_id)
+                if investment.is_active:
+                    self.accrual.add(investment)
             
             # Carregar ordens do mercado
-            orders_data = await self._load_json_file("economy_market_orders.json")
-            for order_id, order_data in orders_data.items():
-                self.market_orders[order_id] = MarketOrderModel(**order_data)
+            for order_id, order_data in state.get("market_orders", {}).items():
+                order = MarketOrderModel(**order_data)
+                self.market_orders[order_id] = order
+                if order.status == MarketOrderStatus.ACTIVE:
+                    self.order_books.add(order)
             
             # Carregar indicadores econômicos
-            indicators_data = await self._load_json_file("economy_indicators.json")
+            indicators_data = state.get("indicators", {}).get("current")
             if indicators_data:
                 self.economic_indicators = EconomicIndicators(**indicators_data)
             
             # Carregar dados de usuário
-            self.user_data = await self._load_json_file("economy_user_data.json")
+            self.user_data = {
+                int(user_id_str): data for user_id_str, data in state.get("user_data", {}).items()
+            }
+            
+            # Reconstruir rankings
+            for user_id, data in state.get("user_data", {}).items():
+                if "trade_volume" in data:
+                    self.rankings.set_score(int(user_id), Decimal(data["trade_volume"]), "trade_volume")
+            for user_id in self.wallets:
+                self._update_rankings(user_id)
             
         except Exception as e:
             self.logger.error(f"Erro ao carregar dados da economia: {e}")
     
-    async def _load_json_file(self, filename: str) -> Dict[str, Any]:
-        """Carregar arquivo JSON"""
-        try:
-            # Implementar carregamento de arquivo
-            # Por enquanto retorna dicionário vazio
-            return {}
-        except Exception as e:
-            self.logger.error(f"Erro ao carregar {filename}: {e}")
-            return {}
+    def _mark_dirty(self, collection: str, key: Any):
+        """Marcar registro alterado para o próximo salvamento"""
+        self.store.mark(collection, key)
+    
+    def _serialize_record(self, collection: str, key: str) -> Optional[Any]:
+        """Serializar um registro em memória (None se foi removido)"""
+        if collection == "wallets":
+            wallet = self.wallets.get(int(key))
+            return wallet.model_dump(mode="json") if wallet else None
+        if collection == "inventories":
+            items = self.user_inventories.get(int(key))
+            return [item.model_dump(mode="json") for item in items] if items is not None else None
+        if collection == "user_data":
+            data = self.user_data.get(int(key))
+            return json.loads(json.dumps(data, default=str)) if data is not None else None
+        if collection == "indicators":
+            return self.economic_indicators.model_dump(mode="json")
+        
+        source = {
+            "transactions": self.transactions,
+            "shop": self.shop_items,
+            "investments": self.investments,
+            "market_orders": self.market_orders
+        }[collection]
+        model = source.get(key)
+        return model.model_dump(mode="json") if model else None
     
     async def _save_data(self):
-        """Salvar dados do sistema"""
-        try:
-            # Salvar carteiras
-            wallets_data = {
-                str(user_id): wallet.dict() for user_id, wallet in self.wallets.items()
-            }
-            await self._save_json_file("economy_wallets.json", wallets_data)
-            
-            # Salvar transações
-            transactions_data = {
-                transaction_id: transaction.dict() 
-                for transaction_id, transaction in self.transactions.items()
-            }
-            await self._save_json_file("economy_transactions.json", transactions_data)
-            
-            # Salvar itens da loja
-            shop_data = {
-                item_id: item.dict() for item_id, item in self.shop_items.items()
-            }
-            await self._save_json_file("economy_shop.json", shop_data)
-            
-            # Salvar inventários
-            inventories_data = {
-                str(user_id): [item.dict() for item in items]
-                for user_id, items in self.user_inventories.items()
-            }
-            await self._save_json_file("economy_inventories.json", inventories_data)
-            
-            # Salvar investimentos
-            investments_data = {
-                investment_id: investment.dict()
-                for investment_id, investment in self.investments.items()
-            }
-            await self._save_json_file("economy_investments.json", investments_data)
-            
-            # Salvar ordens do mercado
-            orders_data = {
-                order_id: order.dict() for order_id, order in self.market_orders.items()
-            }
-            await self._save_json_file("economy_market_orders.json", orders_data)
-            
-            # Salvar indicadores econômicos
-            await self._save_json_file("economy_indicators.json", self.economic_indicators.dict())
-            
-            # Salvar dados de usuário
-            await self._save_json_file("economy_user_data.json", self.user_data)
-            
-        except Exception as e:
-            self.logger.error(f"Erro ao salvar dados da economia: {e}")
-    
-    async def _save_json_file(self, filename: str, data: Dict[str, Any]):
-        """Salvar arquivo JSON"""
-        try:
-            # Implementar salvamento de arquivo
-            pass
-        except Exception as e:
-            self.logger.error(f"Erro ao salvar {filename}: {e}")
+        """Salvar dados alterados desde o último salvamento.
+        
+        Só os registros marcados como sujos são serializados e anexados ao
+        journal; o snapshot é compactado fora do event loop quando o journal
+        cresce demais.
+        """
+        async with self._save_lock:
+            try:
+                loop = asyncio.get_running_loop()
+                dirty = self.store.take_dirty()
+                try:
+                    records = [
+                        (collection, key, self._serialize_record(collection, key))
+                        for collection, keys in dirty.items()
+                        for key in keys
+                    ]
+                    if records:
+                        await loop.run_in_executor(None, self.store.append, records)
+                except BaseException:
+                    # Falha de serialização ou de disco: tentar de novo no próximo salvamento
+                    self.store.restore_dirty(dirty)
+                    raise
+                
+                if self.store.needs_compaction:
+                    await loop.run_in_executor(None, self.store.compact)
+                
+            except Exception as e:
+                self.logger.error(f"Erro ao salvar dados da economia: {e}")
     
     async def _create_default_shop_items(self):
         """Criar itens padrão da loja"""
@@ -615,6 +637,7 @@ class ModernEconomySystem:
         for item_data in default_items:
             if item_data["item_id"] not in self.shop_items:
                 self.shop_items[item_data["item_id"]] = ShopItemModel(**item_data)
+                self._mark_dirty("shop", item_data["item_id"])
     
     async def _start_background_tasks(self):
         """Iniciar tarefas em segundo plano"""
@@ -640,6 +663,9 @@ class ModernEconomySystem:
             # Inicializar saldos
             for currency in CurrencyType:
                 self.wallets[user_id].balances[currency] = CurrencyBalance(currency=currency)
+            
+            self._mark_dirty("wallets", user_id)
+            self._update_rankings(user_id)
         
         return self.wallets[user_id]
     
@@ -663,6 +689,8 @@ class ModernEconomySystem:
             if currency not in wallet.total_earned:
                 wallet.total_earned[currency] = Decimal('0')
             wallet.total_earned[currency] += amount
+            self._mark_dirty("wallets", user_id)
+            self._update_rankings(user_id)
             
             # Registrar transação
             await self._create_transaction(
@@ -711,6 +739,8 @@ class ModernEconomySystem:
             if currency not in wallet.total_spent:
                 wallet.total_spent[currency] = Decimal('0')
             wallet.total_spent[currency] += amount
+            self._mark_dirty("wallets", user_id)
+            self._update_rankings(user_id)
             
             # Registrar transação
             await self._create_transaction(
@@ -821,18 +851,7 @@ class ModernEconomySystem:
     
     async def _get_daily_transferred(self, user_id: int, currency: CurrencyType) -> Decimal:
         """Obter total transferido hoje pelo usuário"""
-        today = datetime.now().date()
-        total = Decimal('0')
-        
-        for transaction in self.transactions.values():
-            if (transaction.from_user_id == user_id and 
-                transaction.transaction_type == TransactionType.TRANSFER and
-                transaction.currency == currency and
-                transaction.created_at.date() == today and
-                transaction.status == TransactionStatus.COMPLETED):
-                total += transaction.amount
-        
-        return total
+        return self.transaction_index.daily_transferred(user_id, currency)
     
     # === MÉTODOS DE TRANSAÇÕES ===
     
@@ -845,6 +864,8 @@ class ModernEconomySystem:
                                  metadata: Dict[str, Any] = None) -> str:
         """Criar nova transação"""
         transaction_id = f"tx_{int(datetime.now().timestamp() * 1000)}_{random.randint(1000, 9999)}"
+        while transaction_id in self.transactions:
+            transaction_id = f"tx_{int(datetime.now().timestamp() * 1000)}_{random.randint(1000, 9999)}"
         
         transaction = TransactionModel(
             transaction_id=transaction_id,
@@ -860,6 +881,8 @@ class ModernEconomySystem:
         )
         
         self.transactions[transaction_id] = transaction
+        self.transaction_index.add(transaction)
+        self._mark_dirty("transactions", transaction_id)
         
         # Atualizar métricas
         await self.metrics.increment("economy.transactions.total")
@@ -867,18 +890,24 @@ class ModernEconomySystem:
         
         return transaction_id
     
-    async def get_transaction_history(self, user_id: int, limit: int = 50) -> List[TransactionModel]:
-        """Obter histórico de transações do usuário"""
-        user_transactions = []
-        
-        for transaction in self.transactions.values():
-            if transaction.from_user_id == user_id or transaction.to_user_id == user_id:
-                user_transactions.append(transaction)
-        
-        # Ordenar por data (mais recentes primeiro)
-        user_transactions.sort(key=lambda x: x.created_at, reverse=True)
-        
-        return user_transactions[:limit]
+    async def get_transaction_history(self, user_id: int, limit: int = 50,
+                                      before: Optional[str] = None) -> List[TransactionModel]:
+        """Obter histórico de transações do usuário (mais recentes primeiro)
+        
+        Para a próxima página, passe em `before` o ID da última transação
+        recebida.
+        """
+        cursor = None
+        if before is not None:
+            previous = self.transactions.get(before)
+            if previous is None:
+                return []
+            cursor = (previous.created_at, previous.transaction_id)
+        
+        return [
+            self.transactions[transaction_id]
+            for transaction_id in self.transaction_index.page(user_id, limit, cursor)
+        ]
     
     # === MÉTODOS DA LOJA ===
     
@@ -965,6 +994,7 @@ class ModernEconomySystem:
             # Atualizar estoque
             if item.stock is not None:
                 item.stock -= quantity
+                self._mark_dirty("shop", item_id)
             
             # Registrar transação
             transaction_id = await self._create_transaction(
@@ -1047,6 +1077,9 @@ class ModernEconomySystem:
                 expires_at=expires_at
             )
             self.user_inventories[user_id].append(new_item)
+        
+        self._mark_dirty("inventories", user_id)
+        self._update_rankings(user_id)
     
     async def get_user_inventory(self, user_id: int) -> List[Dict[str, Any]]:
         """Obter inventário do usuário com detalhes dos itens"""
@@ -1119,10 +1152,16 @@ class ModernEconomySystem:
                 principal_amount=amount,
                 current_value=amount,
                 interest_rate=investment_config.get("interest_rate", Decimal('0')),
-                maturity_date=maturity_date
+                maturity_date=maturity_date,
+                metadata={ACCRUED_KEY: 0}
             )
             
             self.investments[investment_id] = investment
+            self._user_investments.setdefault(user_id, set()).add(investment_id)
+            self.accrual.add(investment)
+            self._investments_changed.set()
+            self._mark_dirty("investments", investment_id)
+            self._update_rankings(user_id)
             
             # Registrar transação
             transaction_id = await self._create_transaction(
@@ -1191,6 +1230,9 @@ class ModernEconomySystem:
             
             # Marcar investimento como inativo
             investment.is_active = False
+            self.accrual.remove(investment_id)
+            self._mark_dirty("investments", investment_id)
+            self._update_rankings(user_id)
             
             # Registrar transação
             transaction_id = await self._create_transaction(
@@ -1219,11 +1261,10 @@ class ModernEconomySystem:
         """Obter investimentos do usuário"""
         user_investments = []
         
-        for investment in self.investments.values():
-            if investment.user_id == user_id and investment.is_active:
-                # Atualizar valor atual
-                await self._update_investment_value(investment)
-                
+        # Valores atualizados pelo motor de rendimento a cada vencimento
+        for investment_id in self._user_investments.get(user_id, ()):
+            investment = self.investments[investment_id]
+            if investment.is_active:
                 user_investments.append({
                     "investment_id": investment.investment_id,
                     "investment_type": investment.investment_type.value,
@@ -1241,68 +1282,9 @@ class ModernEconomySystem:
     
     async def _update_investment_value(self, investment: InvestmentModel):
         """Atualizar valor do investimento"""
-        investment_config = self.config["investment_options"][investment.investment_type]
-        
-        if investment.investment_type == InvestmentType.SAVINGS:
-            # Poupança com juros compostos
-            days_elapsed = (datetime.now() - investment.created_at).days
-            daily_rate = investment.interest_rate / 365
-            investment.current_value = investment.principal_amount * (1 + daily_rate) ** days_elapsed
-            
-        elif investment.investment_type == InvestmentType.STOCKS:
-            # Ações com volatilidade
-            volatility = investment_config["volatility"]
-            days_elapsed = (datetime.now() - investment.created_at).days
-            
-            # Simulação de movimento de preço com volatilidade
-            random_factor = random.uniform(-volatility, volatility)
-            time_factor = math.sqrt(days_elapsed / 365)  # Volatilidade aumenta com o tempo
-            
-            price_change = random_factor * time_factor
-            investment.current_value = investment.principal_amount * (1 + price_change)
-            
-        elif investment.investment_type == InvestmentType.BONDS:
-            # Títulos com juros fixos
-            days_elapsed = (datetime.now() - investment.created_at).days
-            daily_rate = investment.interest_rate / 365
-            investment.current_value = investment.principal_amount * (1 + daily_rate * days_elapsed)
-            
-        elif investment.investment_type == InvestmentType.CRYPTO:
-            # Criptomoedas com alta volatilidade
-            volatility = investment_config["volatility"]
-            hours_elapsed = (datetime.now() - investment.created_at).total_seconds() / 3600
-            
-            # Movimento mais frequente e volátil
-            random_factor = random.uniform(-volatility, volatility)
-            time_factor = math.sqrt(hours_elapsed / (24 * 365))  # Base horária
-            
-            price_change = random_factor * time_factor
-            investment.current_value = investment.principal_amount * (1 + price_change)
-            
-        elif investment.investment_type == InvestmentType.REAL_ESTATE:
-            # Imóveis com apreciação e custos
-            days_elapsed = (datetime.now() - investment.created_at).days
-            
-            appreciation_rate = investment_config["appreciation_rate"]
-            rental_yield = investment_config["rental_yield"]
-            maintenance_cost = investment_config["maintenance_cost"]
-            
-            # Apreciação do imóvel
-            daily_appreciation = appreciation_rate / 365
-            appreciated_value = investment.principal_amount * (1 + daily_appreciation) ** days_elapsed
-            
-            # Renda de aluguel
-            daily_rental = (investment.principal_amount * rental_yield) / 365
-            rental_income = daily_rental * days_elapsed
-            
-            # Custos de manutenção
-            daily_maintenance = (investment.principal_amount * maintenance_cost) / 365
-            maintenance_costs = daily_maintenance * days_elapsed
-            
-            investment.current_value = appreciated_value + rental_income - maintenance_costs
-        
-        # Garantir que o valor não seja negativo
-        investment.current_value = max(investment.current_value, Decimal('0'))
+        investment.current_value = self.accrual.value_of(investment)
+        self._mark_dirty("investments", investment.investment_id)
+        self._update_rankings(investment.user_id)
     
     # === MÉTODOS DO MERCADO P2P ===
     
@@ -1319,8 +1301,7 @@ class ModernEconomySystem:
             market_config = self.config["market_settings"]
             
             # Verificar número máximo de ordens por usuário
-            user_orders = sum(1 for order in self.market_orders.values() 
-                            if order.user_id == user_id and order.status == MarketOrderStatus.ACTIVE)
+            user_orders = self.order_books.user_order_count(user_id)
             
             if user_orders >= market_config["max_orders_per_user"]:
                 return {
@@ -1370,6 +1351,7 @@ class ModernEconomySystem:
             )
             
             self.market_orders[order_id] = order
+            self._mark_dirty("market_orders", order_id)
             
             # Tentar executar ordem imediatamente
             await self._try_execute_order(order_id)
@@ -1403,6 +1385,7 @@ class ModernEconomySystem:
             wallet.balances[currency] = CurrencyBalance(currency=currency)
         
         wallet.balances[currency].locked_amount += amount
+        self._mark_dirty("wallets", user_id)
     
     async def _unlock_currency(self, user_id: int, currency: CurrencyType, amount: Decimal):
         """Desbloquear moeda na carteira"""
@@ -1412,6 +1395,7 @@ class ModernEconomySystem:
                 Decimal('0'), 
                 wallet.balances[currency].locked_amount - amount
             )
+            self._mark_dirty("wallets", user_id)
     
     async def _remove_from_inventory(self, user_id: int, item_id: str, quantity: int):
         """Remover item do inventário"""
@@ -1436,6 +1420,8 @@ class ModernEconomySystem:
         self.user_inventories[user_id] = [
             item for item in self.user_inventories[user_id] if item.quantity > 0
         ]
+        self._mark_dirty("inventories", user_id)
+        self._update_rankings(user_id)
     
     async def _try_execute_order(self, order_id: str):
         """Tentar executar ordem no mercado"""
@@ -1447,39 +1433,22 @@ class ModernEconomySystem:
         if order.status != MarketOrderStatus.ACTIVE:
             return
         
-        # Buscar ordens compatíveis
-        compatible_orders = []
+        # Melhores contrapartes primeiro (prioridade preço-tempo)
+        book = self.order_books.book(order.item_id, order.currency)
         
-        for other_order_id, other_order in self.market_orders.items():
-            if (other_order_id != order_id and
-                other_order.status == MarketOrderStatus.ACTIVE and
-                other_order.item_id == order.item_id and
-                other_order.currency == order.currency and
-                other_order.order_type != order.order_type):
-                
-                # Verificar compatibilidade de preço
-                if order.order_type == MarketOrderType.BUY:
-                    if order.price_per_unit >= other_order.price_per_unit:
-                        compatible_orders.append(other_order)
-                else:  # SELL
-                    if order.price_per_unit <= other_order.price_per_unit:
-                        compatible_orders.append(other_order)
-        
-        # Ordenar por melhor preço
-        if order.order_type == MarketOrderType.BUY:
-            compatible_orders.sort(key=lambda x: x.price_per_unit)  # Menor preço primeiro
-        else:
-            compatible_orders.sort(key=lambda x: x.price_per_unit, reverse=True)  # Maior preço primeiro
-        
-        # Executar trades
-        for compatible_order in compatible_orders:
-            if order.remaining_quantity == 0:
-                break
-            
+        for compatible_order in book.crossing(order):
+            filled_before = compatible_order.filled_quantity
             trade_quantity = min(order.remaining_quantity, compatible_order.remaining_quantity)
             trade_price = compatible_order.price_per_unit  # Preço do maker
             
             await self._execute_trade(order, compatible_order, trade_quantity, trade_price)
+            
+            if compatible_order.filled_quantity == filled_before:
+                break  # Trade falhou; não insistir na mesma contraparte
+        
+        # O que sobrar fica no livro
+        if order.status == MarketOrderStatus.ACTIVE and order.remaining_quantity > 0:
+            self.order_books.add(order)
     
     async def _execute_trade(self, order1: MarketOrderModel, order2: MarketOrderModel,
                             quantity: int, price_per_unit: Decimal):
@@ -1507,13 +1476,23 @@ class ModernEconomySystem:
             # Atualizar ordens
             order1.filled_quantity += quantity
             order2.filled_quantity += quantity
+            self._mark_dirty("market_orders", order1.order_id)
+            self._mark_dirty("market_orders", order2.order_id)
             
             # Verificar se as ordens foram completamente preenchidas
             if order1.remaining_quantity == 0:
                 order1.status = MarketOrderStatus.FILLED
+                self.order_books.remove(order1.order_id)
             
             if order2.remaining_quantity == 0:
                 order2.status = MarketOrderStatus.FILLED
+                self.order_books.remove(order2.order_id)
+            
+            # Volume negociado conta para os dois lados
+            for user_id in {buyer_order.user_id, seller_order.user_id}:
+                volume = self.rankings.add_score(user_id, total_value, "trade_volume")
+                self.user_data.setdefault(user_id, {})["trade_volume"] = str(volume)
+                self._mark_dirty("user_data", user_id)
             
             # Registrar transações
             await self._create_transaction(
@@ -1573,6 +1552,8 @@ class ModernEconomySystem:
             
             # Marcar ordem como cancelada
             order.status = MarketOrderStatus.CANCELLED
+            self.order_books.remove(order_id)
+            self._mark_dirty("market_orders", order_id)
             
             return {"success": True, "message": "Ordem cancelada com sucesso"}
             
@@ -1584,35 +1565,14 @@ class ModernEconomySystem:
         """Obter ordens ativas no mercado"""
         buy_orders = []
         sell_orders = []
+        now = datetime.now()
         
-        for order in self.market_orders.values():
-            if order.status != MarketOrderStatus.ACTIVE:
-                continue
-            
-            if order.is_expired:
-                continue
-            
-            if item_id and order.item_id != item_id:
-                continue
-            
-            order_data = {
-                "order_id": order.order_id,
-                "user_id": order.user_id,
-                "item_id": order.item_id,
-                "quantity": order.remaining_quantity,
-                "price_per_unit": order.price_per_unit,
-                "total_price": order.price_per_unit * order.remaining_quantity,
-                "currency": order.currency.value,
-                "created_at": order.created_at,
-                "expires_at": order.expires_at
-            }
-            
-            if order.order_type == MarketOrderType.BUY:
-                buy_orders.append(order_data)
-            else:
-                sell_orders.append(order_data)
+        # Cada livro já devolve as ordens em prioridade preço-tempo
+        for book in self.order_books.books_for(item_id):
+            buy_orders.extend(self._order_summary(order) for order in book.side(True, now))
+            sell_orders.extend(self._order_summary(order) for order in book.side(False, now))
         
-        # Ordenar ordens
+        # Ordenar entre moedas/itens (estável: preserva a ordem de chegada)
         buy_orders.sort(key=lambda x: x["price_per_unit"], reverse=True)  # Maior preço primeiro
         sell_orders.sort(key=lambda x: x["price_per_unit"])  # Menor preço primeiro
         
@@ -1621,6 +1581,20 @@ class ModernEconomySystem:
             "sell_orders": sell_orders
         }
     
+    def _order_summary(self, order: MarketOrderModel) -> Dict[str, Any]:
+        """Dados públicos de uma ordem ativa"""
+        return {
+            "order_id": order.order_id,
+            "user_id": order.user_id,
+            "item_id": order.item_id,
+            "quantity": order.remaining_quantity,
+            "price_per_unit": order.price_per_unit,
+            "total_price": order.price_per_unit * order.remaining_quantity,
+            "currency": order.currency.value,
+            "created_at": order.created_at,
+            "expires_at": order.expires_at
+        }
+    
     # === MÉTODOS DE ANÁLISE E ESTATÍSTICAS ===
     
     async def get_user_economy_stats(self, user_id: int) -> Dict[str, Any]:
@@ -1670,36 +1644,69 @@ class ModernEconomySystem:
             "inventory_items": len(inventory)
         }
     
+    def _update_rankings(self, user_id: int):
+        """Atualizar a posição do usuário nos rankings de patrimônio e saldo
+        
+        Custa O(moedas + investimentos e itens do usuário) mais O(log n) por
+        ranking; é chamado sempre que saldo, inventário ou investimentos mudam.
+        """
+        wallet = self.wallets.get(user_id)
+        if wallet is None:
+            return
+        
+        total_wallet_value = Decimal('0')
+        for currency, balance in wallet.balances.items():
+            self.rankings.set_score(user_id, balance.amount, currency.value)
+            total_wallet_value += balance.amount
+        
+        total_investment_value = sum(
+            (self.investments[investment_id].current_value
+             for investment_id in self._user_investments.get(user_id, ())
+             if self.investments[investment_id].is_active),
+            Decimal('0')
+        )
+        
+        inventory_value = Decimal('0')
+        for inventory_item in self.user_inventories.get(user_id, ()):
+            shop_item = self.shop_items.get(inventory_item.item_id)
+            if shop_item and shop_item.price and not inventory_item.is_expired:
+                inventory_value += min(shop_item.price.values()) * inventory_item.quantity
+        
+        self.rankings.set_score(user_id, total_wallet_value + total_investment_value + inventory_value,
+                                "net_worth")
+    
     async def get_economy_leaderboard(self, category: str = "net_worth", limit: int = 10) -> List[Dict[str, Any]]:
-        """Obter ranking econômico"""
+        """Obter ranking econômico
+        
+        `category` é "net_worth", "trade_volume" ou o nome de uma moeda. Só os
+        usuários do top-N têm as estatísticas completas calculadas.
+        """
         leaderboard = []
         
-        for user_id in self.wallets.keys():
-            stats = await self.get_user_economy_stats(user_id)
-            
-            if category == "net_worth":
-                value = Decimal(stats["net_worth"])
-            elif category in stats["wallet_balances"]:
-                value = Decimal(stats["wallet_balances"][category])
-            else:
-                continue
-            
+        for position, (user_id, value) in enumerate(self.rankings.top(limit, category), start=1):
             leaderboard.append({
                 "user_id": user_id,
+                "rank": position,
                 "value": value,
-                "stats": stats
+                "stats": await self.get_user_economy_stats(user_id)
             })
         
-        # Ordenar por valor
-        leaderboard.sort(key=lambda x: x["value"], reverse=True)
-        
-        return leaderboard[:limit]
+        return leaderboard
+    
+    async def get_economy_rank(self, user_id: int, category: str = "net_worth") -> Dict[str, Any]:
+        """Obter a posição de um usuário em um ranking econômico"""
+        return {
+            "user_id": user_id,
+            "category": category,
+            "rank": self.rankings.rank(user_id, category),
+            "value": self.rankings.score(user_id, category, Decimal('0')),
+            "total_ranked": self.rankings.size(category)
+        }
     
     async def get_market_analytics(self) -> Dict[str, Any]:
         """Obter análises do mercado"""
         # Análise de ordens ativas
-        active_orders = [order for order in self.market_orders.values() 
-                        if order.status == MarketOrderStatus.ACTIVE]
+        active_orders = self.order_books.active_orders()
         
         # Análise por item
         item_analytics = {}
@@ -1757,70 +1764,75 @@ class ModernEconomySystem:
     # === TAREFAS EM SEGUNDO PLANO ===
     
     async def _process_investments_loop(self):
-        """Loop para processar investimentos"""
+        """Loop para processar investimentos
+        
+        Dorme até o próximo bucket vencer (ou até um investimento novo mudar
+        a agenda) e processa apenas os buckets vencidos.
+        """
         while True:
             try:
-                await asyncio.sleep(3600)  # A cada hora
+                next_due = self.accrual.next_due()
+                timeout = None if next_due is None else max(0.0, (next_due - datetime.now()).total_seconds())
                 
-                for investment in self.investments.values():
-                    if investment.is_active:
-                        await self._update_investment_value(investment)
-                        
-                        # Processar dividendos se aplicável
-                        await self._process_investment_dividends(investment)
+                self._investments_changed.clear()
+                try:
+                    await asyncio.wait_for(self._investments_changed.wait(), timeout)
+                    continue  # Agenda mudou; recalcular o próximo vencimento
+                except asyncio.TimeoutError:
+                    pass
+                
+                await self._accrue_due_investments()
                 
             except Exception as e:
                 self.logger.error(f"Erro no loop de investimentos: {e}")
+                await asyncio.sleep(60)
     
-    async def _process_investment_dividends(self, investment: InvestmentModel):
-        """Processar dividendos de investimentos"""
-        investment_config = self.config["investment_options"][investment.investment_type]
+    async def _accrue_due_investments(self, now: Optional[datetime] = None) -> int:
+        """Atualizar os buckets vencidos e pagar dividendos; retorna quantos investimentos foram processados"""
+        now = now or datetime.now()
+        processed = 0
         
-        if "dividend_rate" not in investment_config:
-            return
+        for bucket, periods in self.accrual.pop_due(now):
+            values, dividend_rate = self.accrual.advance(bucket, periods)
+            members = list(zip(bucket.ids, bucket.user_ids, bucket.principals))
+            
+            for (investment_id, _, _), value in zip(members, values):
+                investment = self.investments[investment_id]
+                investment.current_value = value
+                investment.metadata[ACCRUED_KEY] = periods
+                self._mark_dirty("investments", investment_id)
+            
+            for user_id in set(bucket.user_ids):
+                self._update_rankings(user_id)
+            
+            if dividend_rate is not None:
+                for investment_id, _, principal in members:
+                    investment = self.investments[investment_id]
+                    if investment.is_active:
+                        await self._pay_investment_dividend(investment, principal * dividend_rate, now)
+            
+            processed += len(members)
         
-        dividend_frequency = investment_config.get("dividend_frequency", "monthly")
+        return processed
+    
+    async def _pay_investment_dividend(self, investment: InvestmentModel, dividend_amount: Decimal,
+                                       now: datetime):
+        """Pagar dividendo de um investimento"""
+        await self.add_currency(investment.user_id, investment.currency, dividend_amount,
+                              f"Dividendo de investimento {investment.investment_id}")
         
-        # Verificar se é hora de pagar dividendos
-        now = datetime.now()
-        should_pay = False
-        
-        if dividend_frequency == "daily":
-            should_pay = (investment.last_dividend is None or 
-                         (now - investment.last_dividend).days >= 1)
-        elif dividend_frequency == "weekly":
-            should_pay = (investment.last_dividend is None or 
-                         (now - investment.last_dividend).days >= 7)
-        elif dividend_frequency == "monthly":
-            should_pay = (investment.last_dividend is None or 
-                         (now - investment.last_dividend).days >= 30)
-        
-        if should_pay:
-            dividend_rate = investment_config["dividend_rate"]
-            dividend_amount = investment.principal_amount * dividend_rate
-            
-            if dividend_frequency == "daily":
-                dividend_amount /= 365
-            elif dividend_frequency == "weekly":
-                dividend_amount /= 52
-            elif dividend_frequency == "monthly":
-                dividend_amount /= 12
-            
-            # Pagar dividendo
-            await self.add_currency(investment.user_id, investment.currency, dividend_amount,
-                                  f"Dividendo de investimento {investment.investment_id}")
-            
-            investment.last_dividend = now
-            
-            # Registrar transação
-            await self._create_transaction(
-                to_user_id=investment.user_id,
-                transaction_type=TransactionType.DIVIDEND,
-                currency=investment.currency,
-                amount=dividend_amount,
-                description=f"Dividendo de {investment.investment_type.value}",
-                metadata={"investment_id": investment.investment_id}
-            )
+        investment.last_dividend = now
+        self._mark_dirty("investments", investment.investment_id)
+        
+        # Registrar transação
+        await self._create_transaction(
+            to_user_id=investment.user_id,
+            transaction_type=TransactionType.DIVIDEND,
+            currency=investment.currency,
+            amount=dividend_amount,
+            description=f"Dividendo de {investment.investment_type.value}",
+            metadata={"investment_id": investment.investment_id}
+        )
     
     async def _cleanup_expired_orders_loop(self):
         """Loop para limpar ordens expiradas"""
@@ -1828,11 +1840,8 @@ class ModernEconomySystem:
             try:
                 await asyncio.sleep(1800)  # A cada 30 minutos
                 
-                expired_orders = []
-                
-                for order_id, order in self.market_orders.items():
-                    if order.status == MarketOrderStatus.ACTIVE and order.is_expired:
-                        expired_orders.append(order_id)
+                expired_orders = [order.order_id for order in self.order_books.active_orders()
+                                  if order.is_expired]
                 
                 for order_id in expired_orders:
                     order = self.market_orders[order_id]
@@ -1846,6 +1855,8 @@ class ModernEconomySystem:
                     
                     # Marcar como expirada
                     order.status = MarketOrderStatus.EXPIRED
+                    self.order_books.remove(order_id)
+                    self._mark_dirty("market_orders", order_id)
                     
                     self.logger.info(f"Ordem {order_id} expirada e recursos devolvidos")
                 
@@ -1885,6 +1896,7 @@ class ModernEconomySystem:
                 
                 # Atualizar timestamp
                 self.economic_indicators.last_updated = datetime.now()
+                self._mark_dirty("indicators", "current")
                 
             except Exception as e:
                 self.logger.error(f"Erro na atualização de indicadores: {e}")
@@ -1893,7 +1905,7 @@ class ModernEconomySystem:
         """Loop para salvar dados periodicamente"""
         while True:
             try:
-                await asyncio.sleep(300)  # A cada 5 minutos
+                await asyncio.sleep(60)  # A cada minuto (só grava o que mudou)
                 await self._save_data()
                 
             except Exception as e:
@@ -1950,6 +1962,7 @@ class ModernEconomySystem:
             # Atualizar dados do usuário
             user_data["last_daily_bonus"] = today
             user_data["daily_streak"] = current_streak
+            self._mark_dirty("user_data", user_id)
             
             return {
                 "success": True,
@@ -2005,8 +2018,7 @@ class ModernEconomySystem:
                 "total_transactions": len(self.transactions),
                 "total_shop_items": len(self.shop_items),
                 "active_investments": sum(1 for inv in self.investments.values() if inv.is_active),
-                "active_market_orders": sum(1 for order in self.market_orders.values() 
-                                           if order.status == MarketOrderStatus.ACTIVE),
+                "active_market_orders": len(self.order_books),
                 "cache_size": len(self.cache._cache) if hasattr(self.cache, '_cache') else 0,
                 "last_save": datetime.now().isoformat()
             }
@@ -2019,8 +2031,9 @@ class ModernEconomySystem:
         try:
             self.logger.info("Iniciando desligamento do sistema de economia...")
             
-            # Salvar todos os dados
+            # Salvar alterações pendentes e fechar o journal
             await self._save_data()
+            self.store.close()
             
             # Limpar cache
             if hasattr(self.cache, 'clear'):
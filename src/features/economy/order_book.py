@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Livro de Ofertas do Mercado P2P
+Um livro por (item, moeda) com prioridade preço-tempo: compras e vendas
+ficam em heaps ordenados por (preço, criação), com busca por ID e
+cancelamento preguiçoso. Encontrar a melhor contraparte custa O(log n),
+independente de quantas ordens estão abertas no mercado.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import heapq
+import itertools
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+# Heaps com mais entradas mortas que vivas são reconstruídos
+_COMPACT_MIN_SIZE = 64
+
+BookKey = Tuple[str, Any]
+
+
+def _is_buy(order) -> bool:
+    return order.order_type.value == "buy"
+
+
+class OrderBook:
+    """Ordens ativas de um item em uma moeda.
+
+    As entradas dos heaps são `(chave de preço, created_at, seq, order_id)`;
+    compras usam o preço negado para que o topo seja sempre o maior lance.
+    Remover uma ordem só a tira de `orders` — a entrada do heap é descartada
+    quando chega ao topo (ou na próxima compactação).
+    """
+
+    def __init__(self, item_id: str, currency: Any):
+        self.item_id = item_id
+        self.currency = currency
+        self.orders: Dict[str, Any] = {}
+        self._bids: List[tuple] = []
+        self._asks: List[tuple] = []
+        self._stale = {True: 0, False: 0}
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.orders
+
+    def _heap(self, buy: bool) -> List[tuple]:
+        return self._bids if buy else self._asks
+
+    def _entry(self, order) -> tuple:
+        price = -order.price_per_unit if _is_buy(order) else order.price_per_unit
+        return (price, order.created_at, next(self._seq), order.order_id)
+
+    def add(self, order):
+        """Coloca uma ordem no livro (idempotente)"""
+        if order.order_id in self.orders:
+            return
+        self.orders[order.order_id] = order
+        heapq.heappush(self._heap(_is_buy(order)), self._entry(order))
+
+    def discard(self, order_id: str) -> Optional[Any]:
+        """Tira a ordem do livro; a entrada no heap é limpa depois"""
+        order = self.orders.pop(order_id, None)
+        if order is not None:
+            buy = _is_buy(order)
+            self._stale[buy] += 1
+            heap = self._heap(buy)
+            if len(heap) > _COMPACT_MIN_SIZE and self._stale[buy] * 2 > len(heap):
+                self._compact(buy)
+        return order
+
+    def _compact(self, buy: bool):
+        heap = self._heap(buy)
+        heap[:] = [entry for entry in heap if entry[3] in self.orders]
+        heapq.heapify(heap)
+        self._stale[buy] = 0
+
+    def best(self, buy: bool, now: Optional[datetime] = None) -> Optional[Any]:
+        """Melhor ordem viva do lado pedido (maior compra ou menor venda).
+
+        Entradas canceladas, preenchidas ou expiradas saem do topo do heap.
+        Ordens expiradas continuam em `orders` até o sistema devolver os
+        recursos bloqueados delas.
+        """
+        heap = self._heap(buy)
+        now = now or datetime.now()
+        while heap:
+            order = self.orders.get(heap[0][3])
+            if order is not None and order.remaining_quantity > 0 and order.expires_at >= now:
+                return order
+            heapq.heappop(heap)
+            if order is None:
+                self._stale[buy] = max(0, self._stale[buy] - 1)
+        return None
+
+    def crossing(self, order, now: Optional[datetime] = None) -> Iterator[Any]:
+        """Contrapartes que cruzam o preço de `order`, da melhor para a pior.
+
+        O topo é consultado de novo a cada iteração, então o chamador pode
+        preencher ou remover a ordem devolvida antes de pedir a próxima.
+        """
+        buy = _is_buy(order)
+        while order.remaining_quantity > 0:
+            other = self.best(not buy, now)
+            if other is None:
+                return
+            if buy and other.price_per_unit > order.price_per_unit:
+                return
+            if not buy and other.price_per_unit < order.price_per_unit:
+                return
+            yield other
+
+    def side(self, buy: bool, now: Optional[datetime] = None) -> List[Any]:
+        """Ordens vivas de um lado em prioridade preço-tempo"""
+        now = now or datetime.now()
+        live = [entry for entry in self._heap(buy)
+                if entry[3] in self.orders and self.orders[entry[3]].expires_at >= now]
+        live.sort()
+        return [self.orders[entry[3]] for entry in live]
+
+
+class MarketOrderBooks:
+    """Índice de livros por (item, moeda), com busca por ID e por usuário"""
+
+    def __init__(self):
+        self.books: Dict[BookKey, OrderBook] = {}
+        self._by_order: Dict[str, OrderBook] = {}
+        self._by_item: Dict[str, Set[BookKey]] = {}
+        self._by_user: Dict[int, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_order)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self._by_order
+
+    def book(self, item_id: str, currency: Any) -> OrderBook:
+        key = (item_id, currency)
+        book = self.books.get(key)
+        if book is None:
+            book = self.books[key] = OrderBook(item_id, currency)
+            self._by_item.setdefault(item_id, set()).add(key)
+        return book
+
+    def add(self, order):
+        book = self.book(order.item_id, order.currency)
+        book.add(order)
+        self._by_order[order.order_id] = book
+        self._by_user.setdefault(order.user_id, set()).add(order.order_id)
+
+    def remove(self, order_id: str) -> Optional[Any]:
+        book = self._by_order.pop(order_id, None)
+        if book is None:
+            return None
+        order = book.discard(order_id)
+        user_orders = self._by_user.get(order.user_id)
+        if user_orders is not None:
+            user_orders.discard(order_id)
+            if not user_orders:
+                del self._by_user[order.user_id]
+        return order
+
+    def user_order_count(self, user_id: int) -> int:
+        return len(self._by_user.get(user_id, ()))
+
+    def books_for(self, item_id: Optional[str] = None) -> List[OrderBook]:
+        if item_id is None:
+            return list(self.books.values())
+        return [self.books[key] for key in self._by_item.get(item_id, ())]
+
+    def active_orders(self) -> List[Any]:
+        """Todas as ordens no livro, incluindo expiradas ainda não liquidadas"""
+        return [order for book in self.books.values() for order in book.orders.values()]
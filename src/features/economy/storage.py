@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistência da Economia Virtual
+Snapshot compactado + journal append-only (JSON Lines) com rastreamento de
+registros sujos. Cada salvamento grava apenas as carteiras, ordens etc.
+alteradas desde o anterior; o snapshot é reescrito periodicamente e os
+segmentos de journal já incorporados são apagados.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger('HawkBot.EconomyStore')
+
+SNAPSHOT_FILE = 'snapshot.json'
+JOURNAL_PREFIX = 'journal-'
+
+# (coleção, chave, dados) — dados None remove o registro
+JournalRecord = Tuple[str, str, Optional[Any]]
+
+
+class EconomyStore:
+    """Estado persistido da economia em `data_dir`.
+
+    O estado é um dicionário `coleção -> chave -> registro JSON`. O journal
+    é dividido em segmentos `journal-<seq>.jsonl`; cada linha carrega um
+    número de sequência, e o snapshot guarda a última sequência que já
+    contém. Na recuperação, o snapshot é carregado e as linhas com sequência
+    maior são reaplicadas, então uma queda no meio da compactação não perde
+    nem duplica alterações.
+    """
+
+    def __init__(self, data_dir: Path, fsync: bool = False, compact_threshold: int = 5000):
+        self.data_dir = Path(data_dir)
+        self.fsync = fsync
+        self.compact_threshold = compact_threshold
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self.dirty: Dict[str, Set[str]] = {}
+        self._seq = 0
+        self._journal_entries = 0
+        self._segment: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Recuperação
+    # ------------------------------------------------------------------
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.data_dir.glob(f'{JOURNAL_PREFIX}*.jsonl'),
+                      key=lambda path: int(path.stem[len(JOURNAL_PREFIX):]))
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Carrega o snapshot e reaplica o journal; retorna o estado"""
+        snapshot_path = self.data_dir / SNAPSHOT_FILE
+        snapshot_seq = 0
+        if snapshot_path.exists():
+            with open(snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.state = snapshot.get('collections', {})
+            snapshot_seq = self._seq = snapshot.get('seq', 0)
+
+        replayed = 0
+        for path in self._segments():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Linha parcial de uma escrita interrompida
+                        logger.warning(f"Entrada corrompida ignorada em {path.name}")
+                        continue
+                    if entry['seq'] <= snapshot_seq:
+                        continue
+                    self._apply(entry['c'], entry['k'], entry.get('d'))
+                    self._seq = max(self._seq, entry['seq'])
+                    replayed += 1
+
+        self._journal_entries = replayed
+        return self.state
+
+    def _apply(self, collection: str, key: str, data: Optional[Any]):
+        records = self.state.setdefault(collection, {})
+        if data is None:
+            records.pop(key, None)
+        else:
+            records[key] = data
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def mark(self, collection: str, key: Any):
+        """Marca um registro como alterado desde o último salvamento"""
+        self.dirty.setdefault(collection, set()).add(str(key))
+
+    def take_dirty(self) -> Dict[str, Set[str]]:
+        """Devolve e limpa o conjunto de registros sujos"""
+        dirty, self.dirty = self.dirty, {}
+        return dirty
+
+    def restore_dirty(self, dirty: Dict[str, Set[str]]):
+        """Devolve registros tirados por take_dirty cujo salvamento falhou"""
+        for collection, keys in dirty.items():
+            self.dirty.setdefault(collection, set()).update(keys)
+
+    def append(self, records: Iterable[JournalRecord]) -> int:
+        """Grava os registros no journal com um único write; retorna a quantidade"""
+        with self._lock:
+            lines = []
+            for collection, key, data in records:
+                self._seq += 1
+                self._apply(collection, key, data)
+                lines.append(json.dumps({'seq': self._seq, 'c': collection, 'k': key, 'd': data},
+                                        ensure_ascii=False, separators=(',', ':')))
+            if not lines:
+                return 0
+
+            if self._segment is None:
+                path = self.data_dir / f'{JOURNAL_PREFIX}{self._seq - len(lines) + 1}.jsonl'
+                self._segment = open(path, 'a', encoding='utf-8')
+            self._segment.write('\n'.join(lines) + '\n')
+            self._segment.flush()
+            if self.fsync:
+                os.fsync(self._segment.fileno())
+
+            self._journal_entries += len(lines)
+            return len(lines)
+
+    @property
+    def needs_compaction(self) -> bool:
+        """O journal já é maior que o limite e que o próprio estado"""
+        live = sum(len(records) for records in self.state.values())
+        return self._journal_entries >= max(self.compact_threshold, live)
+
+    def compact(self):
+        """Reescreve o snapshot e apaga os segmentos já incorporados.
+
+        Só a cópia rasa do estado e a troca de segmento acontecem sob o lock;
+        a serialização roda sem bloquear novas gravações no journal.
+        """
+        with self._lock:
+            collections = {name: dict(records) for name, records in self.state.items()}
+            seq = self._seq
+            old_segments = self._segments()
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+            self._journal_entries = 0
+
+        path = self.data_dir / SNAPSHOT_FILE
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'seq': seq, 'collections': collections}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        for segment in old_segments:
+            segment.unlink(missing_ok=True)
+
+    def close(self):
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'seq': self._seq,
+            'journal_entries': self._journal_entries,
+            'dirty': sum(len(keys) for keys in self.dirty.values()),
+            'records': {name: len(records) for name, records in self.state.items()}
+        }
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice de Transações por Usuário
+Mantém, para cada usuário, a lista de transações em ordem cronológica e
+contadores do volume transferido no dia por (usuário, moeda), atualizados
+no momento em que a transação é registrada. Verificar o limite diário custa
+O(1) e cada página do histórico custa O(log n + página).
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+from bisect import bisect_left, insort
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# (created_at, transaction_id) — ordena por tempo e desempata pelo ID
+IndexKey = Tuple[datetime, str]
+
+
+def _is_transfer(transaction) -> bool:
+    return transaction.transaction_type.value == "transfer"
+
+
+def _is_completed(transaction) -> bool:
+    return transaction.status.value == "completed"
+
+
+class TransactionIndex:
+    """Histórico por usuário e volume diário de transferências"""
+
+    def __init__(self):
+        self._by_user: Dict[int, List[IndexKey]] = {}
+        self._daily: Dict[Tuple[int, Any], Tuple[date, Decimal]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_user)
+
+    def add(self, transaction):
+        """Indexa uma transação recém-registrada"""
+        key = (transaction.created_at, transaction.transaction_id)
+        for user_id in {transaction.from_user_id, transaction.to_user_id}:
+            if user_id is None:
+                continue
+            entries = self._by_user.setdefault(user_id, [])
+            if not entries or entries[-1] <= key:
+                entries.append(key)
+            else:
+                insort(entries, key)
+
+        if _is_transfer(transaction) and _is_completed(transaction) and transaction.from_user_id is not None:
+            day = transaction.created_at.date()
+            counter = (transaction.from_user_id, transaction.currency)
+            current_day, total = self._daily.get(counter, (day, Decimal('0')))
+            if current_day == day:
+                self._daily[counter] = (day, total + transaction.amount)
+            elif current_day < day:
+                self._daily[counter] = (day, transaction.amount)
+
+    def rebuild(self, transactions: Iterable[Any]):
+        """Reconstrói o índice (ex.: após carregar do disco) com uma única ordenação"""
+        self._by_user.clear()
+        self._daily.clear()
+        for transaction in sorted(transactions, key=lambda t: (t.created_at, t.transaction_id)):
+            self.add(transaction)
+
+    def daily_transferred(self, user_id: int, currency: Any, today: Optional[date] = None) -> Decimal:
+        """Total transferido pelo usuário no dia"""
+        day, total = self._daily.get((user_id, currency), (None, Decimal('0')))
+        return total if day == (today or datetime.now().date()) else Decimal('0')
+
+    def count(self, user_id: int) -> int:
+        return len(self._by_user.get(user_id, ()))
+
+    def page(self, user_id: int, limit: int, before: Optional[IndexKey] = None) -> List[str]:
+        """IDs das transações do usuário, mais recentes primeiro.
+
+        `before` é a chave da última transação da página anterior; a página
+        seguinte começa logo depois dela.
+        """
+        entries = self._by_user.get(user_id)
+        if not entries or limit <= 0:
+            return []
+        end = bisect_left(entries, before) if before is not None else len(entries)
+        start = max(0, end - limit)
+        return [transaction_id for _, transaction_id in reversed(entries[start:end])]
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de Detecção Compilado para Moderação
+Compila padrões de toxicidade/phishing e listas de palavras uma única vez,
+com um pré-filtro de literais que evita rodar padrões que não podem casar.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+
+# Padrões por categoria
+DEFAULT_TOXICITY_PATTERNS: Dict[str, List[str]] = {
+    # Padrões de ódio
+    'hate_speech': [
+        r'\b(nazi|hitler|holocaust)\b',
+        r'\b(n[i1]gg[e3]r|n[i1]gg[a4])\b',
+        r'\b(f[a4]gg[o0]t|f[a4]g)\b',
+    ],
+    # Padrões de assédio
+    'harassment': [
+        r'\b(kill yourself|kys)\b',
+        r'\b(die|death|suicide)\b.*\b(you|yourself)\b',
+        r'\b(rape|molest)\b',
+    ],
+    # Padrões de spam
+    'spam_indicators': [
+        r'(.)\1{10,}',  # Caracteres repetidos
+        r'\b(free|win|prize|click|link)\b.*\b(now|here|this)\b',
+        r'(discord\.gg|bit\.ly|tinyurl)',
+    ],
+    # Padrões de phishing/scam
+    'phishing': [
+        r'\b(free nitro|discord gift|steam gift)\b',
+        r'\b(click here|download now|limited time)\b',
+        r'\b(verify account|suspended|banned)\b.*\b(click|link)\b',
+    ]
+}
+
+# Palavras tóxicas por categoria
+DEFAULT_TOXIC_WORDS: Dict[str, Set[str]] = {
+    'profanity': {
+        'porra', 'caralho', 'merda', 'bosta', 'cu', 'buceta',
+        'puta', 'fdp', 'filho da puta', 'vai se foder'
+    },
+    'discrimination': {
+        'viado', 'gay', 'bicha', 'traveco', 'negro', 'preto',
+        'macaco', 'gorila', 'nazista', 'hitler'
+    },
+    'toxicity': {
+        'idiota', 'burro', 'estupido', 'imbecil', 'retardado',
+        'cancer', 'aids', 'doente', 'mongoloid', 'lixo', 'trash'
+    },
+    'gaming_toxicity': {
+        'noob', 'ez', 'easy', 'rekt', 'owned', 'git gud',
+        'hack', 'hacker', 'cheater', 'cheat', 'aimbot'
+    }
+}
+
+
+def build_trie_pattern(words: Iterable[str]) -> str:
+    """Monta uma alternação fatorada por prefixo (trie) a partir das palavras.
+
+    `{'hack', 'hacker'}` vira `hack(?:er)?`, evitando que o motor de regex
+    teste cada palavra inteira em cada posição do texto.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}  # fim de palavra
+
+    def render(node: Dict[str, dict]) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + render(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            # Palavra pode terminar aqui: o restante é opcional
+            if len(branches) == 1 and len(branches[0]) > 1:
+                body = '(?:' + body + ')'
+            body += '?'
+        return body
+
+    return render(trie)
+
+
+# Prefixo "\b(alt1|alt2|...)" de um padrão; as alternativas viram literais-gatilho
+_LEADING_GROUP = re.compile(r'^(?:\\b)?\(([^()]*)\)')
+_CLASS_OR_CHAR = re.compile(r'\[([^\]\\^-]+)\]|\\(.)|(.)', re.DOTALL)
+_REGEX_META = set('.^$*+?{}[]()|')
+
+
+def extract_trigger_literals(pattern: str, max_expansions: int = 64) -> Optional[List[str]]:
+    """Extrai os literais dos quais ao menos um precisa aparecer em qualquer match.
+
+    Funciona para padrões que começam com um grupo de alternativas literais
+    (com classes simples como `[i1]`), ex.: `\\b(free nitro|discord gift)\\b`.
+    Retorna None quando o padrão não tem esse formato; ele então roda sempre.
+    """
+    head = _LEADING_GROUP.match(pattern)
+    if not head:
+        return None
+
+    literals: List[str] = []
+    for alternative in head.group(1).split('|'):
+        variants = ['']
+        for char_class, escaped, char in _CLASS_OR_CHAR.findall(alternative):
+            if char_class:
+                options = list(char_class)
+            elif escaped:
+                if escaped.isalnum():
+                    return None  # \w, \d, \b... não são literais
+                options = [escaped]
+            elif char in _REGEX_META:
+                return None
+            else:
+                options = [char]
+
+            variants = [v + o for v in variants for o in options]
+            if len(variants) > max_expansions:
+                return None
+
+        if not variants or not variants[0]:
+            return None
+        literals.extend(variants)
+
+    return literals
+
+
+class DetectionEngine:
+    """Detector compilado de padrões e palavras tóxicas.
+
+    - Padrões: cada padrão é compilado uma vez. Os literais-gatilho de todos
+      os padrões formam uma única regex (trie); uma passagem dela decide quais
+      padrões podem casar, e só esses são executados. Mensagens limpas custam
+      uma varredura em vez de uma `re.search` por padrão.
+    - Palavras: uma única regex (trie) com limites de palavra para todas as
+      listas, mapeando cada ocorrência de volta às suas categorias.
+    """
+
+    __slots__ = ('pattern_categories', 'word_categories', '_patterns', '_ungated',
+                 '_trigger_regex', '_trigger_index', '_word_regex', '_word_index')
+
+    def __init__(self, patterns: Optional[Mapping[str, Iterable[str]]] = None,
+                 words: Optional[Mapping[str, Iterable[str]]] = None):
+        patterns = DEFAULT_TOXICITY_PATTERNS if patterns is None else patterns
+        words = DEFAULT_TOXIC_WORDS if words is None else words
+
+        # (categoria, regex compilada) na ordem de declaração
+        self._patterns: List[Tuple[str, 're.Pattern']] = []
+        self._ungated: List[int] = []
+        trigger_index: Dict[str, Set[int]] = {}
+
+        for category, category_patterns in patterns.items():
+            for pattern in category_patterns:
+                pattern_id = len(self._patterns)
+                # O conteúdo já chega em minúsculas; IGNORECASE só é necessário
+                # (e só custa tempo) quando o próprio padrão tem maiúsculas
+                flags = re.DOTALL | (re.IGNORECASE if pattern != pattern.lower() else 0)
+                self._patterns.append((category, re.compile(pattern, flags)))
+
+                literals = extract_trigger_literals(pattern)
+                if literals is None:
+                    self._ungated.append(pattern_id)
+                else:
+                    for literal in literals:
+                        trigger_index.setdefault(literal.lower(), set()).add(pattern_id)
+
+        self.pattern_categories: Tuple[str, ...] = tuple(dict.fromkeys(c for c, _ in self._patterns))
+
+        # Um literal encontrado também ativa os padrões de literais que são seu prefixo
+        # (a trie casa o mais longo numa posição: "free nitro" cobre "free")
+        self._trigger_index: Dict[str, Tuple[int, ...]] = {}
+        for literal in trigger_index:
+            ids: Set[int] = set()
+            for end in range(1, len(literal) + 1):
+                ids.update(trigger_index.get(literal[:end], ()))
+            self._trigger_index[literal] = tuple(sorted(ids))
+
+        self._trigger_regex = re.compile(build_trie_pattern(trigger_index)) if trigger_index else None
+
+        # Índice palavra -> categorias (uma palavra pode estar em mais de uma lista)
+        self._word_index: Dict[str, Tuple[str, ...]] = {}
+        for category, category_words in words.items():
+            for word in category_words:
+                word = word.lower().strip()
+                if word:
+                    self._word_index[word] = self._word_index.get(word, ()) + (category,)
+        self.word_categories: Tuple[str, ...] = tuple(words.keys())
+
+        self._word_regex = None
+        if self._word_index:
+            self._word_regex = re.compile(
+                r'(?<!\w)(?:' + build_trie_pattern(self._word_index) + r')(?!\w)'
+            )
+
+    def _triggered_patterns(self, content_lower: str) -> Set[int]:
+        """Ids dos padrões cujos literais-gatilho aparecem na mensagem"""
+        candidates = set(self._ungated)
+        regex = self._trigger_regex
+        if regex is None:
+            return candidates
+
+        for match in regex.finditer(content_lower):
+            candidates.update(self._trigger_index[match.group(0)])
+
+            # finditer não sobrepõe matches: literais que começam dentro deste
+            # match são verificados aqui (raro, só ocorre em mensagens suspeitas)
+            for pos in range(match.start() + 1, match.end()):
+                inner = regex.match(content_lower, pos)
+                if inner:
+                    candidates.update(self._trigger_index[inner.group(0)])
+
+        return candidates
+
+    def match_patterns(self, content_lower: str) -> List[str]:
+        """Retorna as categorias de padrão presentes, na ordem de declaração"""
+        found: Set[str] = set()
+        for pattern_id in sorted(self._triggered_patterns(content_lower)):
+            category, regex = self._patterns[pattern_id]
+            if category not in found and regex.search(content_lower):
+                found.add(category)
+        return [category for category in self.pattern_categories if category in found]
+
+    def match_words(self, content_lower: str) -> Dict[str, Set[str]]:
+        """Retorna as palavras encontradas agrupadas por categoria"""
+        found: Dict[str, Set[str]] = {}
+        if self._word_regex is None:
+            return found
+
+        for match in self._word_regex.finditer(content_lower):
+            word = match.group(0)
+            for category in self._word_index[word]:
+                found.setdefault(category, set()).add(word)
+        return found
+
+    def scan(self, content: str) -> Tuple[List[str], Dict[str, Set[str]]]:
+        """Executa padrões e palavras sobre a mensagem (uma passagem de cada)"""
+        content_lower = content.lower()
+        return self.match_patterns(content_lower), self.match_words(content_lower)
+
+
+def merge_word_lists(base: Mapping[str, Iterable[str]],
+                     custom: Optional[Mapping[str, Iterable[str]]]) -> Dict[str, Set[str]]:
+    """Combina as listas padrão com as listas customizadas de um servidor"""
+    merged = {category: set(words) for category, words in base.items()}
+    for category, words in (custom or {}).items():
+        merged.setdefault(category, set()).update(w.lower().strip() for w in words)
+    return merged
@@ -13,9 +13,9 @@ import asyncio
 import re
 import json
 import hashlib
+import time
 from typing import Dict, List, Optional, Any, Set, Tuple, Union
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
@@ -82,9 +82,21 @@ except ImportError:
         async def is_rate_limited(self, key, limit, window): return False
         async def increment(self, key, window): pass
 
+from .detection import (
+    DetectionEngine, DEFAULT_TOXICITY_PATTERNS, DEFAULT_TOXIC_WORDS, merge_word_lists
+)
+from .spam_history import SpamHistory
+from .near_duplicate import NearDuplicateIndex, FloodMatch
+from .pipeline import ModerationPipeline, QueuedMessage
+
 # Configurar logger
 logger = SecureLogger('ModernModerationSystem')
 
+# Padrão para emojis customizados e Unicode
+EMOJI_PATTERN = re.compile(
+    r'<a?:[^:]+:[0-9]+>|[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]'
+)
+
 class ViolationType(Enum):
     """Tipos de violações detectadas"""
     SPAM = "spam"
@@ -138,12 +150,20 @@ class ModerationConfig(BaseModel):
     # Configurações de toxicidade
     toxicity_threshold: float = Field(default=0.7, ge=0.1, le=1.0)
     enable_ai_analysis: bool = Field(default=True, description="Usar análise de IA")
+    custom_toxic_words: Dict[str, List[str]] = Field(default_factory=dict,
+                                                     description="Palavras extras por categoria")
     
     # Configurações de raid
     raid_protection: bool = Field(default=True)
     max_joins_per_minute: int = Field(default=10, ge=1, le=100)
     new_account_threshold_days: int = Field(default=7, ge=1, le=365)
     
+    # Flood coordenado (mesma mensagem de várias contas)
+    flood_detection: bool = Field(default=True)
+    flood_min_users: int = Field(default=4, ge=2, le=50)
+    flood_time_window: int = Field(default=30, ge=5, le=300)
+    flood_similarity: float = Field(default=0.6, ge=0.3, le=1.0)
+    
     # Thresholds de punição
     warning_thresholds: Dict[int, str] = Field(default_factory=lambda: {
         3: "timeout",
@@ -192,52 +212,23 @@ class AIAnalyzer:
     """Analisador de IA para detecção avançada"""
     
     def __init__(self):
-        self.toxicity_patterns = {
-            # Padrões de ódio
-            'hate_speech': [
-                r'\b(nazi|hitler|holocaust)\b',
-                r'\b(n[i1]gg[e3]r|n[i1]gg[a4])\b',
-                r'\b(f[a4]gg[o0]t|f[a4]g)\b',
-            ],
-            # Padrões de assédio
-            'harassment': [
-                r'\b(kill yourself|kys)\b',
-                r'\b(die|death|suicide)\b.*\b(you|yourself)\b',
-                r'\b(rape|molest)\b',
-            ],
-            # Padrões de spam
-            'spam_indicators': [
-                r'(.)\1{10,}',  # Caracteres repetidos
-                r'\b(free|win|prize|click|link)\b.*\b(now|here|this)\b',
-                r'(discord\.gg|bit\.ly|tinyurl)',
-            ],
-            # Padrões de phishing/scam
-            'phishing': [
-                r'\b(free nitro|discord gift|steam gift)\b',
-                r'\b(click here|download now|limited time)\b',
-                r'\b(verify account|suspended|banned)\b.*\b(click|link)\b',
-            ]
-        }
+        self.toxicity_patterns = DEFAULT_TOXICITY_PATTERNS
         
         # Palavras tóxicas por categoria
-        self.toxic_words = {
-            'profanity': {
-                'porra', 'caralho', 'merda', 'bosta', 'cu', 'buceta',
-                'puta', 'fdp', 'filho da puta', 'vai se foder'
-            },
-            'discrimination': {
-                'viado', 'gay', 'bicha', 'traveco', 'negro', 'preto',
-                'macaco', 'gorila', 'nazista', 'hitler'
-            },
-            'toxicity': {
-                'idiota', 'burro', 'estupido', 'imbecil', 'retardado',
-                'cancer', 'aids', 'doente', 'mongoloid', 'lixo', 'trash'
-            },
-            'gaming_toxicity': {
-                'noob', 'ez', 'easy', 'rekt', 'owned', 'git gud',
-                'hack', 'hacker', 'cheater', 'cheat', 'aimbot'
-            }
-        }
+        self.toxic_words = DEFAULT_TOXIC_WORDS
+        
+        # Motor compilado padrão e motores por servidor (listas customizadas)
+        self.engine = DetectionEngine(self.toxicity_patterns, self.toxic_words)
+        self.guild_engines: Dict[int, DetectionEngine] = {}
+    
+    def compile_guild_words(self, guild_id: int, custom_words: Optional[Dict[str, List[str]]]):
+        """Compila as listas customizadas do servidor (uma vez por carga de config)"""
+        if custom_words:
+            self.guild_engines[guild_id] = DetectionEngine(
+                self.toxicity_patterns, merge_word_lists(self.toxic_words, custom_words)
+            )
+        else:
+            self.guild_engines.pop(guild_id, None)
     
     async def analyze_message(self, content: str, user_profile: UserProfile) -> Tuple[float, List[ViolationType], Dict[str, Any]]:
         """Analisa mensagem usando IA e retorna score de toxicidade"""
@@ -251,31 +242,28 @@ class AIAnalyzer:
         violations = []
         toxicity_score = 0.0
         
-        content_lower = content.lower()
+        engine = self.guild_engines.get(user_profile.guild_id, self.engine)
+        pattern_categories, word_matches = engine.scan(content)
         
         # Análise de padrões
-        for category, patterns in self.toxicity_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, content_lower, re.IGNORECASE):
-                    analysis_result['patterns_detected'].append(category)
-                    
-                    if category == 'hate_speech':
-                        violations.append(ViolationType.HATE_SPEECH)
-                        toxicity_score += 0.9
-                    elif category == 'harassment':
-                        violations.append(ViolationType.HARASSMENT)
-                        toxicity_score += 0.8
-                    elif category == 'phishing':
-                        violations.append(ViolationType.PHISHING)
-                        toxicity_score += 0.7
+        for category in pattern_categories:
+            analysis_result['patterns_detected'].append(category)
+            
+            if category == 'hate_speech':
+                violations.append(ViolationType.HATE_SPEECH)
+                toxicity_score += 0.9
+            elif category == 'harassment':
+                violations.append(ViolationType.HARASSMENT)
+                toxicity_score += 0.8
+            elif category == 'phishing':
+                violations.append(ViolationType.PHISHING)
+                toxicity_score += 0.7
         
         # Análise de palavras tóxicas
-        for category, words in self.toxic_words.items():
-            found_words = [word for word in words if word in content_lower]
-            if found_words:
-                analysis_result['word_categories'].append(category)
-                toxicity_score += len(found_words) * 0.1
-                violations.append(ViolationType.TOXIC_LANGUAGE)
+        for category, found_words in word_matches.items():
+            analysis_result['word_categories'].append(category)
+            toxicity_score += len(found_words) * 0.1
+            violations.append(ViolationType.TOXIC_LANGUAGE)
         
         # Análise comportamental baseada no perfil
         if user_profile.trust_score < 0.5:
@@ -328,58 +316,41 @@ class SpamDetector:
     def __init__(self, cache: SmartCache, metrics: MetricsCollector):
         self.cache = cache
         self.metrics = metrics
-        self.user_messages: Dict[int, deque] = defaultdict(lambda: deque(maxlen=20))
+        # Histórico em memória: ring buffer por (guild, usuário), sem serialização
+        self.history = SpamHistory(capacity=32, idle_ttl=120.0)
+        # Índice de quase-duplicatas entre usuários do mesmo servidor
+        self.duplicate_index = NearDuplicateIndex()
         self.similarity_threshold = 0.85
     
     async def check_spam(self, user_id: int, guild_id: int, content: str, config: ModerationConfig) -> Tuple[Optional[ViolationType], float]:
         """Verifica spam com análise avançada"""
-        now = datetime.now()
-        cache_key = f"spam_check:{guild_id}:{user_id}"
+        now = time.monotonic()
         
-        # Obter histórico do cache
-        user_history = await self.cache.get(cache_key) or []
-        
-        # Adicionar mensagem atual
-        message_data = {
-            'content': content.lower().strip(),
-            'timestamp': now.isoformat(),
-            'length': len(content)
-        }
-        user_history.append(message_data)
-        
-        # Manter apenas mensagens recentes
-        cutoff_time = now - timedelta(seconds=config.spam_time_window)
-        user_history = [
-            msg for msg in user_history 
-            if datetime.fromisoformat(msg['timestamp']) > cutoff_time
-        ]
-        
-        # Salvar no cache
-        await self.cache.set(cache_key, user_history, ttl=config.spam_time_window)
+        # Adicionar mensagem atual ao histórico
+        ring = self.history.record(guild_id, user_id, content.lower().strip(), now)
+        cutoff = now - config.spam_time_window
         
         confidence = 0.0
         
-        # Verificar frequência de mensagens
-        if len(user_history) > config.spam_message_limit:
+        # Verificar frequência de mensagens: a (limite+1)-ésima mais recente ainda está na janela
+        limit = config.spam_message_limit
+        if ring.size > limit and ring.timestamp_at(limit) > cutoff:
             confidence += 0.8
             await self.metrics.increment('moderation.spam.frequency_detected', 
                                        tags={'guild_id': guild_id})
             return ViolationType.SPAM, confidence
         
         # Verificar mensagens repetidas
-        if len(user_history) >= 3:
-            recent_contents = [msg['content'] for msg in user_history[-3:]]
-            if len(set(recent_contents)) == 1:  # Todas iguais
+        if ring.size >= 3 and ring.timestamp_at(2) > cutoff:
+            if ring.hash_at(0) == ring.hash_at(1) == ring.hash_at(2):  # Todas iguais
                 confidence += 0.9
                 await self.metrics.increment('moderation.spam.repeated_detected',
                                            tags={'guild_id': guild_id})
                 return ViolationType.REPEATED_MESSAGES, confidence
         
         # Verificar similaridade entre mensagens
-        if len(user_history) >= 2:
-            last_content = user_history[-1]['content']
-            prev_content = user_history[-2]['content']
-            similarity = self._calculate_similarity(last_content, prev_content)
+        if ring.size >= 2 and ring.timestamp_at(1) > cutoff:
+            similarity = self._calculate_similarity(ring.last_content, ring.prev_content)
             
             if similarity > self.similarity_threshold:
                 confidence += similarity
@@ -413,6 +384,23 @@ class SpamDetector:
         
         return len(intersection) / len(union) if union else 0.0
     
+    async def check_duplicate_flood(self, user_id: int, guild_id: int, content: str,
+                                    config: ModerationConfig) -> Optional[FloodMatch]:
+        """Verifica se a mensagem é cópia (quase idêntica) de mensagens de outras contas"""
+        if not config.flood_detection:
+            return None
+        
+        match = self.duplicate_index.check(
+            guild_id, user_id, content,
+            window=config.flood_time_window,
+            min_users=config.flood_min_users,
+            similarity_threshold=config.flood_similarity
+        )
+        if match:
+            await self.metrics.increment('moderation.spam.duplicate_flood_detected',
+                                       tags={'guild_id': guild_id})
+        return match
+    
     async def check_mention_spam(self, message: discord.Message, config: ModerationConfig) -> bool:
         """Verifica spam de menções"""
         total_mentions = len(message.mentions) + len(message.role_mentions)
@@ -423,9 +411,7 @@ class SpamDetector:
     
     async def check_emoji_spam(self, content: str, config: ModerationConfig) -> bool:
         """Verifica spam de emojis"""
-        # Padrão para emojis customizados e Unicode
-        emoji_pattern = r'<a?:[^:]+:[0-9]+>|[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]'
-        emojis = re.findall(emoji_pattern, content)
+        emojis = EMOJI_PATTERN.findall(content)
         return len(emojis) > config.emoji_limit
 
 class RaidProtection:
@@ -434,6 +420,31 @@ class RaidProtection:
     def __init__(self, cache: SmartCache, metrics: MetricsCollector):
         self.cache = cache
         self.metrics = metrics
+        # Último flood de mensagens por servidor (alimentado pelo SpamDetector)
+        self.message_floods: Dict[int, FloodMatch] = {}
+        self.flood_signal_ttl = 300  # segundos
+    
+    async def report_message_flood(self, guild_id: int, match: FloodMatch):
+        """Registra um flood coordenado de mensagens como sinal de raid"""
+        previous = self.message_floods.get(guild_id)
+        self.message_floods[guild_id] = match
+        
+        # Métrica apenas no início de cada onda
+        if previous is None or previous.first_seen != match.first_seen:
+            await self.metrics.increment('moderation.raid.message_flood',
+                                       tags={'guild_id': guild_id})
+    
+    def get_active_flood(self, guild_id: int) -> Optional[FloodMatch]:
+        """Flood de mensagens ainda recente no servidor, se houver.
+        
+        O prazo conta da última mensagem do flood, então uma onda em curso
+        continua ativa enquanto houver reports.
+        """
+        match = self.message_floods.get(guild_id)
+        if match and time.monotonic() - match.last_seen > self.flood_signal_ttl:
+            del self.message_floods[guild_id]
+            return None
+        return match
     
     async def check_raid(self, member: discord.Member, config: ModerationConfig) -> Tuple[bool, Dict[str, Any]]:
         """Verifica tentativa de raid"""
@@ -480,6 +491,12 @@ class RaidProtection:
         if new_account_ratio > 0.7:  # 70% de contas novas
             analysis['suspicious_patterns'].append('new_account_wave')
         
+        # Verificar flood coordenado de mensagens recente
+        active_flood = self.get_active_flood(guild_id)
+        if active_flood:
+            analysis['suspicious_patterns'].append('message_flood')
+            analysis['flood_accounts'] = active_flood.distinct_users
+        
         # Verificar avatars similares (possível bot farm)
         avatar_hashes = [j['avatar_hash'] for j in join_history if j['avatar_hash']]
         if len(avatar_hashes) > 3:
@@ -514,6 +531,9 @@ class ModernModerationSystem:
         self.spam_detector = SpamDetector(self.cache, self.metrics)
         self.raid_protection = RaidProtection(self.cache, self.metrics)
         
+        # Filas por servidor consumidas em micro-lotes
+        self.pipeline = ModerationPipeline(self._process_batch)
+        
         # Configurações por servidor
         self.guild_configs: Dict[int, ModerationConfig] = {}
         self.user_profiles: Dict[Tuple[int, int], UserProfile] = {}  # (user_id, guild_id)
@@ -524,6 +544,7 @@ class ModernModerationSystem:
             'violations_detected': 0,
             'actions_taken': 0,
             'ai_analyses_performed': 0,
+            'ai_analyses_skipped': 0,
             'false_positives': 0
         }
         
@@ -542,6 +563,10 @@ class ModernModerationSystem:
                 # Usar configuração padrão
                 self.guild_configs[guild_id] = ModerationConfig()
                 await self.save_guild_config(guild_id)
+            
+            self.ai_analyzer.compile_guild_words(
+                guild_id, getattr(self.guild_configs[guild_id], 'custom_toxic_words', None)
+            )
         
         return self.guild_configs[guild_id]
     
@@ -603,28 +628,78 @@ class ModernModerationSystem:
             
             await self.cache.set(cache_key, profile_dict, ttl=86400)  # 24 horas
     
-    async def process_message(self, message: discord.Message) -> bool:
+    def submit_message(self, message: discord.Message) -> bool:
+        """Enfileira a mensagem para análise em lote (não bloqueia o on_message)"""
+        if message.author.bot or not message.guild:
+            return False
+        
+        return self.pipeline.submit(message.guild.id, message)
+    
+    async def _process_batch(self, guild_id: int, batch: List[QueuedMessage], shed_load: bool):
+        """Analisa um micro-lote de mensagens de um servidor"""
+        config = await self.load_guild_config(guild_id)
+        
+        if config.enabled:
+            if shed_load:
+                await self.metrics.increment('moderation.pipeline.load_shed',
+                                           tags={'guild_id': guild_id})
+            
+            # Perfis de mensagens limpas são salvos uma vez por lote
+            dirty_profiles: Set[int] = set()
+            for item in batch:
+                try:
+                    violated = await self._analyze_message(item.message, config, skip_ai=shed_load)
+                except Exception as e:
+                    self.logger.error(f"Erro no processamento de mensagem: {e}")
+                    continue
+                if violated is False:
+                    dirty_profiles.add(item.message.author.id)
+            
+            for user_id in dirty_profiles:
+                await self.save_user_profile(user_id, guild_id)
+        
+        queue_stats = self.pipeline.get_guild_stats(guild_id)
+        await self.metrics.gauge('moderation.pipeline.queue_depth', queue_stats['depth'],
+                                tags={'guild_id': guild_id})
+        await self.metrics.gauge('moderation.pipeline.lag_seconds', queue_stats['lag_seconds'],
+                                tags={'guild_id': guild_id})
+    
+    async def process_message(self, message: discord.Message, skip_ai: bool = False) -> bool:
         """Processa mensagem para detecção de violações"""
         if message.author.bot or not message.guild:
             return False
         
+        # Carregar configuração
+        config = await self.load_guild_config(message.guild.id)
+        if not config.enabled:
+            return False
+        
+        violated = await self._analyze_message(message, config, skip_ai=skip_ai)
+        if violated is False:
+            await self.save_user_profile(message.author.id, message.guild.id)
+        
+        return bool(violated)
+    
+    async def _analyze_message(self, message: discord.Message, config: ModerationConfig,
+                               skip_ai: bool = False) -> Optional[bool]:
+        """Executa as verificações de uma mensagem.
+        
+        Retorna True se houve violação, False se a mensagem estava limpa (o
+        perfil foi atualizado em memória e precisa ser salvo) e None se a
+        mensagem não foi analisada.
+        """
         # Verificar rate limiting
         rate_key = f"moderation_check:{message.guild.id}:{message.author.id}"
         if await self.rate_limiter.is_rate_limited(rate_key, limit=10, window=60):
-            return False
+            return None
         
         await self.rate_limiter.increment(rate_key, window=60)
         
-        # Carregar configuração e perfil
-        config = await self.load_guild_config(message.guild.id)
-        if not config.enabled:
-            return False
-        
         user_profile = await self.get_user_profile(message.author.id, message.guild.id)
         
         # Verificar se é moderador
         if await self._is_moderator(message.author):
-            return False
+            return None
         
         self.stats['messages_processed'] += 1
         await self.metrics.increment('moderation.messages_processed',
@@ -641,6 +716,16 @@ class ModernModerationSystem:
             violations.append((spam_violation, spam_confidence, "Spam detectado"))
             max_confidence = max(max_confidence, spam_confidence)
         
+        # Flood coordenado entre contas (alimenta a proteção contra raids)
+        flood = await self.spam_detector.check_duplicate_flood(
+            message.author.id, message.guild.id, message.content, config
+        )
+        if flood:
+            violations.append((ViolationType.RAID_ATTEMPT, flood.similarity,
+                               f"Flood coordenado: {flood.distinct_users} contas com a mesma mensagem"))
+            max_confidence = max(max_confidence, flood.similarity)
+            await self.raid_protection.report_message_flood(message.guild.id, flood)
+        
         # Verificar menções em massa
         if await self.spam_detector.check_mention_spam(message, config):
             violations.append((ViolationType.MENTION_SPAM, 0.8, "Spam de menções"))
@@ -651,8 +736,10 @@ class ModernModerationSystem:
             violations.append((ViolationType.EMOJI_SPAM, 0.6, "Spam de emojis"))
             max_confidence = max(max_confidence, 0.6)
         
-        # Análise de IA para toxicidade
-        if config.enable_ai_analysis:
+        # Análise de IA para toxicidade (pulada quando o pipeline está sob pressão)
+        if config.enable_ai_analysis and skip_ai:
+            self.stats['ai_analyses_skipped'] += 1
+        elif config.enable_ai_analysis:
             toxicity_score, ai_violations, analysis_result = await self.ai_analyzer.analyze_message(
                 message.content, user_profile
             )
@@ -673,7 +760,6 @@ class ModernModerationSystem:
         user_profile.total_messages += 1
         user_profile.last_activity = datetime.now()
         user_profile.trust_score = min(user_profile.trust_score + 0.001, 1.0)  # Pequeno aumento na confiança
-        await self.save_user_profile(message.author.id, message.guild.id)
         
         return False
     
@@ -975,6 +1061,7 @@ class ModernModerationSystem:
     async def get_moderation_stats(self, guild_id: Optional[int] = None) -> Dict[str, Any]:
         """Obtém estatísticas de moderação"""
         stats = self.stats.copy()
+        stats['pipeline'] = self.pipeline.get_stats()
         
         if guild_id:
             # Estatísticas específicas do servidor
@@ -982,6 +1069,7 @@ class ModernModerationSystem:
             stats['guild_users_monitored'] = len(guild_users)
             stats['guild_total_violations'] = sum(len(p.violations) for p in guild_users)
             stats['guild_avg_trust_score'] = sum(p.trust_score for p in guild_users) / len(guild_users) if guild_users else 0
+            stats['guild_queue'] = self.pipeline.get_guild_stats(guild_id)
         
         return stats
     
@@ -993,6 +1081,9 @@ class ModernModerationSystem:
             if hasattr(config, key):
                 setattr(config, key, value)
         
+        if 'custom_toxic_words' in kwargs:
+            self.ai_analyzer.compile_guild_words(guild_id, config.custom_toxic_words)
+        
         await self.save_guild_config(guild_id)
         
         # Emitir evento
@@ -1039,6 +1130,9 @@ class ModernModerationSystem:
             cache_key = f"user_profile:{guild_id}:{user_id}"
             await self.cache.delete(cache_key)
             
+            # Remover histórico de mensagens do detector de spam
+            self.spam_detector.history.discard(guild_id, user_id)
+            
             # Emitir evento
             await self.events.emit('user_data_deleted', {
                 'user_id': user_id,
@@ -1052,6 +1146,10 @@ class ModernModerationSystem:
             self.logger.error(f"Erro ao deletar dados do usuário: {e}")
             return False
     
+    async def shutdown(self):
+        """Encerra os workers do pipeline de moderação"""
+        await self.pipeline.shutdown()
+    
     async def health_check(self) -> Dict[str, Any]:
         """Verifica saúde do sistema"""
         health_status = {
@@ -1079,6 +1177,12 @@ class ModernModerationSystem:
             rate_limited = await self.rate_limiter.is_rate_limited(test_rate_key, 1, 60)
             health_status['components']['rate_limiter'] = 'healthy' if not rate_limited else 'unhealthy'
             
+            # Pipeline de moderação
+            pipeline_stats = self.pipeline.get_stats()
+            health_status['components']['pipeline'] = (
+                'healthy' if pipeline_stats['max_lag_seconds'] < self.pipeline.shed_lag else 'degraded'
+            )
+            
         except Exception as e:
             health_status['status'] = 'unhealthy'
             health_status['error'] = str(e)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline de Moderação em Lotes
+Fila de ingestão limitada por servidor, consumida por workers que analisam
+mensagens em micro-lotes. O handler on_message só enfileira (sem await), e
+sob pressão o pipeline sinaliza descarte de carga para o processador.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueuedMessage:
+    """Mensagem aguardando análise"""
+    message: Any
+    enqueued_at: float
+
+
+# handler(guild_id, lote, descartar_carga)
+BatchHandler = Callable[[int, List[QueuedMessage], bool], Awaitable[None]]
+
+
+class GuildQueue:
+    """Fila e worker de um servidor"""
+
+    __slots__ = ('guild_id', 'queue', 'worker', 'processed', 'dropped', 'shed_batches',
+                 'last_lag')
+
+    def __init__(self, guild_id: int, max_size: int):
+        self.guild_id = guild_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.worker: Optional[asyncio.Task] = None
+        self.processed = 0
+        self.dropped = 0
+        self.shed_batches = 0
+        self.last_lag = 0.0
+
+
+class ModerationPipeline:
+    """Distribui mensagens em filas por servidor com workers limitados.
+
+    Cada servidor tem uma fila de até `max_queue_size` mensagens e um worker
+    que retira até `batch_size` por vez. Um semáforo global limita quantos
+    lotes são analisados em paralelo, para que um raid num servidor não tome
+    o event loop dos outros. Quando a fila passa de `shed_ratio` da
+    capacidade ou o atraso da mensagem mais antiga passa de `shed_lag`
+    segundos, o lote é marcado para descarte de carga (o processador pula a
+    análise de IA e mantém as verificações de spam). Com a fila cheia, novas
+    mensagens são descartadas e contabilizadas.
+    """
+
+    def __init__(self, handler: BatchHandler, max_queue_size: int = 1000,
+                 batch_size: int = 32, max_concurrent_batches: int = 4,
+                 shed_ratio: float = 0.5, shed_lag: float = 2.0,
+                 idle_timeout: float = 60.0):
+        self.handler = handler
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.shed_ratio = shed_ratio
+        self.shed_lag = shed_lag
+        self.idle_timeout = idle_timeout
+
+        self.guilds: Dict[int, GuildQueue] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent_batches)
+        self._closed = False
+
+    def submit(self, guild_id: int, message: Any) -> bool:
+        """Enfileira a mensagem sem bloquear; False se foi descartada"""
+        if self._closed:
+            return False
+
+        guild_queue = self.guilds.get(guild_id)
+        if guild_queue is None:
+            guild_queue = self.guilds[guild_id] = GuildQueue(guild_id, self.max_queue_size)
+
+        try:
+            guild_queue.queue.put_nowait(QueuedMessage(message, time.monotonic()))
+        except asyncio.QueueFull:
+            guild_queue.dropped += 1
+            return False
+
+        if guild_queue.worker is None or guild_queue.worker.done():
+            guild_queue.worker = asyncio.create_task(self._worker(guild_queue))
+        return True
+
+    async def _worker(self, guild_queue: GuildQueue):
+        """Consome a fila do servidor em micro-lotes até ficar ociosa"""
+        queue = guild_queue.queue
+        while True:
+            try:
+                first = await asyncio.wait_for(queue.get(), timeout=self.idle_timeout)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    guild_queue.worker = None
+                    return
+                continue
+
+            batch = [first]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            guild_queue.last_lag = time.monotonic() - first.enqueued_at
+            shed = (queue.qsize() + len(batch) >= self.max_queue_size * self.shed_ratio
+                    or guild_queue.last_lag >= self.shed_lag)
+            if shed:
+                guild_queue.shed_batches += 1
+
+            async with self._semaphore:
+                try:
+                    await self.handler(guild_queue.guild_id, batch, shed)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Erro ao processar lote de moderação do servidor "
+                                 f"{guild_queue.guild_id}: {e}")
+
+            guild_queue.processed += len(batch)
+            for _ in batch:
+                queue.task_done()
+
+    async def drain(self):
+        """Aguarda até todas as filas serem processadas"""
+        for guild_queue in list(self.guilds.values()):
+            await guild_queue.queue.join()
+
+    async def shutdown(self):
+        """Para de aceitar mensagens e cancela os workers"""
+        self._closed = True
+        workers = [g.worker for g in self.guilds.values() if g.worker and not g.worker.done()]
+        for worker in workers:
+            worker.cancel()
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def get_guild_stats(self, guild_id: int) -> Dict[str, Any]:
+        """Profundidade e atraso da fila de um servidor"""
+        guild_queue = self.guilds.get(guild_id)
+        if guild_queue is None:
+            return {'depth': 0, 'lag_seconds': 0.0, 'processed': 0, 'dropped': 0,
+                    'shed_batches': 0}
+        return {
+            'depth': guild_queue.queue.qsize(),
+            'lag_seconds': round(guild_queue.last_lag, 4),
+            'processed': guild_queue.processed,
+            'dropped': guild_queue.dropped,
+            'shed_batches': guild_queue.shed_batches
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas agregadas do pipeline"""
+        queues = list(self.guilds.values())
+        return {
+            'guilds': len(queues),
+            'active_workers': sum(1 for g in queues if g.worker and not g.worker.done()),
+            'queue_depth': sum(g.queue.qsize() for g in queues),
+            'max_lag_seconds': round(max((g.last_lag for g in queues), default=0.0), 4),
+            'processed': sum(g.processed for g in queues),
+            'dropped': sum(g.dropped for g in queues),
+            'shed_batches': sum(g.shed_batches for g in queues)
+        }
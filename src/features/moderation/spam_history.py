@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Histórico de Mensagens para Detecção de Spam
+Ring buffers de tamanho fixo por (servidor, usuário) com timestamps monotônicos
+e hashes de conteúdo, expirados por uma timing wheel quando o usuário fica ocioso.
+
+Autor: Desenvolvedor Sênior
+Versão: 1.0.0
+"""
+
+import time
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+
+HistoryKey = Tuple[int, int]  # (guild_id, user_id)
+
+
+class MessageRing:
+    """Ring buffer pré-alocado com as últimas mensagens de um usuário"""
+
+    __slots__ = ('timestamps', 'hashes', 'capacity', 'head', 'size',
+                 'last_content', 'prev_content', 'wheel_tick')
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.hashes = array('q', bytes(8 * capacity))
+        self.head = 0   # próxima posição de escrita
+        self.size = 0
+        self.last_content = ''
+        self.prev_content = ''
+        self.wheel_tick = -1
+
+    def append(self, timestamp: float, content: str):
+        """Registra uma mensagem sobrescrevendo a mais antiga"""
+        self.timestamps[self.head] = timestamp
+        self.hashes[self.head] = hash(content)
+        self.head = (self.head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+        self.prev_content = self.last_content
+        self.last_content = content
+
+    def timestamp_at(self, back: int) -> float:
+        """Timestamp da mensagem `back` posições atrás (0 = mais recente)"""
+        return self.timestamps[(self.head - 1 - back) % self.capacity]
+
+    def hash_at(self, back: int) -> int:
+        """Hash do conteúdo da mensagem `back` posições atrás (0 = mais recente)"""
+        return self.hashes[(self.head - 1 - back) % self.capacity]
+
+    def count_since(self, cutoff: float, limit: int) -> int:
+        """Quantas das últimas `limit` mensagens são posteriores a `cutoff`"""
+        count = 0
+        for back in range(min(limit, self.size)):
+            if self.timestamp_at(back) <= cutoff:
+                break
+            count += 1
+        return count
+
+    def last_seen(self) -> float:
+        """Timestamp da mensagem mais recente"""
+        return self.timestamp_at(0) if self.size else 0.0
+
+
+class SpamHistory:
+    """Histórico em memória de todos os usuários ativos.
+
+    Usuários sem mensagens por `idle_ttl` segundos são removidos por uma
+    timing wheel: cada ring é registrado no slot do tick da sua última
+    mensagem e, quando a roda passa pelo slot, só os que continuam ociosos
+    são descartados. Custo amortizado O(1) por mensagem.
+    """
+
+    def __init__(self, capacity: int = 32, idle_ttl: float = 120.0, tick: float = 1.0):
+        self.capacity = capacity
+        self.idle_ttl = idle_ttl
+        self.tick = tick
+        self.rings: Dict[HistoryKey, MessageRing] = {}
+
+        self._slots: List[Set[HistoryKey]] = [set() for _ in range(int(idle_ttl / tick) + 1)]
+        self._current_tick: Optional[int] = None
+        self.expired_count = 0
+
+    def record(self, guild_id: int, user_id: int, content: str,
+               now: Optional[float] = None) -> MessageRing:
+        """Adiciona a mensagem ao histórico do usuário e retorna o ring atualizado"""
+        if now is None:
+            now = time.monotonic()
+        self._advance(now)
+
+        key = (guild_id, user_id)
+        ring = self.rings.get(key)
+        if ring is None:
+            ring = self.rings[key] = MessageRing(self.capacity)
+
+        ring.append(now, content)
+
+        tick = self._current_tick
+        if ring.wheel_tick != tick:
+            ring.wheel_tick = tick
+            self._slots[tick % len(self._slots)].add(key)
+
+        return ring
+
+    def get(self, guild_id: int, user_id: int) -> Optional[MessageRing]:
+        """Obtém o ring de um usuário, se existir"""
+        return self.rings.get((guild_id, user_id))
+
+    def discard(self, guild_id: int, user_id: int):
+        """Remove o histórico de um usuário"""
+        self.rings.pop((guild_id, user_id), None)
+
+    def _advance(self, now: float):
+        """Gira a roda até o tick atual expirando os usuários ociosos"""
+        tick = int(now / self.tick)
+        previous = self._current_tick
+        self._current_tick = tick
+        if previous is None or tick == previous:
+            return
+
+        slot_count = len(self._slots)
+        expire_before = now - self.idle_ttl
+
+        # Slots que completaram uma volta desde o último avanço
+        for passed in range(max(previous, tick - slot_count) + 1, tick + 1):
+            slot = self._slots[passed % slot_count]
+            if not slot:
+                continue
+
+            keep = set()
+            for key in slot:
+                ring = self.rings.get(key)
+                if ring is None or ring.wheel_tick % slot_count != passed % slot_count:
+                    continue  # removido ou já registrado em outro slot
+                if ring.last_seen() <= expire_before:
+                    del self.rings[key]
+                    self.expired_count += 1
+                else:
+                    keep.add(key)
+            slot.clear()
+            slot.update(keep)
+
+    def __len__(self) -> int:
+        return len(self.rings)
@@ -34,7 +34,6 @@ try:
     from src.core.typed_config import TypedConfig
     from src.core.metrics_system import MetricsCollector
     from src.core.data_validator import DataValidator
-    from src.core.event_system import EventSystem
     from src.core.rate_limiter import RateLimiter
 except ImportError:
     # Fallback para sistemas não disponíveis
@@ -43,9 +42,17 @@ except ImportError:
     TypedConfig = None
     MetricsCollector = None
     DataValidator = None
-    EventSystem = None
     RateLimiter = None
 
+# Eventos no sistema global, onde o dashboard (LiveUpdateHub) escuta
+try:
+    from ...core.event_system import get_event_system
+except ImportError:
+    try:
+        from core.event_system import get_event_system
+    except ImportError:
+        get_event_system = None
+
 class TournamentStatus(Enum):
     """Status possíveis de um torneio"""
     REGISTRATION = "registration"  # Inscrições abertas
@@ -214,7 +221,7 @@ class ModernTournamentSystem:
         self.config = TypedConfig() if TypedConfig else None
         self.metrics = MetricsCollector() if MetricsCollector else None
         self.validator = DataValidator() if DataValidator else None
-        self.events = EventSystem() if EventSystem else None
+        self.events = get_event_system() if get_event_system else None
         self.rate_limiter = RateLimiter() if RateLimiter else None
         
         # Configurações padrão
@@ -17,6 +17,11 @@ from datetime import datetime, timedelta
 import os
 from urllib.parse import urlparse
 
+try:
+    from ..core.event_system import emit as emit_event
+except ImportError:
+    emit_event = None
+
 logger = logging.getLogger('HawkBot.MedalIntegration')
 
 class MedalIntegration:
@@ -143,6 +148,14 @@ class MedalIntegration:
             # Marcar como processado
             self.processed_clips.add(clip_id)
             
+            # Notificar ouvintes (ex.: stream em tempo real do dashboard)
+            if emit_event:
+                await emit_event('clip_added', {
+                    'clip_id': clip_id,
+                    'discord_user': clip_data['discord_user'],
+                    'guild_id': clip_data['guild_id']
+                }, 'medal_integration')
+            
             # Repostar no canal de clipes se necessário
             await self._repost_clip(message, clip_data)
             
@@ -1,18 +1,40 @@
 """Utilities module for the Discord bot.
 
 This module contains utility functions and classes used across the bot.
+Submodules are imported on first access (PEP 562), so importing one
+utility does not load the others (e.g. charts_system pulls matplotlib).
 """
 
-from .embed_templates import *
-from .emoji_system import *
-from .charts_system import *
-from .scheduler import *
-from .keep_alive import *
+import importlib
 
 __all__ = [
     'embed_templates',
-    'emoji_system', 
+    'emoji_system',
     'charts_system',
     'scheduler',
     'keep_alive'
-]
\ No newline at end of file
+]
+
+# Nomes públicos dos submódulos (antes importados com `*`) -> submódulo
+_EXPORTS = {
+    'EmbedTemplates': 'embed_templates',
+    'EmojiSystem': 'emoji_system',
+    'ChartGenerator': 'charts_system',
+    'ChartsSystem': 'charts_system',
+    'TaskScheduler': 'scheduler',
+    'KeepAlive': 'keep_alive',
+    'add_health_endpoint': 'keep_alive',
+}
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f'.{name}', __name__)
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    return getattr(importlib.import_module(f'.{module_name}', __name__), name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_EXPORTS))
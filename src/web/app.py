@@ -1,7 +1,7 @@
 import os
 import json
 from datetime import datetime, timedelta
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
 # from flask_socketio import SocketIO, emit
 import asyncio
@@ -9,15 +9,23 @@ import threading
 from core.storage import DataStorage
 from features.pubg.api import PUBGIntegration
 from core.rank import RankSystem
+from web.live_stream import LiveUpdateHub
 import logging
 import random
 
+try:
+    from core.event_system import get_event_system
+except ImportError:
+    get_event_system = None
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('WebDashboard')
 
 class WebDashboard:
-    def __init__(self, bot=None):
+    def __init__(self, bot=None, max_stream_clients: int = 100):
+        # max_stream_clients: cada cliente de /api/stream prende uma thread do
+        # servidor; com pool fixo use web.live_stream.stream_client_limit
         self.app = Flask(__name__, template_folder='templates', static_folder='static')
         self.app.config['SECRET_KEY'] = 'hawk_esports_secret_key_2024'
         CORS(self.app)
@@ -28,6 +36,21 @@ class WebDashboard:
         self.pubg_api = PUBGIntegration()
         self.bot = bot
         
+        # Canal de atualizações em tempo real (SSE)
+        self.live_hub = LiveUpdateHub(
+            load_data=self.storage.load_data,
+            providers={
+                'leaderboard': self._live_leaderboard,
+                'stats': lambda data: self._build_stats(data),
+                'tournaments': lambda data: {t['id']: t for t in self._build_tournaments(data)},
+                'clips': lambda data: {c['id']: c for c in self._build_clips(data)}
+            },
+            max_clients=max_stream_clients
+        )
+        if get_event_system:
+            self.live_hub.attach(get_event_system())
+        self.live_hub.start()
+        
         # Configurar rotas
         self.setup_routes()
         # self.setup_websocket_events()
@@ -90,6 +113,145 @@ class WebDashboard:
     #         'url': clip_data.get('url', '#')
     #     })
 
+    def _build_stats(self, data):
+        """Calcula as estatísticas gerais a partir dos dados"""
+        players_data = data.get('players', {})
+        
+        # Calcular estatísticas
+        total_players = len(players_data)
+        active_players = sum(1 for p in players_data.values() if (p.get('last_update') or 0) > (datetime.now().timestamp() - 604800))  # 7 dias
+        
+        # Obter dados de torneios
+        tournaments_data = data.get('tournaments', {})
+        active_tournaments = sum(1 for t in tournaments_data.values() if t.get('status') == 'active')
+        
+        # Obter dados de clipes
+        clips_data = data.get('medal_clips', {})
+        total_clips = len(clips_data)
+        
+        return {
+            'total_players': total_players,
+            'active_players': active_players,
+            'active_tournaments': active_tournaments,
+            'total_clips': total_clips
+        }
+
+    def _build_leaderboard(self, players_data, mode='squad', period='all', sort_by='kd_ratio', region='all'):
+        """Monta o leaderboard ordenado a partir dos dados dos jogadores"""
+        leaderboard = []
+        
+        # Calcular timestamp para filtro de período
+        now = datetime.now()
+        period_filter = None
+        if period == 'daily':
+            period_filter = now - timedelta(days=1)
+        elif period == 'weekly':
+            period_filter = now - timedelta(days=7)
+        elif period == 'monthly':
+            period_filter = now - timedelta(days=30)
+        
+        for discord_id, player_data in players_data.items():
+            # Filtro por período
+            if period_filter and 'last_update' in player_data:
+                try:
+                    last_update = datetime.fromtimestamp(player_data['last_update'])
+                    if last_update < period_filter:
+                        continue
+                except:
+                    continue
+            
+            # Filtro por região
+            if region != 'all' and player_data.get('shard', '').lower() != region.lower():
+                continue
+            
+            if 'pubg_stats' in player_data:
+                stats = player_data['pubg_stats'].get(mode, {})
+                if stats:
+                    kills = stats.get('kills', 0)
+                    deaths = stats.get('deaths', 0)
+                    wins = stats.get('wins', 0)
+                    matches = stats.get('roundsPlayed', 0)
+                    damage = stats.get('damageDealt', 0)
+                    
+                    player_entry = {
+                        'discord_id': discord_id,
+                        'pubg_name': player_data.get('pubg_name', 'Unknown'),
+                        'shard': player_data.get('shard', 'Unknown'),
+                        'kills': kills,
+                        'deaths': deaths,
+                        'kd_ratio': round(kills / max(deaths, 1), 2),
+                        'wins': wins,
+                        'matches': matches,
+                        'damage': damage,
+                        'avg_damage': round(damage / max(matches, 1), 2),
+                        'win_rate': round((wins / max(matches, 1)) * 100, 2),
+                        'last_update': player_data.get('last_update', 0)
+                    }
+                    leaderboard.append(player_entry)
+        
+        # Ordenar por critério selecionado
+        sort_key_map = {
+            'kd_ratio': lambda x: x['kd_ratio'],
+            'kills': lambda x: x['kills'],
+            'wins': lambda x: x['wins'],
+            'damage': lambda x: x['damage'],
+            'avg_damage': lambda x: x['avg_damage'],
+            'win_rate': lambda x: x['win_rate'],
+            'matches': lambda x: x['matches']
+        }
+        
+        if sort_by in sort_key_map:
+            leaderboard.sort(key=sort_key_map[sort_by], reverse=True)
+        else:
+            leaderboard.sort(key=lambda x: x['kd_ratio'], reverse=True)
+        
+        return leaderboard
+
+    def _live_leaderboard(self, data):
+        """Snapshot do leaderboard padrão (squad, K/D) para o stream"""
+        leaderboard = self._build_leaderboard(data.get('players', {}))
+        return {entry['discord_id']: entry for entry in leaderboard[:50]}
+
+    def _build_tournaments(self, data):
+        """Monta a lista de torneios"""
+        tournaments_data = data.get('tournaments', {})
+        tournaments = []
+        
+        for tournament_id, tournament in tournaments_data.items():
+            tournaments.append({
+                'id': tournament_id,
+                'name': tournament.get('name', 'Unknown'),
+                'type': tournament.get('type', 'single_elimination'),
+                'status': tournament.get('status', 'pending'),
+                'participants': len(tournament.get('participants', [])),
+                'max_participants': tournament.get('max_participants', 16),
+                'created_at': tournament.get('created_at', ''),
+                'prize': tournament.get('prize', 'N/A')
+            })
+        
+        return tournaments
+
+    def _build_clips(self, data, limit=10):
+        """Monta a lista dos clipes mais recentes"""
+        clips_data = data.get('medal_clips', {})
+        clips = []
+        
+        for clip_id, clip in clips_data.items():
+            clips.append({
+                'id': clip_id,
+                'title': clip.get('title', 'Clip sem título'),
+                'player': clip.get('player_name', 'Unknown'),
+                'game': clip.get('game', 'PUBG'),
+                'url': clip.get('url', ''),
+                'created_at': clip.get('created_at', ''),
+                'views': clip.get('views', 0)
+            })
+        
+        # Ordenar por data de criação (mais recentes primeiro)
+        clips.sort(key=lambda x: x['created_at'], reverse=True)
+        
+        return clips[:limit]
+
     def setup_routes(self):
         """Configurar todas as rotas do dashboard"""
         
@@ -156,29 +318,9 @@ class WebDashboard:
         def get_stats():
             """API para obter estatísticas gerais"""
             try:
-                # Obter dados dos jogadores registrados
-                data = self.storage.load_data()
-                players_data = data.get('players', {})
-                
-                # Calcular estatísticas
-                total_players = len(players_data)
-                active_players = sum(1 for p in players_data.values() if (p.get('last_update') or 0) > (datetime.now().timestamp() - 604800))  # 7 dias
-                
-                # Obter dados de torneios
-                tournaments_data = data.get('tournaments', {})
-                active_tournaments = sum(1 for t in tournaments_data.values() if t.get('status') == 'active')
-                
-                # Obter dados de clipes
-                clips_data = data.get('medal_clips', {})
-                total_clips = len(clips_data)
-                
-                stats = {
-                    'total_players': total_players,
-                    'active_players': active_players,
-                    'active_tournaments': active_tournaments,
-                    'total_clips': total_clips,
-                    'last_update': datetime.now().isoformat()
-                }
+                # Servido a partir do snapshot mantido pelo canal de tempo real
+                stats = dict(self.live_hub.snapshot('stats'))
+                stats['last_update'] = datetime.now().isoformat()
                 
                 return jsonify(stats)
             except Exception as e:
@@ -195,75 +337,14 @@ class WebDashboard:
                 limit = int(request.args.get('limit', 20))
                 region = request.args.get('region', 'all')
                 
-                # Obter dados dos jogadores
-                data = self.storage.load_data()
-                players_data = data.get('players', {})
-                leaderboard = []
-                
-                # Calcular timestamp para filtro de período
-                now = datetime.now()
-                period_filter = None
-                if period == 'daily':
-                    period_filter = now - timedelta(days=1)
-                elif period == 'weekly':
-                    period_filter = now - timedelta(days=7)
-                elif period == 'monthly':
-                    period_filter = now - timedelta(days=30)
-                
-                for discord_id, player_data in players_data.items():
-                    # Filtro por período
-                    if period_filter and 'last_update' in player_data:
-                        try:
-                            last_update = datetime.fromtimestamp(player_data['last_update'])
-                            if last_update < period_filter:
-                                continue
-                        except:
-                            continue
-                    
-                    # Filtro por região
-                    if region != 'all' and player_data.get('shard', '').lower() != region.lower():
-                        continue
-                    
-                    if 'pubg_stats' in player_data:
-                        stats = player_data['pubg_stats'].get(mode, {})
-                        if stats:
-                            kills = stats.get('kills', 0)
-                            deaths = stats.get('deaths', 0)
-                            wins = stats.get('wins', 0)
-                            matches = stats.get('roundsPlayed', 0)
-                            damage = stats.get('damageDealt', 0)
-                            
-                            player_entry = {
-                                'discord_id': discord_id,
-                                'pubg_name': player_data.get('pubg_name', 'Unknown'),
-                                'shard': player_data.get('shard', 'Unknown'),
-                                'kills': kills,
-                                'deaths': deaths,
-                                'kd_ratio': round(kills / max(deaths, 1), 2),
-                                'wins': wins,
-                                'matches': matches,
-                                'damage': damage,
-                                'avg_damage': round(damage / max(matches, 1), 2),
-                                'win_rate': round((wins / max(matches, 1)) * 100, 2),
-                                'last_update': player_data.get('last_update', 0)
-                            }
-                            leaderboard.append(player_entry)
-                
-                # Ordenar por critério selecionado
-                sort_key_map = {
-                    'kd_ratio': lambda x: x['kd_ratio'],
-                    'kills': lambda x: x['kills'],
-                    'wins': lambda x: x['wins'],
-                    'damage': lambda x: x['damage'],
-                    'avg_damage': lambda x: x['avg_damage'],
-                    'win_rate': lambda x: x['win_rate'],
-                    'matches': lambda x: x['matches']
-                }
-                
-                if sort_by in sort_key_map:
-                    leaderboard.sort(key=sort_key_map[sort_by], reverse=True)
+                # Visão padrão vem do snapshot em cache; filtros recalculam
+                if (mode, period, sort_by, region) == ('squad', 'all', 'kd_ratio', 'all') and limit <= 50:
+                    leaderboard = list(self.live_hub.snapshot('leaderboard').values())
                 else:
-                    leaderboard.sort(key=lambda x: x['kd_ratio'], reverse=True)
+                    data = self.storage.load_data()
+                    leaderboard = self._build_leaderboard(
+                        data.get('players', {}), mode, period, sort_by, region
+                    )
                 
                 return jsonify(leaderboard[:limit])
             except Exception as e:
@@ -274,23 +355,7 @@ class WebDashboard:
         def get_tournaments():
             """API para obter torneios"""
             try:
-                data = self.storage.load_data()
-                tournaments_data = data.get('tournaments', {})
-                tournaments = []
-                
-                for tournament_id, tournament in tournaments_data.items():
-                    tournaments.append({
-                        'id': tournament_id,
-                        'name': tournament.get('name', 'Unknown'),
-                        'type': tournament.get('type', 'single_elimination'),
-                        'status': tournament.get('status', 'pending'),
-                        'participants': len(tournament.get('participants', [])),
-                        'max_participants': tournament.get('max_participants', 16),
-                        'created_at': tournament.get('created_at', ''),
-                        'prize': tournament.get('prize', 'N/A')
-                    })
-                
-                return jsonify(tournaments)
+                return jsonify(list(self.live_hub.snapshot('tournaments').values()))
             except Exception as e:
                 logger.error(f"Erro ao obter torneios: {e}")
                 return jsonify([])  # Retornar array vazio em caso de erro
@@ -299,29 +364,40 @@ class WebDashboard:
         def get_clips():
             """API para obter clipes recentes"""
             try:
-                data = self.storage.load_data()
-                clips_data = data.get('medal_clips', {})
-                clips = []
-                
-                for clip_id, clip in clips_data.items():
-                    clips.append({
-                        'id': clip_id,
-                        'title': clip.get('title', 'Clip sem título'),
-                        'player': clip.get('player_name', 'Unknown'),
-                        'game': clip.get('game', 'PUBG'),
-                        'url': clip.get('url', ''),
-                        'created_at': clip.get('created_at', ''),
-                        'views': clip.get('views', 0)
-                    })
-                
-                # Ordenar por data de criação (mais recentes primeiro)
-                clips.sort(key=lambda x: x['created_at'], reverse=True)
-                
-                return jsonify(clips[:10])  # 10 clipes mais recentes
+                return jsonify(list(self.live_hub.snapshot('clips').values()))  # 10 clipes mais recentes
             except Exception as e:
                 logger.error(f"Erro ao obter clipes: {e}")
                 return jsonify([])  # Retornar array vazio em caso de erro
         
+        @self.app.route('/api/stream')
+        def live_stream():
+            """Stream SSE com diffs de leaderboard, stats, torneios e clipes.
+            
+            Cada conexão ocupa uma thread do servidor até fechar; acima de
+            max_stream_clients a conexão é recusada com 503.
+            """
+            channels = request.args.get('channels')
+            client = self.live_hub.subscribe(channels.split(',') if channels else None)
+            if client is None:
+                return jsonify({'error': 'Limite de conexões atingido'}), 503
+            
+            def generate():
+                try:
+                    yield from self.live_hub.stream(client)
+                finally:
+                    self.live_hub.unsubscribe(client)
+            
+            return Response(
+                stream_with_context(generate()),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+        
+        @self.app.route('/api/stream/stats')
+        def live_stream_stats():
+            """Estatísticas do canal de tempo real"""
+            return jsonify(self.live_hub.get_stats())
+        
         @self.app.route('/api/player/<discord_id>')
         def get_player_details(discord_id):
             """API para obter detalhes de um jogador específico"""
@@ -0,0 +1,355 @@
+"""Canal de atualizações em tempo real (Server-Sent Events) do dashboard.
+
+Este módulo fornece:
+- Snapshots em cache por canal (leaderboard, stats, clips, tournaments)
+- Recalculo apenas dos canais marcados como sujos por eventos
+- Envio de diffs (upsert/remove/order) em vez do payload completo
+- Coalescência por cliente: várias mudanças pendentes viram um único frame
+- Backpressure: clientes lentos recebem um snapshot completo em vez de fila infinita
+
+Cada cliente conectado ocupa uma thread do servidor WSGI durante toda a
+conexão (o gerador do stream bloqueia à espera do próximo frame). Com um
+pool fixo de threads (waitress), `max_clients` precisa ficar abaixo do
+tamanho do pool, com folga para as demais rotas; ver stream_client_limit.
+"""
+
+import json
+import logging
+import threading
+import time
+import itertools
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+logger = logging.getLogger('WebDashboard.LiveStream')
+
+# Eventos do EventSystem que invalidam cada canal
+EVENT_CHANNELS: Dict[str, Tuple[str, ...]] = {
+    'ranking_updated': ('leaderboard', 'stats'),
+    'clip_added': ('clips', 'stats'),
+    'tournament_created': ('tournaments', 'stats'),
+    'participant_registered': ('tournaments',),
+    'tournament_started': ('tournaments', 'stats'),
+    'tournament_round_advanced': ('tournaments',),
+    'tournament_finished': ('tournaments', 'stats'),
+    'tournament_cancelled': ('tournaments', 'stats'),
+}
+
+
+def _merge_diff(pending: Dict[str, Any], diff: Dict[str, Any]):
+    """Funde um diff novo no diff pendente de um cliente (coalescência)"""
+    upsert = pending.setdefault('upsert', {})
+    remove = pending.setdefault('remove', set())
+
+    for key in diff.get('remove', ()):
+        upsert.pop(key, None)
+        remove.add(key)
+
+    for key, row in diff.get('upsert', {}).items():
+        remove.discard(key)
+        upsert[key] = row
+
+    if 'order' in diff:
+        pending['order'] = diff['order']
+
+
+def compute_diff(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Calcula o diff entre dois snapshots de um canal.
+
+    Retorna None quando não há mudanças.
+    """
+    diff: Dict[str, Any] = {}
+
+    upsert = {key: row for key, row in new.items() if old.get(key) != row}
+    remove = [key for key in old if key not in new]
+    if upsert:
+        diff['upsert'] = upsert
+    if remove:
+        diff['remove'] = remove
+
+    new_order = list(new.keys())
+    if new_order != list(old.keys()):
+        diff['order'] = new_order
+
+    return diff or None
+
+
+class LiveClient:
+    """Cliente conectado ao stream com fila coalescida e limitada"""
+
+    __slots__ = ('client_id', 'channels', 'max_pending_rows', '_pending',
+                 '_resync', '_cond', 'closed', 'dropped_frames', 'connected_at')
+
+    def __init__(self, client_id: int, channels: Iterable[str], max_pending_rows: int = 500):
+        self.client_id = client_id
+        self.channels: Set[str] = set(channels)
+        self.max_pending_rows = max_pending_rows
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._resync: Set[str] = set(self.channels)  # primeiro frame é sempre snapshot
+        self._cond = threading.Condition()
+        self.closed = False
+        self.dropped_frames = 0
+        self.connected_at = time.time()
+
+    def push(self, channel: str, diff: Dict[str, Any]):
+        """Enfileira um diff, fundindo com o que ainda não foi enviado"""
+        if channel not in self.channels:
+            return
+
+        with self._cond:
+            if channel not in self._resync:
+                pending = self._pending.setdefault(channel, {})
+                _merge_diff(pending, diff)
+
+                # Backpressure: cliente lento demais vira resync completo
+                pending_rows = len(pending['upsert']) + len(pending['remove'])
+                if pending_rows > self.max_pending_rows:
+                    del self._pending[channel]
+                    self._resync.add(channel)
+                    self.dropped_frames += 1
+
+            self._cond.notify()
+
+    def pull(self, timeout: float) -> Tuple[Set[str], Dict[str, Dict[str, Any]]]:
+        """Aguarda e retira os canais que precisam de snapshot e os diffs pendentes"""
+        with self._cond:
+            if not self._pending and not self._resync and not self.closed:
+                self._cond.wait(timeout)
+
+            resync, self._resync = self._resync, set()
+            pending, self._pending = self._pending, {}
+
+        for diff in pending.values():
+            diff['remove'] = sorted(diff.get('remove', ()))
+            if not diff['remove']:
+                del diff['remove']
+            if not diff.get('upsert'):
+                diff.pop('upsert', None)
+
+        return resync, pending
+
+    def close(self):
+        """Fecha o cliente e acorda o gerador do stream"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+
+def stream_client_limit(server_threads: int, reserved_threads: Optional[int] = None) -> int:
+    """Clientes SSE permitidos num servidor com `server_threads` threads.
+
+    Por padrão metade do pool (no mínimo 2 threads) fica reservada para as
+    requisições comuns do dashboard.
+    """
+    if reserved_threads is None:
+        reserved_threads = max(2, server_threads // 2)
+    return max(0, server_threads - reserved_threads)
+
+
+class LiveUpdateHub:
+    """Mantém snapshots por canal e distribui diffs para os clientes SSE"""
+
+    def __init__(self, load_data: Callable[[], Dict[str, Any]],
+                 providers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]],
+                 max_clients: int = 100, max_pending_rows: int = 500,
+                 min_refresh_interval: float = 0.25, max_snapshot_age: float = 30.0):
+        self.load_data = load_data
+        self.providers = providers
+        self.max_clients = max_clients
+        self.max_pending_rows = max_pending_rows
+        self.min_refresh_interval = min_refresh_interval
+        self.max_snapshot_age = max_snapshot_age
+
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._snapshot_times: Dict[str, float] = {}
+        self._versions: Dict[str, int] = {channel: 0 for channel in providers}
+        self._clients: Dict[int, LiveClient] = {}
+        self._client_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        self._dirty: Set[str] = set()
+        self._dirty_cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._running = False
+
+        # Métricas
+        self.refresh_count = 0
+        self.diff_count = 0
+        self.events_received = 0
+
+    # ------------------------------------------------------------------
+    # Integração com EventSystem
+    # ------------------------------------------------------------------
+
+    def attach(self, event_system) -> None:
+        """Registra listeners no EventSystem para invalidar os canais"""
+        for event_name in EVENT_CHANNELS:
+            event_system.add_listener(event_name, self._on_event,
+                                      name=f"live_stream_{event_name}")
+
+    def _on_event(self, event) -> None:
+        """Listener síncrono: apenas marca canais sujos (O(1), sem I/O no loop)"""
+        self.events_received += 1
+        self.mark_dirty(*EVENT_CHANNELS.get(event.name, ()))
+
+    # ------------------------------------------------------------------
+    # Recalculo de snapshots
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Inicia a thread que recalcula os canais sujos"""
+        if self._running:
+            return
+        self._running = True
+        self._worker = threading.Thread(target=self._refresh_loop,
+                                        name='live-stream-refresh', daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        """Para a thread de recalculo e desconecta os clientes"""
+        self._running = False
+        with self._dirty_cond:
+            self._dirty_cond.notify()
+        with self._lock:
+            clients = list(self._clients.values())
+        for client in clients:
+            client.close()
+
+    def mark_dirty(self, *channels: str) -> None:
+        """Marca canais para recalculo na próxima janela de coalescência"""
+        channels = [c for c in channels if c in self.providers]
+        if not channels:
+            return
+        with self._dirty_cond:
+            self._dirty.update(channels)
+            self._dirty_cond.notify()
+
+    def _refresh_loop(self) -> None:
+        """Loop da thread de recalculo"""
+        while self._running:
+            with self._dirty_cond:
+                if not self._dirty and self._running:
+                    self._dirty_cond.wait(self.max_snapshot_age)
+                if not self._running:
+                    break
+                if not self._dirty:
+                    # Nenhum evento no período: revalidar canais com clientes
+                    # para capturar mudanças feitas fora do EventSystem
+                    with self._lock:
+                        watched = set().union(*(c.channels for c in self._clients.values()))
+                    if not watched:
+                        continue
+                    self._dirty.update(watched)
+
+            # Janela curta para agrupar rajadas de eventos num único recalculo
+            time.sleep(self.min_refresh_interval)
+
+            with self._dirty_cond:
+                dirty, self._dirty = self._dirty, set()
+
+            try:
+                self.refresh(dirty)
+            except Exception as e:
+                logger.error(f"Erro ao recalcular canais {sorted(dirty)}: {e}")
+
+    def refresh(self, channels: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Recalcula os canais informados e publica os diffs. Retorna os diffs."""
+        channels = [c for c in channels if c in self.providers]
+        if not channels:
+            return {}
+
+        data = self.load_data()
+        self.refresh_count += 1
+        diffs = {}
+
+        for channel in channels:
+            new_snapshot = self.providers[channel](data)
+            with self._lock:
+                old_snapshot = self._snapshots.get(channel, {})
+                self._snapshots[channel] = new_snapshot
+                self._snapshot_times[channel] = time.monotonic()
+                diff = compute_diff(old_snapshot, new_snapshot)
+                if diff is None:
+                    continue
+                self._versions[channel] += 1
+                clients = list(self._clients.values())
+
+            diffs[channel] = diff
+            self.diff_count += 1
+            for client in clients:
+                client.push(channel, diff)
+
+        return diffs
+
+    def snapshot(self, channel: str) -> Dict[str, Any]:
+        """Obtém o snapshot em cache de um canal, recalculando se ausente ou expirado"""
+        with self._lock:
+            cached = self._snapshots.get(channel)
+            age = time.monotonic() - self._snapshot_times.get(channel, 0.0)
+        if cached is None or age > self.max_snapshot_age:
+            self.refresh([channel])
+            with self._lock:
+                cached = self._snapshots.get(channel, {})
+        return cached
+
+    # ------------------------------------------------------------------
+    # Clientes
+    # ------------------------------------------------------------------
+
+    def subscribe(self, channels: Optional[Iterable[str]] = None) -> Optional[LiveClient]:
+        """Registra um cliente. Retorna None se o limite de clientes foi atingido."""
+        wanted = [c for c in (channels or self.providers) if c in self.providers]
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                return None
+            client = LiveClient(next(self._client_ids), wanted, self.max_pending_rows)
+            self._clients[client.client_id] = client
+        return client
+
+    def unsubscribe(self, client: LiveClient) -> None:
+        """Remove um cliente"""
+        client.close()
+        with self._lock:
+            self._clients.pop(client.client_id, None)
+
+    def stream(self, client: LiveClient, keepalive: float = 15.0) -> Iterator[str]:
+        """Gera os frames SSE de um cliente até a desconexão"""
+        yield 'retry: 3000\n\n'
+
+        while not client.closed and self._running:
+            resync, pending = client.pull(keepalive)
+
+            if not resync and not pending:
+                yield ': keep-alive\n\n'
+                continue
+
+            for channel in sorted(resync):
+                rows = self.snapshot(channel)
+                payload = {'rows': rows, 'order': list(rows.keys()),
+                           'version': self._versions[channel]}
+                yield self._format('snapshot', channel, payload)
+
+            for channel, diff in pending.items():
+                if channel in resync:
+                    continue  # o snapshot já contém essas mudanças
+                diff['version'] = self._versions[channel]
+                yield self._format('diff', channel, diff)
+
+    @staticmethod
+    def _format(kind: str, channel: str, payload: Dict[str, Any]) -> str:
+        """Formata um frame SSE"""
+        body = json.dumps({'channel': channel, **payload}, ensure_ascii=False, default=str)
+        return f"event: {kind}\ndata: {body}\n\n"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obtém estatísticas do hub"""
+        with self._lock:
+            clients = list(self._clients.values())
+        return {
+            'clients': len(clients),
+            'max_clients': self.max_clients,
+            'events_received': self.events_received,
+            'refresh_count': self.refresh_count,
+            'diff_count': self.diff_count,
+            'dropped_frames': sum(c.dropped_frames for c in clients),
+            'versions': dict(self._versions)
+        }
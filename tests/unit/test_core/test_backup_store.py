@@ -0,0 +1,158 @@
+"""Testes do repositório de backups endereçado por conteúdo"""
+
+import asyncio
+import os
+import time
+
+from src.core.backup_system import BackupConfig, BackupStatus, BackupSystem, BackupType
+
+
+def make_tree(root):
+    (root / 'data').mkdir()
+    (root / 'config').mkdir()
+    (root / 'data' / 'players.json').write_bytes(b'{"a": 1}' * 1000)
+    (root / 'data' / 'big.bin').write_bytes(os.urandom(3000))
+    (root / 'config' / 'bot.yaml').write_text('token: x\n')
+
+
+def make_system(root, **overrides):
+    config = BackupConfig(backup_dir=root / 'backups', chunk_size=1024, **overrides)
+    return BackupSystem(config)
+
+
+def test_incremental_reads_only_changed_files_and_dedups_chunks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_tree(tmp_path)
+    system = make_system(tmp_path)
+
+    full = asyncio.run(system.create_backup(BackupType.FULL))
+    assert full.status == BackupStatus.COMPLETED
+    assert full.metadata['files_read'] == 3
+    chunks_after_full = system.store.chunk_count()
+
+    # Nada mudou: nenhum arquivo é lido e nenhum chunk é gravado
+    unchanged = asyncio.run(system.create_backup(BackupType.INCREMENTAL))
+    assert unchanged.metadata['files_read'] == 0
+    assert unchanged.metadata['files_reused'] == 3
+    assert unchanged.file_size == 0
+
+    # Acrescentar ao fim de um arquivo só grava o chunk final
+    with open(tmp_path / 'data' / 'big.bin', 'ab') as f:
+        f.write(b'tail')
+    changed = asyncio.run(system.create_backup(BackupType.INCREMENTAL))
+    assert changed.metadata['files_read'] == 1
+    assert changed.metadata['new_chunks'] == 1
+    assert changed.metadata['base_backup'] == unchanged.id
+    assert system.store.chunk_count() == chunks_after_full + 1
+
+    differential = asyncio.run(system.create_backup(BackupType.DIFFERENTIAL))
+    assert differential.metadata['base_backup'] == full.id
+    assert differential.metadata['files_read'] == 1
+    assert differential.metadata['new_chunks'] == 0
+
+    restore_dir = tmp_path / 'restored'
+    assert asyncio.run(system.restore_backup(changed.id, restore_dir))
+    for relative in ('data/players.json', 'data/big.bin', 'config/bot.yaml'):
+        assert (restore_dir / relative).read_bytes() == (tmp_path / relative).read_bytes()
+
+    # O histórico recarregado continua apontando para os manifestos
+    reloaded = make_system(tmp_path)
+    assert reloaded.get_backup_info(changed.id).metadata['format'] == 'chunked'
+    assert reloaded.store.chunk_count() == system.store.chunk_count()
+
+
+def test_rotation_sweeps_unreferenced_chunks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_tree(tmp_path)
+    system = make_system(tmp_path, max_backups=1, encrypt_backups=False)
+
+    first = asyncio.run(system.create_backup(BackupType.FULL))
+    (tmp_path / 'data' / 'big.bin').write_bytes(os.urandom(3000))
+    second = asyncio.run(system.create_backup(BackupType.FULL))
+
+    assert system.get_backup_info(first.id) is None
+    assert not system.store.manifest_path(first.id).exists()
+    assert system.store.chunk_count() == len(system.store.live_chunks())
+
+    restore_dir = tmp_path / 'restored'
+    assert asyncio.run(system.restore_backup(second.id, restore_dir))
+    assert (restore_dir / 'data' / 'big.bin').read_bytes() == (tmp_path / 'data' / 'big.bin').read_bytes()
+
+
+
+def test_concurrent_backups_never_lose_chunks_to_rotation(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_tree(tmp_path)
+    system = make_system(tmp_path, max_backups=1, encrypt_backups=False)
+
+    # Varredura lenta: outro backup teria tempo de gravar chunks durante ela
+    live_chunks = system.store.live_chunks
+
+    def slow_live_chunks():
+        live = live_chunks()
+        time.sleep(0.05)
+        return live
+
+    monkeypatch.setattr(system.store, 'live_chunks', slow_live_chunks)
+
+    async def run():
+        backups = []
+        for _ in range(3):
+            # Conteúdo novo a cada rodada: cada backup grava chunks próprios
+            (tmp_path / 'data' / 'big.bin').write_bytes(os.urandom(3000))
+            backups += await asyncio.gather(*(system.create_backup(BackupType.FULL) for _ in range(3)))
+        return backups
+
+    backups = asyncio.run(run())
+    assert all(b.status == BackupStatus.COMPLETED for b in backups)
+
+    # Todo manifesto restante aponta apenas para chunks existentes
+    remaining = system.list_backups(BackupStatus.COMPLETED)
+    assert len(remaining) == 1
+    for backup in remaining:
+        manifest = system.store.load_manifest(backup.id)
+        for entry in manifest['files'].values():
+            assert all(system.store.has(chunk_id) for chunk_id in entry['chunks'])
+    assert asyncio.run(system.restore_backup(remaining[0].id, tmp_path / 'restored'))
+
+def test_backup_runs_off_loop_and_reports_progress(tmp_path, monkeypatch):
+    from src.core.metrics import get_metrics_collector
+
+    monkeypatch.chdir(tmp_path)
+    make_tree(tmp_path)
+    (tmp_path / 'data' / 'large.bin').write_bytes(os.urandom(4 * 1024 * 1024))
+    system = BackupSystem(BackupConfig(backup_dir=tmp_path / 'backups', chunk_size=64 * 1024))
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        info = await system.create_backup(BackupType.FULL)
+        task.cancel()
+        return info, ticks
+
+    info, ticks = asyncio.run(run())
+
+    # O loop continuou girando enquanto os chunks eram gravados
+    assert ticks > 10
+    assert info.metadata['progress_percent'] == 100
+
+    collector = get_metrics_collector()
+    labels = {'backup_type': 'full'}
+    assert collector.get_metric('backup.progress_percent').labels(**labels).get_current_value() == 100
+    assert collector.get_metric('backup.bytes_read').labels(**labels).get_count() >= 4 * 1024 * 1024
+    assert collector.get_metric('backup.duration_seconds').labels(**labels).histogram.count >= 1
+
+    # Chunk adulterado falha na autenticação e a restauração é recusada
+    chunk_id = system.store.load_manifest(info.id)['files']['config/bot.yaml']['chunks'][0]
+    path = system.store._chunk_path(chunk_id)
+    payload = bytearray(path.read_bytes())
+    payload[-1] ^= 1
+    path.write_bytes(bytes(payload))
+    assert not asyncio.run(system.restore_backup(info.id, tmp_path / 'restored'))
@@ -0,0 +1,164 @@
+"""Testes de despacho, modos de execução e fila de background do EventSystem"""
+
+import asyncio
+import time
+
+from src.core.event_system import (EventPhase, EventPriority, EventSystem, ListenerMode,
+                                   OverflowPolicy)
+
+
+def test_dispatch_table_is_cached_and_invalidated():
+    system = EventSystem()
+    calls = []
+
+    async def run():
+        assert await system.emit('sem_listeners', {'x': 1}) is None
+
+        system.add_listener('ping', lambda e: calls.append('low'), priority=EventPriority.LOW)
+        system.add_listener('ping', lambda e: calls.append('high'), priority=EventPriority.HIGH)
+        system.add_listener('ping', lambda e: calls.append('post'), phase=EventPhase.POST)
+
+        await system.emit('ping')
+        table = system._dispatch[('ping', EventPhase.MAIN)]
+        await system.emit('ping')
+        assert system._dispatch[('ping', EventPhase.MAIN)] is table
+
+        system.remove_listener('ping', system.get_listeners('ping')[0])
+        assert ('ping', EventPhase.MAIN) not in system._dispatch
+        await system.emit('ping')
+
+    asyncio.run(run())
+
+    assert calls == ['high', 'low', 'high', 'low', 'low']
+    # Evento sem listeners não entra no histórico
+    assert [e.name for e in system.event_history] == ['ping', 'ping', 'ping']
+    assert system.event_count['sem_listeners'] == 1
+
+
+def test_once_listener_is_removed_after_first_call():
+    system = EventSystem()
+    calls = []
+    system.add_listener('boot', lambda e: calls.append(e.get('n')), once=True)
+
+    async def run():
+        await system.emit('boot', {'n': 1})
+        return await system.emit('boot', {'n': 2})
+
+    assert asyncio.run(run()) is None
+    assert calls == [1]
+    assert system.get_listeners('boot') == []
+
+
+def test_middleware_opts_in_per_event_name():
+    system = EventSystem()
+    seen = []
+
+    system.add_middleware(lambda e: seen.append(('global', e.name)))
+    system.add_middleware(lambda e: seen.append(('audit', e.name)), events=['ban'])
+    system.add_middleware(lambda e: seen.append(('pred', e.name)), events=lambda name: name.startswith('x_'))
+
+    def cancel(event):
+        if event.get('block'):
+            event.cancel()
+
+    system.add_middleware(cancel, events=['msg'])
+    received = []
+    system.add_listener('msg', lambda e: received.append(e.get('id')))
+
+    async def run():
+        await system.emit('ban')        # sem listeners, mas com middleware inscrito
+        await system.emit('x_custom')
+        await system.emit('other')      # caminho rápido
+        await system.emit('msg', {'id': 1})
+        await system.emit('msg', {'id': 2, 'block': True})
+
+    asyncio.run(run())
+
+    assert seen == [('audit', 'ban'), ('pred', 'x_custom'),
+                    ('global', 'msg'), ('global', 'msg')]
+    assert received == [1]
+
+
+def test_concurrent_listeners_of_same_priority_run_together():
+    system = EventSystem()
+    order = []
+
+    def slow(label):
+        async def listener(event):
+            order.append(f'{label}:start')
+            await asyncio.sleep(0.1)
+            order.append(f'{label}:end')
+        return listener
+
+    system.add_listener('save', slow('a'), mode=ListenerMode.CONCURRENT)
+    system.add_listener('save', slow('b'), mode=ListenerMode.CONCURRENT)
+    # Listener serial de menor prioridade só roda depois do grupo concorrente
+    system.add_listener('save', lambda e: order.append('ordered'), priority=EventPriority.LOW)
+
+    async def run():
+        started = time.perf_counter()
+        await system.emit('save')
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+
+    assert elapsed < 0.18
+    assert order[:2] == ['a:start', 'b:start']
+    assert order[-1] == 'ordered'
+    latency = system.get_listener_latency('save')['save']
+    assert latency['listener_0']['count'] == 1
+    assert latency['listener_0']['p50'] >= 0.1
+
+
+def test_background_queue_does_not_block_emitter_and_drops_oldest():
+    system = EventSystem()
+    system.configure_background(max_queue_size=2, workers=1, overflow_policy=OverflowPolicy.DROP_OLDEST)
+    handled = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def slow(event):
+            await release.wait()
+            handled.append(event.get('n'))
+
+        system.add_listener('audit', slow, mode=ListenerMode.BACKGROUND)
+
+        started = time.perf_counter()
+        await system.emit('audit', {'n': 0})
+        await asyncio.sleep(0)  # worker pega o primeiro item e bloqueia
+        for n in range(1, 5):
+            await system.emit('audit', {'n': n})
+        emit_time = time.perf_counter() - started
+
+        release.set()
+        await system.stop_background()
+        return emit_time
+
+    emit_time = asyncio.run(run())
+
+    assert emit_time < 0.1
+    # Fila com 2 vagas: os itens 1 e 2 foram descartados
+    assert handled == [0, 3, 4]
+    assert system.get_event_stats()['background']['dropped'] == 2
+
+
+def test_background_block_policy_applies_backpressure():
+    system = EventSystem()
+    system.configure_background(max_queue_size=1, workers=1, overflow_policy=OverflowPolicy.BLOCK)
+    handled = []
+
+    async def run():
+        async def slow(event):
+            await asyncio.sleep(0.02)
+            handled.append(event.get('n'))
+
+        system.add_listener('audit', slow, mode=ListenerMode.BACKGROUND)
+        for n in range(4):
+            await system.emit('audit', {'n': n})
+        await system.stop_background()
+
+    asyncio.run(run())
+
+    assert handled == [0, 1, 2, 3]
+    assert system.get_event_stats()['background']['dropped'] == 0
@@ -0,0 +1,101 @@
+"""Testes do pipeline assíncrono de logging"""
+
+import logging
+import logging.handlers
+import threading
+
+from src.core.log_pipeline import LogOverflowPolicy, LogPipeline
+from src.core.metrics import get_metrics_collector
+
+
+class CountingStream:
+    def __init__(self):
+        self.writes = []
+        self.threads = set()
+
+    def write(self, text):
+        self.writes.append(text)
+        self.threads.add(threading.current_thread().name)
+
+    def flush(self):
+        pass
+
+
+def make_logger(name, handler, **options):
+    pipeline = LogPipeline([handler], name=name, **options)
+    logger = logging.getLogger(name)
+    logger.handlers = [pipeline.queue_handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger, pipeline
+
+
+def test_records_are_written_in_batches_by_the_writer_thread():
+    stream = CountingStream()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+    logger, pipeline = make_logger('test_pipeline_batches', handler)
+
+    items = ['a']
+    for n in range(100):
+        logger.info('linha %d %s', n, items)
+    items.append('b')  # argumentos mutáveis já foram congelados
+
+    pipeline.start()
+    assert pipeline.flush()
+    pipeline.stop()
+
+    assert len(stream.writes) == 1
+    lines = stream.writes[0].splitlines()
+    assert len(lines) == 100
+    assert lines[0] == "INFO linha 0 ['a']"
+    assert stream.threads == {'log-writer-test_pipeline_batches'}
+
+
+def test_overflow_policies_and_metrics():
+    def fill(policy, name):
+        stream = CountingStream()
+        logger, pipeline = make_logger(name, logging.StreamHandler(stream), maxsize=3,
+                                       policy=policy, block_timeout=0.01)
+        for n in range(5):
+            logger.warning('m%d', n)
+        pipeline.start()
+        pipeline.stop()
+        return [line for text in stream.writes for line in text.splitlines()], pipeline
+
+    newest, pipeline = fill(LogOverflowPolicy.DROP_NEWEST, 'test_pipeline_newest')
+    assert newest == ['m0', 'm1', 'm2']
+    assert pipeline.get_stats()['dropped'] == 2
+
+    oldest, _ = fill(LogOverflowPolicy.DROP_OLDEST, 'test_pipeline_oldest')
+    assert oldest == ['m2', 'm3', 'm4']
+
+    blocked, _ = fill(LogOverflowPolicy.BLOCK, 'test_pipeline_block')
+    assert blocked == ['m0', 'm1', 'm2']  # sem thread de escrita, a espera expira
+
+    dropped = get_metrics_collector().get_metric('logging.records_dropped')
+    assert dropped.labels(pipeline='test_pipeline_newest', policy='drop_newest').get_count() == 2
+
+
+def test_rotation_and_levels_are_respected(tmp_path):
+    rotating = logging.handlers.RotatingFileHandler(tmp_path / 'app.log', maxBytes=200,
+                                                    backupCount=2, encoding='utf-8')
+    errors = logging.FileHandler(tmp_path / 'errors.log', encoding='utf-8')
+    errors.setLevel(logging.ERROR)
+
+    pipeline = LogPipeline([rotating, errors], name='test_pipeline_rotation')
+    logger = logging.getLogger('test_pipeline_rotation')
+    logger.handlers = [pipeline.queue_handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    pipeline.start()
+
+    for n in range(20):
+        logger.info('registro número %02d', n)
+    logger.error('falhou')
+    pipeline.stop()
+    rotating.close()
+    errors.close()
+
+    assert (tmp_path / 'app.log.1').exists()
+    assert (tmp_path / 'errors.log').read_text(encoding='utf-8') == 'falhou\n'
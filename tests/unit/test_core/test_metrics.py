@@ -0,0 +1,175 @@
+"""Testes das primitivas de métricas e da coleta não bloqueante"""
+
+import asyncio
+import gc
+import random
+import threading
+import time
+
+import psutil
+
+from src.core.metrics import Gauge, MetricsCollector, StreamingHistogram
+
+
+def test_system_sampling_does_not_block_event_loop(monkeypatch):
+    intervals = []
+    original = psutil.cpu_percent
+
+    def spy(interval=None, *args, **kwargs):
+        intervals.append(interval)
+        return original(interval=None)
+
+    monkeypatch.setattr(psutil, 'cpu_percent', spy)
+    collector = MetricsCollector()
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        await collector.collect_system_metrics()
+        await collector.collect_system_metrics()
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        return elapsed, ticks
+
+    elapsed, ticks = asyncio.run(run())
+
+    assert intervals == [None, None]
+    assert elapsed < 0.5
+    assert ticks > 0
+    for name in ('system.cpu.percent', 'system.memory.percent', 'system.disk.percent',
+                 'process.memory.rss_bytes', 'system.network.bytes_recv_rate'):
+        assert collector.get_metric(name) is not None, name
+
+
+def test_runtime_metrics_capture_loop_lag_gc_and_tasks():
+    collector = MetricsCollector(collection_interval=3600, lag_interval=0.02)
+
+    async def run():
+        await collector.start()
+
+        async def idle():
+            await asyncio.sleep(10)
+
+        extra = [asyncio.create_task(idle()) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # bloqueia o loop de propósito
+        await asyncio.sleep(0.05)
+        gc.collect()
+
+        collector.collect_runtime_metrics()
+        for task in extra:
+            task.cancel()
+        await collector.stop()
+
+    asyncio.run(run())
+
+    assert collector.get_metric('event_loop.lag_max_ms').get_current_value() >= 150
+    assert collector.get_metric('gc.collections.gen2').get_current_value() >= 1
+    assert collector.get_metric('gc.pause_ms').get_current_value() > 0
+    assert collector.get_metric('event_loop.tasks').get_current_value() >= 4
+    tasks = collector.get_metric('event_loop.tasks')
+    idle_name = 'test_runtime_metrics_capture_loop_lag_gc_and_tasks.run.idle'
+    assert tasks.labels(coroutine=idle_name).get_current_value() == 3
+    assert not any(name.startswith('event_loop.tasks.') for name in collector.metrics)
+    assert not collector.gc_tracker.installed
+
+
+def test_task_gauge_keeps_only_current_top_coroutines():
+    collector = MetricsCollector(top_task_names=1)
+
+    async def run():
+        async def busy():
+            await asyncio.sleep(10)
+
+        async def quiet():
+            await asyncio.sleep(10)
+
+        busy_tasks = [asyncio.create_task(busy()) for _ in range(3)]
+        quiet_tasks = [asyncio.create_task(quiet()) for _ in range(2)]
+        await asyncio.sleep(0)
+        collector.collect_runtime_metrics()
+        first = {child.tags['coroutine'] for child in collector.get_metric('event_loop.tasks').children()}
+
+        for task in busy_tasks:
+            task.cancel()
+        await asyncio.sleep(0)
+        collector.collect_runtime_metrics()
+        second = collector.get_metric('event_loop.tasks').children()
+        for task in quiet_tasks:
+            task.cancel()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert [name.rsplit('.', 1)[-1] for name in first] == ['busy']
+    # A série de busy saiu do top N e não é mais exportada
+    assert [child.tags['coroutine'].rsplit('.', 1)[-1] for child in second] == ['quiet']
+    assert second[0].get_current_value() == 2
+
+
+def test_histogram_quantiles_within_relative_error():
+    histogram = StreamingHistogram(relative_accuracy=0.02)
+    rng = random.Random(3)
+    values = [rng.lognormvariate(-4, 1.2) for _ in range(20000)]
+    for value in values:
+        histogram.observe(value)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(histogram.quantile(q) - exact) / exact <= 0.021
+
+    before = len(histogram.counts)
+    histogram.observe(1e12)  # fora da faixa cai no último bucket
+    assert len(histogram.counts) == before
+    assert histogram.quantile(1.0) == 1e12
+
+
+def test_counter_is_exact_across_threads_and_labels_are_children():
+    collector = MetricsCollector()
+    counter = collector.create_counter('jobs')
+
+    def work():
+        for _ in range(10000):
+            counter.increment()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.get_count() == 40000
+
+    collector.increment_counter('jobs', labels={'queue': 'fast'})
+    collector.increment_counter('jobs', 2, labels={'queue': 'fast'})
+    with collector.record_timer('job.duration', labels={'queue': 'fast'}):
+        pass
+
+    collector.snapshot_metrics()
+    exported = collector.get_all_metrics()
+    assert exported['jobs']['current_value'] == 40000
+    assert exported['jobs{queue="fast"}']['current_value'] == 3
+    assert exported['job.duration{queue="fast"}']['count'] == 1
+    assert set(exported['job.duration{queue="fast"}']['quantiles']) == {'p50', 'p95', 'p99'}
+
+
+def test_gauge_window_stats_use_constant_memory():
+    gauge = Gauge('queue.depth')
+    for value in range(5000):
+        gauge.set(value)
+
+    assert len(gauge.samples) == Gauge.SAMPLE_SIZE
+    assert gauge.get_current_value() == 4999
+    assert gauge.get_max() == 4999
+    assert gauge.get_min() == 0
+    assert gauge.get_average() == 2499.5
+    assert [v.value for v in gauge.get_values()][-1] == 4999
@@ -0,0 +1,122 @@
+"""Testes da exposição Prometheus/OpenMetrics e dos deltas do dashboard"""
+
+import asyncio
+import gzip
+import json
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.core.metrics import MetricsCollector
+from src.core.metrics_dashboard import MetricsDashboard
+from src.core.metrics_exposition import PrometheusExporter
+
+
+def make_collector():
+    collector = MetricsCollector()
+    collector.increment_counter('commands.executed', 3, labels={'command': 'rank'})
+    collector.increment_counter('commands.executed')
+    collector.get_metric('commands.executed').description = 'Comandos executados'
+    collector.record_gauge('system.cpu.percent', 12.5)
+    collector.record_gauge('guild.members', 40, labels={'guild': 'a"b\\c'})
+    for value in (0.1, 0.2, 0.3):
+        collector.observe_histogram('api.latency', value)
+    return collector
+
+
+def test_text_format_and_incremental_cache():
+    collector = make_collector()
+    exporter = PrometheusExporter(collector)
+
+    text = exporter.render().decode()
+    lines = text.splitlines()
+    assert '# HELP hawkbot_commands_executed_total Comandos executados' in lines
+    assert '# TYPE hawkbot_commands_executed_total counter' in lines
+    assert 'hawkbot_commands_executed_total 1' in lines
+    assert 'hawkbot_commands_executed_total{command="rank"} 3' in lines
+    assert 'hawkbot_system_cpu_percent 12.5' in lines
+    assert 'hawkbot_guild_members{guild="a\\"b\\\\c"} 40' in lines
+    assert '# TYPE hawkbot_api_latency summary' in lines
+    assert 'hawkbot_api_latency_count 3' in lines
+    assert any(line.startswith('hawkbot_api_latency{quantile="0.99"}') for line in lines)
+
+    renders = exporter.family_renders
+    assert exporter.render() is exporter.render()
+    assert exporter.family_renders == renders
+
+    # Só a família alterada é renderizada de novo
+    collector.increment_counter('commands.executed')
+    assert 'hawkbot_commands_executed_total 2' in exporter.render().decode().splitlines()
+    assert exporter.family_renders == renders + 1
+
+    openmetrics = exporter.render(openmetrics=True).decode()
+    assert '# TYPE hawkbot_commands_executed counter' in openmetrics
+    assert openmetrics.endswith('# EOF\n')
+
+    compressed = exporter.render_gzip()
+    assert exporter.render_gzip() is compressed
+    assert gzip.decompress(compressed) == exporter.render()
+
+
+def test_metrics_endpoint_negotiates_gzip_and_format():
+    dashboard = MetricsDashboard()
+    dashboard.metrics_collector = make_collector()
+    dashboard.exporter = PrometheusExporter(dashboard.metrics_collector)
+
+    async def run():
+        async with TestClient(TestServer(dashboard.create_app())) as client:
+            plain = await client.get('/metrics', headers={'Accept-Encoding': 'identity'})
+            zipped = await client.get('/metrics', headers={'Accept-Encoding': 'gzip'})
+            om = await client.get('/metrics', headers={'Accept': 'application/openmetrics-text; version=1.0.0'})
+            return ((plain.headers['Content-Type'], plain.headers.get('Content-Encoding'), await plain.text()),
+                    (zipped.headers.get('Content-Encoding'), await zipped.text()),
+                    (om.headers['Content-Type'], await om.text()))
+
+    plain, zipped, om = asyncio.run(run())
+
+    assert plain[0].startswith('text/plain; version=0.0.4')
+    assert plain[1] is None
+    assert zipped == ('gzip', plain[2])
+    assert om[0].startswith('application/openmetrics-text')
+    assert om[1].endswith('# EOF\n')
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.closed = False
+        self.sent = []
+
+    async def send_str(self, message):
+        self.sent.append(json.loads(message))
+
+
+def test_broadcast_sends_deltas_since_each_clients_last_frame():
+    dashboard = MetricsDashboard()
+    collector = dashboard.metrics_collector = MetricsCollector()
+    collector.record_gauge('a', 1)
+    collector.record_gauge('b', 1)
+
+    first = FakeWebSocket()
+    dashboard.websockets = [first]
+
+    async def run():
+        await dashboard.broadcast_metrics()
+        collector.record_gauge('b', 2)
+        late = FakeWebSocket()
+        dashboard.websockets.append(late)
+        await dashboard.broadcast_metrics()
+        return late
+
+    late = asyncio.run(run())
+
+    assert first.sent[0]['type'] == 'metrics_update'
+    assert set(first.sent[0]['data']['metrics']) == {'a', 'b'}
+
+    delta = first.sent[1]
+    assert delta['type'] == 'metrics_delta'
+    assert set(delta['data']['changed']) == {'b'}
+    assert delta['data']['removed'] == []
+    assert 'alerts' not in delta['data']
+
+    # Cliente que entrou depois recebe o quadro completo
+    assert late.sent[0]['type'] == 'metrics_update'
+    assert late.sent[0]['data']['metrics']['b']['current_value'] == 2
@@ -0,0 +1,98 @@
+"""Testes do sanitizador combinado e do SecureLogger"""
+
+import re
+import threading
+
+from src.core.secure_logger import DataSanitizer, SecureLogger, SensitiveDataType
+
+
+SAMPLES = [
+    "password=hunter2 e email fulano@exemplo.com no ip 10.0.0.1",
+    "api_key: ABCDEFGHIJKLMNOPQRSTUVWX",
+    "user_id=123456789012345678 session_id=abcdefghijklmnopq",
+    "cartão 1234 5678 9012 3456",
+    "mensagem comum sem nada sensível",
+]
+
+
+def test_combined_pattern_matches_rule_by_rule_results():
+    sanitizer = DataSanitizer()
+
+    for text in SAMPLES:
+        expected = text
+        for rule in sanitizer.rules:
+            expected = rule.sanitize(expected)
+        assert sanitizer.sanitize(text) == expected
+
+    assert sanitizer._combined is not None
+    assert sanitizer.sanitize("PWD: x") == "PWD: [PASSWORD]"
+
+    # Regras alteradas recompilam a expressão e limpam o cache
+    sanitizer.add_rule("ticket", r"TICKET-(\d+)", r"TICKET-#\1", SensitiveDataType.CUSTOM, case_sensitive=True)
+    assert sanitizer.sanitize("TICKET-42 ticket-42") == "TICKET-#42 ticket-42"
+    sanitizer.enable_rule("email_addresses", False)
+    assert sanitizer.sanitize("fulano@exemplo.com") == "fulano@exemplo.com"
+
+
+def test_rules_that_cannot_be_combined_fall_back_to_sequential():
+    sanitizer = DataSanitizer()
+    sanitizer.add_rule("dup", re.compile(r"(?P<v>x)(?P=v)"), "[XX]", SensitiveDataType.CUSTOM)
+    sanitizer.add_rule("dup2", re.compile(r"(?P<v>y)(?P=v)"), "[YY]", SensitiveDataType.CUSTOM)
+
+    assert sanitizer.sanitize("xx yy a@b.com") == "[XX] [YY] [EMAIL]"
+    assert sanitizer._combined is None
+
+
+def test_records_are_sanitized_once_and_levels_short_circuit(tmp_path):
+    logger = SecureLogger("test_secure_once", log_dir=tmp_path, enable_console=True)
+    calls = []
+    original = logger.sanitizer.sanitize_record
+
+    def spy(record):
+        calls.append(record.getMessage())
+        return original(record)
+
+    logger.sanitizer.sanitize_record = spy
+
+    logger.logger.info("login %s", "password=abc")
+    logger.info("constante")
+    logger.info("constante")
+    assert logger.flush()
+
+    content = (tmp_path / "test_secure_once.log").read_text(encoding="utf-8")
+    assert "password: [PASSWORD]" in content
+    assert "abc" not in content
+    # Console e arquivo recebem o mesmo registro, mas cada mensagem é
+    # sanitizada uma vez; a constante repetida vem do cache
+    assert len(calls) == 6
+    info = logger.sanitizer._cached_sanitize.cache_info()
+    assert (info.misses, info.hits) == (2, 1)
+
+    console_only = SecureLogger("test_secure_levels", log_dir=tmp_path, enable_file=False)
+    console_only.sanitizer.sanitize_record = lambda record: calls.append("debug") or record
+    calls.clear()
+    console_only.debug("não deve gerar registro")
+    console_only.trace("nem este")
+    assert calls == []
+
+    logger.close()
+    console_only.close()
+
+
+def test_recreating_a_logger_replaces_its_writer_thread(tmp_path):
+    loggers = [SecureLogger("test_secure_recreate", log_dir=tmp_path, enable_console=False)
+               for _ in range(5)]
+    writers = [thread for thread in threading.enumerate()
+               if thread.name == "log-writer-test_secure_recreate"]
+    assert len(writers) == 1
+
+    # Os arquivos das instâncias anteriores foram fechados
+    previous = loggers[0].pipeline.handlers[0].base_handler
+    assert previous.stream is None
+
+    loggers[-1].info("ainda gravando")
+    assert loggers[-1].flush()
+    content = (tmp_path / "test_secure_recreate.log").read_text(encoding="utf-8")
+    assert "ainda gravando" in content
+    loggers[-1].close()
+    assert not any(thread.name == "log-writer-test_secure_recreate" for thread in threading.enumerate())
@@ -0,0 +1,151 @@
+"""Testes do registro de serviços sob demanda"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.core.service_registry import LazyServiceRegistry, ServiceError
+
+SRC_DIR = Path(__file__).resolve().parents[3] / 'src'
+
+
+def run_with_src(code, cwd):
+    """Executa `code` num processo novo com src no sys.path (como o bot.py)"""
+    prelude = f"import sys; sys.path.insert(0, {str(SRC_DIR)!r})\n"
+    return subprocess.run([sys.executable, '-c', prelude + code], cwd=cwd,
+                          capture_output=True, text=True)
+
+
+def test_services_are_built_on_first_use_after_their_dependencies():
+    registry = LazyServiceRegistry()
+    built = []
+
+    def factory(name):
+        def build(*deps):
+            built.append(name)
+            return {'name': name, 'deps': [dep['name'] for dep in deps]}
+        return build
+
+    registry.register('storage', factory('storage'))
+    registry.register('api', factory('api'))
+    registry.register('ranks', factory('ranks'), ('storage', 'api'))
+    registry.register('badges', factory('badges'), ('storage', 'ranks'))
+
+    assert built == []
+    assert not registry.is_loaded('ranks')
+
+    badges = registry.get('badges')
+    assert badges['deps'] == ['storage', 'ranks']
+    assert built == ['storage', 'api', 'ranks', 'badges']
+
+    # A instância é reaproveitada e as dependências não são reconstruídas
+    assert registry.get('badges') is badges
+    assert registry.get('storage') is registry.get('storage')
+    assert built.count('storage') == 1
+
+    stats = registry.get_stats()
+    assert stats['loaded'] == 4 and stats['pending'] == []
+    assert set(stats['load_times_ms']) == {'storage', 'api', 'ranks', 'badges'}
+
+    with pytest.raises(ServiceError):
+        registry.register('ranks', factory('ranks'))
+
+
+def test_heavy_imports_only_happen_inside_factories():
+    module_name = 'json.tool'
+    sys.modules.pop(module_name, None)
+
+    registry = LazyServiceRegistry()
+
+    def tool():
+        import json.tool
+        return json.tool
+
+    registry.register('tool', tool)
+    registry.register('other', lambda: object())
+    assert module_name not in sys.modules
+
+    registry.get('other')
+    assert module_name not in sys.modules
+    assert registry.get('tool') is sys.modules[module_name]
+    assert registry.get_stats()['pending'] == []
+
+
+def test_load_all_unknown_services_cycles_and_factory_errors():
+    registry = LazyServiceRegistry()
+    registry.register('a', lambda b: 'a', ('b',))
+    registry.register('b', lambda a: 'b', ('a',))
+    registry.register('broken', lambda: 1 / 0)
+    registry.register('ok', lambda: 'ok')
+
+    with pytest.raises(ServiceError, match='a -> b -> a'):
+        registry.get('a')
+    with pytest.raises(ServiceError, match="'missing' não registrado"):
+        registry.get('missing')
+    with pytest.raises(ServiceError, match='broken'):
+        registry.get('broken')
+    assert not registry.is_loaded('broken')
+
+    # Depois de um erro o registro continua utilizável
+    assert registry.load_all(['ok']) == ['ok']
+    assert registry.load_all(['ok']) == []
+    assert registry.get_stats()['pending'] == ['a', 'b', 'broken']
+
+
+def test_factory_failures_are_remembered_until_retry():
+    registry = LazyServiceRegistry()
+    calls = []
+    available = False
+
+    def flaky():
+        calls.append(1)
+        if not available:
+            raise ImportError("No module named 'matplotlib'")
+        return 'charts'
+
+    registry.register('charts', flaky)
+    for _ in range(3):
+        with pytest.raises(ServiceError, match='matplotlib'):
+            registry.get('charts')
+    # A fábrica (e o import pesado) roda uma única vez
+    assert len(calls) == 1
+    assert isinstance(registry.failure('charts').__cause__, ImportError)
+    assert registry.get_stats()['failed'] == ['charts']
+
+    available = True
+    assert registry.retry('charts') == 'charts'
+    assert registry.failure('charts') is None
+    assert len(calls) == 2
+
+
+def test_failed_service_reads_as_missing_attribute_on_bot(tmp_path):
+    code = """
+import bot
+bot.bot.services.register('broken_system', lambda: 1 / 0)
+assert not hasattr(bot.bot, 'broken_system')
+assert not hasattr(bot.bot, 'broken_system')
+assert getattr(bot.bot, 'broken_system', None) is None
+try:
+    bot.bot.broken_system
+except AttributeError as e:
+    assert 'division by zero' in str(e.__cause__)
+"""
+    result = run_with_src(code, tmp_path)
+    assert result.returncode == 0, result.stderr.strip().splitlines()[-1:]
+    # A falha é registrada uma vez, não a cada hasattr()
+    assert result.stderr.count("Sistema 'broken_system' indisponível") == 1
+
+
+def test_utils_package_imports_submodules_only_on_access(tmp_path):
+    code = """
+import sys
+import utils
+assert not hasattr(utils, 'does_not_exist')
+assert not any(name.startswith('utils.') for name in sys.modules)
+assert utils.embed_templates.EmbedTemplates is utils.EmbedTemplates
+assert 'utils.charts_system' not in sys.modules and 'matplotlib' not in sys.modules
+"""
+    result = run_with_src(code, tmp_path)
+    assert result.returncode == 0, result.stderr.strip().splitlines()[-1:]
@@ -0,0 +1,104 @@
+"""Testes do agendador de lembretes de check-in por deadline"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from src.features.checkin.reminder_scheduler import ReminderScheduler
+from src.features.checkin.reminders import CheckInReminders
+
+
+class FakeStorage:
+    def __init__(self):
+        self.data = {}
+
+    def save_data(self):
+        return True
+
+
+class FakeCheckInSystem:
+    def __init__(self, sessions):
+        self.sessions = {session['id']: session for session in sessions}
+        self.listeners = []
+
+    def add_session_listener(self, callback):
+        self.listeners.append(callback)
+
+    def get_active_sessions(self):
+        return [s for s in self.sessions.values() if s['status'] == 'active']
+
+    def get_session(self, session_id):
+        return self.sessions.get(session_id)
+
+
+class FakeBot:
+    async def wait_until_ready(self):
+        pass
+
+
+def make_session(session_id, start, hours=2, status='active'):
+    return {'id': session_id, 'type': 'scrim', 'status': status,
+            'start_time': start.isoformat(), 'end_time': (start + timedelta(hours=hours)).isoformat(),
+            'checkin_count': 0, 'checkout_count': 0, 'max_players': 10}
+
+
+def test_scheduler_orders_reschedules_and_cancels():
+    scheduler = ReminderScheduler()
+    assert scheduler.schedule('a', 30.0, 'A', group='s1')
+    assert scheduler.schedule('b', 10.0, 'B', group='s1')
+    assert not scheduler.schedule('c', 20.0, 'C', group='s2')
+
+    # Reagendar substitui a entrada anterior
+    scheduler.schedule('b', 25.0, 'B2', group='s1')
+    assert scheduler.next_deadline() == 20.0
+
+    assert scheduler.cancel_group('s1') == 2
+    assert scheduler.pop_due(100.0) == [('c', 'C')]
+    assert len(scheduler) == 0
+    assert scheduler.next_deadline() is None
+
+
+def test_session_reminders_are_compiled_into_fire_times():
+    start = datetime.now() + timedelta(minutes=20)
+    system = FakeCheckInSystem([make_session('s1', start)])
+    reminders = CheckInReminders(FakeBot(), system, FakeStorage())
+
+    reminders.rebuild_schedule()
+    keys = set(reminders.scheduler._entries)
+
+    # Lembrete de 30 min antes já vencido ainda dispara (dentro da janela até o início)
+    assert {'s1_start_30', 's1_start_15', 's1_start_5', 's1_checkin_deadline_10',
+            's1_end_15', 's1_checkout_30'} <= keys
+    assert reminders.scheduler.next_deadline() <= datetime.now().timestamp()
+
+    # Cancelar a sessão remove todos os lembretes dela
+    system.sessions['s1']['status'] = 'cancelled'
+    system.listeners[0](system.sessions['s1'])
+    assert len(reminders.scheduler) == 0
+
+
+def test_sleeper_wakes_at_next_deadline():
+    system = FakeCheckInSystem([])
+    reminders = CheckInReminders(FakeBot(), system, FakeStorage())
+    sent = []
+
+    async def fake_send(reminder_data):
+        sent.append(reminder_data['title'])
+
+    reminders._send_custom_reminder = fake_send
+
+    async def run():
+        reminders.start_reminder_task()
+        await asyncio.sleep(0)
+        reminders.create_custom_reminder('depois', 'msg', datetime.now() + timedelta(seconds=0.2))
+        reminders.create_custom_reminder('antes', 'msg', datetime.now() + timedelta(seconds=0.05))
+        await asyncio.sleep(0.1)
+        first = list(sent)
+        await asyncio.sleep(0.2)
+        reminders.stop_reminders()
+        return first
+
+    first = asyncio.run(run())
+
+    assert first == ['antes']
+    assert sent == ['antes', 'depois']
+    assert all(r['sent'] for r in reminders.get_custom_reminders())
@@ -0,0 +1,84 @@
+"""Testes dos rollups diários de check-in"""
+
+from datetime import datetime, timedelta
+
+from src.features.checkin.reports import CheckInReports
+from src.features.checkin.rollups import CheckInRollups
+from src.features.checkin.system import CheckInSystem, SessionType
+
+
+class MemoryStorage:
+    def __init__(self):
+        self.data = {}
+        self.saves = 0
+
+    def save_data(self):
+        self.saves += 1
+
+
+def make_session(session_id, created_at, session_type='scrim', players=None):
+    start = created_at.replace(hour=20, minute=0, second=0, microsecond=0)
+    return {
+        'id': session_id,
+        'type': session_type,
+        'start_time': start.isoformat(),
+        'end_time': (start + timedelta(hours=2)).isoformat(),
+        'created_at': created_at.isoformat(),
+        'players': players or {}
+    }
+
+
+def test_aggregate_sums_only_days_in_window():
+    today = datetime(2024, 5, 10, 12, 0)
+    rollups = CheckInRollups({})
+    rollups.rebuild([
+        make_session('hoje', today, players={'1': {'status': 'checked_out'}, '2': {'status': 'checked_in'}}),
+        make_session('ontem', today - timedelta(days=1), 'ranked', {'1': {'status': 'checked_in'}}),
+        make_session('antiga', today - timedelta(days=40), players={'3': {'status': 'checked_out'}}),
+    ])
+
+    week = rollups.aggregate(7, today=today.date())
+    assert week['sessions'] == 2
+    assert week['checkins'] == 3
+    assert week['checkouts'] == 1
+    assert week['session_types'] == {'scrim': 1, 'ranked': 1}
+    assert week['hours'] == {'20:00-21:00': 2}
+    assert set(week['players']) == {'1', '2'}
+    assert week['players']['1']['total_time'] == 120
+
+    assert rollups.aggregate(1, today=today.date())['sessions'] == 1
+    assert rollups.aggregate(60, today=today.date())['sessions'] == 3
+
+
+def test_system_updates_rollups_and_reports_use_them(tmp_path):
+    storage = MemoryStorage()
+    system = CheckInSystem(bot=None, storage=storage, log_dir=tmp_path)
+    now = datetime.now()
+    system.create_session('s1', SessionType.SCRIM, now, now + timedelta(hours=1))
+    system.check_in_player('s1', '10', 'alice')
+    system.check_in_player('s1', '20', 'bob')
+    system.check_out_player('s1', '10')
+
+    # Relatórios não varrem mais o histórico de sessões
+    system.get_all_sessions = None
+    reports = CheckInReports(bot=None, checkin_system=system, storage=storage)
+
+    summary = reports.get_summary_stats(7)
+    assert summary['total_sessions'] == 1
+    assert summary['unique_players'] == 2
+    assert summary['most_popular_session'] == {'id': 's1', 'type': 'scrim', 'checkins': 2}
+
+    leaderboard = reports.generate_leaderboard('total_time', days=7)
+    assert leaderboard[0]['player_id'] == '10'
+    assert leaderboard[0]['total_time_minutes'] == 60
+
+    report = reports.generate_participation_report(30)
+    assert report['summary']['participation_rate'] == 50.0
+    assert report['player_stats']['20']['checkouts'] == 0
+
+    # Rollups persistidos junto com os dados e reconstruídos se ausentes
+    rebuilt = CheckInSystem(bot=None, storage=storage, log_dir=tmp_path)
+    assert rebuilt.rollups.aggregate(1)['checkins'] == 2
+    del storage.data['checkin_system']['rollups']
+    rebuilt = CheckInSystem(bot=None, storage=storage, log_dir=tmp_path)
+    assert rebuilt.rollups.aggregate(1)['checkouts'] == 1
@@ -0,0 +1,145 @@
+"""Testes do motor de rendimento de investimentos em lotes"""
+
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from src.features.economy.accrual import ACCRUED_KEY, InvestmentAccrualEngine
+from src.features.economy.modern_system import (
+    CurrencyType, InvestmentModel, InvestmentType, ModernEconomySystem, TransactionType
+)
+
+BASE = datetime(2026, 1, 1, 12, 0)
+
+
+def make_investment(investment_id, created_at, investment_type=InvestmentType.SAVINGS,
+                    principal="1000", rate="0.05", user_id=1):
+    return InvestmentModel(
+        investment_id=investment_id, user_id=user_id, investment_type=investment_type,
+        currency=CurrencyType.COINS, principal_amount=Decimal(principal),
+        current_value=Decimal(principal), interest_rate=Decimal(rate), created_at=created_at
+    )
+
+
+def make_engine():
+    options = {
+        InvestmentType.SAVINGS: {"interest_rate": Decimal("0.05")},
+        InvestmentType.STOCKS: {"volatility": Decimal("0.15"), "dividend_rate": Decimal("0.03"),
+                                "dividend_frequency": "weekly"},
+    }
+    return InvestmentAccrualEngine(options)
+
+
+def test_ticks_touch_only_due_buckets():
+    engine = make_engine()
+    # 24 horas de criação, 50 investimentos por hora
+    for hour in range(24):
+        for i in range(50):
+            created = BASE + timedelta(hours=hour, minutes=i)
+            engine.add(make_investment(f"i{hour}_{i}", created), now=created)
+
+    assert len(engine.buckets) == 24
+    assert engine.next_due() == BASE + timedelta(days=1, hours=1)
+
+    # Um dia e meio depois só a primeira metade dos buckets venceu
+    due = engine.pop_due(BASE + timedelta(days=1, hours=12, minutes=30))
+    assert sum(len(bucket) for bucket, _ in due) == 12 * 50
+    assert {periods for _, periods in due} == {1}
+    assert engine.pop_due(BASE + timedelta(days=1, hours=12, minutes=30)) == []
+
+    bucket, periods = due[0]
+    values, dividend = engine.advance(bucket, periods)
+    assert values == [Decimal("1000") * (1 + Decimal("0.05") / 365)] * 50
+    assert dividend is None
+    assert engine.value_of(make_investment("x", BASE), BASE + timedelta(days=1, hours=2)) == values[0]
+
+    # Remover troca com o último e esvazia o bucket
+    for i in range(50):
+        engine.remove(f"i23_{i}")
+    assert len(engine.buckets) == 23
+    assert len(engine) == 23 * 50
+
+
+def test_system_pays_weekly_dividends_and_updates_values(tmp_path):
+    async def run():
+        system = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await system._init_task
+
+        created = datetime.now() - timedelta(days=6, hours=23)
+        savings = make_investment("sav", created, user_id=1)
+        stocks = make_investment("stk", created, InvestmentType.STOCKS, principal="5200", rate="0", user_id=2)
+        for investment in (savings, stocks):
+            await system.get_wallet(investment.user_id)
+            system.investments[investment.investment_id] = investment
+            system._user_investments.setdefault(investment.user_id, set()).add(investment.investment_id)
+            system.accrual.add(investment, now=created)
+
+        first = await system._accrue_due_investments(created + timedelta(days=1, hours=1))
+        week = await system._accrue_due_investments(created + timedelta(days=7, hours=1))
+        idle = await system._accrue_due_investments(created + timedelta(days=7, hours=2))
+        dividends = [t for t in system.transactions.values()
+                     if t.transaction_type == TransactionType.DIVIDEND]
+        return system, first, week, idle, dividends
+
+    system, first, week, idle, dividends = asyncio.run(run())
+
+    assert (first, week, idle) == (2, 2, 0)
+    assert system.investments["sav"].current_value == Decimal("1000") * (1 + Decimal("0.05") / 365) ** 7
+    stock_value = system.investments["stk"].current_value
+    assert Decimal("5200") * Decimal("0.8") < stock_value < Decimal("5200") * Decimal("1.2")
+
+    # 3% ao ano pago semanalmente: 5200 * 0.03 / 52 = 3
+    assert [(t.to_user_id, t.amount) for t in dividends] == [(2, Decimal("3"))]
+    assert system.rankings.score(1, "net_worth") == system.investments["sav"].current_value
+
+
+def test_restart_pays_dividends_owed_during_downtime(tmp_path):
+    created = datetime.now() - timedelta(days=8)
+
+    async def first_run():
+        system = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await system._init_task
+        stocks = make_investment("stk", created, InvestmentType.STOCKS, principal="5200", rate="0", user_id=2)
+        stocks.metadata[ACCRUED_KEY] = 0
+        await system.get_wallet(2)
+        system.investments["stk"] = stocks
+        system._user_investments.setdefault(2, set()).add("stk")
+        system.accrual.add(stocks, now=created)
+        system._mark_dirty("investments", "stk")
+
+        # Último tick antes de desligar: dia 6, antes do pagamento semanal
+        await system._accrue_due_investments(created + timedelta(days=6, hours=1))
+        await system.shutdown()
+
+    async def second_run():
+        # Religado no dia 8: o pagamento do dia 7 ficou para trás
+        system = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await system._init_task
+        bucket = next(iter(system.accrual.buckets.values()))
+        accrued = bucket.accrued
+        await system._accrue_due_investments()
+        dividends = [t for t in system.transactions.values()
+                     if t.transaction_type == TransactionType.DIVIDEND]
+        await system.shutdown()
+        return accrued, dividends
+
+    asyncio.run(first_run())
+    accrued, dividends = asyncio.run(second_run())
+
+    assert accrued == 6
+    assert [(t.to_user_id, t.amount) for t in dividends] == [(2, Decimal("3"))]
+
+
+def test_engine_seeds_schedule_from_persisted_state():
+    engine = make_engine()
+    now = BASE + timedelta(days=10, hours=2)
+
+    legacy = make_investment("legacy", BASE, InvestmentType.STOCKS)
+    legacy.last_dividend = BASE + timedelta(days=7, hours=1)
+    engine.add(legacy, now=now)
+    assert engine.buckets[engine._bucket_of["legacy"]].accrued == 7
+
+    # Sem contador nem dividendo: começa agora, sem pagar nada de novo
+    fresh = make_investment("fresh", BASE + timedelta(hours=5), InvestmentType.STOCKS)
+    engine.add(fresh, now=now)
+    assert engine.buckets[engine._bucket_of["fresh"]].accrued == 9
@@ -0,0 +1,78 @@
+"""Testes dos rankings econômicos incrementais"""
+
+import asyncio
+from decimal import Decimal
+
+from src.features.economy.modern_system import (
+    CurrencyType, InvestmentType, MarketOrderType, ModernEconomySystem
+)
+
+
+def test_rankings_follow_balance_inventory_investment_and_trades(tmp_path):
+    async def run():
+        system = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await system._init_task
+
+        for user_id in range(1, 41):
+            await system.add_currency(user_id, CurrencyType.COINS, Decimal(user_id * 100))
+        await system.add_currency(5, CurrencyType.GEMS, Decimal("50"))
+
+        # Inventário conta pelo menor preço do item na loja (mystery_box = 200 coins)
+        await system._add_to_inventory(3, "mystery_box", 30)
+        # Investimento sai da carteira mas continua no patrimônio
+        await system.create_investment(40, InvestmentType.SAVINGS, CurrencyType.COINS, Decimal("2000"))
+        await system.remove_currency(39, CurrencyType.COINS, Decimal("3900"))
+
+        # Trade: 2x mystery_box a 100 entre os usuários 3 (vendedor) e 20 (comprador)
+        await system.create_market_order(3, MarketOrderType.SELL, "mystery_box", 2, Decimal("100"), CurrencyType.COINS)
+        await system.create_market_order(20, MarketOrderType.BUY, "mystery_box", 2, Decimal("100"), CurrencyType.COINS)
+
+        calls = []
+        original = system.get_user_economy_stats
+
+        async def counting_stats(user_id):
+            calls.append(user_id)
+            return await original(user_id)
+
+        system.get_user_economy_stats = counting_stats
+        top = await system.get_economy_leaderboard("net_worth", limit=3)
+        stats_calls = len(calls)
+        gems = await system.get_economy_leaderboard(CurrencyType.GEMS.value, limit=3)
+        volume = await system.get_economy_leaderboard("trade_volume", limit=5)
+        ranks = {user_id: await system.get_economy_rank(user_id) for user_id in (3, 39, 40)}
+        system.get_user_economy_stats = original
+
+        expected = []
+        for user_id in system.wallets:
+            stats = await original(user_id)
+            expected.append((Decimal(stats["net_worth"]), user_id))
+        expected.sort(key=lambda entry: (-entry[0], entry[1]))
+        await system.shutdown()
+        return top, gems, volume, ranks, stats_calls, expected
+
+    top, gems, volume, ranks, stats_calls, expected = asyncio.run(run())
+
+    assert [(entry["value"], entry["user_id"]) for entry in top] == expected[:3]
+    assert top[0]["user_id"] == 3 and top[0]["stats"]["user_id"] == 3
+    assert stats_calls == 3  # só o top-N calcula estatísticas completas
+
+    assert [(entry["user_id"], entry["value"]) for entry in gems][0] == (5, Decimal("50"))
+
+    assert {entry["user_id"]: entry["value"] for entry in volume} == {3: Decimal("200"), 20: Decimal("200")}
+
+    positions = {user_id: rank for rank, (_, user_id) in enumerate(expected, start=1)}
+    for user_id, rank in ranks.items():
+        assert rank["rank"] == positions[user_id]
+        assert rank["total_ranked"] == len(expected)
+    assert ranks[39]["value"] == Decimal("0")
+
+
+    async def restart():
+        system = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await system._init_task
+        return system.rankings
+
+    # Rankings são reconstruídos a partir do estado persistido
+    rankings = asyncio.run(restart())
+    assert [(value, user_id) for user_id, value in rankings.top(3, "net_worth")] == expected[:3]
+    assert rankings.score(20, "trade_volume") == Decimal("200")
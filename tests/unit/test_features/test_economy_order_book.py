@@ -0,0 +1,90 @@
+"""Testes do livro de ofertas do mercado P2P"""
+
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from src.features.economy.modern_system import (
+    CurrencyType, MarketOrderModel, MarketOrderStatus, MarketOrderType, ModernEconomySystem
+)
+from src.features.economy.order_book import MarketOrderBooks
+
+ITEM = "lucky_charm"
+
+
+def make_order(order_id, order_type, price, quantity=1, user_id=1, created_at=None, expires_in=7):
+    created_at = created_at or datetime.now()
+    return MarketOrderModel(
+        order_id=order_id, user_id=user_id, order_type=order_type, item_id=ITEM,
+        quantity=quantity, price_per_unit=Decimal(price), currency=CurrencyType.COINS,
+        created_at=created_at, expires_at=created_at + timedelta(days=expires_in)
+    )
+
+
+def test_book_orders_by_price_then_time_with_lazy_cancellation():
+    books = MarketOrderBooks()
+    base = datetime.now()
+    for i, price in enumerate(["12", "10", "10", "11"]):
+        books.add(make_order(f"s{i}", MarketOrderType.SELL, price, created_at=base + timedelta(seconds=i)))
+    books.add(make_order("b0", MarketOrderType.BUY, "9", user_id=2))
+    books.add(make_order("old", MarketOrderType.SELL, "1", created_at=base - timedelta(days=8)))
+
+    book = books.book(ITEM, CurrencyType.COINS)
+    assert [o.order_id for o in book.side(False)] == ["s1", "s2", "s3", "s0"]
+    assert book.best(True).order_id == "b0"
+
+    books.remove("s1")
+    assert book.best(False).order_id == "s2"
+    assert books.user_order_count(1) == 4  # a expirada continua até ser liquidada
+    assert books.user_order_count(2) == 1
+
+    taker = make_order("t", MarketOrderType.BUY, "11", quantity=5, user_id=3)
+    matched = []
+    for order in book.crossing(taker):
+        matched.append(order.order_id)
+        books.remove(order.order_id)
+    assert matched == ["s2", "s3"]  # a venda expirada a 1 é ignorada
+
+    # Muitos cancelamentos compactam o heap em vez de deixá-lo crescer
+    for i in range(200):
+        books.add(make_order(f"c{i}", MarketOrderType.BUY, "5"))
+    for i in range(200):
+        books.remove(f"c{i}")
+    assert len(book._bids) < 100
+    assert book.best(True).order_id == "b0"
+
+
+def test_market_matches_best_price_first_and_keeps_remainder_on_book(tmp_path):
+    async def run():
+        system = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await system._init_task
+
+        for seller, price in ((10, "30"), (11, "20"), (12, "20")):
+            await system._add_to_inventory(seller, ITEM, 2)
+            result = await system.create_market_order(
+                seller, MarketOrderType.SELL, ITEM, 2, Decimal(price), CurrencyType.COINS)
+            assert result["success"]
+
+        await system.add_currency(20, CurrencyType.COINS, Decimal("1000"))
+        buy = await system.create_market_order(
+            20, MarketOrderType.BUY, ITEM, 5, Decimal("25"), CurrencyType.COINS)
+
+        market = await system.get_market_orders(ITEM)
+        inventory = await system._get_user_item_count(20, ITEM)
+        return system, buy, market, inventory
+
+    system, buy, market, inventory = asyncio.run(run())
+
+    # Só as vendas a 20 cruzam; a mais antiga é preenchida primeiro
+    assert inventory == 4
+    buy_order = system.market_orders[buy["order_id"]]
+    assert buy_order.filled_quantity == 4
+    assert buy_order.status == MarketOrderStatus.ACTIVE
+    assert [o["user_id"] for o in market["sell_orders"]] == [10]
+    assert [(o["user_id"], o["quantity"]) for o in market["buy_orders"]] == [(20, 1)]
+    assert len(system.order_books) == 2
+
+    result = asyncio.run(system.cancel_market_order(20, buy["order_id"]))
+    assert result["success"]
+    assert buy["order_id"] not in system.order_books
+    assert system.order_books.user_order_count(20) == 0
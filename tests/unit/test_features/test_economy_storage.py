@@ -0,0 +1,104 @@
+"""Testes da persistência incremental da economia"""
+
+import asyncio
+from decimal import Decimal
+
+from src.features.economy.modern_system import CurrencyType, MarketOrderType, ModernEconomySystem
+from src.features.economy.storage import EconomyStore
+
+
+def test_store_replays_journal_over_snapshot(tmp_path):
+    store = EconomyStore(tmp_path, compact_threshold=3)
+    store.load()
+    store.append([("wallets", "1", {"v": 1}), ("wallets", "2", {"v": 1})])
+    assert not store.needs_compaction
+
+    store.append([("wallets", "1", {"v": 2}), ("orders", "a", {"q": 1})])
+    assert store.needs_compaction
+    store.compact()
+    assert list(tmp_path.glob("journal-*.jsonl")) == []
+
+    store.append([("wallets", "2", None), ("orders", "a", {"q": 0})])
+    store.close()
+
+    # Linha parcial de uma escrita interrompida é ignorada
+    with open(next(tmp_path.glob("journal-*.jsonl")), "a", encoding="utf-8") as f:
+        f.write('{"seq": 99, "c": "wal')
+
+    recovered = EconomyStore(tmp_path).load()
+    assert recovered == {"wallets": {"1": {"v": 2}}, "orders": {"a": {"q": 0}}}
+
+
+def test_economy_saves_only_changes_and_recovers_on_restart(tmp_path):
+    async def first_run():
+        system = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await system._init_task
+        await system._save_data()  # itens padrão da loja
+
+        for user_id in range(50):
+            await system.add_currency(user_id, CurrencyType.COINS, Decimal("100"))
+        await system._save_data()
+        baseline = system.store.get_stats()["seq"]
+        transactions_before = len(system.transactions)
+
+        # Só a carteira, a transação e o inventário/ordem tocados são gravados
+        await system.add_currency(7, CurrencyType.COINS, Decimal("25.5"))
+        await system._add_to_inventory(7, "lucky_charm", 3)
+        order = await system.create_market_order(
+            7, MarketOrderType.SELL, "lucky_charm", 2, Decimal("40"), CurrencyType.COINS)
+        await system.claim_daily_bonus(8)
+        await system._save_data()
+        written = system.store.get_stats()["seq"] - baseline
+
+        await system._save_data()
+        assert system.store.get_stats()["seq"] - baseline == written
+        await system.shutdown()
+        new_transactions = len(system.transactions) - transactions_before
+        return order["order_id"], written, new_transactions, len(system.transactions)
+
+    async def second_run():
+        system = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await system._init_task
+        return system
+
+    order_id, written, new_transactions, transactions = asyncio.run(first_run())
+    # carteiras 7 e 8, inventário 7, ordem, dados do usuário 8 e as transações novas
+    assert written == 5 + new_transactions
+
+    system = asyncio.run(second_run())
+    assert system.wallets[7].get_balance(CurrencyType.COINS) == Decimal("125.5")
+    assert system.wallets[3].get_balance(CurrencyType.COINS) == Decimal("100")
+    assert system.user_data[8]["daily_streak"] == 1
+    assert order_id in system.order_books
+    assert asyncio.run(system._get_user_item_count(7, "lucky_charm")) == 1
+    assert len(system.transactions) == transactions
+
+
+def test_failed_save_keeps_records_dirty(tmp_path):
+    async def run():
+        system = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await system._init_task
+        await system._save_data()
+
+        await system.add_currency(5, CurrencyType.COINS, Decimal("42"))
+        append = system.store.append
+
+        def failing_append(records):
+            raise OSError("No space left on device")
+
+        system.store.append = failing_append
+        await system._save_data()
+        pending = system.store.get_stats()["dirty"]
+
+        system.store.append = append
+        await system._save_data()
+        await system.shutdown()
+
+        reloaded = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await reloaded._init_task
+        return pending, reloaded
+
+    pending, reloaded = asyncio.run(run())
+
+    assert pending > 0
+    assert reloaded.wallets[5].get_balance(CurrencyType.COINS) == Decimal("42")
@@ -0,0 +1,77 @@
+"""Testes do índice de transações por usuário"""
+
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from src.features.economy.modern_system import (
+    CurrencyType, ModernEconomySystem, TransactionModel, TransactionStatus, TransactionType
+)
+from src.features.economy.transaction_index import TransactionIndex
+
+
+def make_transaction(transaction_id, created_at, amount="10", from_user_id=1, to_user_id=2,
+                     transaction_type=TransactionType.TRANSFER, currency=CurrencyType.COINS):
+    return TransactionModel(
+        transaction_id=transaction_id, from_user_id=from_user_id, to_user_id=to_user_id,
+        transaction_type=transaction_type, currency=currency, amount=Decimal(amount),
+        status=TransactionStatus.COMPLETED, created_at=created_at
+    )
+
+
+def test_daily_counters_roll_over_and_ignore_other_types():
+    index = TransactionIndex()
+    today = datetime.now()
+    yesterday = today - timedelta(days=1)
+
+    index.add(make_transaction("a", yesterday, "500"))
+    index.add(make_transaction("b", today, "30"))
+    index.add(make_transaction("c", today, "20"))
+    index.add(make_transaction("d", today, "99", transaction_type=TransactionType.REWARD))
+    index.add(make_transaction("e", today, "7", currency=CurrencyType.GEMS))
+
+    assert index.daily_transferred(1, CurrencyType.COINS) == Decimal("50")
+    assert index.daily_transferred(1, CurrencyType.GEMS) == Decimal("7")
+    assert index.daily_transferred(2, CurrencyType.COINS) == Decimal("0")  # só quem envia
+    assert index.daily_transferred(1, CurrencyType.COINS, today.date() + timedelta(days=1)) == 0
+
+    # Carga fora de ordem produz o mesmo resultado
+    rebuilt = TransactionIndex()
+    rebuilt.rebuild([make_transaction("c", today, "20"), make_transaction("a", yesterday, "500"),
+                     make_transaction("b", today, "30")])
+    assert rebuilt.daily_transferred(1, CurrencyType.COINS) == Decimal("50")
+    assert rebuilt.page(2, 10) == ["c", "b", "a"]
+
+
+def test_history_pages_follow_cursor(tmp_path):
+    async def run():
+        system = ModernEconomySystem(bot=None, data_dir=tmp_path)
+        await system._init_task
+
+        for i in range(25):
+            await system._create_transaction(
+                transaction_type=TransactionType.TRANSFER, currency=CurrencyType.COINS,
+                amount=Decimal(i + 1), from_user_id=1 if i % 2 else 3, to_user_id=2 if i % 2 else 1)
+        await system._create_transaction(
+            transaction_type=TransactionType.REWARD, currency=CurrencyType.COINS,
+            amount=Decimal("5"), to_user_id=9)
+
+        pages = []
+        cursor = None
+        while True:
+            page = await system.get_transaction_history(1, limit=10, before=cursor)
+            if not page:
+                break
+            pages.append(page)
+            cursor = page[-1].transaction_id
+        return system, pages
+
+    system, pages = asyncio.run(run())
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    history = [t for page in pages for t in page]
+    expected = sorted((t for t in system.transactions.values() if 1 in (t.from_user_id, t.to_user_id)),
+                      key=lambda t: (t.created_at, t.transaction_id), reverse=True)
+    assert history == expected
+    transferred = sum(t.amount for t in system.transactions.values() if t.from_user_id == 1)
+    assert asyncio.run(system._get_daily_transferred(1, CurrencyType.COINS)) == transferred
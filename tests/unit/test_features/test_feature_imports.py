@@ -0,0 +1,23 @@
+"""Testes de importação dos sistemas como o bot.py faz (src no sys.path)"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[3] / 'src'
+
+
+@pytest.mark.parametrize('module, name', [
+    ('features.badges.system', 'BadgeSystem'),
+    ('features.achievements.badges', 'BadgeSystem'),
+    ('features.achievements.modern_system', 'ModernAchievementSystem'),
+    ('features.economy.modern_system', 'ModernEconomySystem'),
+])
+def test_feature_module_imports_as_top_level_package(module, name):
+    # Processo novo: `features` e `core` como pacotes de topo não devem
+    # conviver com os módulos `src.*` já importados pelos outros testes
+    code = f"import sys; sys.path.insert(0, {str(SRC_DIR)!r}); from {module} import {name}"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr.strip().splitlines()[-1:]
@@ -0,0 +1,99 @@
+"""Testes dos rankings incrementais de conquistas e emblemas"""
+
+import asyncio
+import os
+import sys
+
+# O pacote de conquistas importa `core.*` a partir de src/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'src'))
+
+from src.core.leaderboard import LeaderboardIndex
+from src.features.achievements.badges import BadgeSystem
+from src.features.achievements.modern_system import ModernAchievementSystem
+
+
+class FakeMember:
+    def __init__(self, member_id, bot=False):
+        self.id = member_id
+        self.bot = bot
+        self.display_name = f"user{member_id}"
+
+
+class FakeGuild:
+    def __init__(self, members):
+        self._members = {member.id: member for member in members}
+
+    def get_member(self, member_id):
+        return self._members.get(member_id)
+
+
+def test_index_keeps_boards_sorted():
+    index = LeaderboardIndex()
+    for member, score in [(1, 10), (2, 30), (3, 20), (4, 30)]:
+        index.set_score(member, score)
+
+    assert index.top(3) == [(2, 30), (4, 30), (3, 20)]
+
+    index.add_score(1, 25)
+    assert index.top(2) == [(1, 35), (2, 30)]
+    assert index.rank(3) == 4
+
+    index.remove(2)
+    assert [member for member, _ in index.iter_ranked()] == [1, 4, 3]
+    assert index.score(2) is None
+    assert index.top(5, board='vazio') == []
+
+
+def test_achievement_leaderboard_uses_category_totals():
+    async def run():
+        system = ModernAchievementSystem(bot=None, config_path='/nonexistent/achievements.json')
+        await asyncio.sleep(0)
+        system._send_achievement_notification = lambda *args: asyncio.sleep(0)
+
+        await system._unlock_achievement(1, system.achievements['first_kill'])
+        await system._unlock_achievement(2, system.achievements['first_win'])
+        await system._unlock_achievement(2, system.achievements['kill_master'])
+        await system.get_user_progress(3)
+
+        return (system, await system.get_leaderboard(10),
+                await system.get_leaderboard(10, 'combate'))
+
+    system, overall, combat = asyncio.run(run())
+
+    assert [entry['user_id'] for entry in overall] == [2, 1, 3]
+    assert overall[0]['achievements_count'] == 2
+
+    kill_master = system.achievements['kill_master']
+    assert combat[0]['user_id'] == 2
+    assert combat[0]['category_points'] == kill_master.points
+    assert combat[0]['category_achievements'] == 1
+    # Usuários sem pontos na categoria completam a lista com zero
+    assert combat[-1] == {**combat[-1], 'user_id': 3, 'category_points': 0}
+
+
+def test_badge_leaderboard_filters_guild_members(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    system = BadgeSystem(bot=None, storage=None, pubg_api=None, dual_ranking=None)
+
+    def give(user_id, *badges):
+        system.user_badges[user_id] = {"badges": [
+            {"name": name, "rarity": rarity, "category": category, "earned_date": "2024-01-01"}
+            for name, rarity, category in badges
+        ], "total_score": 0}
+        system._update_user_badge_score(user_id)
+
+    give("1", ("a", "comum", "combat"))
+    give("2", ("b", "mítico", "social"), ("c", "comum", "combat"))
+    give("3", ("d", "lendário", "combat"))
+    give("4", ("e", "mítico", "combat"))
+
+    guild = FakeGuild([FakeMember(1), FakeMember(2), FakeMember(3), FakeMember(4, bot=True)])
+
+    ranking = system.get_leaderboard(guild, limit=2)
+    assert [entry["user_id"] for entry in ranking] == ["2", "3"]
+
+    combat = system.get_leaderboard(guild, limit=5, category="combat")
+    assert [(e["user_id"], e["category_score"]) for e in combat] == [("3", 300), ("1", 100), ("2", 100)]
+
+    asyncio.run(system.reset_all_badges(0))
+    assert system.get_leaderboard(guild) == []
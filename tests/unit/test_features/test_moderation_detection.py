@@ -0,0 +1,61 @@
+"""Testes do motor de detecção compilado da moderação"""
+
+import re
+
+from src.features.moderation.detection import (
+    DetectionEngine, DEFAULT_TOXICITY_PATTERNS, DEFAULT_TOXIC_WORDS,
+    build_trie_pattern, extract_trigger_literals, merge_word_lists
+)
+
+
+def legacy_categories(content):
+    content_lower = content.lower()
+    return [category for category, patterns in DEFAULT_TOXICITY_PATTERNS.items()
+            if any(re.search(p, content_lower, re.IGNORECASE) for p in patterns)]
+
+
+def test_trie_pattern_matches_exactly_the_words():
+    words = {'hack', 'hacker', 'ez', 'easy', 'git gud'}
+    regex = re.compile(r'(?:' + build_trie_pattern(words) + r')\Z')
+
+    for word in words:
+        assert regex.match(word)
+    assert not regex.match('hacke')
+    assert not regex.match('e')
+
+
+def test_extract_trigger_literals():
+    assert extract_trigger_literals(r'\b(f[a4]g)\b') == ['fag', 'f4g']
+    assert extract_trigger_literals(r'(discord\.gg|bit\.ly)') == ['discord.gg', 'bit.ly']
+    assert extract_trigger_literals(r'(.)\1{10,}') is None
+    assert extract_trigger_literals(r'\b(\w+)\b') is None
+
+
+def test_patterns_match_legacy_behavior():
+    engine = DetectionEngine()
+    samples = [
+        'FREE NITRO aqui, click here now',
+        'kys', 'xkysuicide you', 'go die you noob',
+        'aaaaaaaaaaaaaaaaaaaa', 'entra no discord.gg/abc',
+        'verify account or get banned, click the link',
+        'bom jogo galera'
+    ]
+    for sample in samples:
+        assert engine.match_patterns(sample.lower()) == legacy_categories(sample), sample
+
+
+def test_words_respect_word_boundaries():
+    engine = DetectionEngine()
+
+    # Substrings não contam mais ("cu" em "curso", "ez" em "fazer")
+    assert engine.match_words('vou fazer o curso') == {}
+    assert engine.match_words('ez demais, noob') == {'gaming_toxicity': {'ez', 'noob'}}
+    assert engine.match_words('filho da puta') == {'profanity': {'filho da puta'}}
+
+
+def test_custom_guild_words_are_merged():
+    words = merge_word_lists(DEFAULT_TOXIC_WORDS, {'toxicity': ['Camper'], 'custom': ['xit']})
+    engine = DetectionEngine(DEFAULT_TOXICITY_PATTERNS, words)
+
+    found = engine.match_words('esse camper usa xit')
+    assert found == {'toxicity': {'camper'}, 'custom': {'xit'}}
@@ -0,0 +1,74 @@
+"""Testes do pipeline de moderação em lotes por servidor"""
+
+import asyncio
+
+from src.features.moderation.pipeline import ModerationPipeline
+
+
+def test_batches_per_guild_and_drains():
+    batches = []
+
+    async def handler(guild_id, batch, shed):
+        batches.append((guild_id, [item.message for item in batch], shed))
+
+    async def run():
+        pipeline = ModerationPipeline(handler, max_queue_size=100, batch_size=8)
+        for i in range(20):
+            assert pipeline.submit(i % 2, i)
+        await pipeline.drain()
+        stats = pipeline.get_stats()
+        await pipeline.shutdown()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert stats['processed'] == 20
+    assert stats['queue_depth'] == 0
+    assert all(len(messages) <= 8 for _, messages, _ in batches)
+    assert [m for g, ms, _ in batches if g == 0 for m in ms] == list(range(0, 20, 2))
+    assert [m for g, ms, _ in batches if g == 1 for m in ms] == list(range(1, 20, 2))
+
+
+def test_sheds_load_and_drops_when_full():
+    sheds = []
+
+    async def handler(guild_id, batch, shed):
+        sheds.append(shed)
+
+    async def run():
+        pipeline = ModerationPipeline(handler, max_queue_size=10, batch_size=4, shed_ratio=0.5)
+        accepted = [pipeline.submit(1, i) for i in range(15)]
+        await pipeline.drain()
+        stats = pipeline.get_guild_stats(1)
+        await pipeline.shutdown()
+        return accepted, stats
+
+    accepted, stats = asyncio.run(run())
+
+    # A fila cheia descarta o excedente sem bloquear o submit
+    assert accepted.count(True) == 10
+    assert stats['dropped'] == 5
+    # Primeiros lotes com a fila acima de 50%: análise pesada descartada
+    assert sheds[0] is True
+    assert sheds[-1] is False
+    assert stats['shed_batches'] == sheds.count(True)
+
+
+def test_handler_errors_do_not_stop_worker():
+    seen = []
+
+    async def handler(guild_id, batch, shed):
+        seen.extend(item.message for item in batch)
+        if batch[0].message == 0:
+            raise RuntimeError("falha")
+
+    async def run():
+        pipeline = ModerationPipeline(handler, batch_size=1)
+        for i in range(3):
+            pipeline.submit(1, i)
+        await pipeline.drain()
+        await pipeline.shutdown()
+        return pipeline.submit(1, 99)
+
+    assert asyncio.run(run()) is False
+    assert seen == [0, 1, 2]
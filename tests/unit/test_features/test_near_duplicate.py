@@ -0,0 +1,82 @@
+"""Testes do índice MinHash-LSH de quase-duplicatas"""
+
+import asyncio
+import time
+
+from src.features.moderation.near_duplicate import FloodMatch, MinHasher, NearDuplicateIndex, estimate_similarity
+
+RAID_MESSAGE = 'ganhe nitro gratis agora mesmo clicando no link discord gift nitro'
+
+
+def test_signature_similarity_tracks_jaccard():
+    hasher = MinHasher(num_hashes=64)
+    base = hasher.signature(hasher.shingles(RAID_MESSAGE))
+    variant = hasher.signature(hasher.shingles(RAID_MESSAGE + ' 4821'))
+    other = hasher.signature(hasher.shingles('bora jogar squad hoje no mapa erangel de noite'))
+
+    assert estimate_similarity(base, base) == 1.0
+    assert estimate_similarity(base, variant) > 0.6
+    assert estimate_similarity(base, other) < 0.2
+
+
+def test_flags_only_after_min_distinct_users():
+    index = NearDuplicateIndex()
+
+    # Um único usuário repetindo não é flood coordenado (é spam do SpamDetector)
+    for i in range(6):
+        assert index.check(1, 42, RAID_MESSAGE, now=float(i)) is None
+
+    assert index.check(1, 43, RAID_MESSAGE + ' 1111', now=6.0) is None
+    assert index.check(1, 44, RAID_MESSAGE + ' 2222', now=7.0) is None
+    match = index.check(1, 45, RAID_MESSAGE + ' 3333', now=8.0)
+
+    assert match is not None
+    assert match.distinct_users == 4
+    assert match.first_seen == 0.0
+    assert match.last_seen == 8.0
+
+    # Outro servidor tem índice próprio
+    assert index.check(2, 46, RAID_MESSAGE, now=8.0) is None
+
+
+def test_window_expiry_and_short_messages():
+    index = NearDuplicateIndex()
+
+    for user_id in range(3):
+        index.check(1, user_id, RAID_MESSAGE, window=30, now=float(user_id))
+    # A quarta conta chega depois da janela: as anteriores já expiraram
+    assert index.check(1, 99, RAID_MESSAGE, window=30, now=100.0) is None
+    assert index.get_stats()['buckets'] == NearDuplicateIndex().bands
+
+    # Mensagens curtas repetem naturalmente e são ignoradas
+    for user_id in range(10):
+        assert index.check(1, user_id, 'bom dia', now=101.0) is None
+
+
+def test_raid_signal_expires_from_last_flood_message():
+    from src.features.moderation.modern_system import RaidProtection
+
+    class Metrics:
+        def __init__(self):
+            self.waves = 0
+
+        async def increment(self, metric, tags=None):
+            self.waves += 1
+
+    metrics = Metrics()
+    raid = RaidProtection(cache=None, metrics=metrics)
+    now = time.monotonic()
+
+    def report(first_seen, last_seen):
+        match = FloodMatch(guild_id=1, distinct_users=5, message_count=9, similarity=0.9,
+                           first_seen=first_seen, last_seen=last_seen)
+        asyncio.run(raid.report_message_flood(1, match))
+
+    # Onda iniciada há 20 minutos mas ainda ativa continua sendo sinal de raid
+    report(now - 1200, now - 5)
+    report(now - 1200, now - 1)
+    assert raid.get_active_flood(1) is not None
+    assert metrics.waves == 1
+
+    report(now - 1200, now - raid.flood_signal_ttl - 1)
+    assert raid.get_active_flood(1) is None
@@ -0,0 +1,61 @@
+"""Testes do histórico de mensagens (ring buffers) do detector de spam"""
+
+import asyncio
+
+from src.features.moderation.modern_system import ModerationConfig, SpamDetector, ViolationType
+from src.features.moderation.spam_history import MessageRing, SpamHistory
+
+
+class NullMetrics:
+    async def increment(self, metric, tags=None):
+        pass
+
+
+def test_ring_overwrites_oldest_entries():
+    ring = MessageRing(capacity=3)
+    for i in range(5):
+        ring.append(float(i), f"msg {i}")
+
+    assert ring.size == 3
+    assert [ring.timestamp_at(back) for back in range(3)] == [4.0, 3.0, 2.0]
+    assert ring.hash_at(0) == hash("msg 4")
+    assert ring.last_content == "msg 4" and ring.prev_content == "msg 3"
+    assert ring.count_since(2.5, limit=3) == 2
+
+
+def test_idle_users_expire_from_timing_wheel():
+    history = SpamHistory(capacity=4, idle_ttl=10.0, tick=1.0)
+    history.record(1, 100, "oi", now=0.0)
+    history.record(1, 200, "oi", now=0.0)
+
+    # Usuário 200 continua ativo; 100 fica ocioso
+    for t in range(1, 9):
+        history.record(1, 200, "oi", now=float(t))
+    history.record(1, 300, "oi", now=15.0)
+
+    assert history.get(1, 100) is None
+    assert history.get(1, 200) is not None
+    assert history.expired_count == 1
+
+    history.record(1, 300, "oi", now=40.0)
+    assert history.get(1, 200) is None
+    assert len(history) == 1
+
+
+def test_check_spam_detects_frequency_and_repeats():
+    detector = SpamDetector(cache=None, metrics=NullMetrics())
+    config = ModerationConfig(spam_message_limit=5, spam_time_window=10)
+
+    async def run():
+        results = []
+        for i in range(3):
+            results.append(await detector.check_spam(1, 1, "compra aqui", config))
+        for i in range(6):
+            results.append(await detector.check_spam(2, 1, f"mensagem diferente numero {i} {'x' * i}", config))
+        return results
+
+    results = asyncio.run(run())
+
+    assert results[2][0] == ViolationType.REPEATED_MESSAGES
+    assert results[-1][0] == ViolationType.SPAM
+    assert all(violation is None for violation, _ in results[3:8])
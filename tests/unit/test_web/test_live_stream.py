@@ -0,0 +1,132 @@
+"""Testes do canal de atualizações em tempo real do dashboard"""
+
+import asyncio
+import json
+
+from src.web.live_stream import EVENT_CHANNELS, LiveUpdateHub, compute_diff, stream_client_limit
+
+
+def make_hub(state, **kwargs):
+    """Cria um hub com um único canal 'players' lido de `state`"""
+    return LiveUpdateHub(
+        load_data=lambda: state,
+        providers={'players': lambda data: dict(data['players'])},
+        **kwargs
+    )
+
+
+def test_compute_diff_upsert_remove_order():
+    old = {'a': 1, 'b': 2, 'c': 3}
+    new = {'b': 2, 'a': 5, 'd': 4}
+
+    diff = compute_diff(old, new)
+
+    assert diff['upsert'] == {'a': 5, 'd': 4}
+    assert diff['remove'] == ['c']
+    assert diff['order'] == ['b', 'a', 'd']
+    assert compute_diff(new, dict(new)) is None
+
+
+def test_client_receives_snapshot_then_coalesced_diff():
+    state = {'players': {'1': {'kills': 10}}}
+    hub = make_hub(state)
+    hub._running = True
+    client = hub.subscribe()
+
+    resync, pending = client.pull(timeout=0)
+    assert resync == {'players'} and pending == {}
+
+    # Duas mudanças antes do cliente ler viram um único diff
+    state['players'] = {'1': {'kills': 11}, '2': {'kills': 1}}
+    hub.refresh(['players'])
+    state['players'] = {'1': {'kills': 12}}
+    hub.refresh(['players'])
+
+    resync, pending = client.pull(timeout=0)
+    assert resync == set()
+    assert pending['players']['upsert'] == {'1': {'kills': 12}}
+    assert pending['players']['remove'] == ['2']
+
+
+def test_slow_client_falls_back_to_snapshot():
+    state = {'players': {}}
+    hub = make_hub(state, max_pending_rows=3)
+    hub._running = True
+    client = hub.subscribe()
+    client.pull(timeout=0)
+
+    state['players'] = {str(i): i for i in range(10)}
+    hub.refresh(['players'])
+
+    resync, pending = client.pull(timeout=0)
+    assert resync == {'players'}
+    assert pending == {}
+    assert client.dropped_frames == 1
+
+
+def test_stream_formats_sse_frames():
+    state = {'players': {'1': {'kills': 1}}}
+    hub = make_hub(state)
+    hub._running = True
+    client = hub.subscribe(['players'])
+
+    frames = hub.stream(client, keepalive=0)
+    assert next(frames).startswith('retry:')
+
+    frame = next(frames)
+    assert frame.startswith('event: snapshot\n')
+    payload = json.loads(frame.split('data: ', 1)[1])
+    assert payload['channel'] == 'players'
+    assert payload['rows'] == {'1': {'kills': 1}}
+
+
+def test_subscribe_respects_client_limit():
+    hub = make_hub({'players': {}}, max_clients=1)
+    assert hub.subscribe() is not None
+    assert hub.subscribe() is None
+
+
+def test_events_mark_channels_dirty():
+    class Event:
+        name = 'ranking_updated'
+
+    hub = LiveUpdateHub(load_data=dict, providers={'leaderboard': dict, 'stats': dict})
+    hub._on_event(Event())
+
+    assert hub._dirty == {'leaderboard', 'stats'}
+    assert hub.events_received == 1
+
+
+def test_stream_client_limit_leaves_threads_for_other_routes():
+    assert stream_client_limit(16) == 8
+    assert stream_client_limit(4) == 2
+    assert stream_client_limit(2) == 0
+    assert stream_client_limit(8, reserved_threads=3) == 5
+
+    hub = make_hub({'players': {}}, max_clients=stream_client_limit(4))
+    clients = [hub.subscribe() for _ in range(3)]
+    assert clients[2] is None
+    for client in clients[:2]:
+        hub.unsubscribe(client)
+
+
+def test_tournament_events_reach_the_hub(tmp_path, monkeypatch):
+    from src.core.event_system import get_event_system
+    from src.features.tournaments.modern_system import ModernTournamentSystem
+
+    monkeypatch.chdir(tmp_path)
+    hub = LiveUpdateHub(load_data=dict, providers={'tournaments': dict, 'stats': dict})
+    hub.attach(get_event_system())
+
+    async def run():
+        system = ModernTournamentSystem(bot=None)
+        await system.events.emit('tournament_created', {'tournament_id': 't1'})
+
+    try:
+        asyncio.run(run())
+    finally:
+        for event_name in EVENT_CHANNELS:
+            get_event_system().remove_listener(event_name, f"live_stream_{event_name}")
+
+    assert hub._dirty == {'tournaments', 'stats'}
+    assert hub.events_received == 1
@@ -18,6 +18,7 @@ sys.path.insert(0, str(src_path))
 
 from src.bot import HawkBot
 from web.app import WebDashboard
+from web.live_stream import stream_client_limit
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,8 +27,12 @@ logger = logging.getLogger('WSGI')
 # Create bot instance
 bot = HawkBot()
 
+# Threads do servidor; cada cliente de /api/stream prende uma até desconectar,
+# então metade do pool fica reservada para as demais rotas
+WEB_THREADS = int(os.getenv('WEB_THREADS', '16'))
+
 # Create Flask app instance
-web_dashboard = WebDashboard()
+web_dashboard = WebDashboard(max_stream_clients=stream_client_limit(WEB_THREADS))
 app = web_dashboard.app
 
 def start_discord_bot():
@@ -52,7 +57,7 @@ if __name__ == "__main__":
     try:
         from waitress import serve
         logger.info(f"Starting with Waitress on port {port}")
-        serve(app, host='0.0.0.0', port=port, threads=4)
+        serve(app, host='0.0.0.0', port=port, threads=WEB_THREADS)
     except ImportError:
         logger.info(f"Starting with Flask dev server on port {port}")
         app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
\ No newline at end of file